@@ -11,9 +11,12 @@ from pathlib import Path
 from typing import Callable, List, Optional
 
 from admin_tool.db_manager import DatabaseManager, format_build_error
+from shared.build_scheduler import BuildJob, estimate_build_weight, run_concurrent_builds
 from shared.db_build_state import is_building, is_stale_building
 from shared.indexer_version import INDEXER_VERSION
 from shared.source_path import get_effective_config_xml, source_exists
+from shared.xml_parser import WorkerPool
+from shared.xml_parser.parse_cache import default_parse_cache_dir
 
 #: Обновлять только базы, чья версия формата индекса не равна текущей (плюс отсутствующие файлы).
 SCOPE_OUTDATED = 'outdated'
@@ -122,41 +125,107 @@ def run_bulk_update(
     on_progress: Optional[Callable[[BulkTarget, int, int, str, bool], None]] = None,
     on_db_finish: Optional[Callable[[BulkTarget, bool, Optional[str]], None]] = None,
     should_stop: Optional[Callable[[], bool]] = None,
+    max_parallel: int = 1,
+    memory_budget_mb: Optional[int] = None,
 ) -> BulkResult:
-    """Последовательно пересобирает базы из плана.
+    """Пересобирает базы из плана — последовательно или, с `max_parallel` > 1, до стольких
+    баз одновременно (`_run_parallel`).
 
     Ошибка одной базы не прерывает прогон: она попадает в `BulkResult.failures`, и
     обход продолжается — иначе долгий батч пришлось бы запускать заново с начала.
     `should_stop` проверяется между базами (сборка одной базы не прерывается —
     кооперативная отмена внутри сборки это отдельная задача `gui-cancel-build`).
+
+    Все сборки прогона разбирают в одном пуле воркеров (`WorkerPool`): старт процессов
+    оплачивается один раз на батч, а не на каждую базу. После неудачной сборки пул
+    пересоздаётся — упавший воркер не должен утянуть за собой следующие базы.
     """
     actionable = [t for t in targets if t.is_actionable]
     result = BulkResult()
 
-    for index, target in enumerate(actionable, start=1):
-        if should_stop is not None and should_stop():
-            result.stopped_early = True
-            break
+    # ProcessPoolExecutor порождает процессы лениво, на первый submit(): пустой план ничего не стоит.
+    with WorkerPool() as pool:
+        if max_parallel > 1 and len(actionable) > 1:
+            _run_parallel(
+                actionable, pool, result, max_parallel, memory_budget_mb,
+                on_db_start, on_progress, on_db_finish, should_stop,
+            )
+            return result
+
+        for index, target in enumerate(actionable, start=1):
+            if should_stop is not None and should_stop():
+                result.stopped_early = True
+                break
+
+            if on_db_start:
+                on_db_start(index, len(actionable), target)
+
+            def progress_callback(current, total, message, replace_last=False, _t=target):
+                if on_progress:
+                    on_progress(_t, current, total, message, replace_last)
+
+            try:
+                DatabaseManager.build_from_xml_atomic(
+                    target.db_path, target.config_xml, progress_callback=progress_callback,
+                    parse_cache_dir=default_parse_cache_dir(target.db_path), worker_pool=pool,
+                )
+                result.succeeded += 1
+                if on_db_finish:
+                    on_db_finish(target, True, None)
+            except Exception as exc:  # noqa: BLE001 — сводка по всем базам важнее падения на первой
+                error_text = format_build_error(exc)
+                result.failed += 1
+                result.failures.append((target.label, error_text))
+                if pool.broken:
+                    pool.reset()
+                if on_db_finish:
+                    on_db_finish(target, False, error_text)
 
-        if on_db_start:
-            on_db_start(index, len(actionable), target)
+    return result
+
+
+def _run_parallel(
+    actionable, pool, result, max_parallel, memory_budget_mb,
+    on_db_start, on_progress, on_db_finish, should_stop,
+):
+    """Параллельный режим `run_bulk_update`: расписание и деление пула — `shared/build_scheduler.py`.
+
+    Контракт тот же, что у последовательного прогона: ошибка базы — в `result.failures`,
+    `should_stop` проверяется перед стартом каждой следующей базы, колбэки приходят на
+    каждую базу (прогресс — из потока её сборки, старт и финиш — из потока вызывающего).
+    Номер в `on_db_start` — порядок старта: крупные базы стартуют первыми.
+    """
+    jobs = [BuildJob(item=target, weight=estimate_build_weight(target.config_xml)) for target in actionable]
+    started = [0]
 
-        def progress_callback(current, total, message, replace_last=False, _t=target):
+    def build(target, worker_pool):
+        def progress_callback(current, total, message, replace_last=False):
             if on_progress:
-                on_progress(_t, current, total, message, replace_last)
+                on_progress(target, current, total, message, replace_last)
 
-        try:
-            DatabaseManager.build_from_xml_atomic(
-                target.db_path, target.config_xml, progress_callback=progress_callback
-            )
+        return DatabaseManager.build_from_xml_atomic(
+            target.db_path, target.config_xml, progress_callback=progress_callback,
+            parse_cache_dir=default_parse_cache_dir(target.db_path), worker_pool=worker_pool,
+        )
+
+    def on_start(job):
+        started[0] += 1
+        if on_db_start:
+            on_db_start(started[0], len(actionable), job.item)
+
+    def on_finish(job):
+        if job.error is None:
             result.succeeded += 1
             if on_db_finish:
-                on_db_finish(target, True, None)
-        except Exception as exc:  # noqa: BLE001 — сводка по всем базам важнее падения на первой
-            error_text = format_build_error(exc)
-            result.failed += 1
-            result.failures.append((target.label, error_text))
-            if on_db_finish:
-                on_db_finish(target, False, error_text)
-
-    return result
+                on_db_finish(job.item, True, None)
+            return
+        error_text = format_build_error(job.error)
+        result.failed += 1
+        result.failures.append((job.item.label, error_text))
+        if on_db_finish:
+            on_db_finish(job.item, False, error_text)
+
+    result.stopped_early = run_concurrent_builds(
+        jobs, build, pool, max_parallel, memory_budget_mb=memory_budget_mb,
+        should_stop=should_stop, on_start=on_start, on_finish=on_finish,
+    )
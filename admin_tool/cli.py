@@ -55,6 +55,13 @@ def _build_parser() -> argparse.ArgumentParser:
             default=True,
             help="JSON output on stdout (default: true)",
         )
+        if name == "rebuild-all":
+            sp.add_argument(
+                "--parallel",
+                type=int,
+                default=1,
+                help="Build up to N databases at once, sharing one worker pool (default: 1)",
+            )
 
     rebuild_sp = sub.add_parser("rebuild-index", help="Rebuild one database index (JSON)")
     rebuild_sp.add_argument(
@@ -62,6 +69,24 @@ def _build_parser() -> argparse.ArgumentParser:
         required=True,
         help="infobaseId (database registry id)",
     )
+    rebuild_sp.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Re-parse only objects whose source files changed (full rebuild if not possible)",
+    )
+    rebuild_sp.add_argument(
+        "--compact",
+        action="store_true",
+        default=False,
+        help="After a full build, VACUUM the database for reading (slower build, smaller file)",
+    )
+    rebuild_sp.add_argument(
+        "--code-trigram",
+        action="store_true",
+        default=False,
+        help="Also build the trigram code index: substring search_code without a LIKE scan (larger file)",
+    )
     rebuild_sp.add_argument(
         "--json",
         action="store_true",
@@ -207,11 +232,14 @@ def main(argv: list[str] | None = None) -> int:
         elif command == "export-registry":
             payload = run_export_registry(args.root)
         elif command == "rebuild-index":
-            payload = run_rebuild_index(args.db_id, args.root)
+            payload = run_rebuild_index(
+                args.db_id, args.root, incremental=args.incremental, compact=args.compact,
+                code_trigram=args.code_trigram,
+            )
             _emit_json(payload, args.json)
             return _rebuild_exit_code(payload)
         elif command == "rebuild-all":
-            payload = run_rebuild_all(args.root)
+            payload = run_rebuild_all(args.root, parallel=args.parallel)
             _emit_json(payload, args.json)
             return EXIT_SUCCESS if payload.get("success") else EXIT_RUNTIME
         elif command == "reconcile-markers":
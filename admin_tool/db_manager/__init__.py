@@ -10,10 +10,14 @@ from .insert_objects import ObjectInsertionMixin
 from .insert_forms import FormInsertionMixin
 from .relations import RelationsMixin
 from .roles import RoleInsertionMixin
+from .incremental import IncrementalUpdateMixin
+from .checkpoint import BuildCheckpointMixin
 from .file_ops import format_build_error, _replace_file_with_retry
 
 
 class DatabaseManager(
+    IncrementalUpdateMixin,
+    BuildCheckpointMixin,
     ObjectInsertionMixin,
     FormInsertionMixin,
     RelationsMixin,
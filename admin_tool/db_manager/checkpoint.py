@@ -0,0 +1,193 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+from shared.db_build_state import is_interrupted_build, tmp_db_path
+from shared.indexer_version import INDEXER_VERSION
+from shared.xml_parser import ConfigurationParser
+from shared.xml_parser.xml_helpers import _winlong
+
+from .insert_objects import _InsertState
+
+#: Как часто потоковая вставка фиксирует контрольную точку в foo.db.tmp. Точка — commit плюс
+#: JSON `_InsertState` (на ЕРП — сотни тысяч отложенных слотов типов), поэтому не чаще:
+#: за ~160 c сборки это около восьми точек, прерванная сборка теряет не больше 20 c.
+CHECKPOINT_INTERVAL_SECONDS = 20.0
+
+_CHECKPOINT_TABLE = '''
+    CREATE TABLE IF NOT EXISTS build_checkpoint (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        indexer_version INTEGER NOT NULL,
+        config_path TEXT NOT NULL,
+        config_hash TEXT NOT NULL,
+        objects_done INTEGER NOT NULL,
+        last_object_type TEXT,
+        last_object_name TEXT,
+        insert_state BLOB NOT NULL,
+        saved_at REAL NOT NULL
+    )
+'''
+
+
+def _dump_state(state):
+    """`_InsertState` точки: zlib над JSON — только данные. tmp лежит в общем каталоге баз, и
+    pickle из подложенного туда файла выполнил бы чужой код при следующей сборке."""
+    payload = {
+        'source_db_name': state.source_db_name,
+        'pending_type_slots': state.pending_type_slots,
+        'pending_form_type_slots': state.pending_form_type_slots,
+        'pending_fo_usage': state.pending_fo_usage,
+        # Ключи — пары (тип, имя): в JSON — списком троек.
+        'type_name_to_id': [[obj_type, name, obj_id] for (obj_type, name), obj_id in state.type_name_to_id.items()],
+        'fo_resolver': state.fo_resolver,
+        'relation_objects': state.relation_objects,
+        'preassigned_ids': [[obj_type, name, obj_id] for (obj_type, name), obj_id in state.preassigned_ids.items()],
+    }
+    text = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    return zlib.compress(text.encode('utf-8'), 1)
+
+
+def _load_state(blob):
+    """`_InsertState` из `_dump_state`."""
+    payload = json.loads(zlib.decompress(blob).decode('utf-8'))
+    state = _InsertState(payload['source_db_name'])
+    state.pending_type_slots = payload['pending_type_slots']
+    state.pending_form_type_slots = payload['pending_form_type_slots']
+    state.pending_fo_usage = [tuple(usage) for usage in payload['pending_fo_usage']]
+    state.type_name_to_id = {(obj_type, name): obj_id for obj_type, name, obj_id in payload['type_name_to_id']}
+    state.fo_resolver = payload['fo_resolver']
+    state.relation_objects = payload['relation_objects']
+    state.preassigned_ids = {(obj_type, name): obj_id for obj_type, name, obj_id in payload['preassigned_ids']}
+    return state
+
+
+def _config_hash(config_xml_path):
+    with open(_winlong(config_xml_path), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class BuildCheckpoints:
+    """Контрольные точки одной полной сборки (см. `BuildCheckpointMixin`)."""
+
+    def __init__(self, conn, config_xml_path, objects_done=0):
+        self.conn = conn
+        self.config_path = str(Path(config_xml_path).resolve())
+        self.config_hash = _config_hash(config_xml_path)
+        self.objects_done = objects_done
+        self.saved = 0
+        self._last_save = time.perf_counter()
+        self.conn.execute(_CHECKPOINT_TABLE)
+
+    def after_object(self, rows, state, obj):
+        """Объект вставлен целиком (в `RowWriter` сборки); раз в `CHECKPOINT_INTERVAL_SECONDS` — точка."""
+        self.objects_done += 1
+        if time.perf_counter() - self._last_save >= CHECKPOINT_INTERVAL_SECONDS:
+            self.save(rows, state, obj)
+
+    def save(self, rows, state, obj):
+        try:
+            blob = _dump_state(state)
+        except (TypeError, ValueError):
+            # Значение не из JSON в разобранном объекте: эту точку пропускаем — буфер не
+            # сбрасывается и не коммитится, прежняя точка по-прежнему описывает базу.
+            return
+        # Точка описывает то, что уже в базе: сначала сбросить буфер строк.
+        rows.flush()
+        rows.cursor.execute('''
+            INSERT OR REPLACE INTO build_checkpoint (
+                id, indexer_version, config_path, config_hash, objects_done,
+                last_object_type, last_object_name, insert_state, saved_at
+            )
+            VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            INDEXER_VERSION, self.config_path, self.config_hash, self.objects_done,
+            obj['type'], obj['name'],
+            blob,
+            time.time(),
+        ))
+        self.conn.commit()
+        self.saved += 1
+        self._last_save = time.perf_counter()
+
+    @staticmethod
+    def clear(cursor):
+        """Убирает точку в той же транзакции, что пишет отложенные стадии: после их commit
+        продолжать с точки нельзя (они бы записались второй раз), а до — точка нужна."""
+        cursor.execute('DROP TABLE IF EXISTS build_checkpoint')
+
+
+class BuildCheckpointMixin:
+    """Возобновляемая полная сборка: контрольные точки потоковой вставки в foo.db.tmp.
+
+    Если сборка умерла посреди вставки (OOM, сон машины, закрытое GUI), в каталоге остаются
+    foo.db.tmp и маркер `.building` мёртвого процесса. Следующий `build_from_xml_atomic`
+    той же выгрузки (`load_build_checkpoint`) не удаляет tmp, а продолжает: всё, что
+    закоммичено до последней точки, уже в базе, незакоммиченный хвост SQLite откатил по
+    журналу; разбираются только объекты, которых нет в `_InsertState.type_name_to_id`
+    точки, затем отложенные стадии — как у обычной сборки. foo.db не трогается до подмены.
+    """
+
+    @staticmethod
+    def load_build_checkpoint(db_path, config_xml_path):
+        """Точка прерванной сборки `db_path` из той же выгрузки или None.
+
+        Продолжать можно, только если: маркер сборки есть, а его процесс мёртв; foo.db.tmp
+        проходит `quick_check`; точка записана той же версией индексатора по тому же
+        Configuration.xml (путь и содержимое); отпечатки файлов объектов (`object_sources`
+        tmp-базы) не изменились — иначе уже вставленные объекты устарели.
+
+        Returns:
+            dict | None: state (`_InsertState`), objects_done, last_object, source_fingerprints.
+        """
+        db_path = Path(db_path)
+        tmp_path = tmp_db_path(db_path)
+        if not is_interrupted_build(db_path):
+            return None
+        try:
+            conn = sqlite3.connect(f'{tmp_path.resolve().as_uri()}?mode=ro', uri=True)
+        except sqlite3.Error:
+            return None
+        try:
+            if conn.execute('PRAGMA quick_check').fetchone()[0] != 'ok':
+                return None
+            row = conn.execute('''
+                SELECT indexer_version, config_path, config_hash, objects_done,
+                       last_object_type, last_object_name, insert_state
+                FROM build_checkpoint WHERE id = 1
+            ''').fetchone()
+            if row is None:
+                return None
+            stored_fingerprints = {
+                (r[0], r[1]): (r[2], r[3])
+                for r in conn.execute('SELECT object_type, name, stat_signature, content_hash FROM object_sources')
+            }
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+        version, config_path, config_hash, objects_done, last_type, last_name, blob = row
+        try:
+            if (
+                version != INDEXER_VERSION
+                or config_path != str(Path(config_xml_path).resolve())
+                or config_hash != _config_hash(config_xml_path)
+            ):
+                return None
+            state = _load_state(blob)
+        except Exception:  # noqa: BLE001 — битая/чужая точка: просто собираем заново
+            return None
+
+        parser = ConfigurationParser(config_xml_path, use_process_pool=False)
+        fingerprints = parser.matching_source_fingerprints(stored_fingerprints)
+        if fingerprints is None:
+            return None
+        return {
+            'state': state,
+            'objects_done': objects_done,
+            'last_object': (last_type, last_name),
+            'source_fingerprints': fingerprints,
+        }
@@ -1,14 +1,25 @@
+import json
 import sqlite3
 import time
+import uuid
 from contextlib import closing
 from pathlib import Path
 
 from shared.xml_parser import ConfigurationParser
+from shared.xml_parser.parse_cache import ParseCache
 from shared.indexer_version import INDEXER_VERSION
+from shared.index_status import INDEX_GENERATION_KEY, INDEX_STATISTICS_KEY
 from shared.db_build_state import mark_building, clear_building, tmp_db_path
 
+from .checkpoint import BuildCheckpoints
+from .pipeline import PIPELINE_DEPTH, ParsePipeline
 from .file_ops import _remove_db_file, _remove_sqlite_sidecars, _replace_file_with_retry
 
+#: Размер страницы, с которым `compact_database` пересобирает файл. По умолчанию SQLite пишет
+#: страницами по 4 КБ; база только читается, а крупные строки (сжатый код, тексты RLS, FTS)
+#: на 8 КБ реже уходят в overflow-цепочки, и B-деревья индексов на уровень ниже.
+COMPACT_PAGE_SIZE = 8192
+
 _STAGE_LABELS = {
     'properties': 'Метаданные (свойства/реквизиты)',
     'modules': 'Модули (BSL)',
@@ -18,6 +29,9 @@ _STAGE_LABELS = {
     'commands': 'Команды объектов',
     'subsystems': 'Подсистемы',
     'roles': 'Роли / role_grants',
+    'objects': 'Ожидание воркеров разбора объектов',
+    'dcs': 'СКД / макеты',
+    'inventory': 'Опись файлов выгрузки (scandir)',
 }
 
 
@@ -31,6 +45,12 @@ class DatabaseManagerCore:
         """
         self.db_path = Path(db_path)
         self.conn = None
+        #: Время стадий последней сборки/обновления (c): пишется в статистику базы.
+        self.stage_seconds = {}
+        #: Строить ли второй полнотекстовый индекс кода — триграммный (`code_search_trigram`),
+        #: для поиска подстроки. Полная сборка берёт его из `build_from_xml_atomic(code_trigram=)`,
+        #: инкрементальная — из самой базы (индекс есть — поддерживается).
+        self.code_trigram = False
 
     def connect(self, journal_mode='WAL'):
         """Подключение к базе данных"""
@@ -70,24 +90,51 @@ class DatabaseManagerCore:
             conn.close()
 
     @staticmethod
-    def build_from_xml_atomic(db_path, config_xml_path, progress_callback=None):
+    def build_from_xml_atomic(
+        db_path, config_xml_path, progress_callback=None, parse_cache_dir=None, worker_pool=None,
+        compact=False, code_trigram=False,
+    ):
         """
         Сборка в .db.tmp с маркером .building и атомарной подменой foo.db.
         При ошибке старая база (если была) не трогается.
+
+        parse_cache_dir — каталог дискового кэша разбора (`default_parse_cache_dir(db_path)`
+        у билдеров GUI/CLI/Hub); None — без кэша. worker_pool — `WorkerPool` вызывающей
+        стороны (массовые пересборки: один пул на батч); None — парсер поднимает свой.
+
+        Если прошлая сборка той же выгрузки умерла, не дойдя до подмены (процесс убит — tmp и
+        маркер остались), она продолжается с последней контрольной точки
+        (`BuildCheckpointMixin.load_build_checkpoint`), а не начинается заново. Ошибка внутри
+        сборки (исключение) по-прежнему удаляет tmp: повтор упал бы так же.
+
+        compact — перед подменой пересобрать tmp под чтение (`compact_database`): VACUUM с
+        `COMPACT_PAGE_SIZE`, статистика планировщика. Дольше на время VACUUM, файл меньше.
+
+        code_trigram — построить и триграммный индекс кода (`code_search_trigram`): search_code
+        ищет подстроку (`ОбщегоНазначения.СообщитьПользователю(`) по индексу, а не LIKE по
+        всему коду. Индекс примерно втрое больше текста кода.
         """
         from . import DatabaseManager  # deferred: DatabaseManager composes this mixin in __init__.py
 
         db_path = Path(db_path)
         tmp_path = tmp_db_path(db_path)
+        checkpoint = DatabaseManager.load_build_checkpoint(db_path, config_xml_path)
         mark_building(db_path)
         db_manager = None
         succeeded = False
         try:
-            _remove_db_file(tmp_path)
+            if checkpoint is None:
+                _remove_db_file(tmp_path)
             db_manager = DatabaseManager(tmp_path)
+            db_manager.code_trigram = code_trigram
             # DELETE вместо WAL: один файл, надёжнее os.replace на Windows.
             db_manager.connect(journal_mode='DELETE')
-            db_manager.create_database(config_xml_path, progress_callback)
+            db_manager.create_database(
+                config_xml_path, progress_callback, parse_cache_dir=parse_cache_dir, worker_pool=worker_pool,
+                checkpoint=checkpoint, table_bytes=not compact,
+            )
+            if compact:
+                db_manager.compact_database(progress_callback=progress_callback)
             db_manager.close()
             db_manager = None
             _replace_file_with_retry(tmp_path, db_path)
@@ -106,13 +153,84 @@ class DatabaseManagerCore:
                 except OSError:
                     pass
 
-    def create_database(self, config_xml_path, progress_callback=None):
+    def compact_database(self, page_size=COMPACT_PAGE_SIZE, progress_callback=None):
+        """Пересобирает готовую базу под чтение: VACUUM в файл без фрагментации с размером
+        страницы `page_size`, затем `PRAGMA optimize`.
+
+        Вставка чередует строки ~30 таблиц, и страницы каждой таблицы и индекса разбросаны по
+        файлу; VACUUM укладывает их подряд и выбрасывает свободные страницы. Статистика
+        планировщика (ANALYZE сборки, полная: `analysis_limit` не задан) VACUUM переносит как
+        есть; sqlite_stat4 по перекошенным колонкам появляется, только если SQLite собран с
+        SQLITE_ENABLE_STAT4. Размеры до/после и время пишутся в index_metadata
+        (`compact_*`) и в лог сборки, размеры таблиц (`table_bytes` статистики базы) снимаются
+        здесь, по сжатому файлу. Нужна база в режиме журнала DELETE (размер страницы WAL-базы
+        VACUUM не меняет) и никаких открытых транзакций.
+
+        Returns:
+            dict: page_size, size_before, size_after (байты), seconds.
+        """
+        t0 = time.perf_counter()
+        self.conn.commit()
+        size_before = self.db_path.stat().st_size
+        self.conn.execute(f'PRAGMA page_size = {int(page_size)}')
+        self.conn.execute('VACUUM')
+        self.conn.execute('PRAGMA optimize')
+        size_after = self.db_path.stat().st_size
+        seconds = time.perf_counter() - t0
+        page_size = self.conn.execute('PRAGMA page_size').fetchone()[0]
+        metadata = [
+            ('compact_page_size', str(page_size)),
+            ('compact_size_before', str(size_before)),
+            ('compact_size_after', str(size_after)),
+            ('compact_seconds', f'{seconds:.1f}'),
+        ]
+        # Размеры таблиц в статистике сняты до VACUUM — со старым размером страницы и
+        # фрагментацией; пересчитываются по сжатому файлу.
+        row = self.conn.execute(
+            'SELECT value FROM index_metadata WHERE key = ?', (INDEX_STATISTICS_KEY,),
+        ).fetchone()
+        if row is not None:
+            stats = json.loads(row[0])
+            stats['table_bytes'] = self._table_bytes(self.conn.cursor())
+            metadata.append((INDEX_STATISTICS_KEY, json.dumps(stats, ensure_ascii=False)))
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO index_metadata (key, value) VALUES (?, ?)', metadata,
+        )
+        self.conn.commit()
+        if progress_callback:
+            progress_callback(
+                99, 100,
+                f"Сжатие базы (VACUUM, страница {page_size} Б) — "
+                f"{size_before / 1048576:.1f} → {size_after / 1048576:.1f} МБ, {seconds:.1f} c",
+            )
+        return {
+            'page_size': page_size,
+            'size_before': size_before,
+            'size_after': size_after,
+            'seconds': seconds,
+        }
+
+    def create_database(
+        self, config_xml_path, progress_callback=None, parse_cache_dir=None, worker_pool=None, checkpoint=None,
+        pipeline_depth=PIPELINE_DEPTH, table_bytes=True,
+    ):
         """
         Создает базу данных из XML конфигурации
 
         Args:
             config_xml_path: Путь к Configuration.xml
             progress_callback: Функция для отчета о прогрессе (current, total, message)
+            parse_cache_dir: Каталог дискового кэша результатов движка формата
+                (`shared/xml_parser/parse_cache.py`); None — без кэша.
+            worker_pool: Пул разбора вызывающей стороны (`shared.xml_parser.core.WorkerPool`);
+                None — свой пул на время разбора.
+            checkpoint: Точка прерванной сборки в этой же базе (`load_build_checkpoint`) —
+                разбираются и вставляются только объекты, которых в ней ещё нет.
+            pipeline_depth: Окно конвейера разбор → вставка (`ParsePipeline`): объекты
+                разбираются в отдельном потоке, пока этот пишет в SQLite. 0 — без конвейера,
+                разбор и вставка по очереди в этом потоке.
+            table_bytes: Снимать размеры таблиц (dbstat) в статистику. False — их снимет
+                следующий `compact_database`: полный проход dbstat по файлу до VACUUM лишний.
         """
         t_start = time.perf_counter()
 
@@ -124,18 +242,50 @@ class DatabaseManagerCore:
             progress_callback(0, 100, "Парсинг Configuration.xml...")
 
         t0 = time.perf_counter()
-        parser = ConfigurationParser(config_xml_path)
+        parse_cache = ParseCache(parse_cache_dir) if parse_cache_dir else None
+        parser = ConfigurationParser(config_xml_path, parse_cache=parse_cache, worker_pool=worker_pool)
+        # Отпечатки исходных файлов (для `rebuild-index --incremental`) — до разбора: файл,
+        # изменившийся во время сборки, даст несовпадение при следующей инкрементальной
+        # пересборке и будет переразобран, а не пропущен.
+        if checkpoint is None:
+            source_fingerprints = parser.object_source_fingerprints()
+            state = None
+        else:
+            source_fingerprints = checkpoint['source_fingerprints']
+            state = checkpoint['state']
+            parser.only_objects = set(source_fingerprints) - set(state.type_name_to_id)
+            if progress_callback:
+                last_type, last_name = checkpoint['last_object']
+                progress_callback(
+                    0, 100,
+                    f"Продолжение прерванной сборки: вставлено объектов — {checkpoint['objects_done']} "
+                    f"(последний — {last_type}.{last_name}), осталось — {len(parser.only_objects)}",
+                )
+        t_fingerprints = time.perf_counter() - t0
         header, objects = parser.parse_streaming()
-        t_parse_open = time.perf_counter() - t0
+        t_parse_open = time.perf_counter() - t0 - t_fingerprints
 
+        self.stage_seconds = {'fingerprints': t_fingerprints, 'parse_open': t_parse_open}
         t0 = time.perf_counter()
-        self._create_schema()
+        self._create_schema(read_indexes=False)
+        # Контрольные точки — только у выгрузок конфигураций: внешний отчёт/обработка — один
+        # объект без отпечатков, его проще собрать заново.
+        checkpoints = None
+        if source_fingerprints:
+            checkpoints = BuildCheckpoints(
+                self.conn, config_xml_path, objects_done=checkpoint['objects_done'] if checkpoint else 0,
+            )
+            if checkpoint is None:
+                # Отпечатки — сразу: по ним продолжение проверяет, что выгрузка не менялась.
+                self._write_object_sources(self.conn.cursor(), source_fingerprints)
+                self.conn.commit()
 
         if progress_callback:
             progress_callback(
                 20, 100,
                 f"Структура БД — {time.perf_counter() - t0:.1f} c "
-                f"(корень выгрузки — {t_parse_open:.1f} c) — разбор и загрузка объектов...",
+                f"(корень выгрузки — {t_parse_open:.1f} c, отпечатки файлов — {t_fingerprints:.1f} c) "
+                f"— разбор и загрузка объектов...",
             )
 
         def report_parse_stages():
@@ -146,11 +296,24 @@ class DatabaseManagerCore:
             for stage_name, seconds in sorted(parser.stage_seconds.items(), key=lambda kv: -kv[1]):
                 label = _STAGE_LABELS.get(stage_name, stage_name)
                 progress_callback(90, 100, f"    - {label}: {seconds:.1f} c")
+            if parser.worker_stage_seconds:
+                # Объекты разбирались в пуле: разбивка по категориям — суммарное время воркеров
+                # (CPU, не стена), поэтому отдельным блоком и не в сумму «разбор XML».
+                progress_callback(90, 100, "    В воркерах разбора объектов (суммарно по процессам):")
+                for stage_name, seconds in sorted(parser.worker_stage_seconds.items(), key=lambda kv: -kv[1]):
+                    label = _STAGE_LABELS.get(stage_name, stage_name)
+                    progress_callback(90, 100, f"    - {label}: {seconds:.1f} c")
             if parser.skipped_forms:
                 progress_callback(
                     90, 100,
                     f"    ⚠ Пропущено форм при парсинге (ошибки): {len(parser.skipped_forms)} — см. лог выше",
                 )
+            if pipeline is not None:
+                progress_callback(
+                    90, 100,
+                    f"    Конвейер: вставка ждала разбор — {pipeline.writer_wait_seconds:.1f} c, "
+                    f"разбор ждал вставку — {pipeline.parser_wait_seconds:.1f} c",
+                )
             if parser.skipped_form_modules:
                 progress_callback(
                     90, 100,
@@ -158,82 +321,154 @@ class DatabaseManagerCore:
                     f"{len(parser.skipped_form_modules)} — см. лог выше",
                 )
 
+        pipeline = ParsePipeline(objects, pipeline_depth) if pipeline_depth else None
         data = dict(header)
-        data['objects'] = objects
+        data['objects'] = iter(pipeline) if pipeline is not None else objects
         # closing(): если вставка упадёт посреди потока, генератор закроется и пул форм
-        # завершится в его finally, а не когда до него доберётся сборщик мусора.
-        with closing(objects):
-            self._insert_configuration(data, progress_callback, after_objects=report_parse_stages)
+        # завершится в его finally, а не когда до него доберётся сборщик мусора. Конвейер
+        # закрывает генератор сам, в потоке разбора.
+        with closing(pipeline if pipeline is not None else objects):
+            self._insert_configuration(
+                data, progress_callback, after_objects=report_parse_stages,
+                state=state, checkpoints=checkpoints, bulk_code_search=True,
+            )
 
         cursor = self.conn.cursor()
+        self._write_object_sources(cursor, source_fingerprints)
+        self._write_statistics(time.perf_counter() - t_start, progress_callback, table_bytes=table_bytes)
+        self._write_build_generation(cursor)
         cursor.execute(f'PRAGMA user_version = {INDEXER_VERSION}')
         self.conn.commit()
+        self._trim_parse_cache(parse_cache, progress_callback)
 
         if progress_callback:
             progress_callback(100, 100, f"Готово! Всего: {time.perf_counter() - t_start:.1f} c")
 
         return True
 
+    @staticmethod
+    def _trim_parse_cache(parse_cache, progress_callback=None):
+        """Вытесняет давно не использованные записи кэша разбора до его лимита размера.
+        Делается в конце сборки, в главном процессе: воркеры только читают и дописывают."""
+        if parse_cache is None:
+            return
+        t0 = time.perf_counter()
+        stats = parse_cache.trim()
+        if progress_callback:
+            progress_callback(
+                99, 100,
+                f"Кэш разбора — {stats['entries']} записей, {stats['bytes'] / (1 << 20):.0f} МБ "
+                f"(вытеснено {stats['evicted']}) — {time.perf_counter() - t0:.1f} c",
+            )
+
     def get_statistics(self):
-        """Возвращает статистику по БД"""
+        """Возвращает статистику по БД.
+
+        Счётчики посчитаны при сборке и лежат в index_metadata (`_write_statistics`): это один
+        поиск по ключу, а не ~15 COUNT(*) по таблицам в гигабайты. База, собранная до этого,
+        считается по-старому (`_count_statistics`).
+        """
         cursor = self.conn.cursor()
+        try:
+            row = cursor.execute(
+                'SELECT value FROM index_metadata WHERE key = ?', (INDEX_STATISTICS_KEY,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is not None and row[0]:
+            return json.loads(row[0])
+        return self._count_statistics(cursor)
 
+    @staticmethod
+    def _count_statistics(cursor):
+        """Счётчики строк по таблицам (полный проход по ним — поэтому только при сборке)."""
         stats = {}
 
-        # Общее количество объектов
         cursor.execute('SELECT COUNT(*) FROM metadata_objects')
         stats['total_objects'] = cursor.fetchone()[0]
 
-        # По типам
         cursor.execute('''
             SELECT object_type, COUNT(*) as count
             FROM metadata_objects
             GROUP BY object_type
             ORDER BY count DESC
         ''')
-        stats['by_type'] = {row['object_type']: row['count'] for row in cursor.fetchall()}
+        stats['by_type'] = {row[0]: row[1] for row in cursor.fetchall()}
 
-        # Количество модулей
         cursor.execute('SELECT COUNT(*) FROM modules')
         stats['total_modules'] = cursor.fetchone()[0]
 
-        # Количество атрибутов
-        cursor.execute('SELECT COUNT(*) FROM attributes')
-        stats['total_attributes'] = cursor.fetchone()[0]
-
-        # Количество стандартных атрибутов
-        cursor.execute('SELECT COUNT(*) FROM attributes WHERE is_standard = 1')
-        stats['total_standard_attributes'] = cursor.fetchone()[0]
-
-        # Количество кастомных атрибутов
-        cursor.execute('SELECT COUNT(*) FROM attributes WHERE is_standard = 0')
-        stats['total_custom_attributes'] = cursor.fetchone()[0]
-
-        # Количество измерений регистров
-        cursor.execute("SELECT COUNT(*) FROM attributes WHERE section = 'Dimension'")
-        stats['total_dimensions'] = cursor.fetchone()[0]
-
-        # Количество ресурсов регистров
-        cursor.execute("SELECT COUNT(*) FROM attributes WHERE section = 'Resource'")
-        stats['total_resources'] = cursor.fetchone()[0]
-
-        # Количество колонок табличных частей
-        cursor.execute('SELECT COUNT(*) FROM tabular_section_columns')
-        stats['total_tabular_section_columns'] = cursor.fetchone()[0]
-
-        # Количество значений перечислений
-        cursor.execute('SELECT COUNT(*) FROM enum_values')
-        stats['total_enum_values'] = cursor.fetchone()[0]
-
-        # Функциональные опции (базы пересоздаются при изменении схемы)
-        cursor.execute('SELECT COUNT(*) FROM functional_options')
-        stats['total_functional_options'] = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM fo_form_usage')
-        stats['total_fo_form_usage'] = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM fo_content_ref')
-        stats['total_fo_content_ref'] = cursor.fetchone()[0]
+        # Атрибуты: все счётчики — одним проходом по таблице.
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(is_standard = 1), 0),
+                   COALESCE(SUM(is_standard = 0), 0),
+                   COALESCE(SUM(section = 'Dimension'), 0),
+                   COALESCE(SUM(section = 'Resource'), 0)
+            FROM attributes
+        ''')
+        (stats['total_attributes'], stats['total_standard_attributes'], stats['total_custom_attributes'],
+         stats['total_dimensions'], stats['total_resources']) = cursor.fetchone()
+
+        for key, table in (
+            ('total_tabular_section_columns', 'tabular_section_columns'),
+            ('total_enum_values', 'enum_values'),
+            ('total_functional_options', 'functional_options'),
+            ('total_fo_form_usage', 'fo_form_usage'),
+            ('total_fo_content_ref', 'fo_content_ref'),
+            ('total_scheduled_jobs', 'scheduled_jobs'),
+        ):
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+            stats[key] = cursor.fetchone()[0]
 
-        cursor.execute('SELECT COUNT(*) FROM scheduled_jobs')
-        stats['total_scheduled_jobs'] = cursor.fetchone()[0]
+        return stats
 
+    @staticmethod
+    def _table_bytes(cursor):
+        """Байты на таблицу вместе с её индексами (виртуальная таблица dbstat), по убыванию.
+        Пусто, если SQLite собран без SQLITE_ENABLE_DBSTAT_VTAB."""
+        try:
+            rows = cursor.execute('''
+                SELECT m.tbl_name, SUM(s.pgsize) AS bytes
+                FROM dbstat s
+                JOIN sqlite_master m ON m.name = s.name
+                WHERE s.aggregate = TRUE
+                GROUP BY m.tbl_name
+                ORDER BY bytes DESC
+            ''').fetchall()
+        except sqlite3.OperationalError:
+            return {}
+        return {row[0]: row[1] for row in rows}
+
+    def _write_build_generation(self, cursor):
+        """Новый id поколения индекса (`INDEX_GENERATION_KEY`) — в конце каждой сборки и
+        инкрементального обновления. Сервер держит по нему кэш результатов инструментов:
+        база подменяется целиком, так что новое поколение — это ровно новое содержимое."""
+        cursor.execute(
+            'INSERT OR REPLACE INTO index_metadata (key, value) VALUES (?, ?)',
+            (INDEX_GENERATION_KEY, uuid.uuid4().hex),
+        )
+
+    def _write_statistics(self, build_seconds, progress_callback=None, table_bytes=True):
+        """Статистика базы в index_metadata (`INDEX_STATISTICS_KEY`, JSON): счётчики
+        `_count_statistics`, размеры таблиц, время сборки и её стадий (`stage_seconds`).
+        Пишется в конце сборки и инкрементального обновления — таблицы только что записаны и
+        лежат в страничном кэше, а `get_statistics`, статус хаба и `active_databases` потом
+        читают готовое."""
+        t0 = time.perf_counter()
+        cursor = self.conn.cursor()
+        stats = self._count_statistics(cursor)
+        # Без table_bytes (сборка с compact) размеры снимет compact_database после VACUUM.
+        stats['table_bytes'] = self._table_bytes(cursor) if table_bytes else {}
+        self.stage_seconds['statistics'] = time.perf_counter() - t0
+        stats['build_seconds'] = round(build_seconds, 1)
+        stats['stage_seconds'] = {name: round(seconds, 1) for name, seconds in self.stage_seconds.items()}
+        cursor.execute(
+            'INSERT OR REPLACE INTO index_metadata (key, value) VALUES (?, ?)',
+            (INDEX_STATISTICS_KEY, json.dumps(stats, ensure_ascii=False)),
+        )
+        if progress_callback:
+            progress_callback(
+                99, 100, f"Статистика базы — {self.stage_seconds['statistics']:.1f} c",
+            )
         return stats
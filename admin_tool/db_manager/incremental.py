@@ -0,0 +1,365 @@
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from shared.xml_parser import ConfigurationParser
+from shared.xml_parser.parse_cache import ParseCache
+from shared.form_eav import ENTITY_KIND_IDS
+from shared.indexer_version import INDEXER_VERSION
+from shared.module_code import decompress_code
+from shared.db_build_state import mark_building, clear_building, tmp_db_path
+
+from .file_ops import _remove_db_file, _replace_file_with_retry
+from .insert_objects import _InsertState
+
+#: Строки, принадлежащие объекту (object_id = ?), в порядке «сначала дети, потом родители».
+#: Формы и всё под ними, модули (их код в module_code и code_search общий с другими модулями —
+#: см. `_drop_unused_module_code`), секции, роли (тексты RLS тоже общие — см.
+#: `_drop_unused_role_texts`), свойства видов и исходящие связи. Входящие ссылки других
+#: объектов (слоты типов, связи, состав и использование ФО) сюда не входят — см.
+#: `_INCOMING_REFERENCE_DELETES`.
+_OBJECT_ROW_DELETES = (
+    f'''DELETE FROM form_entity_properties WHERE entity_kind = {ENTITY_KIND_IDS['item']} AND entity_id IN (
+           SELECT fi.id FROM form_items fi JOIN forms f ON f.id = fi.form_id WHERE f.object_id = ?)''',
+    f'''DELETE FROM form_entity_properties WHERE entity_kind = {ENTITY_KIND_IDS['attribute_column']} AND entity_id IN (
+           SELECT c.id FROM form_attribute_columns c
+           JOIN form_attributes a ON a.id = c.form_attribute_id
+           JOIN forms f ON f.id = a.form_id WHERE f.object_id = ?)''',
+    f'''DELETE FROM form_entity_properties WHERE entity_kind = {ENTITY_KIND_IDS['attribute']} AND entity_id IN (
+           SELECT a.id FROM form_attributes a JOIN forms f ON f.id = a.form_id WHERE f.object_id = ?)''',
+    '''DELETE FROM form_item_events WHERE item_id IN (
+           SELECT fi.id FROM form_items fi JOIN forms f ON f.id = fi.form_id WHERE f.object_id = ?)''',
+    'DELETE FROM form_items WHERE form_id IN (SELECT id FROM forms WHERE object_id = ?)',
+    '''DELETE FROM form_attribute_columns WHERE form_attribute_id IN (
+           SELECT a.id FROM form_attributes a JOIN forms f ON f.id = a.form_id WHERE f.object_id = ?)''',
+    'DELETE FROM form_attributes WHERE form_id IN (SELECT id FROM forms WHERE object_id = ?)',
+    'DELETE FROM form_commands WHERE form_id IN (SELECT id FROM forms WHERE object_id = ?)',
+    'DELETE FROM form_events WHERE form_id IN (SELECT id FROM forms WHERE object_id = ?)',
+    'DELETE FROM form_conditional_appearance WHERE form_id IN (SELECT id FROM forms WHERE object_id = ?)',
+    'DELETE FROM module_procedures WHERE module_id IN (SELECT id FROM modules WHERE object_id = ?)',
+    'DELETE FROM modules WHERE object_id = ?',
+    'DELETE FROM forms WHERE object_id = ?',
+    '''DELETE FROM tabular_section_columns WHERE tabular_section_id IN (
+           SELECT id FROM tabular_sections WHERE object_id = ?)''',
+    'DELETE FROM tabular_sections WHERE object_id = ?',
+    'DELETE FROM attributes WHERE object_id = ?',
+    'DELETE FROM enum_values WHERE object_id = ?',
+    'DELETE FROM bp_route_points WHERE object_id = ?',
+    'DELETE FROM bp_route_transitions WHERE object_id = ?',
+    'DELETE FROM object_commands WHERE object_id = ?',
+    'DELETE FROM dcs_schema WHERE object_id = ?',
+    'DELETE FROM functional_options WHERE object_id = ?',
+    'DELETE FROM scheduled_jobs WHERE object_id = ?',
+    'DELETE FROM event_subscriptions WHERE object_id = ?',
+    'DELETE FROM metadata_type_slots WHERE src_object_id = ?',
+    'DELETE FROM metadata_relations WHERE src_object_id = ?',
+    'DELETE FROM fo_content_ref WHERE functional_option_id = ?',
+    'DELETE FROM fo_form_usage WHERE owner_object_id = ?',
+    '''DELETE FROM role_access_restrictions WHERE grant_id IN (
+           SELECT id FROM role_grants WHERE role_object_id = ?)''',
+    'DELETE FROM role_grants WHERE role_object_id = ?',
+    'DELETE FROM role_settings WHERE role_object_id = ?',
+    'DELETE FROM role_restriction_templates WHERE role_object_id = ?',
+    'DELETE FROM metadata_objects WHERE id = ?',
+)
+
+#: Ссылки других объектов на объект (object_id = ?). Удаляются, только если объекта больше нет:
+#: полная сборка такие ссылки не разрешила бы и не записала. Переразобранный объект сохраняет
+#: свой id, и эти строки остаются верными.
+_INCOMING_REFERENCE_DELETES = (
+    'DELETE FROM metadata_type_slots WHERE object_id = ?',
+    'DELETE FROM metadata_relations WHERE dst_object_id = ?',
+    'DELETE FROM fo_content_ref WHERE metadata_object_id = ?',
+    'DELETE FROM fo_form_usage WHERE functional_option_id = ?',
+)
+
+
+class IncrementalUpdateMixin:
+    """Incremental rebuild (`rebuild-index --incremental`): re-parse only objects whose source
+    files changed (per-object fingerprints in `object_sources`), replace their rows in a copy
+    of the DB and swap it in atomically."""
+
+    @staticmethod
+    def incremental_blocker(db_path):
+        """Почему базу нельзя обновить инкрементально (строка для лога) или None, если можно."""
+        from . import DatabaseManager  # deferred: DatabaseManager composes this mixin in __init__.py
+
+        db_path = Path(db_path)
+        version = DatabaseManager.read_db_version(db_path)
+        if version is None:
+            return 'базы ещё нет'
+        if version != INDEXER_VERSION:
+            return f'версия индекса {version}, текущая {INDEXER_VERSION}'
+        uri = db_path.resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            row = conn.execute('SELECT COUNT(*) FROM object_sources').fetchone()
+        except sqlite3.Error:
+            row = None
+        finally:
+            conn.close()
+        if not row or not row[0]:
+            return 'в базе нет отпечатков исходных файлов (внешний отчёт/обработка или пустая выгрузка)'
+        return None
+
+    @staticmethod
+    def update_from_xml_atomic(
+        db_path, config_xml_path, progress_callback=None, parse_cache_dir=None, worker_pool=None,
+        code_trigram=False,
+    ):
+        """
+        Инкрементальная пересборка с той же атомарностью, что у `build_from_xml_atomic`:
+        копия foo.db → foo.db.tmp (маркер .building), обновление копии, подмена foo.db.
+        При ошибке старая база не трогается. Если инкрементально нельзя
+        (`incremental_blocker`), делается полная сборка. parse_cache_dir, worker_pool и
+        code_trigram (для полной сборки) — как у `build_from_xml_atomic`; инкрементальное
+        обновление поддерживает триграммный индекс, если он в базе есть.
+
+        Returns:
+            dict: mode ('incremental' | 'full'), reason (для 'full'), changed/added/deleted/
+            unchanged (для 'incremental').
+        """
+        from . import DatabaseManager  # deferred: DatabaseManager composes this mixin in __init__.py
+
+        db_path = Path(db_path)
+        reason = DatabaseManager.incremental_blocker(db_path)
+        if reason is not None:
+            if progress_callback:
+                progress_callback(0, 100, f"Инкрементально нельзя ({reason}) — полная сборка")
+            DatabaseManager.build_from_xml_atomic(
+                db_path, config_xml_path, progress_callback,
+                parse_cache_dir=parse_cache_dir, worker_pool=worker_pool, code_trigram=code_trigram,
+            )
+            return {'mode': 'full', 'reason': reason}
+
+        tmp_path = tmp_db_path(db_path)
+        mark_building(db_path)
+        db_manager = None
+        succeeded = False
+        try:
+            _remove_db_file(tmp_path)
+            shutil.copyfile(db_path, tmp_path)
+            db_manager = DatabaseManager(tmp_path)
+            db_manager.connect(journal_mode='DELETE')
+            summary = db_manager.update_database(
+                config_xml_path, progress_callback, parse_cache_dir=parse_cache_dir, worker_pool=worker_pool,
+            )
+            db_manager.close()
+            db_manager = None
+            _replace_file_with_retry(tmp_path, db_path)
+            succeeded = True
+            return summary
+        finally:
+            if db_manager is not None:
+                try:
+                    db_manager.close()
+                except sqlite3.Error:
+                    pass
+            clear_building(db_path)
+            if not succeeded:
+                try:
+                    _remove_db_file(tmp_path)
+                except OSError:
+                    pass
+
+    def update_database(self, config_xml_path, progress_callback=None, parse_cache_dir=None, worker_pool=None):
+        """
+        Обновляет открытую базу (собранную той же версией индексатора) по изменившимся файлам.
+
+        1. Отпечатки всех объектов выгрузки сравниваются с `object_sources`: изменённые и новые
+           объекты переразбираются, исчезнувшие удаляются.
+        2. Строки изменённых объектов удаляются, объект вставляется заново с **прежним id** —
+           ссылки на него из неизменённых объектов (слоты типов, связи, ФО) остаются верными.
+           У удалённых объектов удаляются ещё и входящие ссылки.
+        3. Отложенные стадии (`_finalize_configuration`) идут как при полной сборке, но над
+           справочниками всей базы: слоты типов и `fo_form_usage` переразобранных объектов,
+           связи изменённых подсистем/подписок, состав изменённых ФО; пометки процедур
+           регл. заданий/подписок пересчитываются целиком.
+
+        Ссылка объекта на другой объект всегда живёт в файлах ссылающегося, поэтому
+        неизменённому объекту переразбор не нужен и когда появился объект, на который он
+        ссылается: такая ссылка без правки его файлов в выгрузке появиться не может.
+        """
+        t_start = time.perf_counter()
+        cursor = self.conn.cursor()
+        # Триграммный индекс кода поддерживается, если полная сборка его построила.
+        self.code_trigram = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'code_search_trigram'"
+        ).fetchone() is not None
+
+        if progress_callback:
+            progress_callback(0, 100, "Сравнение отпечатков исходных файлов...")
+        t0 = time.perf_counter()
+        parse_cache = ParseCache(parse_cache_dir) if parse_cache_dir else None
+        parser = ConfigurationParser(config_xml_path, parse_cache=parse_cache, worker_pool=worker_pool)
+        stored = self._read_object_sources(cursor)
+        current = parser.object_source_fingerprints(previous=stored)
+        changed = {
+            key for key, (_sig, digest) in current.items()
+            if key not in stored or stored[key][1] != digest
+        }
+        deleted = set(stored) - set(current)
+        added = sum(1 for key in changed if key not in stored)
+        summary = {
+            'mode': 'incremental',
+            'changed': len(changed) - added,
+            'added': added,
+            'deleted': len(deleted),
+            'unchanged': len(current) - len(changed),
+        }
+        self.stage_seconds = {'fingerprints': time.perf_counter() - t0}
+        if progress_callback:
+            progress_callback(
+                10, 100,
+                f"Отпечатки — {self.stage_seconds['fingerprints']:.1f} c: изменено {summary['changed']}, "
+                f"новых {summary['added']}, удалено {summary['deleted']}, "
+                f"без изменений {summary['unchanged']}",
+            )
+
+        existing_ids = {}
+        cursor.execute("SELECT id, object_type, name FROM metadata_objects WHERE object_kind = 'ConfigObject'")
+        for row in cursor.fetchall():
+            existing_ids[(row[1], row[2])] = row[0]
+
+        t0 = time.perf_counter()
+        for key in deleted:
+            object_id = existing_ids.get(key)
+            if object_id is not None:
+                self._delete_object_rows(cursor, object_id, drop_incoming=True)
+        preassigned_ids = {}
+        for key in changed:
+            object_id = existing_ids.get(key)
+            if object_id is not None:
+                self._delete_object_rows(cursor, object_id)
+                preassigned_ids[key] = object_id
+        # Пометки процедур — производные от регл. заданий/подписок всей базы; ставятся только
+        # в 1, поэтому перед повторной привязкой в финализации сбрасываются целиком.
+        cursor.execute('UPDATE module_procedures SET used_in_scheduled_job = 0 WHERE used_in_scheduled_job != 0')
+        cursor.execute(
+            'UPDATE module_procedures SET used_in_event_subscription = 0 WHERE used_in_event_subscription != 0'
+        )
+        # Промежуточный commit безопасен — правится копия (foo.db.tmp), а `_insert_configuration`
+        # начинает с PRAGMA synchronous, которую внутри открытой транзакции SQLite не меняет.
+        self.conn.commit()
+        self.stage_seconds['delete'] = time.perf_counter() - t0
+        if progress_callback:
+            progress_callback(
+                15, 100,
+                f"Удаление строк изменённых объектов — {self.stage_seconds['delete']:.1f} c",
+            )
+
+        parser.only_objects = changed
+        header, objects = parser.parse_streaming()
+        state = self._incremental_insert_state(cursor, header.get('name') or '')
+        state.preassigned_ids = preassigned_ids
+
+        def after_objects():
+            # Объект был, файлы изменились, а разобрать его теперь не удалось (дескриптор не
+            # распознан) — для базы он исчез: убираем ссылки на него, как у удалённого.
+            for key, object_id in preassigned_ids.items():
+                cursor.execute('SELECT 1 FROM metadata_objects WHERE id = ?', (object_id,))
+                if cursor.fetchone() is not None:
+                    continue
+                self._drop_incoming_references(cursor, object_id)
+                if state.type_name_to_id.get(key) == object_id:
+                    del state.type_name_to_id[key]
+                for fo_key in [k for k, v in state.fo_resolver.items() if v == object_id]:
+                    del state.fo_resolver[fo_key]
+
+        data = dict(header)
+        data['objects'] = objects
+        with closing(objects):
+            self._insert_configuration(data, progress_callback, after_objects=after_objects, state=state)
+
+        # Дескрипторы примитивных типов, на которые больше не ссылается ни один слот.
+        cursor.execute('''
+            DELETE FROM metadata_objects
+            WHERE object_kind = 'TypeDescriptor'
+              AND id NOT IN (SELECT object_id FROM metadata_type_slots)
+        ''')
+        self._drop_unused_module_code(cursor, self.code_trigram)
+        self._drop_unused_role_texts(cursor)
+        self._write_object_sources(cursor, current)
+        self._write_statistics(time.perf_counter() - t_start, progress_callback)
+        self._write_build_generation(cursor)
+        cursor.execute(f'PRAGMA user_version = {INDEXER_VERSION}')
+        self.conn.commit()
+        self._trim_parse_cache(parse_cache, progress_callback)
+
+        if progress_callback:
+            progress_callback(100, 100, f"Готово (инкрементально)! Всего: {time.perf_counter() - t_start:.1f} c")
+        return summary
+
+    def _incremental_insert_state(self, cursor, source_db_name):
+        """`_InsertState` со справочниками из БД: (object_type, name) → id и разрешение ФО.
+        Строки изменённых объектов к этому моменту уже удалены — их ключи вернёт вставка."""
+        state = _InsertState(source_db_name)
+        cursor.execute('''
+            SELECT id, object_type, name, uuid FROM metadata_objects
+            WHERE object_kind = 'ConfigObject'
+            ORDER BY id
+        ''')
+        for object_id, object_type, name, uuid in cursor.fetchall():
+            state.type_name_to_id[(object_type, name)] = object_id
+            if object_type == 'FunctionalOption':
+                state.fo_resolver[uuid or ''] = object_id
+                state.fo_resolver[name] = object_id
+                state.fo_resolver['FunctionalOption.' + name] = object_id
+        return state
+
+    def _delete_object_rows(self, cursor, object_id, drop_incoming=False):
+        """Удаляет строки объекта (`_OBJECT_ROW_DELETES`); drop_incoming — ещё и ссылки на него."""
+        for sql in _OBJECT_ROW_DELETES:
+            cursor.execute(sql, (object_id,))
+        if drop_incoming:
+            self._drop_incoming_references(cursor, object_id)
+
+    @staticmethod
+    def _drop_unused_module_code(cursor, code_trigram=False):
+        """Код, на который после обновления не ссылается ни один модуль: строка module_code и её
+        строки code_search (и code_search_trigram, если он есть). Код, который переразобранный
+        объект сохранил, переиспользован вставкой по хэшу — FTS его не переиндексирует. Индексы
+        contentless, поэтому 'delete' получает тот же текст, что был проиндексирован."""
+        cursor.execute('SELECT id, code FROM module_code WHERE id NOT IN (SELECT code_id FROM modules)')
+        unused = [(code_id, decompress_code(blob)) for code_id, blob in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO code_search (code_search, rowid, code) VALUES ('delete', ?, ?)", unused,
+        )
+        if code_trigram:
+            cursor.executemany(
+                "INSERT INTO code_search_trigram (code_search_trigram, rowid, code) VALUES ('delete', ?, ?)",
+                unused,
+            )
+        cursor.executemany('DELETE FROM module_code WHERE id = ?', [(code_id,) for code_id, _code in unused])
+
+    @staticmethod
+    def _drop_unused_role_texts(cursor):
+        """Тексты RLS, на которые больше не ссылается ни одно ограничение. Имена и права
+        (role_qnames, role_rights) не чистятся: их число ограничено составом конфигурации."""
+        cursor.execute('''
+            DELETE FROM role_restriction_texts
+            WHERE id NOT IN (SELECT text_id FROM role_access_restrictions)
+        ''')
+
+    def _drop_incoming_references(self, cursor, object_id):
+        for sql in _INCOMING_REFERENCE_DELETES:
+            cursor.execute(sql, (object_id,))
+
+    @staticmethod
+    def _read_object_sources(cursor):
+        cursor.execute('SELECT object_type, name, stat_signature, content_hash FROM object_sources')
+        return {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _write_object_sources(cursor, fingerprints):
+        """Заменяет `object_sources` отпечатками текущей выгрузки."""
+        cursor.execute('DELETE FROM object_sources')
+        cursor.executemany('''
+            INSERT INTO object_sources (object_type, name, stat_signature, content_hash)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (object_type, name, stat_signature, content_hash)
+            for (object_type, name), (stat_signature, content_hash) in fingerprints.items()
+        ])
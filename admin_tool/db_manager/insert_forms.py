@@ -1,31 +1,61 @@
 import json
 
-from .bsl import _parse_module_procedures
+from shared.form_eav import ENTITY_KIND_IDS, VALUE_TYPE_IDS
+
+from .bsl import _insert_module, _insert_module_procedures
+from .row_writer import RowWriter
 
 
 def _insert_entity_properties(cursor, entity_kind, entity_id, properties):
-    """Bulk-insert EAV rows for one entity."""
+    """Bulk-insert EAV rows for one entity (buffered when `cursor` is a `RowWriter`).
+
+    Path/name and value type are interned into form_property_paths / form_value_types.
+    """
     if not properties:
         return
-    cursor.executemany('''
+    rows = RowWriter.of(cursor)
+    kind_id = ENTITY_KIND_IDS[entity_kind]
+    rows.insert_many('''
         INSERT INTO form_entity_properties (
-            entity_kind, entity_id, property_path, property_name, ordinal, value_text, value_type
+            entity_kind, entity_id, path_id, ordinal, value_text, value_type_id
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?)
     ''', [
         (
-            entity_kind,
+            kind_id,
             entity_id,
-            p['property_path'],
-            p['property_name'],
+            _property_path_id(rows, p['property_path'], p['property_name']),
             p.get('ordinal', 0),
             p.get('value_text'),
-            p.get('value_type'),
+            _value_type_id(rows, p.get('value_type')),
         )
         for p in properties
     ])
 
 
+def _property_path_id(rows, property_path, property_name):
+    return rows.intern_id(
+        'form_property_paths', property_path,
+        'SELECT id FROM form_property_paths WHERE property_path = ?',
+        'INSERT INTO form_property_paths (id, property_path, property_name) VALUES (?, ?, ?)',
+        (property_path, property_name),
+    )
+
+
+def _value_type_id(rows, value_type):
+    if value_type is None:
+        return None
+    type_id = VALUE_TYPE_IDS.get(value_type)
+    if type_id is not None:
+        return type_id
+    return rows.intern_id(
+        'form_value_types', value_type,
+        'SELECT id FROM form_value_types WHERE value_type = ?',
+        'INSERT INTO form_value_types (id, value_type) VALUES (?, ?)',
+        (value_type,),
+    )
+
+
 class FormInsertionMixin:
     """Form insertion (forms + attributes + commands + events + items + fo_form_usage) and Content-ref parsing."""
 
@@ -63,7 +93,7 @@ class FormInsertionMixin:
 
     def _insert_fo_form_usage(self, cursor, fo_id, owner_object_id, form_id, element_type, element_name,
                               parent_element_name=None):
-        cursor.execute('''
+        RowWriter.of(cursor).insert('''
             INSERT INTO fo_form_usage (
                 functional_option_id, owner_object_id, form_id,
                 element_type, element_name, parent_element_name
@@ -94,9 +124,10 @@ class FormInsertionMixin:
         """Вставляет данные формы в БД. fo_resolver: dict (uuid/имя/FunctionalOption.Имя -> id)
         для fo_form_usage; pending_fo_usage — отложенное разрешение вместо fo_resolver."""
         fo_resolver = fo_resolver or {}
-        cursor.execute('''
-            INSERT INTO forms (object_id, form_name, form_kind, uuid, properties_json)
-            VALUES (?, ?, ?, ?, ?)
+        rows = RowWriter.of(cursor)
+        form_id = rows.insert_id('forms', '''
+            INSERT INTO forms (id, object_id, form_name, form_kind, uuid, properties_json)
+            VALUES (?, ?, ?, ?, ?, ?)
         ''', (
             object_id,
             form['name'],
@@ -104,20 +135,18 @@ class FormInsertionMixin:
             form['uuid'],
             json.dumps(form['properties'], ensure_ascii=False) if form['properties'] else None
         ))
-        form_id = cursor.lastrowid
 
         for attr in form.get('attributes', []):
-            cursor.execute('''
-                INSERT INTO form_attributes (form_id, name, title, is_main)
-                VALUES (?, ?, ?, ?)
+            attr_id = rows.insert_id('form_attributes', '''
+                INSERT INTO form_attributes (id, form_id, name, title, is_main)
+                VALUES (?, ?, ?, ?, ?)
             ''', (
                 form_id,
                 attr['name'],
                 attr['title'],
                 1 if attr['is_main'] else 0,
             ))
-            attr_id = cursor.lastrowid
-            _insert_entity_properties(cursor, 'attribute', attr_id, attr.get('entity_properties'))
+            _insert_entity_properties(rows, 'attribute', attr_id, attr.get('entity_properties'))
             if pending_type_slots is not None:
                 type_slots = attr.get('type_slots')
                 if type_slots:
@@ -128,19 +157,18 @@ class FormInsertionMixin:
                         'type_slots': type_slots,
                     })
             for col in attr.get('columns') or []:
-                cursor.execute('''
+                col_id = rows.insert_id('form_attribute_columns', '''
                     INSERT INTO form_attribute_columns (
-                        form_attribute_id, name, title, table_context
+                        id, form_attribute_id, name, title, table_context
                     )
-                    VALUES (?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, ?)
                 ''', (
                     attr_id,
                     col['name'],
                     col.get('title', ''),
                     col.get('table'),
                 ))
-                col_id = cursor.lastrowid
-                _insert_entity_properties(cursor, 'attribute_column', col_id, col.get('entity_properties'))
+                _insert_entity_properties(rows, 'attribute_column', col_id, col.get('entity_properties'))
                 if pending_type_slots is not None:
                     col_slots = col.get('type_slots')
                     if col_slots:
@@ -152,17 +180,17 @@ class FormInsertionMixin:
                         })
                 for fo_ref in col.get('functional_options', []):
                     self._record_fo_form_usage(
-                        cursor, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
+                        rows, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
                         'FormAttributeColumn', col['name'], parent_element_name=attr['name'],
                     )
             for fo_ref in attr.get('functional_options', []):
                 self._record_fo_form_usage(
-                    cursor, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
+                    rows, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
                     'FormAttribute', attr['name'],
                 )
 
         for cmd in form.get('commands', []):
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO form_commands (
                     form_id, name, title, action, shortcut, representation
                 )
@@ -177,13 +205,13 @@ class FormInsertionMixin:
             ))
             for fo_ref in cmd.get('functional_options', []):
                 self._record_fo_form_usage(
-                    cursor, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
+                    rows, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
                     'FormCommand', cmd['name'],
                 )
 
         # Вставляем события формы
         for event in form.get('events', []):
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO form_events (form_id, event_name, handler, call_type)
                 VALUES (?, ?, ?, ?)
             ''', (
@@ -201,27 +229,25 @@ class FormInsertionMixin:
             if item['parent_id']:
                 parent_db_id = item_id_map.get(item['parent_id'])
 
-            cursor.execute('''
-                INSERT INTO form_items (form_id, parent_id, name, item_type)
-                VALUES (?, ?, ?, ?)
+            item_db_id = rows.insert_id('form_items', '''
+                INSERT INTO form_items (id, form_id, parent_id, name, item_type)
+                VALUES (?, ?, ?, ?, ?)
             ''', (
                 form_id,
                 parent_db_id,
                 item['name'],
                 item['type'],
             ))
-
-            item_db_id = cursor.lastrowid
             item_id_map[item['id']] = item_db_id
-            _insert_entity_properties(cursor, 'item', item_db_id, item.get('entity_properties'))
+            _insert_entity_properties(rows, 'item', item_db_id, item.get('entity_properties'))
             for fo_ref in item.get('functional_options', []):
                 self._record_fo_form_usage(
-                    cursor, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
+                    rows, fo_ref, fo_resolver, pending_fo_usage, object_id, form_id,
                     'FormItem', item['name'],
                 )
 
             for event in item.get('events', []):
-                cursor.execute('''
+                rows.insert('''
                     INSERT INTO form_item_events (item_id, event_name, handler)
                     VALUES (?, ?, ?)
                 ''', (
@@ -231,7 +257,7 @@ class FormInsertionMixin:
                 ))
 
         if form.get('conditional_appearance'):
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO form_conditional_appearance (form_id, xml_data)
                 VALUES (?, ?)
             ''', (
@@ -240,25 +266,5 @@ class FormInsertionMixin:
             ))
 
         if form.get('module'):
-            cursor.execute('''
-                INSERT INTO modules (object_id, form_id, command_id, module_type, code)
-                VALUES (?, ?, NULL, ?, ?)
-            ''', (
-                object_id,
-                form_id,
-                'FormModule',
-                form['module']
-            ))
-
-            module_id = cursor.lastrowid
-            cursor.execute('''
-                INSERT INTO code_search (rowid, code)
-                VALUES (?, ?)
-            ''', (module_id, form['module']))
-            procs = _parse_module_procedures(form['module'])
-            if procs:
-                cursor.executemany('''
-                    INSERT INTO module_procedures (module_id, name, proc_type, start_line, end_line, params, is_export, execution_context, extension_call_type, comment)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', [(module_id, p['name'], p['proc_type'], p['start_line'], p['end_line'],
-                       p['params'], p['is_export'], p['execution_context'], p['extension_call_type'], p['comment']) for p in procs])
+            module_id = _insert_module(rows, object_id, form_id, None, 'FormModule', form['module'])
+            _insert_module_procedures(rows, module_id, form['module'], form.get('module_procedures'))
@@ -1,7 +1,8 @@
 import json
 import time
 
-from .bsl import _parse_module_procedures
+from .bsl import _insert_module, _insert_module_procedures
+from .row_writer import RowWriter
 from shared.metadata_type_resolver import MetadataTypeResolver
 
 #: Виды объектов, которые после вставки нужны ещё раз — на этапе связей (подсистемы: Content и
@@ -30,12 +31,19 @@ class _InsertState:
         self.fo_resolver = {}
         #: Объекты видов RELATION_SOURCE_TYPES — нужны на этапе связей.
         self.relation_objects = []
+        #: (object_type, name) -> id, который объект обязан получить. Заполняет только
+        #: инкрементальная пересборка (`update_database`): переразобранный объект сохраняет
+        #: прежний id, и ссылки на него из неизменённых объектов остаются верными.
+        self.preassigned_ids = {}
 
 
 class ObjectInsertionMixin:
     """Streaming insertion: objects with their forms, then relations and deferred resolution."""
 
-    def _insert_configuration(self, data, progress_callback=None, after_objects=None):
+    def _insert_configuration(
+        self, data, progress_callback=None, after_objects=None, state=None, checkpoints=None,
+        bulk_code_search=False,
+    ):
         """Вставляет конфигурацию в БД одним потоковым проходом по объектам.
 
         `data['objects']` — список **или генератор** (`ConfigurationParser.parse_streaming`).
@@ -55,6 +63,17 @@ class ObjectInsertionMixin:
         `after_objects` — callable без аргументов, вызывается сразу после обхода объектов:
         сборка выводит им разбивку времени парсинга, которая при потоковом разборе известна
         только когда поток вычерпан.
+
+        `state` — заранее подготовленный `_InsertState` (инкрементальная пересборка кладёт в
+        него справочники неизменённых объектов из БД и прежние id переразбираемых, продолжение
+        прерванной сборки — состояние из контрольной точки); по умолчанию — пустой.
+
+        `checkpoints` — `BuildCheckpoints` полной сборки (checkpoint.py): после каждого
+        вставленного объекта ему сообщается об этом, и раз в интервал он коммитит точку.
+
+        `bulk_code_search` — полная сборка: code_search не пополняется по строке посреди потока
+        объектов, а строится после загрузки одной фазой (`_build_code_search`). Инкрементальная
+        пересборка правит готовый индекс построчно.
         """
         cursor = self.conn.cursor()
         cursor.execute('PRAGMA synchronous=OFF')
@@ -65,14 +84,18 @@ class ObjectInsertionMixin:
         expected_total = data.get('expected_object_count')
         if expected_total is None:
             expected_total = len(objects) if isinstance(objects, (list, tuple)) else 0
-        state = _InsertState(data.get('name') or '')
+        if state is None:
+            state = _InsertState(data.get('name') or '')
 
         t_objects_start = time.perf_counter()
 
         total_objects = 0
+        rows = RowWriter(cursor, defer_code_search=bulk_code_search, code_trigram=self.code_trigram)
         for idx, obj in enumerate(objects):
             total_objects = idx + 1
-            self._insert_object(cursor, obj, state)
+            self._insert_object(rows, obj, state)
+            if checkpoints is not None:
+                checkpoints.after_object(rows, state, obj)
 
             if progress_callback and idx % 10 == 0:
                 progress = 20 + int((idx / expected_total) * 70) if expected_total else 20
@@ -80,32 +103,59 @@ class ObjectInsertionMixin:
                     min(progress, 90), 100,
                     f"Объекты и формы {idx + 1}/{expected_total or '?'}", replace_last=True,
                 )
+        # Хвост буфера — до отметки времени стадии: запись строк — её часть.
+        rows.flush()
+        self.stage_seconds['objects'] = time.perf_counter() - t_objects_start
 
         if progress_callback:
             progress_callback(
                 90, 100,
-                f"Объекты и формы ({total_objects}) — {time.perf_counter() - t_objects_start:.1f} c",
+                f"Объекты и формы ({total_objects}) — {self.stage_seconds['objects']:.1f} c",
             )
 
         if after_objects is not None:
             after_objects()
 
+        if checkpoints is not None:
+            checkpoints.clear(cursor)
         self._finalize_configuration(cursor, state, data, progress_callback)
 
+        if bulk_code_search:
+            self._build_code_search(progress_callback)
+
+        # Индексы чтения — по готовым данным (полная сборка создаёт схему без них, см.
+        # `_create_schema`); инкрементальной пересборке, которая правит полную базу, тут
+        # создавать нечего.
+        self._create_read_indexes(progress_callback)
+
+        # Без sqlite_stat1 планировщик работает на дефолтных эвристиках и на базе в
+        # несколько ГБ выбирает SCAN там, где индекс дешевле. На ЕРП (3.3 ГБ) ANALYZE
+        # занимает 1.8 c — это последний шаг сборки, дальше база только читается.
+        t_analyze = time.perf_counter()
+        cursor.execute('ANALYZE')
+        self.conn.commit()
+        self.stage_seconds['analyze'] = time.perf_counter() - t_analyze
+        if progress_callback:
+            progress_callback(98, 100, f"ANALYZE — {self.stage_seconds['analyze']:.1f} c")
+
     def _insert_object(self, cursor, obj, state):
         """Вставляет один объект целиком: сам объект, его модули/реквизиты/секции/команды и формы.
 
+        `cursor` — курсор или `RowWriter` сборки: строки копятся в нём и пишутся пачками,
+        id объектов и дочерних строк выдаёт он же (row_writer.py).
+
         Всё, что уже записано, тут же освобождается (`obj[...] = None`) — для потокового входа
         это лишь ускоряет освобождение, для списочного (dev-скрипты) остаётся единственным
         способом не держать всё дерево до конца сборки."""
+        rows = RowWriter.of(cursor)
         pending_type_slots = state.pending_type_slots
 
-        cursor.execute('''
+        object_id = rows.insert_id('metadata_objects', '''
             INSERT INTO metadata_objects (
-                uuid, object_type, name, synonym, comment,
+                id, uuid, object_type, name, synonym, comment,
                 object_belonging, extended_configuration_object, object_kind
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'ConfigObject')
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'ConfigObject')
         ''', (
             obj['uuid'],
             obj['type'],
@@ -114,8 +164,7 @@ class ObjectInsertionMixin:
             obj['properties'].get('comment', ''),
             obj['properties'].get('object_belonging'),
             obj['properties'].get('extended_configuration_object')
-        ))
-        object_id = cursor.lastrowid
+        ), row_id=state.preassigned_ids.get((obj['type'], obj['name'])))
 
         # Справочник (object_type, name) -> id: раньше SELECT после первого прохода, теперь
         # копится здесь. Дубли имён внутри вида перетирают друг друга в том же порядке, что и
@@ -125,7 +174,7 @@ class ObjectInsertionMixin:
         if obj['type'] == 'FunctionalOption':
             loc = obj['properties'].get('location')
             priv = obj['properties'].get('privileged_get_mode')
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO functional_options (object_id, location_constant, privileged_get_mode)
                 VALUES (?, ?, ?)
             ''', (object_id, loc, 1 if priv else 0))
@@ -147,7 +196,7 @@ class ObjectInsertionMixin:
                 s['raw'] for s in (p.get('sources') or [])
                 if s.get('is_type_set') and '.' not in s.get('raw', '')
             ]
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO event_subscriptions (
                     object_id, event, handler, handler_module, handler_procedure, source_kinds
                 )
@@ -165,7 +214,7 @@ class ObjectInsertionMixin:
             p = obj['properties']
             use_val = p.get('use')
             predefined_val = p.get('predefined')
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO scheduled_jobs (
                     object_id, method_name, description, key, use, predefined,
                     restart_count_on_failure, restart_interval_on_failure
@@ -183,7 +232,7 @@ class ObjectInsertionMixin:
             ))
 
         if obj['type'] == 'Role':
-            self._insert_role_data(cursor, object_id, obj, state.source_db_name)
+            self._insert_role_data(rows, object_id, obj, state.source_db_name)
             obj['role_grants'] = None
             obj['role_access_restrictions'] = None
             obj['role_restriction_templates'] = None
@@ -200,41 +249,27 @@ class ObjectInsertionMixin:
                 })
 
         for module in obj['modules']:
-            cursor.execute('''
-                INSERT INTO modules (object_id, form_id, command_id, module_type, code)
-                VALUES (?, NULL, NULL, ?, ?)
-            ''', (object_id, module['type'], module['code']))
-            module_id = cursor.lastrowid
-            cursor.execute('''
-                INSERT INTO code_search (rowid, code)
-                VALUES (?, ?)
-            ''', (module_id, module['code']))
-            procs = _parse_module_procedures(module['code'])
-            if procs:
-                cursor.executemany('''
-                    INSERT INTO module_procedures (module_id, name, proc_type, start_line, end_line, params, is_export, execution_context, extension_call_type, comment)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', [(module_id, p['name'], p['proc_type'], p['start_line'], p['end_line'],
-                       p['params'], p['is_export'], p['execution_context'], p['extension_call_type'], p['comment']) for p in procs])
+            module_id = _insert_module(rows, object_id, None, None, module['type'], module['code'])
+            _insert_module_procedures(rows, module_id, module['code'], module.get('procedures'))
         # P-4 (audit-2026-08): module code is the single biggest chunk of a parsed object
         # (904 MB across modules on the ERP corpus) — drop it the moment it's inserted.
         obj['modules'] = None
 
         # Срез 1 (dcs-schema-indexing): текст запроса набора СКД -> code_search (FTS).
-        # code_search — внешнее содержимое над modules, поэтому кладём запрос строкой
+        # code_search индексирует код строк modules, поэтому кладём запрос строкой
         # modules с module_type='DcsQuery' (владелец — объект шаблона). Схемы без
         # <query> (правила отбора каталогов) не дают строки — деградация без ошибки.
-        self._insert_dcs_schemas(cursor, object_id, obj)
-        self._insert_spreadsheet_templates(cursor, object_id, obj)
+        self._insert_dcs_schemas(rows, object_id, obj)
+        self._insert_spreadsheet_templates(rows, object_id, obj)
 
         # Команды объекта (не CommonCommand) + модули CommandModule
         if obj['type'] != 'CommonCommand':
             for cmd in obj.get('commands', []):
-                cursor.execute('''
+                command_id = rows.insert_id('object_commands', '''
                     INSERT INTO object_commands (
-                        object_id, name, synonym, uuid, object_belonging, extended_configuration_object
+                        id, object_id, name, synonym, uuid, object_belonging, extended_configuration_object
                     )
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     object_id,
                     cmd['name'],
@@ -243,45 +278,30 @@ class ObjectInsertionMixin:
                     cmd.get('object_belonging'),
                     cmd.get('extended_configuration_object'),
                 ))
-                command_id = cursor.lastrowid
                 module_code = cmd.get('module_code')
                 if module_code:
-                    cursor.execute('''
-                        INSERT INTO modules (object_id, form_id, command_id, module_type, code)
-                        VALUES (?, NULL, ?, 'CommandModule', ?)
-                    ''', (object_id, command_id, module_code))
-                    module_id = cursor.lastrowid
-                    cursor.execute('''
-                        INSERT INTO code_search (rowid, code)
-                        VALUES (?, ?)
-                    ''', (module_id, module_code))
-                    procs = _parse_module_procedures(module_code)
-                    if procs:
-                        cursor.executemany('''
-                            INSERT INTO module_procedures (module_id, name, proc_type, start_line, end_line, params, is_export, execution_context, extension_call_type, comment)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', [(module_id, p['name'], p['proc_type'], p['start_line'], p['end_line'],
-                               p['params'], p['is_export'], p['execution_context'], p['extension_call_type'], p['comment']) for p in procs])
+                    module_id = _insert_module(rows, object_id, None, command_id, 'CommandModule', module_code)
+                    _insert_module_procedures(rows, module_id, module_code, cmd.get('module_procedures'))
 
         for attr in obj['properties'].get('standard_attributes', []):
-            self._insert_attribute(cursor, object_id, attr, pending_type_slots=pending_type_slots)
+            self._insert_attribute(rows, object_id, attr, pending_type_slots=pending_type_slots)
         for attr in obj['properties'].get('custom_attributes', []):
-            self._insert_attribute(cursor, object_id, attr, pending_type_slots=pending_type_slots)
+            self._insert_attribute(rows, object_id, attr, pending_type_slots=pending_type_slots)
         if obj['type'] not in ('ScheduledJob', 'Subsystem', 'DefinedType'):
             for dim in obj.get('dimensions', []):
-                self._insert_attribute(cursor, object_id, dim, section='Dimension', pending_type_slots=pending_type_slots)
+                self._insert_attribute(rows, object_id, dim, section='Dimension', pending_type_slots=pending_type_slots)
             for res in obj.get('resources', []):
-                self._insert_attribute(cursor, object_id, res, section='Resource', pending_type_slots=pending_type_slots)
+                self._insert_attribute(rows, object_id, res, section='Resource', pending_type_slots=pending_type_slots)
             for attr in obj.get('attributes', []):
-                self._insert_attribute(cursor, object_id, attr, section='Attribute', pending_type_slots=pending_type_slots)
+                self._insert_attribute(rows, object_id, attr, section='Attribute', pending_type_slots=pending_type_slots)
             for ts in obj.get('tabular_sections', []):
-                self._insert_tabular_section(cursor, object_id, ts, pending_type_slots=pending_type_slots)
+                self._insert_tabular_section(rows, object_id, ts, pending_type_slots=pending_type_slots)
             enum_values = obj.get('enum_values', [])
             if enum_values:
-                self._insert_enum_values(cursor, object_id, enum_values)
+                self._insert_enum_values(rows, object_id, enum_values)
             if obj['type'] == 'BusinessProcess':
                 self._insert_bp_route_data(
-                    cursor, object_id,
+                    rows, object_id,
                     obj.get('route_points', []),
                     obj.get('route_transitions', []),
                 )
@@ -302,7 +322,7 @@ class ObjectInsertionMixin:
         # (раньше его искали SELECT-ом по имени и виду), ссылки на ФО и слоты типов отложены.
         for form in obj.get('forms') or []:
             self._insert_form(
-                cursor, object_id, form,
+                rows, object_id, form,
                 pending_type_slots=state.pending_form_type_slots,
                 pending_fo_usage=state.pending_fo_usage,
             )
@@ -315,77 +335,73 @@ class ObjectInsertionMixin:
             state.relation_objects.append(obj)
 
     def _finalize_configuration(self, cursor, state, data, progress_callback=None):
-        """Хвост сборки: связи и всё отложенное, чему нужны полные справочники объектов."""
+        """Хвост сборки: связи и всё отложенное, чему нужны полные справочники объектов.
+
+        Всё разрешается через справочники `state` в памяти и пишется `executemany` или одним
+        UPDATE на стадию: число обращений к SQLite не растёт с числом подсистем, ФО и заданий.
+        Время каждой подстадии — в строке прогресса."""
         t_relations_start = time.perf_counter()
+        timings = []
+
+        def stage(label, t0):
+            timings.append(f"{label} {time.perf_counter() - t0:.1f}")
+            return time.perf_counter()
 
+        t0 = time.perf_counter()
         type_name_to_id = state.type_name_to_id
         type_resolver = MetadataTypeResolver()
         if state.pending_type_slots:
             type_resolver.insert_slots(cursor, state.pending_type_slots, type_name_to_id)
             state.pending_type_slots = []
+        t0 = stage('типы', t0)
 
         # fo_form_usage: ссылки на ФО, накопленные при вставке форм (порядок сохранён).
+        fo_usage_rows = []
         for (fo_ref, owner_object_id, form_id, element_type,
              element_name, parent_element_name) in state.pending_fo_usage:
             fo_id = self._resolve_fo_id(fo_ref, state.fo_resolver)
             if fo_id is not None:
-                self._insert_fo_form_usage(
-                    cursor, fo_id, owner_object_id, form_id,
-                    element_type, element_name, parent_element_name,
+                fo_usage_rows.append(
+                    (fo_id, owner_object_id, form_id, element_type, element_name, parent_element_name)
                 )
+        if fo_usage_rows:
+            cursor.executemany('''
+                INSERT INTO fo_form_usage (
+                    functional_option_id, owner_object_id, form_id,
+                    element_type, element_name, parent_element_name
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', fo_usage_rows)
         state.pending_fo_usage = []
+        t0 = stage('ФО на формах', t0)
 
         self._link_subsystem_relations(cursor, state.relation_objects, type_name_to_id)
+        t0 = stage('подсистемы', t0)
         self._link_event_subscription_relations(cursor, state.relation_objects, type_name_to_id)
-
-        # Заполняем fo_content_ref из Content каждой ФО
-        for obj in state.relation_objects:
-            if obj['type'] != 'FunctionalOption':
-                continue
-            content_refs = obj['properties'].get('content_refs') or []
-            fo_id = type_name_to_id.get(('FunctionalOption', obj['name']))
-            if fo_id is None:
-                continue
-            for ref_str in content_refs:
-                parsed = self._parse_content_ref(ref_str)
-                if not parsed:
-                    continue
-                obj_type, obj_name, ref_type, ts_name, elem_name = parsed
-                meta_id = type_name_to_id.get((obj_type, obj_name))
-                if meta_id is None:
-                    continue
-                cursor.execute('''
-                    INSERT INTO fo_content_ref (functional_option_id, metadata_object_id, content_ref_type, tabular_section_name, element_name)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (fo_id, meta_id, ref_type, ts_name, elem_name))
+        t0 = stage('подписки', t0)
+        self._link_functional_option_content(cursor, state.relation_objects, type_name_to_id)
+        t0 = stage('состав ФО', t0)
 
         self._link_scheduled_job_procedures(cursor)
         self._link_event_subscription_procedures(cursor)
+        t0 = stage('процедуры', t0)
 
         if state.pending_form_type_slots:
             type_resolver.insert_slots(cursor, state.pending_form_type_slots, type_name_to_id)
             state.pending_form_type_slots = []
+        stage('типы форм', t0)
+        self.stage_seconds['relations'] = time.perf_counter() - t_relations_start
 
         if progress_callback:
             progress_callback(
                 95, 100,
-                f"Связи (типы, подсистемы, ФО, регл. задания, подписки) — "
-                f"{time.perf_counter() - t_relations_start:.1f} c",
+                f"Связи — {self.stage_seconds['relations']:.1f} c ({', '.join(timings)})",
             )
 
         self._insert_index_metadata(cursor, data)
 
         self.conn.commit()
 
-        # Без sqlite_stat1 планировщик работает на дефолтных эвристиках и на базе в
-        # несколько ГБ выбирает SCAN там, где индекс дешевле. На ЕРП (3.3 ГБ) ANALYZE
-        # занимает 1.8 c — это последний шаг сборки, дальше база только читается.
-        t_analyze = time.perf_counter()
-        cursor.execute('ANALYZE')
-        self.conn.commit()
-        if progress_callback:
-            progress_callback(98, 100, f"ANALYZE — {time.perf_counter() - t_analyze:.1f} c")
-
     def _insert_dcs_schemas(self, cursor, object_id, obj):
         """DCS templates of an object (dcs-schema-indexing):
 
@@ -396,6 +412,7 @@ class ObjectInsertionMixin:
           denormalised shape hints for cheap listing / query-vs-rule distinction).
 
         See docs/dcs-schema-indexing.md."""
+        rows = RowWriter.of(cursor)
         for dcs in obj.get('dcs_schemas', []):
             template_name = dcs.get('template_name', '')
 
@@ -403,19 +420,11 @@ class ObjectInsertionMixin:
             for query_text in dcs.get('query_texts', []):
                 if not (query_text and query_text.strip()):
                     continue
-                cursor.execute('''
-                    INSERT INTO modules (object_id, form_id, command_id, module_type, code)
-                    VALUES (?, NULL, NULL, 'DcsQuery', ?)
-                ''', (object_id, query_text))
-                module_id = cursor.lastrowid
-                cursor.execute('''
-                    INSERT INTO code_search (rowid, code)
-                    VALUES (?, ?)
-                ''', (module_id, query_text))
+                _insert_module(rows, object_id, None, None, 'DcsQuery', query_text)
 
             # Срез 2
             shape = dcs.get('shape') or {}
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO dcs_schema (
                     object_id, template_name, has_query, dataset_count, field_count,
                     parameter_count, calculated_count, total_count, has_grouping,
@@ -441,25 +450,18 @@ class ObjectInsertionMixin:
         (cell text + whole-cell parameters + named-area names) -> code_search (FTS) as an
         'MxlText' module row (external content over modules). Text-less macets add no row
         (graceful degradation). See docs/mxl-macet-indexing.md."""
+        rows = RowWriter.of(cursor)
         for macet in obj.get('spreadsheet_templates', []):
             text = macet.get('text')
             if not (text and text.strip()):
                 continue
-            cursor.execute('''
-                INSERT INTO modules (object_id, form_id, command_id, module_type, code)
-                VALUES (?, NULL, NULL, 'MxlText', ?)
-            ''', (object_id, text))
-            module_id = cursor.lastrowid
-            cursor.execute('''
-                INSERT INTO code_search (rowid, code)
-                VALUES (?, ?)
-            ''', (module_id, text))
+            _insert_module(rows, object_id, None, None, 'MxlText', text)
 
     def _insert_attribute(self, cursor, object_id, attr, section='Attribute', pending_type_slots=None):
         """Вставляет атрибут объекта в БД"""
-        cursor.execute('''
-            INSERT INTO attributes (object_id, name, title, comment, is_standard, standard_type, section)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+        attribute_id = RowWriter.of(cursor).insert_id('attributes', '''
+            INSERT INTO attributes (id, object_id, name, title, comment, is_standard, standard_type, section)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             object_id,
             attr['name'],
@@ -474,37 +476,38 @@ class ObjectInsertionMixin:
             if type_slots:
                 pending_type_slots.append({
                     'source_table': 'attributes',
-                    'source_row_id': cursor.lastrowid,
+                    'source_row_id': attribute_id,
                     'src_object_id': object_id,
                     'type_slots': type_slots,
                 })
 
     def _insert_tabular_section(self, cursor, object_id, ts, pending_type_slots=None):
         """Вставляет табличную часть с колонками в БД (tabular_sections + tabular_section_columns)."""
-        cursor.execute('''
-            INSERT INTO tabular_sections (object_id, name, title, comment)
-            VALUES (?, ?, ?, ?)
+        rows = RowWriter.of(cursor)
+        ts_id = rows.insert_id('tabular_sections', '''
+            INSERT INTO tabular_sections (id, object_id, name, title, comment)
+            VALUES (?, ?, ?, ?, ?)
         ''', (object_id, ts['name'], ts.get('title', ''), ts.get('comment', '')))
-        ts_id = cursor.lastrowid
         for column in ts['columns']:
-            cursor.execute('''
-                INSERT INTO tabular_section_columns (tabular_section_id, column_name, title, comment)
-                VALUES (?, ?, ?, ?)
+            column_id = rows.insert_id('tabular_section_columns', '''
+                INSERT INTO tabular_section_columns (id, tabular_section_id, column_name, title, comment)
+                VALUES (?, ?, ?, ?, ?)
             ''', (ts_id, column['name'], column.get('title', ''), column.get('comment', '')))
             if pending_type_slots is not None:
                 type_slots = column.get('type_slots')
                 if type_slots:
                     pending_type_slots.append({
                         'source_table': 'tabular_section_columns',
-                        'source_row_id': cursor.lastrowid,
+                        'source_row_id': column_id,
                         'src_object_id': object_id,
                         'type_slots': type_slots,
                     })
 
     def _insert_enum_values(self, cursor, object_id, enum_values):
         """Вставляет значения перечисления в БД"""
+        rows = RowWriter.of(cursor)
         for ev in enum_values:
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO enum_values (object_id, name, enum_order, title, comment, object_belonging, extended_configuration_object)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
@@ -519,8 +522,9 @@ class ObjectInsertionMixin:
 
     def _insert_bp_route_data(self, cursor, object_id, route_points, route_transitions):
         """Вставляет точки маршрута и переходы бизнес-процесса."""
+        rows = RowWriter.of(cursor)
         for point in route_points:
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO bp_route_points (
                     object_id, name, point_type, title, uuid, tab_order, true_port, false_port
                 )
@@ -536,7 +540,7 @@ class ObjectInsertionMixin:
                 point.get('false_port'),
             ))
         for transition in route_transitions:
-            cursor.execute('''
+            rows.insert('''
                 INSERT INTO bp_route_transitions (
                     object_id, from_point, to_point, from_port, title
                 )
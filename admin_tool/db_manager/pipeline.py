@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+
+#: Сколько разобранных объектов может ждать вставки. Окно небольшое: потоковая сборка держит
+#: в памяти по объекту за раз (P-4), и очередь прибавляет к этому не больше нескольких десятков
+#: объектов — пик памяти почти прежний, а разбору есть куда уйти вперёд, пока SQLite пишет.
+PIPELINE_DEPTH = 32
+
+# Как часто заблокированный на полной очереди разбор проверяет, не закрыт ли конвейер.
+_POLL_SECONDS = 0.1
+
+
+class _End:
+    """Конец потока объектов; `error` — исключение разбора, если поток оборвался им."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+class ParsePipeline:
+    """Разбор и вставка внахлёст: поток объектов `parse_streaming` вычерпывается в отдельном
+    потоке и через ограниченную очередь отдаётся потоку, который владеет соединением SQLite.
+
+    Без конвейера сборка чередует два дела: достать следующий объект (чтение файлов, разбор
+    дескриптора, приём результата из пула) и записать его. Теперь, пока SQLite пишет (вызовы
+    sqlite3 отпускают GIL), разбор готовит следующие объекты. Пишет по-прежнему один поток —
+    тот, что создал соединение (sqlite3 не даёт пользоваться им из другого потока): он же
+    зовёт progress_callback и пишет контрольные точки. Полная очередь останавливает разбор —
+    вперёд он уходит не больше чем на `depth` объектов.
+
+    Исключение разбора поднимается в потоке вставки на месте оборвавшегося объекта. `close`
+    (в т.ч. когда упала вставка) останавливает разбор и закрывает исходный генератор в его же
+    потоке — генератор отменяет свои задачи в пуле (`_schedule_by_cost`).
+    """
+
+    def __init__(self, objects, depth=PIPELINE_DEPTH):
+        self._source = objects
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        #: Сколько вставка ждала разбор и разбор — вставку: какая сторона узкое место.
+        self.writer_wait_seconds = 0.0
+        self.parser_wait_seconds = 0.0
+        self._thread = threading.Thread(target=self._produce, name='parse-pipeline', daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        t0 = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.parser_wait_seconds += time.perf_counter() - t0
+
+    def _produce(self):
+        try:
+            for obj in self._source:
+                if not self._put(obj):
+                    return
+            self._put(_End())
+        except BaseException as exc:  # noqa: BLE001 — передаётся потоку вставки как есть
+            self._put(_End(exc))
+        finally:
+            close = getattr(self._source, 'close', None)
+            if close is not None:
+                close()
+
+    def __iter__(self):
+        while True:
+            t0 = time.perf_counter()
+            item = self._queue.get()
+            self.writer_wait_seconds += time.perf_counter() - t0
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+
+    def close(self):
+        self._stop.set()
+        # Освободить место: разбор, ждущий на полной очереди, увидит остановку быстрее.
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join()
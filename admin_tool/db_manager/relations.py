@@ -1,27 +1,23 @@
+import json
+
 from shared.metadata_type_resolver import parse_event_source_string
 
 
 class RelationsMixin:
-    """metadata_relations materialization (subsystems) and scheduled-job procedure linking."""
+    """metadata_relations materialization (subsystems, subscriptions), FO content and procedure flags."""
 
     def _link_subsystem_relations(self, cursor, objects, type_name_to_id):
-        """Материализует subsystem_member в metadata_relations из Content и ChildObjects подсистем."""
-        subsystem_ids = {}
-        for obj in objects:
-            if obj['type'] != 'Subsystem':
-                continue
-            cursor.execute(
-                'SELECT id FROM metadata_objects WHERE name = ? AND object_type = ?',
-                (obj['name'], 'Subsystem'),
-            )
-            row = cursor.fetchone()
-            if row:
-                subsystem_ids[obj['name']] = row['id']
+        """Материализует subsystem_member в metadata_relations из Content и ChildObjects подсистем.
 
+        id подсистем (своей и дочерних) — из `type_name_to_id` (имя подсистемы в нём уже
+        квалифицированное): при инкрементальной пересборке в `objects` только изменённые
+        подсистемы, а дочерняя может быть и неизменённой.
+        """
+        rows = []
         for obj in objects:
             if obj['type'] != 'Subsystem':
                 continue
-            src_id = subsystem_ids.get(obj['name'])
+            src_id = type_name_to_id.get(('Subsystem', obj['name']))
             if src_id is None:
                 continue
 
@@ -32,25 +28,47 @@ class RelationsMixin:
                 dst_id = type_name_to_id.get((obj_type, obj_name))
                 if dst_id is None:
                     continue
-                cursor.execute('''
-                    INSERT INTO metadata_relations (
-                        src_object_id, dst_object_id, relation_kind, source_name, source_detail
-                    )
-                    VALUES (?, ?, 'subsystem_member', ?, 'Content')
-                ''', (src_id, dst_id, ref_str))
+                rows.append((src_id, dst_id, ref_str, 'Content'))
 
             parent_qname = obj['name']
             for child_name in obj.get('child_subsystem_names') or []:
                 child_qname = f'{parent_qname}.{child_name}'
-                dst_id = subsystem_ids.get(child_qname)
+                dst_id = type_name_to_id.get(('Subsystem', child_qname))
                 if dst_id is None:
                     continue
-                cursor.execute('''
-                    INSERT INTO metadata_relations (
-                        src_object_id, dst_object_id, relation_kind, source_name, source_detail
-                    )
-                    VALUES (?, ?, 'subsystem_member', ?, 'ChildSubsystem')
-                ''', (src_id, dst_id, child_name))
+                rows.append((src_id, dst_id, child_name, 'ChildSubsystem'))
+        if rows:
+            cursor.executemany('''
+                INSERT INTO metadata_relations (
+                    src_object_id, dst_object_id, relation_kind, source_name, source_detail
+                )
+                VALUES (?, ?, 'subsystem_member', ?, ?)
+            ''', rows)
+
+    def _link_functional_option_content(self, cursor, objects, type_name_to_id):
+        """Заполняет fo_content_ref из Content функциональных опций: id опции и объектов —
+        из `type_name_to_id`, строки — одним `executemany`."""
+        rows = []
+        for obj in objects:
+            if obj['type'] != 'FunctionalOption':
+                continue
+            fo_id = type_name_to_id.get(('FunctionalOption', obj['name']))
+            if fo_id is None:
+                continue
+            for ref_str in obj['properties'].get('content_refs') or []:
+                parsed = self._parse_content_ref(ref_str)
+                if not parsed:
+                    continue
+                obj_type, obj_name, ref_type, ts_name, elem_name = parsed
+                meta_id = type_name_to_id.get((obj_type, obj_name))
+                if meta_id is None:
+                    continue
+                rows.append((fo_id, meta_id, ref_type, ts_name, elem_name))
+        if rows:
+            cursor.executemany('''
+                INSERT INTO fo_content_ref (functional_option_id, metadata_object_id, content_ref_type, tabular_section_name, element_name)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
 
     def _link_event_subscription_relations(self, cursor, objects, type_name_to_id):
         """Материализует event_subscription в metadata_relations из Source подписок.
@@ -112,29 +130,30 @@ class RelationsMixin:
         ''')
 
     def _link_scheduled_job_procedures(self, cursor):
-        """Проставляет used_in_scheduled_job для процедур общих модулей из MethodName регл. заданий."""
+        """Проставляет used_in_scheduled_job для процедур общих модулей из MethodName регл. заданий.
+
+        MethodName (`CommonModule.Модуль.Процедура`) разбирается в Python, а процедуры
+        помечаются одним UPDATE по списку пар (модуль, процедура) — не запросом на задание."""
         cursor.execute('SELECT method_name FROM scheduled_jobs WHERE method_name IS NOT NULL')
-        for row in cursor.fetchall():
-            method_name = (row['method_name'] or '').strip()
-            if not method_name:
-                continue
-            parts = method_name.split('.')
+        targets = set()
+        for (method_name,) in cursor.fetchall():
+            parts = (method_name or '').strip().split('.')
             if len(parts) != 3 or parts[0] != 'CommonModule':
                 continue
-            module_name, procedure_name = parts[1], parts[2]
-            cursor.execute('''
+            targets.add((parts[1], parts[2]))
+        if not targets:
+            return
+        cursor.execute('''
+            UPDATE module_procedures SET used_in_scheduled_job = 1
+            WHERE id IN (
                 SELECT p.id
-                FROM module_procedures p
-                JOIN modules m ON p.module_id = m.id
-                JOIN metadata_objects o ON m.object_id = o.id
-                WHERE o.object_type = 'CommonModule' AND o.name = ?
-                  AND m.module_type = 'Module'
-                  AND m.form_id IS NULL AND m.command_id IS NULL
-                  AND p.name = ?
-            ''', (module_name, procedure_name))
-            proc_row = cursor.fetchone()
-            if proc_row:
-                cursor.execute(
-                    'UPDATE module_procedures SET used_in_scheduled_job = 1 WHERE id = ?',
-                    (proc_row['id'],),
-                )
+                FROM json_each(?) t
+                JOIN metadata_objects o
+                  ON o.object_type = 'CommonModule' AND o.name = json_extract(t.value, '$[0]')
+                JOIN modules m
+                  ON m.object_id = o.id AND m.module_type = 'Module'
+                 AND m.form_id IS NULL AND m.command_id IS NULL
+                JOIN module_procedures p
+                  ON p.module_id = m.id AND p.name = json_extract(t.value, '$[1]')
+            )
+        ''', (json.dumps(sorted(targets), ensure_ascii=False),))
@@ -0,0 +1,119 @@
+#: Когда сбрасывать накопленное: «вес» строки — 1 плюс килобайты кода у строк module_code
+#: (сжатого) и code_search. Около 50k строк за сброс, но не больше ~50 МБ кода в памяти.
+FLUSH_WEIGHT = 50_000
+
+
+class RowWriter:
+    """Буфер строк сборки: id — на стороне Python, запись — большими `executemany`.
+
+    Раньше каждая строка была отдельным `cursor.execute`, а `cursor.lastrowid` после него
+    нужен был только затем, чтобы привязать дочерние строки: форма → реквизиты → колонки,
+    элемент → свойства EAV, право роли → ограничения (946k прав на ЕРП). Теперь id строки
+    выдаёт счётчик таблицы (`insert_id`), строки копятся поверх границ объектов и пишутся
+    одним `executemany` на оператор. Счётчик начинается там же, где продолжил бы
+    AUTOINCREMENT (`sqlite_sequence` и MAX(id)), а строки таблицы пишутся в порядке
+    добавления — id те же, что выдал бы SQLite построчно.
+
+    Таблица, строкам которой id выдаёт `insert_id`, должна получать его у всех своих строк:
+    строка без id получила бы MAX(id)+1 на момент сброса и могла бы столкнуться с уже
+    выданным id строки, ещё лежащей в буфере.
+    """
+
+    def __init__(self, cursor, flush_weight=FLUSH_WEIGHT, defer_code_search=False, code_trigram=False):
+        self.cursor = cursor
+        self.flush_weight = flush_weight
+        #: Полная сборка строит code_search одной фазой после загрузки (`_build_code_search`):
+        #: строки модулей тогда не дублируются в FTS по одной.
+        self.defer_code_search = defer_code_search
+        #: Пополнять ли вместе с code_search и триграммный code_search_trigram.
+        self.code_trigram = code_trigram
+        #: sha1 кода → id строки module_code, выданный этим буфером (`_module_code_id`).
+        self.code_ids = {}
+        # Справочник → {значение: id} (`intern_id`).
+        self._interned = {}
+        # SQL -> [values]; порядок операторов — порядок их первого появления, так что
+        # родительские таблицы (metadata_objects, forms) пишутся раньше дочерних.
+        self._pending = {}
+        self._weight = 0
+        self._next_ids = {}
+        self.rows_written = 0
+
+    @classmethod
+    def of(cls, target):
+        """`target`, если это уже буфер сборки; для обычного курсора — буфер без накопления
+        (каждая строка пишется сразу): так вставку можно вызвать и отдельно, как в тестах."""
+        if isinstance(target, cls):
+            return target
+        return cls(target, flush_weight=0)
+
+    def next_id(self, table):
+        """Следующий свободный id таблицы (`INTEGER PRIMARY KEY AUTOINCREMENT`)."""
+        next_id = self._next_ids.get(table)
+        if next_id is None:
+            next_id = self._initial_id(table)
+        self._next_ids[table] = next_id + 1
+        return next_id
+
+    def _initial_id(self, table):
+        row = self.cursor.execute(f'SELECT MAX(id) FROM {table}').fetchone()
+        last = row[0] or 0
+        row = self.cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+        if row is not None and row[0] is not None:
+            last = max(last, row[0])
+        return last + 1
+
+    def insert(self, sql, values, weight=1):
+        """Строка таблицы, чей id никому не нужен (id выдаст SQLite при сбросе)."""
+        pending = self._pending.get(sql)
+        if pending is None:
+            pending = self._pending[sql] = []
+        pending.append(values)
+        self._weight += weight
+        if self._weight >= self.flush_weight:
+            self.flush()
+
+    def insert_many(self, sql, rows):
+        """`insert` для списка строк одного оператора."""
+        if not rows:
+            return
+        pending = self._pending.get(sql)
+        if pending is None:
+            pending = self._pending[sql] = []
+        pending.extend(rows)
+        self._weight += len(rows)
+        if self._weight >= self.flush_weight:
+            self.flush()
+
+    def insert_id(self, table, sql, values, row_id=None, weight=1):
+        """Строка с id, выданным здесь же: `sql` перечисляет `id` первой колонкой, `values` —
+        без него. `row_id` — id, который строка обязана получить (инкрементальная пересборка
+        сохраняет прежние id объектов). Возвращает id строки."""
+        if row_id is None:
+            row_id = self.next_id(table)
+        self.insert(sql, (row_id, *values), weight)
+        return row_id
+
+    def intern_id(self, table, key, select_sql, insert_sql, values):
+        """id строки справочника `table` со значением `key`: уже выданный этим буфером, найденный
+        в базе (`select_sql` с параметром `key`) или новый (`insert_id` с `insert_sql`/`values`).
+        В базе ищется один раз на значение, дальше — словарь в памяти."""
+        ids = self._interned.get(table)
+        if ids is None:
+            ids = self._interned[table] = {}
+        row_id = ids.get(key)
+        if row_id is None:
+            row = self.cursor.execute(select_sql, (key,)).fetchone()
+            row_id = row[0] if row is not None else self.insert_id(table, insert_sql, values)
+            ids[key] = row_id
+        return row_id
+
+    def flush(self):
+        """Пишет всё накопленное. Нужен перед любым чтением этих таблиц и перед commit."""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = {}
+        self._weight = 0
+        for sql, rows in pending.items():
+            self.cursor.executemany(sql, rows)
+            self.rows_written += len(rows)
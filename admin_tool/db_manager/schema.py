@@ -1,9 +1,39 @@
+import re
+import time
+from itertools import islice
+
+from shared.form_eav import ENTITY_KIND_IDS, HOT_PROPERTY_PATH_IDS, VALUE_TYPE_IDS
+from shared.module_code import decompress_code
+
+_INDEX_TABLE = re.compile(r'\bON\s+(\w+)\s*\(')
+
+# Сколько модулей распаковывается за раз, когда code_search и code_search_trigram строятся
+# одним проходом: текст пачки отдаётся обоим индексам, в памяти — не больше пачки.
+_CODE_SEARCH_BATCH = 500
+
+
+def _index_table(sql):
+    """Таблица из DDL индекса: индексы одной таблицы строятся подряд, пока её страницы в кэше."""
+    return _INDEX_TABLE.search(sql).group(1)
+
+
 class SchemaMixin:
     """DB schema creation (migration-free: always CREATE TABLE/INDEX IF NOT EXISTS)."""
 
-    def _create_schema(self):
-        """Создает структуру таблиц"""
+    def _create_schema(self, read_indexes=True):
+        """Создает структуру таблиц
+
+        Args:
+            read_indexes: Создавать ли индексы, нужные только чтению (инструментам MCP).
+                Полная сборка передаёт False: таблицы заполняются без их поддержки, а сами
+                индексы строятся одним проходом по готовым данным (`_create_read_indexes`).
+                Сразу создаются только ограничения и индексы, на которые опирается сама
+                вставка и отложенные стадии.
+        """
         cursor = self.conn.cursor()
+        # DDL индексов чтения копится и выполняется в конце, сгруппированным по таблицам.
+        pending_read_indexes = []
+        read_index = pending_read_indexes.append
 
         # Таблица объектов метаданных
         cursor.execute('''
@@ -66,7 +96,7 @@ class SchemaMixin:
                 FOREIGN KEY (form_attribute_id) REFERENCES form_attributes(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_fac_form_attribute
             ON form_attribute_columns(form_attribute_id)
         ''')
@@ -110,21 +140,64 @@ class SchemaMixin:
             )
         ''')
 
-        # EAV свойства сущностей форм (attribute | attribute_column | item)
+        # EAV свойства сущностей форм (attribute | attribute_column | item). Самая большая
+        # таблица индекса (1.9–3.1M строк на ЕРП), а различных путей свойств — несколько тысяч:
+        # вид сущности, путь/имя свойства и тип значения хранятся id справочников (v25).
+        # Закреплённые id (вид сущности, типы значений, горячие пути) — в shared/form_eav.py:
+        # на них опираются частичные индексы и запросы инструментов.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS form_entity_kinds (
+                id INTEGER PRIMARY KEY,
+                entity_kind TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS form_property_paths (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                property_path TEXT NOT NULL UNIQUE,
+                property_name TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS form_value_types (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                value_type TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.executemany(
+            'INSERT OR IGNORE INTO form_entity_kinds (id, entity_kind) VALUES (?, ?)',
+            [(kind_id, kind) for kind, kind_id in ENTITY_KIND_IDS.items()],
+        )
+        cursor.executemany(
+            'INSERT OR IGNORE INTO form_property_paths (id, property_path, property_name) VALUES (?, ?, ?)',
+            [(path_id, path, path.rsplit('.', 1)[-1]) for path, path_id in HOT_PROPERTY_PATH_IDS.items()],
+        )
+        cursor.executemany(
+            'INSERT OR IGNORE INTO form_value_types (id, value_type) VALUES (?, ?)',
+            [(type_id, value_type) for value_type, type_id in VALUE_TYPE_IDS.items()],
+        )
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS form_entity_properties (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entity_kind TEXT NOT NULL,
+                entity_kind INTEGER NOT NULL,
                 entity_id INTEGER NOT NULL,
-                property_path TEXT NOT NULL,
-                property_name TEXT NOT NULL,
+                path_id INTEGER NOT NULL,
                 ordinal INTEGER NOT NULL DEFAULT 0,
                 value_text TEXT,
-                value_type TEXT,
-                UNIQUE(entity_kind, entity_id, property_path, ordinal)
+                value_type_id INTEGER,
+                FOREIGN KEY (entity_kind) REFERENCES form_entity_kinds(id),
+                FOREIGN KEY (path_id) REFERENCES form_property_paths(id),
+                FOREIGN KEY (value_type_id) REFERENCES form_value_types(id)
             )
         ''')
-        cursor.execute('''
+        # Уникальность (entity_kind, entity_id, path_id, ordinal) — отдельным индексом, а
+        # не ограничением таблицы: ограничение нельзя отложить до конца сборки, а 3M строк EAV
+        # платили бы за его B-дерево при каждой вставке.
+        read_index('''
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_fep_entity_path
+            ON form_entity_properties(entity_kind, entity_id, path_id, ordinal)
+        ''')
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_fep_entity
             ON form_entity_properties(entity_kind, entity_id)
         ''')
@@ -133,25 +206,29 @@ class SchemaMixin:
         # everything else goes through ix_fep_entity (drill-down) instead. A single
         # partial index per hot value — not one WHERE...IN(…) index — because SQLite's
         # per-bind-value partial-index optimization (needed since tool code always binds
-        # property_path as a parameter, never as a literal) only kicks in for a plain
-        # `column = 'literal'` partial-index condition, not for an IN-list one; verified
-        # via EXPLAIN QUERY PLAN. Other property_path values still work, just via a full
-        # scan (same accepted trade-off as the search_code LIKE fallback).
-        # Indexed on (entity_kind, property_path), not property_path alone: tool queries
-        # always add `entity_kind = 'item'`, and without entity_kind in the index SQLite
-        # prefers the existing (entity_kind, entity_id, property_path, ordinal) UNIQUE
+        # path_id as a parameter, never as a literal) only kicks in for a plain
+        # `column = literal` partial-index condition, not for an IN-list one; verified
+        # via EXPLAIN QUERY PLAN. Other paths still work, just via a full scan (same
+        # accepted trade-off as the search_code LIKE fallback). Hot paths have ids fixed by
+        # the schema (HOT_PROPERTY_PATH_IDS), so the index condition can name them.
+        # Indexed on (entity_kind, path_id), not path_id alone: tool queries
+        # always add `entity_kind = item`, and without entity_kind in the index SQLite
+        # prefers the existing (entity_kind, entity_id, path_id, ordinal) UNIQUE
         # index — a much more expensive per-entity_id scan (verified on a 2M-row table:
         # ~1.6s vs ~1ms with entity_kind included).
         for hot_path in ('DataPath', 'Visible', 'Enabled'):
-            cursor.execute(f'''
+            read_index(f'''
                 CREATE INDEX IF NOT EXISTS ix_fep_path_{hot_path.lower()}
-                ON form_entity_properties(entity_kind, property_path)
-                WHERE property_path = '{hot_path}'
+                ON form_entity_properties(entity_kind, path_id)
+                WHERE path_id = {HOT_PROPERTY_PATH_IDS[hot_path]}
             ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS ix_fep_name_querytext
-            ON form_entity_properties(property_name)
-            WHERE property_name = 'QueryText'
+        # QueryText ищется по имени свойства (любой путь с листом QueryText), а имя живёт в
+        # справочнике. Значение QueryText всегда 'longtext' (form_property_flattener), а длинных
+        # строк кроме него единицы — частичный индекс по этому типу сужает поиск так же.
+        read_index(f'''
+            CREATE INDEX IF NOT EXISTS ix_fep_longtext
+            ON form_entity_properties(value_type_id)
+            WHERE value_type_id = {VALUE_TYPE_IDS['longtext']}
         ''')
 
         # Таблица событий элементов
@@ -188,11 +265,21 @@ class SchemaMixin:
                 FOREIGN KEY (object_id) REFERENCES metadata_objects(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_object_commands_object_name
             ON object_commands(object_id, name)
         ''')
 
+        # Код модулей: один сжатый zlib текст на содержимое (sha1), см. shared/module_code.py.
+        # UNIQUE по hash нужен и самой вставке — по нему находится уже записанный текст.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS module_code (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash BLOB NOT NULL UNIQUE,
+                code BLOB NOT NULL
+            )
+        ''')
+
         # Таблица модулей (form_id для FormModule; command_id для CommandModule команды объекта)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS modules (
@@ -201,14 +288,19 @@ class SchemaMixin:
                 form_id INTEGER,
                 command_id INTEGER,
                 module_type TEXT NOT NULL,
-                code TEXT NOT NULL,
+                code_id INTEGER NOT NULL,
                 FOREIGN KEY (object_id) REFERENCES metadata_objects(id),
                 FOREIGN KEY (form_id) REFERENCES forms(id),
-                FOREIGN KEY (command_id) REFERENCES object_commands(id)
+                FOREIGN KEY (command_id) REFERENCES object_commands(id),
+                FOREIGN KEY (code_id) REFERENCES module_code(id)
             )
         ''')
+        read_index('''
+            CREATE INDEX IF NOT EXISTS idx_modules_code
+            ON modules(code_id)
+        ''')
 
-        # Таблица процедур/функций модулей (индекс, код хранится в modules.code по start_line/end_line)
+        # Таблица процедур/функций модулей (индекс, код — в module_code по start_line/end_line)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS module_procedures (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -284,14 +376,14 @@ class SchemaMixin:
         # `WHERE object_id = ? AND source_table = '...'` (четыре ветки _REFERENCING_SLOTS_SQL),
         # и без source_table в индексе остаётся лишний фильтр по строкам (423k на ЕРП).
         # Отдельный индекс по (object_id) не нужен — он строгий префикс этого.
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mts_object_source
             ON metadata_type_slots(object_id, source_table)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mts_src_object ON metadata_type_slots(src_object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mts_source ON metadata_type_slots(source_table, source_row_id)
         ''')
 
@@ -379,11 +471,11 @@ class SchemaMixin:
                 FOREIGN KEY (object_id) REFERENCES metadata_objects(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_event_subscriptions_handler_module
             ON event_subscriptions(handler_module)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_event_subscriptions_event
             ON event_subscriptions(event)
         ''')
@@ -401,13 +493,13 @@ class SchemaMixin:
                 FOREIGN KEY (dst_object_id) REFERENCES metadata_objects(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mrel_src ON metadata_relations(src_object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mrel_dst ON metadata_relations(dst_object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_mrel_kind ON metadata_relations(relation_kind)
         ''')
 
@@ -439,99 +531,115 @@ class SchemaMixin:
             )
         ''')
 
-        # Индексы для быстрого поиска
+        # Индексы для быстрого поиска. idx_objects_name, idx_modules_object и
+        # idx_module_procedures_module нужны уже сборке: по ним отложенные стадии ищут
+        # процедуры общих модулей (`_link_scheduled_job_procedures` и подписки).
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_objects_name
             ON metadata_objects(name)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_objects_type
             ON metadata_objects(object_type)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_forms_name
             ON forms(form_name)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_form_items_name
             ON form_items(name)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_form_items_type
             ON form_items(item_type)
         ''')
 
         # Индексы для атрибутов
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_attributes_object
             ON attributes(object_id)
         ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_attributes_name ON attributes(name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tabular_sections_object ON tabular_sections(object_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tabular_section_columns_ts ON tabular_section_columns(tabular_section_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tabular_section_columns_name ON tabular_section_columns(column_name)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_attributes_name ON attributes(name)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_tabular_sections_object ON tabular_sections(object_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_tabular_section_columns_ts ON tabular_section_columns(tabular_section_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_tabular_section_columns_name ON tabular_section_columns(column_name)')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_enum_values_object
             ON enum_values(object_id)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_bp_route_points_object
             ON bp_route_points(object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_bp_route_transitions_object
             ON bp_route_transitions(object_id)
         ''')
 
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_fo_content_ref_fo
             ON fo_content_ref(functional_option_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_fo_content_ref_object
             ON fo_content_ref(metadata_object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_fo_form_usage_fo
             ON fo_form_usage(functional_option_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_fo_form_usage_owner_form
             ON fo_form_usage(owner_object_id, form_id, element_type, element_name)
         ''')
 
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_modules_object ON modules(object_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_forms_object ON forms(object_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_forms_object ON forms(object_id)')
 
         # FK-индексы дочерних таблиц формы. Соседи (form_events, form_attribute_columns,
         # form_item_events) свои получили сразу, эти пятеро — нет, и каждый запрос по форме
         # шёл полным сканом: на ЕРП find_form без фильтров — ~817 c против 0.6 мс, а любой
         # из ~5 запросов get_form_structure — 12–33 мс против 0.1–0.2 мс. Цена — 0.3 c
         # сборки и +7 МБ на базу 3.3 ГБ (аудит 2026-08, A-9).
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_items_form ON form_items(form_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_attributes_form ON form_attributes(form_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_commands_form ON form_commands(form_id)')
-        cursor.execute('''
+        read_index('CREATE INDEX IF NOT EXISTS idx_form_items_form ON form_items(form_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_form_attributes_form ON form_attributes(form_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_form_commands_form ON form_commands(form_id)')
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_form_conditional_appearance_form
             ON form_conditional_appearance(form_id)
         ''')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_modules_form ON modules(form_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_modules_form ON modules(form_id)')
 
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_events_form ON form_events(form_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_item_events_item ON form_item_events(item_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_form_events_form ON form_events(form_id)')
+        read_index('CREATE INDEX IF NOT EXISTS idx_form_item_events_item ON form_item_events(item_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_module_procedures_module ON module_procedures(module_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_module_procedures_name ON module_procedures(name)')
-        cursor.execute('''
+        read_index('CREATE INDEX IF NOT EXISTS idx_module_procedures_name ON module_procedures(name)')
+        read_index('''
             CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_method_name
             ON scheduled_jobs(method_name)
         ''')
 
+        # Отпечатки исходных файлов объектов — для `rebuild-index --incremental`
+        # (DatabaseManager.update_database): переразбираются только объекты, у которых
+        # content_hash не совпал. stat_signature (размер + mtime) позволяет не перечитывать
+        # файлы неизменённых объектов. Ключ — как у metadata_objects (object_type, name).
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS object_sources (
+                object_type TEXT NOT NULL,
+                name TEXT NOT NULL,
+                stat_signature TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                PRIMARY KEY (object_type, name)
+            ) WITHOUT ROWID
+        ''')
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS index_metadata (
                 key TEXT PRIMARY KEY,
@@ -550,30 +658,64 @@ class SchemaMixin:
             )
         ''')
 
+        # Права ролей (v26): на ЕРП ~900k строк role_grants, и каждая повторяла строками имя
+        # объекта, родителя, права, вид цели и базы, а один и тот же текст RLS (типовые шаблоны
+        # копируются из роли в роль) хранился тысячи раз. Теперь строки — id справочников:
+        # role_qnames (полное имя цели и его вид), role_rights, role_sources и
+        # role_restriction_texts (текст один раз на содержимое, ключ — sha1).
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS role_qnames (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                qname TEXT NOT NULL UNIQUE,
+                target_kind TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS role_rights (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                right_name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS role_sources (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_db_name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS role_restriction_texts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash BLOB NOT NULL UNIQUE,
+                restriction_text TEXT NOT NULL
+            )
+        ''')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS role_grants (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 role_object_id INTEGER NOT NULL,
-                target_qname TEXT NOT NULL,
-                target_kind TEXT NOT NULL,
-                parent_object_qname TEXT NOT NULL,
-                right_name TEXT NOT NULL,
+                target_id INTEGER NOT NULL,
+                parent_id INTEGER NOT NULL,
+                right_id INTEGER NOT NULL,
                 granted INTEGER,
-                source_db_name TEXT,
-                FOREIGN KEY (role_object_id) REFERENCES metadata_objects(id)
+                source_id INTEGER,
+                FOREIGN KEY (role_object_id) REFERENCES metadata_objects(id),
+                FOREIGN KEY (target_id) REFERENCES role_qnames(id),
+                FOREIGN KEY (parent_id) REFERENCES role_qnames(id),
+                FOREIGN KEY (right_id) REFERENCES role_rights(id),
+                FOREIGN KEY (source_id) REFERENCES role_sources(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_role_grants_role
             ON role_grants(role_object_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_role_grants_parent
-            ON role_grants(parent_object_qname)
+            ON role_grants(parent_id)
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_role_grants_target_right
-            ON role_grants(target_qname, right_name)
+            ON role_grants(target_id, right_id)
         ''')
 
         cursor.execute('''
@@ -581,12 +723,14 @@ class SchemaMixin:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 grant_id INTEGER NOT NULL,
                 field_scope TEXT,
-                restriction_text TEXT NOT NULL,
-                source_db_name TEXT,
-                FOREIGN KEY (grant_id) REFERENCES role_grants(id)
+                text_id INTEGER NOT NULL,
+                source_id INTEGER,
+                FOREIGN KEY (grant_id) REFERENCES role_grants(id),
+                FOREIGN KEY (text_id) REFERENCES role_restriction_texts(id),
+                FOREIGN KEY (source_id) REFERENCES role_sources(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_role_access_restrictions_grant
             ON role_access_restrictions(grant_id)
         ''')
@@ -601,7 +745,7 @@ class SchemaMixin:
                 FOREIGN KEY (role_object_id) REFERENCES metadata_objects(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_role_restriction_templates_role
             ON role_restriction_templates(role_object_id)
         ''')
@@ -627,7 +771,7 @@ class SchemaMixin:
                 FOREIGN KEY (object_id) REFERENCES metadata_objects(id)
             )
         ''')
-        cursor.execute('''
+        read_index('''
             CREATE INDEX IF NOT EXISTS ix_dcs_schema_object
             ON dcs_schema(object_id)
         ''')
@@ -642,13 +786,90 @@ class SchemaMixin:
         #     содержали слово в коде. Ложные строки съедали MAX_MODULES_SEARCH_CODE ещё до
         #     проверки релевантности — реальные совпадения молча обрезались.
         # Оба поля и так приходят джойном к modules/metadata_objects в server/tools/code.py.
+        # Индекс contentless, rowid = module_code.id: сжатый код FTS5 прочитать не может, поэтому
+        # текст ему отдаёт сборка, а модули с одинаковым кодом индексируются один раз. Удалить
+        # строку можно только командой 'delete' с тем же текстом (инкрементальная пересборка).
         cursor.execute('''
             CREATE VIRTUAL TABLE IF NOT EXISTS code_search
             USING fts5(
                 code,
-                content='modules',
-                content_rowid='id'
-            )
-        ''')
+                content=''
+            )
+        ''')
+        # Второй индекс кода, по желанию сборки (`code_trigram`): токены — все триграммы текста,
+        # так что фраза из 3+ символов ищет любую подстроку, с точками и скобками, без учёта
+        # регистра (кириллицы тоже). Тоже contentless, rowid = module_code.id.
+        if self.code_trigram:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS code_search_trigram
+                USING fts5(
+                    code,
+                    content='',
+                    tokenize='trigram'
+                )
+            ''')
 
+        if read_indexes:
+            pending_read_indexes.sort(key=_index_table)
+            for sql in pending_read_indexes:
+                cursor.execute(sql)
+        self.conn.commit()
+
+    def _build_code_search(self, progress_callback=None):
+        """Полнотекстовый индекс code_search целиком по загруженному module_code (полная сборка).
+
+        Построчная вставка посреди потока объектов перемежала слияния сегментов FTS5 со всей
+        остальной записью и оставляла раскладку сегментов, зависящую от порядка вставки (см.
+        A/B-сверку в CHANGELOG 2026-08-01). Здесь каждый уникальный текст распаковывается и
+        индексируется одним проходом по module_code, `optimize` сливает всё в один сегмент:
+        `MATCH` читает одно b-дерево, и индекс одинаков от сборки к сборке.
+
+        С `code_trigram` тем же проходом (текст распаковывается один раз, пачками по
+        `_CODE_SEARCH_BATCH`) строится и code_search_trigram, а в index_metadata ставится
+        `code_trigram` — по нему сервер знает, что поиск подстроки может идти через индекс.
+        """
+        t_start = time.perf_counter()
+        cursor = self.conn.cursor()
+        source = self.conn.cursor()
+        source.execute('SELECT id, code FROM module_code ORDER BY id')
+        texts = ((code_id, decompress_code(blob)) for code_id, blob in source)
+        if not self.code_trigram:
+            cursor.executemany('INSERT INTO code_search (rowid, code) VALUES (?, ?)', texts)
+        else:
+            while True:
+                batch = list(islice(texts, _CODE_SEARCH_BATCH))
+                if not batch:
+                    break
+                cursor.executemany('INSERT INTO code_search (rowid, code) VALUES (?, ?)', batch)
+                cursor.executemany('INSERT INTO code_search_trigram (rowid, code) VALUES (?, ?)', batch)
+            cursor.execute("INSERT INTO code_search_trigram(code_search_trigram) VALUES ('optimize')")
+            cursor.execute("INSERT OR REPLACE INTO index_metadata (key, value) VALUES ('code_trigram', '1')")
+        cursor.execute("INSERT INTO code_search(code_search) VALUES ('optimize')")
         self.conn.commit()
+        self.stage_seconds['code_search'] = time.perf_counter() - t_start
+        if progress_callback:
+            size = cursor.execute('SELECT COALESCE(SUM(LENGTH(block)), 0) FROM code_search_data').fetchone()[0]
+            trigram_part = ''
+            if self.code_trigram:
+                trigram_size = cursor.execute(
+                    'SELECT COALESCE(SUM(LENGTH(block)), 0) FROM code_search_trigram_data'
+                ).fetchone()[0]
+                trigram_part = f", триграммный — {trigram_size / (1 << 20):.0f} МБ"
+            progress_callback(
+                96, 100,
+                f"Полнотекстовый индекс code_search — {self.stage_seconds['code_search']:.1f} c, "
+                f"{size / (1 << 20):.0f} МБ{trigram_part}",
+            )
+
+    def _create_read_indexes(self, progress_callback=None):
+        """Индексы чтения после загрузки данных (`_create_schema(read_indexes=False)`).
+
+        Построить индекс по готовой таблице — одна сортировка её строк; поддерживать его по
+        ходу вставки — поиск и вставка в B-дерево на каждую строку. Таблицы уже есть, поэтому
+        повторный `_create_schema` создаёт только недостающие индексы.
+        """
+        t_start = time.perf_counter()
+        self._create_schema()
+        self.stage_seconds['read_indexes'] = time.perf_counter() - t_start
+        if progress_callback:
+            progress_callback(97, 100, f"Индексы чтения — {self.stage_seconds['read_indexes']:.1f} c")
@@ -19,10 +19,12 @@ from admin_tool.bulk_update import (
 from admin_tool.db_manager import DatabaseManager, format_build_error
 from shared.project_manager import ProjectManager
 from shared.xml_parser import get_configuration_name, get_configuration_type
+from shared.xml_parser.parse_cache import default_parse_cache_dir
 from shared.indexer_version import INDEXER_VERSION
 from shared.index_status import read_db_last_updated_at, format_last_updated_local
 from shared.db_build_state import (
     is_building,
+    is_interrupted_build,
     is_stale_building,
     reconcile_building_markers,
     mark_building,
@@ -216,7 +218,10 @@ class AdminAppV2:
                 db_text = f"{db_icon} {db['name']}"
                 db_path = self.db_dir / db["db_file"]
                 if is_building(db_path):
-                    if is_stale_building(db_path):
+                    if is_interrupted_build(db_path):
+                        status = "Сборка прервана — пересборка продолжит её"
+                        db_tags = ("database", project["id"], db["id"], "building_stale")
+                    elif is_stale_building(db_path):
                         status = "Сборка прервана — пересоберите"
                         db_tags = ("database", project["id"], db["id"], "building_stale")
                     else:
@@ -391,7 +396,10 @@ class AdminAppV2:
             type_label = {'base': 'Основная', 'processor': 'Внешняя обработка', 'report': 'Внешний отчёт'}.get(db['type'], 'Расширение')
             msg += f"Тип: {type_label}\n\n"
             msg += f"Всего объектов: {stats['total_objects']}\n"
-            msg += f"Всего модулей: {stats['total_modules']}\n\n"
+            msg += f"Всего модулей: {stats['total_modules']}\n"
+            if stats.get('build_seconds') is not None:
+                msg += f"Время сборки: {stats['build_seconds']} c\n"
+            msg += "\n"
             msg += "По типам:\n"
             for obj_type, count in sorted(stats['by_type'].items()):
                 msg += f"  {obj_type}: {count}\n"
@@ -597,7 +605,10 @@ class AddDatabaseWindow:
             )
 
         try:
-            success = DatabaseManager.build_from_xml_atomic(db_path, str(self.xml_path), progress_callback=on_progress)
+            success = DatabaseManager.build_from_xml_atomic(
+                db_path, str(self.xml_path), progress_callback=on_progress,
+                parse_cache_dir=default_parse_cache_dir(db_path),
+            )
 
             if success:
                 db_id = self.main_app.pm.add_database(self.project["id"], name, db_type, db_filename)
@@ -740,7 +751,10 @@ class QuickUpdateDialog:
             )
 
         try:
-            success = DatabaseManager.build_from_xml_atomic(db_path, xml_path, progress_callback=on_progress)
+            success = DatabaseManager.build_from_xml_atomic(
+                db_path, xml_path, progress_callback=on_progress,
+                parse_cache_dir=default_parse_cache_dir(db_path),
+            )
 
             if success:
                 def on_success():
@@ -833,7 +847,10 @@ class UpdateDatabaseWindow:
             )
 
         try:
-            success = DatabaseManager.build_from_xml_atomic(db_path, str(self.xml_path), progress_callback=on_progress)
+            success = DatabaseManager.build_from_xml_atomic(
+                db_path, str(self.xml_path), progress_callback=on_progress,
+                parse_cache_dir=default_parse_cache_dir(db_path),
+            )
 
             if success:
                 self.main_app.pm.update_source_xml(
@@ -860,10 +877,15 @@ class UpdateDatabaseWindow:
 class BulkUpdateWindow:
     """Массовое обновление баз: весь проект или все проекты (backlog `gui-bulk-update`).
 
-    Базы пересобираются последовательно из сохранённых источников; окно показывает план
+    Базы пересобираются из сохранённых источников — по одной или, с флажком «Несколько баз
+    одновременно», параллельно (`run_bulk_update(max_parallel=...)`); окно показывает план
     (что будет пересобрано и что пропущено — и почему), текущую базу, прогресс N из M и
     общий лог стадий. Ошибка одной базы не останавливает прогон — итог в сводке."""
 
+    #: Сколько баз собирать одновременно в параллельном режиме (ещё и бюджет памяти —
+    #: `shared/build_scheduler.py`).
+    PARALLEL_BUILDS = 4
+
     def __init__(self, parent, main_app, project=None):
         self.main_app = main_app
         self.project = project
@@ -896,6 +918,10 @@ class BulkUpdateWindow:
             scope_frame, text="Все базы", variable=self.scope_var,
             value=SCOPE_ALL, command=self._refresh_plan
         ).pack(side=tk.LEFT, padx=10)
+        self.parallel_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            scope_frame, text="Несколько баз одновременно", variable=self.parallel_var
+        ).pack(side=tk.LEFT, padx=10)
 
         plan_frame = tk.Frame(self.window)
         plan_frame.pack(padx=20, pady=5, fill=tk.BOTH, expand=True)
@@ -993,7 +1019,9 @@ class BulkUpdateWindow:
         self.stop_button.config(state=tk.NORMAL)
         self.progress.config(maximum=len(actionable), value=0)
 
-        thread = threading.Thread(target=self._bulk_update_thread, args=(list(self.targets),))
+        thread = threading.Thread(
+            target=self._bulk_update_thread, args=(list(self.targets), self.parallel_var.get())
+        )
         thread.start()
 
     def request_stop(self):
@@ -1009,7 +1037,7 @@ class BulkUpdateWindow:
             self.plan_tree.item(item, tags=(tag,) if tag else ())
             self.plan_tree.see(item)
 
-    def _bulk_update_thread(self, targets):
+    def _bulk_update_thread(self, targets, parallel):
         def on_db_start(index, total, target):
             def apply():
                 self.status_label.config(text=f"База {index} из {total}: {target.label}")
@@ -1018,6 +1046,12 @@ class BulkUpdateWindow:
             self.main_app.schedule_on_main(apply)
 
         def on_progress(target, current, total, message, replace_last):
+            if parallel:
+                # Строки нескольких сборок идут вперемешку: счётчики «N/M» (replace_last)
+                # затирали бы чужие строки — их не показываем, остальные помечаем базой.
+                if replace_last:
+                    return
+                message = f"[{target.label}] {message}"
             self.main_app.schedule_on_main(
                 lambda: _append_build_log_line(self.log_widget, message, replace_last=replace_last)
             )
@@ -1040,6 +1074,7 @@ class BulkUpdateWindow:
             on_progress=on_progress,
             on_db_finish=on_db_finish,
             should_stop=lambda: self.stop_requested,
+            max_parallel=self.PARALLEL_BUILDS if parallel else 1,
         )
 
         self.main_app.schedule_on_main(lambda: self._on_finished(result))
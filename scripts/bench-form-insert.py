@@ -30,6 +30,8 @@ def main():
     dm.connect(journal_mode='OFF')
     dm._create_schema()
 
+    # Замер — разбор формы в строки; сама запись идёт пачками через RowWriter сборки
+    # (admin_tool/db_manager/row_writer.py) и в него не попадает.
     orig_insert = dm._insert_form
 
     def timed_insert(cursor, object_id, form, **kwargs):
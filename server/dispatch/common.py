@@ -58,6 +58,15 @@ async def handle_active_databases(tools, arguments: dict) -> list[TextContent]:
                 suffix = ""
             updated = format_last_updated_local(db.get("last_updated_at"))
             updated_part = f", обновлена {updated}" if updated else ""
-            lines.append(f"  — {db['name']} ({db['type']}){updated_part}{suffix}")
+            objects = db.get("total_objects")
+            objects_part = f", объектов {objects}" if objects is not None else ""
+            lines.append(f"  — {db['name']} ({db['type']}){objects_part}{updated_part}{suffix}")
         lines.append("")
-    return [TextContent(type="text", text="Активные проекты и базы:\n\n" + "\n".join(lines) if lines else "Нет активных проектов.")]
+    text = "Активные проекты и базы:\n\n" + "\n".join(lines) if lines else "Нет активных проектов."
+    cache = results.get("result_cache")
+    if cache is not None:
+        text += (
+            f"\nКэш ответов: попаданий {cache['hits_memory']} (память) + {cache['hits_disk']} (диск), "
+            f"промахов {cache['misses']}, записей {cache['entries']}, {cache['bytes'] / (1 << 20):.1f} МБ"
+        )
+    return [TextContent(type="text", text=text)]
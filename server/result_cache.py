@@ -0,0 +1,189 @@
+"""Кэш результатов инструментов MCP: в памяти (LRU с бюджетом в байтах) и, по желанию, на диске.
+
+Агенты за сессию и от сессии к сессии много раз зовут одни и те же `get_object_structure`,
+`get_module_procedures`, `find_referencing_objects`, а базы меняются только пересборкой.
+Ключ — имя инструмента, аргументы (без полей корреляции журнала) и состояние активных баз
+(`BaseTools.build_generation_token`): id поколения, который каждая сборка пишет в
+`index_metadata`, версия индекса и маркер сборки. Сборка подменяет файл базы целиком, поэтому
+новое поколение — ровно новое содержимое, и устаревший ответ из кэша не достаётся никогда.
+
+Дисковый уровень (`<logsDir>/result-cache`) переживает перезапуск сервера; включается
+переменной окружения `RESULT_CACHE_DISK_ENV`. Запись файла — через временный файл и
+`os.replace`, так что параллельный сервер не прочтёт половину ответа.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from shared.indexer_version import INDEXER_VERSION
+from shared.module_version import MODULE_VERSION
+from shared.tool_calls_log import CORRELATION_KEYS
+
+#: Сколько ответов держит кэш в памяти (сумма байт текста в UTF-8).
+RESULT_CACHE_BYTES = 64 << 20
+
+#: Предел дискового уровня; сверх него удаляются самые давно записанные файлы.
+RESULT_CACHE_DISK_BYTES = 512 << 20
+
+#: Переменная окружения, включающая дисковый уровень (`1`).
+RESULT_CACHE_DISK_ENV = 'CONFIG_MCP_RESULT_CACHE_DISK'
+
+#: Версия формата записи; входит в ключ вместе с версией модуля и индекса.
+RESULT_CACHE_FORMAT = 1
+
+# Дисковый уровень чистится раз в столько записей.
+_DISK_PRUNE_EVERY = 64
+
+#: Значения `cache_status` в журнале вызовов.
+CACHE_HIT_MEMORY = 'memory'
+CACHE_HIT_DISK = 'disk'
+CACHE_MISS = 'miss'
+
+
+def result_cache_key(tool, args, generation_token):
+    """sha256 ключа: инструмент, нормализованные аргументы, состояние баз, версии форматов."""
+    normalized = {
+        key: value for key, value in (args or {}).items()
+        if key not in CORRELATION_KEYS and value is not None
+    }
+    payload = json.dumps(
+        [RESULT_CACHE_FORMAT, MODULE_VERSION, INDEXER_VERSION, tool, normalized, generation_token],
+        ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ToolResultCache:
+    """Ответы инструментов (списки текстов TextContent) по ключу `result_cache_key`.
+
+    Потокобезопасен: инструменты выполняются в пуле потоков сервера. Ответ больше всего
+    бюджета памяти не кэшируется в памяти (но может лечь на диск).
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_BYTES, disk_dir=None, max_disk_bytes=RESULT_CACHE_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._disk_writes = 0
+        self._lock = threading.Lock()
+        #: Счётчики с запуска сервера: попадания по уровням и промахи.
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    def get(self, key):
+        """(texts, уровень) — или (None, CACHE_MISS)."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits_memory += 1
+                return entry[0], CACHE_HIT_MEMORY
+        texts = self._read_disk(key)
+        if texts is not None:
+            self._remember(key, texts)
+            with self._lock:
+                self.hits_disk += 1
+            return texts, CACHE_HIT_DISK
+        with self._lock:
+            self.misses += 1
+        return None, CACHE_MISS
+
+    def put(self, key, texts):
+        texts = list(texts)
+        self._remember(key, texts)
+        self._write_disk(key, texts)
+
+    def _remember(self, key, texts):
+        size = sum(len(text.encode('utf-8')) for text in texts)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._items[key] = (texts, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _key, (_texts, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+
+    def _disk_path(self, key):
+        return self.disk_dir / f'{key}.json'
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                texts = json.load(f)['texts']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return texts if isinstance(texts, list) else None
+
+    def _write_disk(self, key, texts):
+        """Атомарная запись (временный файл + os.replace); ошибки диска кэш не ломают."""
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'texts': texts}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _DISK_PRUNE_EVERY == 1
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Держит дисковый уровень в пределах `max_disk_bytes`: удаляет старые файлы по mtime."""
+        if self.disk_dir is None:
+            return
+        try:
+            entries = []
+            for path in self.disk_dir.glob('*.json'):
+                st = path.stat()
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        except OSError:
+            return
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def counters(self):
+        with self._lock:
+            return {
+                'hits_memory': self.hits_memory,
+                'hits_disk': self.hits_disk,
+                'misses': self.misses,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+            }
+
+
+def result_cache_disk_dir(logs_dir):
+    """`<logsDir>/result-cache`, если дисковый уровень включён (`RESULT_CACHE_DISK_ENV`), иначе None."""
+    if os.environ.get(RESULT_CACHE_DISK_ENV, '').strip() not in ('1', 'true', 'yes'):
+        return None
+    return Path(logs_dir) / 'result-cache'
@@ -19,7 +19,9 @@ def fetch_role_row(cursor, role_name):
 
 
 def fetch_role_layer(cursor, role_object_id):
-    """Return grants, access_restrictions, role_settings, restriction_templates for one role in one db."""
+    """Return grants, access_restrictions, role_settings, restriction_templates for one role in one db.
+
+    Qnames, rights, source names and RLS texts are decoded from their lookup tables (v26)."""
     cursor.execute('''
         SELECT set_for_new_objects, set_for_attributes_by_default,
                independent_rights_of_child_objects, source_db_name
@@ -35,9 +37,14 @@ def fetch_role_layer(cursor, role_object_id):
         }
 
     cursor.execute('''
-        SELECT target_qname, target_kind, parent_object_qname, right_name, granted, source_db_name
-        FROM role_grants WHERE role_object_id = ?
-        ORDER BY target_qname, right_name
+        SELECT tq.qname, tq.target_kind, pq.qname, rr.right_name, rg.granted, rs.source_db_name
+        FROM role_grants rg
+        JOIN role_qnames tq ON tq.id = rg.target_id
+        JOIN role_qnames pq ON pq.id = rg.parent_id
+        JOIN role_rights rr ON rr.id = rg.right_id
+        LEFT JOIN role_sources rs ON rs.id = rg.source_id
+        WHERE rg.role_object_id = ?
+        ORDER BY tq.qname, rr.right_name, rg.id
     ''', (role_object_id,))
     grants = []
     for row in cursor.fetchall():
@@ -51,12 +58,16 @@ def fetch_role_layer(cursor, role_object_id):
         })
 
     cursor.execute('''
-        SELECT rar.field_scope, rar.restriction_text, rar.source_db_name,
-               rg.target_qname, rg.right_name
+        SELECT rar.field_scope, rt.restriction_text, rs.source_db_name,
+               tq.qname, rr.right_name
         FROM role_access_restrictions rar
         JOIN role_grants rg ON rar.grant_id = rg.id
+        JOIN role_qnames tq ON tq.id = rg.target_id
+        JOIN role_rights rr ON rr.id = rg.right_id
+        JOIN role_restriction_texts rt ON rt.id = rar.text_id
+        LEFT JOIN role_sources rs ON rs.id = rar.source_id
         WHERE rg.role_object_id = ?
-        ORDER BY rg.target_qname, rg.right_name, rar.field_scope
+        ORDER BY tq.qname, rr.right_name, rar.field_scope, rar.id
     ''', (role_object_id,))
     access_restrictions = []
     for row in cursor.fetchall():
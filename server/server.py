@@ -2,6 +2,7 @@ import asyncio
 import json
 import sqlite3
 import sys
+import threading
 import time
 from pathlib import Path
 from mcp.server import Server
@@ -14,6 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from server.tools import ConfigurationTools
 from server.tool_schemas import TOOL_SCHEMAS
 from server.dispatch import HANDLERS, handle_active_databases
+from server.result_cache import CACHE_MISS, ToolResultCache, result_cache_disk_dir, result_cache_key
 from shared.agent_guide import GuideError, GuideSectionError, render as render_guide
 from shared.runtime_paths import get_paths
 from shared.tool_calls_log import (
@@ -37,6 +39,57 @@ tools = ConfigurationTools(
 # Журнал вызовов инструментов (protocol v1.0.7 §3): <logsDir>/tool-calls.db
 _call_logger = ToolCallLogger(tool_calls_db_path(_module_paths.logs_dir))
 
+# Обработчики синхронно читают SQLite: в цикле событий долгий search_code или get_role_rights
+# по ПолныеПрава держал бы все остальные запросы клиента, включая list_tools. В пуле потоков
+# инструментов (`BaseTools.executor`, `TOOL_WORKERS`) каждый вызов читает базу подключением из
+# пула базы (`BaseTools._get_connection`), а sqlite3 отпускает GIL на запросе. Тот же пул
+# опрашивает базы проекта (`_fan_out`).
+_tool_executor = tools.executor
+_worker_state = threading.local()
+
+# Кэш ответов инструментов по поколению сборки баз (server/result_cache.py).
+_result_cache = ToolResultCache(disk_dir=result_cache_disk_dir(_module_paths.logs_dir))
+tools.result_cache = _result_cache
+
+
+def _run_handler(handler, args):
+    """Выполняет async-обработчик инструмента в потоке пула (свой цикл событий на поток)."""
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None:
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(handler(tools, args))
+    finally:
+        tools.release_connections()
+
+
+def _run_cached_handler(name, handler, args):
+    """`_run_handler` через кэш результатов. Возвращает (ответ, cache_status для журнала);
+    cache_status None — вызов не кэшируется (у какой-то активной базы нет поколения сборки)."""
+    generation = tools.build_generation_token()
+    if generation is None:
+        return _run_handler(handler, args), None
+    key = result_cache_key(name, args, generation)
+    texts, cache_status = _result_cache.get(key)
+    if texts is not None:
+        return [TextContent(type="text", text=text) for text in texts], cache_status
+    response = _run_handler(handler, args)
+    if response and all(getattr(item, "type", None) == "text" for item in response):
+        _result_cache.put(key, [item.text for item in response])
+    return response, CACHE_MISS
+
+
+async def _call_cached_handler(name, handler, args):
+    return await asyncio.get_running_loop().run_in_executor(
+        _tool_executor, _run_cached_handler, name, handler, args,
+    )
+
+
+async def _call_handler(handler, args):
+    # Отмена вызова (таймаут/отключение клиента) не прерывает уже начатый запрос в потоке:
+    # его результат просто отбрасывается.
+    return await asyncio.get_running_loop().run_in_executor(_tool_executor, _run_handler, handler, args)
+
 
 def _response_bytes(response: list[TextContent] | None) -> int | None:
     """Serialized response size for the journal (sum of TextContent utf-8 bytes)."""
@@ -64,6 +117,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     started_mono = time.monotonic()
     success = True
     error_code = None
+    cache_status = None
     response: list[TextContent] | None = None
 
     try:
@@ -90,12 +144,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 "model": context["model"],
             }, ensure_ascii=False))]
         elif name == "active_databases":
-            response = await handle_active_databases(tools, args)
+            response = await _call_handler(handle_active_databases, args)
         else:
             try:
                 handler = HANDLERS.get(name)
                 if handler is not None:
-                    response = await handler(tools, args)
+                    response, cache_status = await _call_cached_handler(name, handler, args)
                 else:
                     response = [TextContent(type="text", text=f"Неизвестный инструмент: {name}")]
             except ValueError as e:
@@ -135,17 +189,21 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             success=success,
             error_code=error_code,
             result_bytes=_response_bytes(response),
+            cache_status=cache_status,
         )
 
 
 async def main():
     """Запуск сервера через stdio"""
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        _tool_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
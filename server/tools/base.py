@@ -1,13 +1,24 @@
 import os
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from shared.project_manager import ProjectManager
 from shared.indexer_version import INDEXER_VERSION
-from shared.index_status import read_db_last_updated_at
+from shared.index_status import read_db_last_updated_at, read_db_status
 from shared.db_build_state import is_building as _is_db_updating
-from server.role_db import read_index_metadata
+
+#: Сколько вызовов инструментов выполняется одновременно (пул потоков `server.server`).
+TOOL_WORKERS = max(2, min(8, os.cpu_count() or 2))
+
+#: Сколько свободных подключений к одной базе держит её пул (`_ConnectionPool`).
+CONNECTION_POOL_SIZE = TOOL_WORKERS
+
+#: Страничный кэш SQLite на одну базу (КБ): делится поровну между подключениями её пула, так
+#: что число потоков не умножает память — при 15 базах это 15 × 64 МБ, а не 15 × 16 × 64 МБ.
+CONNECTION_CACHE_KIB = 65536
 
 
 def _py_lower(value):
@@ -16,17 +27,13 @@ def _py_lower(value):
 
 
 def _read_db_user_version(db_path: str) -> Optional[int]:
-    """PRAGMA user_version из файла .db (только чтение). None — файла нет."""
-    p = Path(db_path)
-    if not p.exists():
-        return None
-    uri = p.resolve().as_uri() + '?mode=ro'
-    conn = sqlite3.connect(uri, uri=True)
-    try:
-        row = conn.execute('PRAGMA user_version').fetchone()
-        return int(row[0]) if row is not None else 0
-    finally:
-        conn.close()
+    """PRAGMA user_version из файла .db (только чтение). None — файла нет.
+
+    Фильтр активных баз зовёт это на каждом вызове инструмента по каждой базе: значение
+    берётся из кэша `read_db_status`, файл открывается заново, только если он изменился.
+    """
+    status = read_db_status(db_path)
+    return status['user_version'] if status is not None else None
 
 
 def _is_db_outdated(db_path: str) -> bool:
@@ -40,23 +47,99 @@ def _is_db_outdated(db_path: str) -> bool:
 
 
 def _read_db_extension_purpose(db_path: str) -> str:
-    """Read extension_purpose from index_metadata (empty for base configs)."""
-    p = Path(db_path)
-    if not p.exists():
-        return ''
-    uri = p.resolve().as_uri() + '?mode=ro'
-    conn = sqlite3.connect(uri, uri=True)
+    """Read extension_purpose from index_metadata (empty for base configs); cached per file version."""
     try:
-        meta = read_index_metadata(conn.cursor())
-        return meta.get('extension_purpose') or ''
+        status = read_db_status(db_path)
     except sqlite3.Error:
         return ''
-    finally:
-        conn.close()
+    return status['extension_purpose'] if status is not None else ''
+
+
+def _db_has_code_trigram(db_path: str) -> bool:
+    """Собран ли триграммный индекс кода (`code_search_trigram`); из кэша статуса базы."""
+    try:
+        status = read_db_status(db_path)
+    except sqlite3.Error:
+        return False
+    return bool(status and status['code_trigram'])
+
+
+def _open_read_only(db_path):
+    """Read-only подключение к базе с настройками сервера."""
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+    # Подключение переходит между потоками пула (по одному за раз) — check_same_thread=False.
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Default page cache is 2 MB against multi-GB DB files (§4.4 audit-2026-08); бюджет базы
+    # делится между подключениями пула.
+    conn.execute(f'PRAGMA cache_size=-{max(2048, CONNECTION_CACHE_KIB // CONNECTION_POOL_SIZE)}')
+    conn.execute('PRAGMA mmap_size=1073741824')  # 1 GB, OS pages in on demand
+    conn.create_function('py_lower', 1, _py_lower, deterministic=True)
+    return conn
+
+
+class _ConnectionPool:
+    """Read-only подключения к одной базе, общие для всех потоков.
+
+    Поток берёт подключение (`acquire`) на время вызова инструмента и возвращает (`release`);
+    свободных держится не больше `max_idle`. Когда файл базы подменён (другой mtime), все
+    свободные подключения закрываются сразу, а занятые — при возврате: старый файл не держит
+    ни один поток.
+    """
+
+    def __init__(self, db_path, max_idle=CONNECTION_POOL_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.mtime = None
+        self._idle = []
+        # Подключение → mtime файла, для которого оно открыто.
+        self._leased = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, mtime):
+        stale = []
+        with self._lock:
+            if mtime != self.mtime:
+                stale, self._idle, self.mtime = self._idle, [], mtime
+            conn = self._idle.pop() if self._idle else None
+        for old in stale:
+            old.close()
+        if conn is None:
+            conn = _open_read_only(self.db_path)
+        with self._lock:
+            self._leased[conn] = mtime
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            mtime = self._leased.pop(conn, None)
+            keep = mtime is not None and mtime == self.mtime and len(self._idle) < self.max_idle
+            if keep:
+                self._idle.append(conn)
+        if not keep:
+            conn.close()
+
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    def close(self):
+        with self._lock:
+            conns = self._idle + list(self._leased)
+            self._idle, self._leased = [], {}
+        for conn in conns:
+            conn.close()
 
 
 class BaseTools:
-    """Connection lifecycle, active-database resolution, and project-filter validation."""
+    """Connection lifecycle, active-database resolution, and project-filter validation.
+
+    Инструменты вызываются из пула потоков сервера (`server.server`). Подключение нельзя
+    использовать из двух потоков сразу, поэтому поток берёт его из пула базы (`_ConnectionPool`,
+    общий для всех потоков) и держит до конца вызова (`release_connections`): независимые
+    вызовы читают базу параллельно (вызовы sqlite3 отпускают GIL), а число подключений и
+    их кэшей ограничено пулом, а не числом потоков.
+    """
 
     def __init__(self, projects_file=None, databases_dir=None):
         """
@@ -74,8 +157,29 @@ class BaseTools:
                 databases_dir = paths.data_dir
 
         self.pm = ProjectManager(str(projects_file), str(databases_dir))
-        self.connections = {}
-        self._connection_mtime = {}
+        self._local = threading.local()
+        # db_path -> _ConnectionPool.
+        self._pools = {}
+        # Словари подключений, взятых потоками, — для close_all.
+        self._thread_connections = []
+        self._thread_connections_lock = threading.Lock()
+        self._executor = None
+        # Кэш ответов сервера (`server.result_cache.ToolResultCache`); задаёт server.py.
+        self.result_cache = None
+
+    def _thread_state(self):
+        local = self._local
+        if not hasattr(local, 'connections'):
+            local.connections = {}
+            local.connection_mtime = {}
+            with self._thread_connections_lock:
+                self._thread_connections.append((local.connections, local.connection_mtime))
+        return local
+
+    @property
+    def connections(self):
+        """Подключения, взятые текущим потоком: db_path -> sqlite3.Connection."""
+        return self._thread_state().connections
 
     def _get_active_databases(self, project_filter=None, include_outdated: bool = False):
         """
@@ -102,8 +206,35 @@ class BaseTools:
 
         return all_dbs
 
+    def build_generation_token(self):
+        """Состояние всех активных баз для ключа кэша результатов (`server.result_cache`):
+        проект, база, поколение сборки, версия индекса и маркер сборки по каждой. None — если
+        у какой-то базы нет поколения (её нет или собрана до него): такие вызовы не кэшируются.
+        """
+        token = []
+        for db in self.pm.get_active_databases():
+            try:
+                status = read_db_status(db['db_path'])
+            except sqlite3.Error:
+                return None
+            if status is None or not status['build_generation']:
+                return None
+            token.append((
+                db['project_name'], db['db_name'], db['db_type'], db['db_path'],
+                status['build_generation'], status['user_version'], _is_db_updating(db['db_path']),
+            ))
+        return tuple(token)
+
+    def _pool(self, db_path):
+        pool = self._pools.get(db_path)
+        if pool is None:
+            with self._thread_connections_lock:
+                pool = self._pools.setdefault(db_path, _ConnectionPool(db_path))
+        return pool
+
     def _get_connection(self, db_path):
-        """Получить подключение к БД (только чтение, с кэшированием). При изменении mtime — пересоздание."""
+        """Получить подключение к БД (только чтение): взятое текущим потоком или из пула базы.
+        При изменении mtime — новое, а подключения к старому файлу закрываются."""
         p = Path(db_path)
         if not p.exists():
             raise FileNotFoundError(f"Database file not found: {db_path}")
@@ -111,29 +242,100 @@ class BaseTools:
             current_mtime = os.path.getmtime(db_path)
         except OSError:
             current_mtime = 0
-        if db_path in self.connections:
-            if self._connection_mtime.get(db_path) != current_mtime:
-                self.connections[db_path].close()
-                del self.connections[db_path]
-                del self._connection_mtime[db_path]
-        if db_path not in self.connections:
-            uri = p.resolve().as_uri() + '?mode=ro'
-            conn = sqlite3.connect(uri, uri=True)
-            conn.row_factory = sqlite3.Row
-            # Default page cache is 2 MB against multi-GB DB files (§4.4 audit-2026-08).
-            conn.execute('PRAGMA cache_size=-65536')  # 64 MB
-            conn.execute('PRAGMA mmap_size=1073741824')  # 1 GB, OS pages in on demand
-            conn.create_function('py_lower', 1, _py_lower, deterministic=True)
-            self.connections[db_path] = conn
-            self._connection_mtime[db_path] = current_mtime
-        return self.connections[db_path]
+        state = self._thread_state()
+        connections = state.connections
+        if db_path in connections:
+            if state.connection_mtime.get(db_path) == current_mtime:
+                return connections[db_path]
+            stale = connections.pop(db_path)
+            del state.connection_mtime[db_path]
+            self._pool(db_path).release(stale)
+        conn = self._pool(db_path).acquire(current_mtime)
+        connections[db_path] = conn
+        state.connection_mtime[db_path] = current_mtime
+        return conn
+
+    def release_connections(self):
+        """Вернуть в пулы подключения, взятые текущим потоком (конец вызова инструмента)."""
+        state = self._thread_state()
+        connections = state.connections
+        while connections:
+            db_path, conn = connections.popitem()
+            state.connection_mtime.pop(db_path, None)
+            self._pool(db_path).release(conn)
+
+    @property
+    def executor(self):
+        """Пул потоков инструментов (`TOOL_WORKERS`): в нём сервер выполняет вызовы, а `_fan_out`
+        — запросы к базам. Один пул на всё — число потоков, а с ним и подключений, ограничено им."""
+        executor = self._executor
+        if executor is None:
+            with self._thread_connections_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='tool')
+                executor = self._executor
+        return executor
+
+    def _fan_out(self, databases, per_db):
+        """`per_db(db_info)` по каждой базе — одновременно, в потоках пула инструментов
+        (`executor`), каждая со своим read-only подключением (`_get_connection`). Результаты —
+        в порядке `databases`, так что сборка ответа по проектам/базам прежняя, а время вызова —
+        около времени самой медленной базы, а не сумма по основной конфигурации и всем
+        расширениям. Исключение первой по порядку упавшей базы поднимается как есть.
+
+        Вызывающий поток сам разбирает базы вместе с помощниками из пула, а помощник, которому
+        не досталось свободного потока, отменяется: когда пул занят (все потоки — вызовы,
+        ждущие своих баз), вызов доделывает всё сам, и взаимной блокировки нет, в том числе
+        при вложенном `_fan_out`. Одну базу опрашивает вызывающий поток — без передачи в пул.
+        """
+        if len(databases) <= 1:
+            return [per_db(db_info) for db_info in databases]
+        results = [None] * len(databases)
+        errors = [None] * len(databases)
+        pending = iter(enumerate(databases))
+        pending_lock = threading.Lock()
+
+        def drain():
+            while True:
+                with pending_lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                index, db_info = item
+                try:
+                    results[index] = per_db(db_info)
+                except BaseException as exc:
+                    errors[index] = exc
+
+        def helper():
+            # Взятые помощником подключения возвращаются в пулы баз сразу.
+            try:
+                drain()
+            finally:
+                self.release_connections()
+
+        helpers = [self.executor.submit(helper) for _ in range(len(databases) - 1)]
+        drain()
+        for future in helpers:
+            if not future.cancel():
+                future.result()
+        for exc in errors:
+            if exc is not None:
+                raise exc
+        return results
 
     def close_all(self):
-        """Закрыть все подключения"""
-        for conn in self.connections.values():
-            conn.close()
-        self.connections.clear()
-        self._connection_mtime.clear()
+        """Закрыть все подключения (всех потоков) и пул потоков инструментов"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._thread_connections_lock:
+            pools, self._pools = list(self._pools.values()), {}
+            for connections, connection_mtime in self._thread_connections:
+                connections.clear()
+                connection_mtime.clear()
+        for pool in pools:
+            pool.close()
 
     def _require_project_filter(self, project_filter):
         """Требует указания project_filter. Вызвать в начале tools, где фильтр обязателен."""
@@ -166,6 +368,11 @@ class BaseTools:
             pname = db['project_name']
             if pname not in by_project:
                 by_project[pname] = {'name': pname, 'databases': []}
+            # Счётчики посчитаны при сборке и лежат в кэше статуса базы вместе с версией.
+            try:
+                stats = (read_db_status(db['db_path']) or {}).get('statistics') or {}
+            except sqlite3.Error:
+                stats = {}
             by_project[pname]['databases'].append({
                 'name': db['db_name'],
                 'type': db['db_type'],
@@ -173,5 +380,10 @@ class BaseTools:
                 'is_updating': _is_db_updating(db['db_path']),
                 'last_updated_at': read_db_last_updated_at(db['db_path']),
                 'extension_purpose': _read_db_extension_purpose(db['db_path']),
+                'total_objects': stats.get('total_objects'),
+                'build_seconds': stats.get('build_seconds'),
             })
-        return {'projects': list(by_project.values())}
+        result = {'projects': list(by_project.values())}
+        if self.result_cache is not None:
+            result['result_cache'] = self.result_cache.counters()
+        return result
@@ -1,5 +1,9 @@
 import re
 
+from shared.form_eav import ENTITY_KIND_IDS, VALUE_TYPE_IDS
+from shared.module_code import ModuleCodeCache
+
+from .base import _db_has_code_trigram
 from .formatting import _validate_module_form_command_args
 
 # Максимум модулей для поиска в одной базе (лимит по модулям; внутри каждого — до max_results вхождений)
@@ -10,6 +14,19 @@ MAX_MODULES_SEARCH_CODE = 100
 # а не модули, и сигналим is_truncated (аудит 2026-08 T-11).
 MAX_SNIPPETS_SEARCH_CODE = 100
 
+# Триграммный индекс ищет фразу из 3+ символов; более короткий запрос — LIKE по коду.
+TRIGRAM_MIN_QUERY_CHARS = 3
+
+# Распакованный код горячих модулей (module_code хранит его сжатым). Ключ — sha1 содержимого,
+# поэтому кэш общий для всех баз и переживает пересборку без инвалидации.
+_MODULE_CODE_CACHE = ModuleCodeCache()
+
+
+def _module_code(row):
+    """Текст модуля из строки выборки с колонками code_hash/code (module_code)."""
+    return _MODULE_CODE_CACHE.get(row['code_hash'], row['code'])
+
+
 # Символы, при которых FTS5 бесполезен или опасен: точка/скобки — обычный способ искать
 # `ОбщегоНазначения.СообщитьПользователю(`, то есть подстроку внутри токена, чего FTS не
 # умеет; дефис, двоеточие, `*`, `^`, `"` — синтаксис самого FTS5. Раньше список был
@@ -80,20 +97,82 @@ class CodeMixin:
         # ложатся поверх FTS — джойн к modules/metadata_objects уже есть (аудит T-12).
         use_exact_search = not _fts_query_is_safe(query)
 
-        results = {}
-
-        for db_info in databases:
+        def search_db(db_info):
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
-
-            if use_exact_search:
-                # Прямой LIKE поиск; лимит по числу модулей
+            payload = {'matches': [], 'is_truncated': False}
+            # code_id → текст модуля, уже распакованный проходом без индекса.
+            exact_texts = None
+
+            if len(query) >= TRIGRAM_MIN_QUERY_CHARS and _db_has_code_trigram(db_info['db_path']):
+                # Подстрока по триграммному индексу (собирается по желанию, `code_trigram`) —
+                # для любого запроса, и со спецсимволами, и внутри слова, чего code_search не
+                # умеет. Кандидаты — модули, где фраза триграмм встречается без учёта регистра;
+                # точное вхождение дальше проверяет тот же поиск подстроки, что у LIKE и FTS.
                 sql = '''
                     SELECT
                         m.id as module_id,
                         o.name as object_name,
                         m.module_type,
-                        m.code,
+                        mc.hash as code_hash,
+                        mc.code,
+                        o.object_type,
+                        f.form_name,
+                        oc.name as command_name
+                    FROM code_search_trigram ct
+                    JOIN module_code mc ON mc.id = ct.rowid
+                    JOIN modules m ON m.code_id = mc.id
+                    JOIN metadata_objects o ON m.object_id = o.id
+                    LEFT JOIN forms f ON m.form_id = f.id
+                    LEFT JOIN object_commands oc ON m.command_id = oc.id
+                    WHERE code_search_trigram MATCH ?
+                '''
+                params = [_fts_phrase(query)]
+                if object_name:
+                    sql += ' AND o.name LIKE ?'
+                    params.append(f'%{object_name}%')
+                if module_type:
+                    sql += ' AND m.module_type = ?'
+                    params.append(module_type)
+                sql += ' LIMIT ?'
+                params.append(MAX_MODULES_SEARCH_CODE)
+                cursor.execute(sql, params)
+            elif use_exact_search:
+                # Подстрока без индекса: один проход по module_code, каждый уникальный текст
+                # распаковывается один раз, сколько бы модулей на него ни ссылалось (LIKE от
+                # `modules` распаковывал общий код заново для каждого модуля). С фильтрами
+                # проходятся только тексты модулей, которые под них попадают.
+                scope_sql = 'SELECT id, hash, code FROM module_code'
+                scope_params = []
+                if object_name or module_type:
+                    scope_sql += (
+                        ' WHERE id IN (SELECT m.code_id FROM modules m'
+                        ' JOIN metadata_objects o ON m.object_id = o.id WHERE 1 = 1'
+                    )
+                    if object_name:
+                        scope_sql += ' AND o.name LIKE ?'
+                        scope_params.append(f'%{object_name}%')
+                    if module_type:
+                        scope_sql += ' AND m.module_type = ?'
+                        scope_params.append(module_type)
+                    scope_sql += ')'
+                query_lower = query.lower()
+                exact_texts = {}
+                for code_id, digest, blob in conn.execute(scope_sql, scope_params):
+                    # Без записи в кэш: проход по всему коду не вытесняет горячие модули.
+                    code = _MODULE_CODE_CACHE.get(digest, blob, remember=False)
+                    if query_lower in code.lower():
+                        exact_texts[code_id] = code
+                        # На каждый текст в области поиска есть хотя бы один модуль.
+                        if len(exact_texts) >= MAX_MODULES_SEARCH_CODE:
+                            break
+                placeholders = ','.join('?' * len(exact_texts)) or 'NULL'
+                sql = f'''
+                    SELECT
+                        m.id as module_id,
+                        o.name as object_name,
+                        m.module_type,
+                        m.code_id,
                         o.object_type,
                         f.form_name,
                         oc.name as command_name
@@ -101,9 +180,9 @@ class CodeMixin:
                     JOIN metadata_objects o ON m.object_id = o.id
                     LEFT JOIN forms f ON m.form_id = f.id
                     LEFT JOIN object_commands oc ON m.command_id = oc.id
-                    WHERE m.code LIKE ?
+                    WHERE m.code_id IN ({placeholders})
                 '''
-                params = [f'%{query}%']
+                params = list(exact_texts)
                 if object_name:
                     sql += ' AND o.name LIKE ?'
                     params.append(f'%{object_name}%')
@@ -120,12 +199,14 @@ class CodeMixin:
                         m.id as module_id,
                         o.name as object_name,
                         m.module_type,
-                        m.code,
+                        mc.hash as code_hash,
+                        mc.code,
                         o.object_type,
                         f.form_name,
                         oc.name as command_name
                     FROM code_search cs
-                    JOIN modules m ON cs.rowid = m.id
+                    JOIN module_code mc ON mc.id = cs.rowid
+                    JOIN modules m ON m.code_id = mc.id
                     JOIN metadata_objects o ON m.object_id = o.id
                     LEFT JOIN forms f ON m.form_id = f.id
                     LEFT JOIN object_commands oc ON m.command_id = oc.id
@@ -165,7 +246,7 @@ class CodeMixin:
                 if len(db_results) >= MAX_SNIPPETS_SEARCH_CODE:
                     hit_snippet_cap = True
                     break
-                code = row['code']
+                code = exact_texts[row['code_id']] if exact_texts is not None else _module_code(row)
                 module_id = row['module_id']
                 procedures = procedures_by_module.get(module_id, [])
                 query_lower = query.lower()
@@ -215,13 +296,6 @@ class CodeMixin:
                     pos += 1
 
             if db_results:
-                project_key = f"{db_info['project_name']}"
-                if project_key not in results:
-                    results[project_key] = {}
-                db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                payload = results[project_key].setdefault(
-                    db_key, {'matches': [], 'is_truncated': False},
-                )
                 payload['matches'].extend(db_results)
                 if hit_module_cap or hit_snippet_cap:
                     payload['is_truncated'] = True
@@ -229,7 +303,9 @@ class CodeMixin:
             # Поиск по тексту запроса DynamicList в EAV — свойство формы, не модуля;
             # нерелевантно, если module_type сузил поиск до конкретного не-FormModule типа.
             if not module_type or module_type == 'FormModule':
-                fq_sql = '''
+                # Значение QueryText всегда 'longtext' — тип сужает поиск по частичному индексу
+                # ix_fep_longtext, имя свойства берётся из справочника путей.
+                fq_sql = f'''
                     SELECT
                         o.name as object_name,
                         o.object_type,
@@ -237,10 +313,13 @@ class CodeMixin:
                         fa.name as attribute_name,
                         fep.value_text as query_text
                     FROM form_entity_properties fep
-                    JOIN form_attributes fa ON fep.entity_id = fa.id AND fep.entity_kind = 'attribute'
+                    JOIN form_attributes fa
+                      ON fep.entity_id = fa.id AND fep.entity_kind = {ENTITY_KIND_IDS['attribute']}
                     JOIN forms f ON fa.form_id = f.id
                     JOIN metadata_objects o ON f.object_id = o.id
-                    WHERE fep.property_name = 'QueryText' AND fep.value_text LIKE ?
+                    WHERE fep.value_type_id = {VALUE_TYPE_IDS['longtext']}
+                      AND fep.path_id IN (SELECT id FROM form_property_paths WHERE property_name = 'QueryText')
+                      AND fep.value_text LIKE ?
                 '''
                 fq_params = [f'%{query}%']
                 if object_name:
@@ -267,15 +346,16 @@ class CodeMixin:
                         'snippet': snippet,
                         'hint': f'get_form_attribute(object_name="{row["object_name"]}", form_name="{row["form_name"]}", attribute_name="{row["attribute_name"]}")',
                     }
-                    project_key = f"{db_info['project_name']}"
-                    if project_key not in results:
-                        results[project_key] = {}
-                    db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                    payload = results[project_key].setdefault(
-                        db_key, {'matches': [], 'is_truncated': False},
-                    )
                     payload['matches'].append(entry)
 
+            return payload if payload['matches'] else None
+
+        results = {}
+        for db_info, payload in zip(databases, self._fan_out(databases, search_db)):
+            if payload is not None:
+                db_key = f"{db_info['db_name']} ({db_info['db_type']})"
+                results.setdefault(db_info['project_name'], {})[db_key] = payload
+
         for project_data in results.values():
             for payload in project_data.values():
                 payload['returned_count'] = len(payload['matches'])
@@ -320,8 +400,9 @@ class CodeMixin:
                 cursor = conn.cursor()
 
                 cursor.execute('''
-                    SELECT m.code
+                    SELECT mc.hash as code_hash, mc.code
                     FROM modules m
+                    JOIN module_code mc ON mc.id = m.code_id
                     JOIN forms f ON m.form_id = f.id
                     JOIN metadata_objects o ON f.object_id = o.id
                     WHERE o.name = ? AND f.form_name = ? AND m.module_type = 'FormModule'
@@ -335,15 +416,16 @@ class CodeMixin:
                         results[project_key] = {}
 
                     db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                    results[project_key][db_key] = row['code']
+                    results[project_key][db_key] = _module_code(row)
         elif module_type == 'CommandModule':
             for db_info in databases:
                 conn = self._get_connection(db_info['db_path'])
                 cursor = conn.cursor()
                 if cn:
                     cursor.execute('''
-                        SELECT m.code
+                        SELECT mc.hash as code_hash, mc.code
                         FROM modules m
+                        JOIN module_code mc ON mc.id = m.code_id
                         JOIN metadata_objects o ON m.object_id = o.id
                         JOIN object_commands oc ON m.command_id = oc.id
                         WHERE o.name = ? AND oc.name = ? AND m.module_type = 'CommandModule'
@@ -351,8 +433,9 @@ class CodeMixin:
                     ''', (object_name, cn))
                 else:
                     cursor.execute('''
-                        SELECT m.code
+                        SELECT mc.hash as code_hash, mc.code
                         FROM modules m
+                        JOIN module_code mc ON mc.id = m.code_id
                         JOIN metadata_objects o ON m.object_id = o.id
                         WHERE o.name = ? AND m.module_type = 'CommandModule'
                           AND m.form_id IS NULL AND m.command_id IS NULL
@@ -364,15 +447,16 @@ class CodeMixin:
                     if project_key not in results:
                         results[project_key] = {}
                     db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                    results[project_key][db_key] = row['code']
+                    results[project_key][db_key] = _module_code(row)
         else:
             for db_info in databases:
                 conn = self._get_connection(db_info['db_path'])
                 cursor = conn.cursor()
 
                 cursor.execute('''
-                    SELECT m.code
+                    SELECT mc.hash as code_hash, mc.code
                     FROM modules m
+                    JOIN module_code mc ON mc.id = m.code_id
                     JOIN metadata_objects o ON m.object_id = o.id
                     WHERE o.name = ? AND m.module_type = ? AND m.form_id IS NULL AND m.command_id IS NULL
                     LIMIT 1
@@ -385,7 +469,7 @@ class CodeMixin:
                         results[project_key] = {}
 
                     db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                    results[project_key][db_key] = row['code']
+                    results[project_key][db_key] = _module_code(row)
 
         return results
 
@@ -519,7 +603,7 @@ class CodeMixin:
     def get_procedure_code(self, object_name, procedure_name, module_type='Module', form_name=None, command_name=None,
                            project_filter=None, extension_filter=None):
         """
-        Получить код конкретной процедуры (по start_line/end_line из module_procedures, срез modules.code).
+        Получить код конкретной процедуры (по start_line/end_line из module_procedures, срез кода модуля).
 
         Args:
             object_name: Имя объекта
@@ -551,18 +635,22 @@ class CodeMixin:
                 conn = self._get_connection(db_info['db_path'])
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT p.start_line, p.end_line, m.code
+                    SELECT p.start_line, p.end_line, mc.hash as code_hash, mc.code
                     FROM module_procedures p
                     JOIN modules m ON p.module_id = m.id
+                    JOIN module_code mc ON mc.id = m.code_id
                     JOIN forms f ON m.form_id = f.id
                     JOIN metadata_objects o ON f.object_id = o.id
                     WHERE o.name = ? AND f.form_name = ? AND m.module_type = 'FormModule' AND p.name = ?
                     LIMIT 1
                 ''', (object_name, form_name, procedure_name))
                 row = cursor.fetchone()
-                if not row or not row['code']:
+                if not row:
                     continue
-                lines = row['code'].split('\n')
+                code = _module_code(row)
+                if not code:
+                    continue
+                lines = code.split('\n')
                 start_line = row['start_line']
                 end_line = row['end_line']
                 if end_line is None:
@@ -579,9 +667,10 @@ class CodeMixin:
                 cursor = conn.cursor()
                 if cn:
                     cursor.execute('''
-                        SELECT p.start_line, p.end_line, m.code
+                        SELECT p.start_line, p.end_line, mc.hash as code_hash, mc.code
                         FROM module_procedures p
                         JOIN modules m ON p.module_id = m.id
+                        JOIN module_code mc ON mc.id = m.code_id
                         JOIN metadata_objects o ON m.object_id = o.id
                         JOIN object_commands oc ON m.command_id = oc.id
                         WHERE o.name = ? AND oc.name = ? AND m.module_type = 'CommandModule' AND p.name = ?
@@ -589,18 +678,22 @@ class CodeMixin:
                     ''', (object_name, cn, procedure_name))
                 else:
                     cursor.execute('''
-                        SELECT p.start_line, p.end_line, m.code
+                        SELECT p.start_line, p.end_line, mc.hash as code_hash, mc.code
                         FROM module_procedures p
                         JOIN modules m ON p.module_id = m.id
+                        JOIN module_code mc ON mc.id = m.code_id
                         JOIN metadata_objects o ON m.object_id = o.id
                         WHERE o.name = ? AND m.module_type = 'CommandModule'
                           AND m.form_id IS NULL AND m.command_id IS NULL AND p.name = ?
                         LIMIT 1
                     ''', (object_name, procedure_name))
                 row = cursor.fetchone()
-                if not row or not row['code']:
+                if not row:
+                    continue
+                code = _module_code(row)
+                if not code:
                     continue
-                lines = row['code'].split('\n')
+                lines = code.split('\n')
                 start_line = row['start_line']
                 end_line = row['end_line']
                 if end_line is None:
@@ -616,17 +709,21 @@ class CodeMixin:
                 conn = self._get_connection(db_info['db_path'])
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT p.start_line, p.end_line, m.code
+                    SELECT p.start_line, p.end_line, mc.hash as code_hash, mc.code
                     FROM module_procedures p
                     JOIN modules m ON p.module_id = m.id
+                    JOIN module_code mc ON mc.id = m.code_id
                     JOIN metadata_objects o ON m.object_id = o.id
                     WHERE o.name = ? AND m.module_type = ? AND m.form_id IS NULL AND m.command_id IS NULL AND p.name = ?
                     LIMIT 1
                 ''', (object_name, module_type, procedure_name))
                 row = cursor.fetchone()
-                if not row or not row['code']:
+                if not row:
+                    continue
+                code = _module_code(row)
+                if not code:
                     continue
-                lines = row['code'].split('\n')
+                lines = code.split('\n')
                 start_line = row['start_line']
                 end_line = row['end_line']
                 if end_line is None:
@@ -1,11 +1,14 @@
 import json
 
 from shared.form_eav import (
+    ENTITY_KIND_IDS,
+    HOT_PROPERTY_PATH_IDS,
     curate_eav_properties,
     field_index_from_eav,
     filter_field_eav,
     get_eav_value,
     load_entity_eav,
+    property_path_id,
 )
 from shared.form_overview_profiles import (
     attribute_overview_hints,
@@ -161,10 +164,10 @@ class FormsMixin:
                 conditions.append('fi.name LIKE ?')
                 params.append(f'%{element_name}%')
             if data_path:
-                conditions.append('''EXISTS (
+                conditions.append(f'''EXISTS (
                     SELECT 1 FROM form_entity_properties fep
-                    WHERE fep.entity_kind = 'item' AND fep.entity_id = fi.id
-                      AND fep.property_path = 'DataPath' AND fep.value_text LIKE ?
+                    WHERE fep.entity_kind = {ENTITY_KIND_IDS['item']} AND fep.entity_id = fi.id
+                      AND fep.path_id = {HOT_PROPERTY_PATH_IDS['DataPath']} AND fep.value_text LIKE ?
                 )''')
                 params.append(f'%{data_path}%')
 
@@ -655,18 +658,24 @@ class FormsMixin:
                 value_clause = ' AND py_lower(fep.value_text) = ?'
                 value_param = low
 
-        where_params = [property_path]
-        if value_param is not None:
-            where_params.append(value_param)
-
+        item_kind = ENTITY_KIND_IDS['item']
         results = {}
         for db_info in databases:
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
 
+            # Путь — id справочника: привязанный параметром, он подхватывает частичный индекс
+            # горячего пути (ix_fep_path_*).
+            path_id = property_path_id(cursor, property_path)
+            if path_id is None:
+                continue
+            where_params = [path_id]
+            if value_param is not None:
+                where_params.append(value_param)
+
             total = cursor.execute(
                 f'''SELECT COUNT(*) FROM form_entity_properties fep
-                    WHERE fep.entity_kind = 'item' AND fep.property_path = ?{value_clause}''',
+                    WHERE fep.entity_kind = {item_kind} AND fep.path_id = ?{value_clause}''',
                 where_params,
             ).fetchone()[0]
             if not total:
@@ -682,10 +691,10 @@ class FormsMixin:
                     fi.item_type,
                     fep.value_text as property_value
                 FROM form_entity_properties fep
-                JOIN form_items fi ON fep.entity_id = fi.id AND fep.entity_kind = 'item'
+                JOIN form_items fi ON fep.entity_id = fi.id AND fep.entity_kind = {item_kind}
                 JOIN forms f ON fi.form_id = f.id
                 JOIN metadata_objects o ON f.object_id = o.id
-                WHERE fep.property_path = ?{value_clause}
+                WHERE fep.path_id = ?{value_clause}
                 ORDER BY o.name, f.form_name, fi.name
                 LIMIT ?
             ''', [*where_params, max_results])
@@ -35,9 +35,7 @@ class ObjectsMixin:
         if extension_filter:
             databases = [db for db in databases if db['db_name'].lower() == extension_filter.lower()]
 
-        results = {}
-
-        for db_info in databases:
+        def find_in_db(db_info):
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
 
@@ -82,7 +80,10 @@ class ObjectsMixin:
                     if row['extended_configuration_object']:
                         item['extended_configuration_object'] = row['extended_configuration_object']
                 db_results.append(item)
+            return db_results
 
+        results = {}
+        for db_info, db_results in zip(databases, self._fan_out(databases, find_in_db)):
             if db_results:
                 project_key = f"{db_info['project_name']}"
                 if project_key not in results:
@@ -215,27 +216,20 @@ class ObjectsMixin:
         if extension_filter:
             databases = [db for db in databases if db['db_name'].lower() == extension_filter.lower()]
 
-        results = {}
-
-        for db_info in databases:
+        def structure_in_db(db_info):
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
 
             resolved = _resolve_config_object(cursor, object_name, object_type)
             if resolved['status'] == 'not_found':
-                continue
+                return None
             if resolved['status'] == 'ambiguous':
-                project_key = db_info['project_name']
-                if project_key not in results:
-                    results[project_key] = {}
-                db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-                results[project_key][db_key] = {
+                return {
                     'ambiguous': True,
                     'requested_name': resolved['requested_name'],
                     'match_kind': resolved.get('match_kind'),
                     'candidates': resolved['candidates'],
                 }
-                continue
             obj_row = resolved['row']
 
             object_id = obj_row['id']
@@ -544,7 +538,12 @@ class ObjectsMixin:
                 structure['object_belonging'] = obj_row['object_belonging']
                 if obj_row['extended_configuration_object']:
                     structure['extended_configuration_object'] = obj_row['extended_configuration_object']
+            return structure
 
+        results = {}
+        for db_info, structure in zip(databases, self._fan_out(databases, structure_in_db)):
+            if structure is None:
+                continue
             project_key = db_info['project_name']
             if project_key not in results:
                 results[project_key] = {}
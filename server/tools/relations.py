@@ -230,13 +230,16 @@ def _fetch_referencing_role_grants(cursor, parent_object_qname):
         SELECT mo.object_type AS src_type,
                mo.name AS src_name,
                mo.synonym AS src_synonym,
-               rg.right_name,
+               rr.right_name,
                rg.granted,
-               rg.source_db_name
-        FROM role_grants rg
+               rs.source_db_name
+        FROM role_qnames pq
+        JOIN role_grants rg ON rg.parent_id = pq.id
+        JOIN role_rights rr ON rr.id = rg.right_id
+        LEFT JOIN role_sources rs ON rs.id = rg.source_id
         JOIN metadata_objects mo ON rg.role_object_id = mo.id
-        WHERE rg.parent_object_qname = ? AND rg.granted = 1
-        ORDER BY src_type, src_name, rg.right_name
+        WHERE pq.qname = ? AND rg.granted = 1
+        ORDER BY src_type, src_name, rr.right_name
     ''', (parent_object_qname,))
 
     referencers = []
@@ -329,28 +332,20 @@ class RelationsMixin:
         if max_results is None or max_results < 1:
             max_results = 100
 
-        results = {}
-
-        for db_info in databases:
+        def referencing_in_db(db_info):
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
 
             resolved = _resolve_config_object(cursor, object_name, object_type)
-            project_key = db_info['project_name']
-            db_key = f"{db_info['db_name']} ({db_info['db_type']})"
-
             if resolved['status'] == 'not_found':
-                continue
+                return None
             if resolved['status'] == 'ambiguous':
-                if project_key not in results:
-                    results[project_key] = {}
-                results[project_key][db_key] = {
+                return {
                     'ambiguous': True,
                     'requested_name': resolved['requested_name'],
                     'match_kind': resolved.get('match_kind'),
                     'candidates': resolved['candidates'],
                 }
-                continue
 
             obj_row = resolved['row']
             parent_object_qname = f"{obj_row['object_type']}.{obj_row['name']}"
@@ -362,9 +357,7 @@ class RelationsMixin:
                     ref['db_name'] = db_info['db_name']
                     ref.pop('source_db_name', None)
 
-            if project_key not in results:
-                results[project_key] = {}
-            results[project_key][db_key] = {
+            return {
                 'target': {
                     'name': obj_row['name'],
                     'type': obj_row['object_type'],
@@ -376,4 +369,14 @@ class RelationsMixin:
                 'is_truncated': total_count > len(referencers),
             }
 
+        results = {}
+        for db_info, payload in zip(databases, self._fan_out(databases, referencing_in_db)):
+            if payload is None:
+                continue
+            project_key = db_info['project_name']
+            db_key = f"{db_info['db_name']} ({db_info['db_type']})"
+            if project_key not in results:
+                results[project_key] = {}
+            results[project_key][db_key] = payload
+
         return results
@@ -73,18 +73,24 @@ def _role_dict(row, db_info):
 
 
 def _query_roles_for_object_rows(cursor, parent_qname, right_name=None, rls=None):
+    # Имя родителя и права — в справочниках (v26): сначала их id, дальше только целые.
+    row = cursor.execute('SELECT id FROM role_qnames WHERE qname = ?', (parent_qname,)).fetchone()
+    if row is None:
+        return []
+    parent_id = row[0]
     sql = '''
         SELECT DISTINCT mo.id AS role_object_id, mo.name AS role_name, mo.uuid,
-               rg.right_name, rg.granted
+               rr.right_name, rg.granted
         FROM role_grants rg
+        JOIN role_rights rr ON rr.id = rg.right_id
         JOIN metadata_objects mo ON rg.role_object_id = mo.id
-        WHERE rg.parent_object_qname = ? AND rg.granted = 1
+        WHERE rg.parent_id = ? AND rg.granted = 1
     '''
-    params = [parent_qname]
+    params = [parent_id]
     if right_name:
-        sql += ' AND rg.right_name = ?'
+        sql += ' AND rr.right_name = ?'
         params.append(right_name)
-    sql += ' ORDER BY mo.name, rg.right_name'
+    sql += ' ORDER BY mo.name, rr.right_name'
 
     cursor.execute(sql, params)
     all_rows = cursor.fetchall()
@@ -94,8 +100,8 @@ def _query_roles_for_object_rows(cursor, parent_qname, right_name=None, rls=None
             SELECT DISTINCT rg.role_object_id
             FROM role_access_restrictions rar
             JOIN role_grants rg ON rar.grant_id = rg.id
-            WHERE rg.parent_object_qname = ?
-        ''', (parent_qname,))
+            WHERE rg.parent_id = ?
+        ''', (parent_id,))
         role_ids_with_rls = {r[0] for r in cursor.fetchall()}
         if rls is True:
             all_rows = [r for r in all_rows if r['role_object_id'] in role_ids_with_rls]
@@ -213,26 +219,35 @@ class RolesMixin:
         if not merge and not extension_filter and len(databases) > 1:
             databases = [db for db in databases if db.get('db_type') == 'base'] or databases[:1]
 
-        layer_payloads = []
-        role_row = None
-        for db_info in databases:
-            if not merge and extension_filter and db_info['db_name'].lower() != extension_filter.lower():
-                continue
+        if not merge and extension_filter:
+            databases = [db for db in databases if db['db_name'].lower() == extension_filter.lower()]
+
+        def role_layer(db_info):
             conn = self._get_connection(db_info['db_path'])
             cursor = conn.cursor()
             meta = read_index_metadata(cursor)
             row = fetch_role_row(cursor, role_name)
             if row is None:
-                continue
-            if role_row is None:
-                role_row = row
-            layer_payloads.append({
+                return None
+            return row, {
                 'db_type': db_info.get('db_type'),
                 'db_name': db_info.get('db_name'),
                 'extension_purpose': meta.get('extension_purpose') or '',
                 'source_db_name': meta.get('source_db_name') or db_info.get('db_name'),
                 **fetch_role_layer(cursor, row['id']),
-            })
+            }
+
+        # Слои ролей (основная конфигурация и расширения) читаются одновременно; порядок —
+        # порядок баз, роль описывает первая база, где она есть.
+        layer_payloads = []
+        role_row = None
+        for layer in self._fan_out(databases, role_layer):
+            if layer is None:
+                continue
+            row, layer_payload = layer
+            if role_row is None:
+                role_row = row
+            layer_payloads.append(layer_payload)
 
         if role_row is None:
             return {'error': 'not_found', 'role_name': role_name}
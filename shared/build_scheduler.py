@@ -0,0 +1,189 @@
+"""Параллельная пересборка нескольких баз с делением ресурсов (массовое обновление, rebuild-all).
+
+Сборки идут в потоках процесса-оркестратора, разбор — в общем `WorkerPool`
+(`shared/xml_parser/core.py`): каждая сборка получает долю его воркеров (`WorkerPool.share`),
+пропорциональную весу своей выгрузки. Крупная база берёт большую часть пула, мелкие
+расширения собираются рядом на остатке. Сколько сборок идёт одновременно, ограничивают
+`max_jobs` и бюджет памяти: пик сборки растёт с размером конфигурации (потоковая вставка
+держит окно объектов и справочники сборки), и две крупные базы разом могут не поместиться.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+#: Грубая оценка пика памяти сборки: постоянная часть плюс пропорциональная размеру
+#: Configuration.xml (он перечисляет все объекты — это дешёвая мера размера конфигурации,
+#: известная до разбора). Коэффициенты — консервативный порядок величины (пик потоковой
+#: сборки ЕРП ~1.1 ГБ, CHANGELOG 2026-08-01), а не замер по каждой конфигурации.
+BUILD_MEMORY_BASE_MB = 150
+BUILD_MEMORY_MB_PER_CONFIG_MB = 600
+
+#: Доля доступной памяти, которую отдаём сборкам, когда бюджет не задан явно.
+DEFAULT_MEMORY_FRACTION = 0.7
+
+#: Источник доступной памяти на Linux (`MemAvailable`, КБ).
+PROC_MEMINFO = '/proc/meminfo'
+
+
+@dataclass
+class BuildJob:
+    """Одна сборка в расписании: `item` — цель вызывающей стороны, `weight` — байты её
+    Configuration.xml (`estimate_build_weight`)."""
+
+    item: Any
+    weight: int
+    workers: int = 1
+    memory_mb: int = 0
+    started: bool = False
+    result: Any = None
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+
+def estimate_build_weight(config_xml) -> int:
+    """Размер Configuration.xml в байтах; 0, если файл недоступен."""
+    try:
+        return os.path.getsize(Path(config_xml))
+    except (OSError, TypeError):
+        return 0
+
+
+def estimate_build_memory_mb(weight: int) -> int:
+    return int(BUILD_MEMORY_BASE_MB + BUILD_MEMORY_MB_PER_CONFIG_MB * weight / (1 << 20))
+
+
+def available_memory_mb() -> Optional[int]:
+    """Доступная физическая память в МБ (свободная плюс вытесняемый кэш); None, если ОС её не
+    сообщает."""
+    if os.name == 'nt':
+        import ctypes
+
+        class _MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = _MemoryStatus()
+        status.dwLength = ctypes.sizeof(_MemoryStatus)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+        return int(status.ullAvailPhys >> 20)
+    # MemAvailable учитывает вытесняемый страничный кэш; SC_AVPHYS_PAGES — это MemFree, и после
+    # чтения выгрузки он почти ноль — бюджет пускал бы одну сборку. sysconf — только без /proc.
+    try:
+        with open(PROC_MEMINFO, 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) >> 10
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return int(os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') >> 20)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def plan_worker_shares(weights: List[int], total_workers: int) -> List[int]:
+    """Доли пула по весам: пропорционально весу, не меньше одного воркера и не больше пула.
+
+    Сумма долей может превысить пул, когда сборок больше, чем воркеров: доля — это окно
+    задач сборки в общем исполнителе, а не выделенные процессы, лишнее просто ждёт в очереди.
+    """
+    total = sum(weights)
+    if total <= 0:
+        return [max(1, total_workers // max(1, len(weights)))] * len(weights)
+    return [min(total_workers, max(1, round(total_workers * w / total))) for w in weights]
+
+
+def run_concurrent_builds(
+    jobs: List[BuildJob],
+    build: Callable[[Any, Any], Any],
+    pool,
+    max_jobs: int,
+    memory_budget_mb: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_start: Optional[Callable[[BuildJob], None]] = None,
+    on_finish: Optional[Callable[[BuildJob], None]] = None,
+) -> bool:
+    """Выполняет `build(item, worker_pool)` для всех `jobs`, до `max_jobs` одновременно.
+
+    Порядок старта — от тяжёлых к лёгким: крупная база стартует первой и не оказывается в
+    хвосте, пока расширения уже собраны. Следующая сборка стартует, если помещается в
+    `memory_budget_mb` вместе с идущими (первым подходящим по списку); одна сборка идёт
+    всегда, даже если её оценка больше бюджета. None — доля доступной памяти
+    (`DEFAULT_MEMORY_FRACTION`), а если ОС её не сообщает — без ограничения.
+
+    `on_start`/`on_finish` вызываются в потоке вызывающего, ошибка сборки — в `job.error`
+    (прогон не прерывает). `should_stop` проверяется перед стартом каждой сборки: после
+    запроса новые не стартуют, идущие доделываются. Упавший воркер (OOM, kill) ломает общий
+    исполнитель: сборки, чьи задачи были в нём, доразбирают их у себя (`_pool_result`) и не
+    падают, а пул пересоздаётся (`WorkerPool.reset`) перед стартом следующих.
+
+    Returns:
+        bool: True, если прогон остановлен до старта всех сборок.
+    """
+    if memory_budget_mb is None:
+        available = available_memory_mb()
+        memory_budget_mb = int(available * DEFAULT_MEMORY_FRACTION) if available else None
+
+    shares = plan_worker_shares([job.weight for job in jobs], pool.workers)
+    for job, workers in zip(jobs, shares):
+        job.workers = workers
+        job.memory_mb = estimate_build_memory_mb(job.weight)
+    pending = sorted(jobs, key=lambda job: -job.weight)
+
+    running = {}
+    stopped_early = False
+
+    def fits(job):
+        if not running:
+            return True
+        if len(running) >= max_jobs:
+            return False
+        if memory_budget_mb is None:
+            return True
+        return sum(j.memory_mb for j in running.values()) + job.memory_mb <= memory_budget_mb
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_jobs)) as threads:
+        while pending or running:
+            if pool.broken:
+                pool.reset()
+            while pending:
+                if should_stop is not None and should_stop():
+                    stopped_early = True
+                    pending = []
+                    break
+                job = next((j for j in pending if fits(j)), None)
+                if job is None:
+                    break
+                pending.remove(job)
+                job.started = True
+                if on_start:
+                    on_start(job)
+                running[threads.submit(build, job.item, pool.share(job.workers))] = job
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                try:
+                    job.result = future.result()
+                except Exception as exc:  # noqa: BLE001 — ошибка одной сборки не останавливает остальные
+                    job.error = exc
+                if on_finish:
+                    on_finish(job)
+
+    return stopped_early
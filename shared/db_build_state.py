@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import json
 import os
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
+from shared.indexer_version import INDEXER_VERSION
+
 PathLike = Union[str, Path]
 
 MARKER_SUFFIX = '.building'
@@ -71,19 +74,50 @@ def _pid_alive(pid: Any) -> bool:
 
 
 def is_stale_building(db_path: PathLike) -> bool:
-    """Маркер есть, но процесс-сборщик не жив и нет незавершённого .tmp."""
+    """Маркер есть, но процесс-сборщик не жив: сборка не идёт, новую запускать можно.
+
+    Оставшийся .tmp при этом — прерванная сборка (`is_interrupted_build`): следующая сборка
+    продолжит её с контрольной точки, если та совпадает с выгрузкой, иначе начнёт заново.
+    """
     if not is_building(db_path):
         return False
     info = read_building_info(db_path)
-    if info and _pid_alive(info.get('pid')):
+    return not (info and _pid_alive(info.get('pid')))
+
+
+def is_interrupted_build(db_path: PathLike) -> bool:
+    """Процесс-сборщик умер, не дойдя до подмены: маркер мёртвого процесса и .tmp на месте."""
+    return is_stale_building(db_path) and tmp_db_path(db_path).exists()
+
+
+def has_resumable_checkpoint(tmp_path: PathLike) -> bool:
+    """В .tmp есть контрольная точка полной сборки текущей версии индексатора.
+
+    Только такую прерванную сборку может продолжить следующая: у .tmp прерванного
+    инкрементального обновления точки нет, а точку другой версии `load_build_checkpoint`
+    отвергнет. Файл открывается на запись — горячий журнал убитой сборки откатывается, как
+    откатился бы и при продолжении.
+    """
+    try:
+        conn = sqlite3.connect(str(tmp_path))
+    except sqlite3.Error:
+        return False
+    try:
+        row = conn.execute('SELECT indexer_version FROM build_checkpoint WHERE id = 1').fetchone()
+    except sqlite3.Error:
         return False
-    return not tmp_db_path(db_path).exists()
+    finally:
+        conn.close()
+    return row is not None and row[0] == INDEXER_VERSION
 
 
 def reconcile_building_markers(databases_dir: PathLike) -> None:
     """
-    При старте admin tool: убрать зависшие маркеры (процесс мёртв, .tmp нет)
-    и удалить осиротевшие .db.tmp (не трогать .tmp активной сборки).
+    При старте admin tool: убрать зависшие маркеры (процесс мёртв, .tmp нет или его не
+    продолжить) и удалить .db.tmp, кроме .tmp активной сборки и прерванной полной сборки с
+    контрольной точкой текущей версии (`has_resumable_checkpoint`) — её продолжит следующая
+    сборка. Остальные — осиротевшие, от прерванных инкрементальных обновлений, с точкой
+    прежней версии — удаляются: иначе многогигабайтные файлы копились бы.
     """
     root = Path(databases_dir)
     if not root.is_dir():
@@ -100,10 +134,9 @@ def reconcile_building_markers(databases_dir: PathLike) -> None:
             pass
         tmp = tmp_db_path(db_path)
         pid_alive = info and _pid_alive(info.get('pid'))
-        if pid_alive and tmp.exists():
+        if tmp.exists() and (pid_alive or has_resumable_checkpoint(tmp)):
             protected_tmp.add(tmp.resolve())
-        tmp_exists = tmp.exists()
-        if not pid_alive and not tmp_exists:
+        elif not pid_alive:
             marker.unlink(missing_ok=True)
 
     for tmp in root.glob('*.db' + TMP_SUFFIX):
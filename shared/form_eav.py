@@ -7,6 +7,24 @@ from typing import Any
 
 from shared.form_property_flattener import UNSET_DATE_VALUE as _UNSET_DATE_VALUE
 
+# form_entity_properties stores entity kind, property path/name and value type as ids of small
+# lookup tables (form_entity_kinds, form_property_paths, form_value_types; v25). The ids below
+# are fixed by the schema: partial indexes and tool queries name them as literals.
+
+ENTITY_KIND_IDS = {'attribute': 1, 'attribute_column': 2, 'item': 3}
+
+# Paths with partial indexes (ix_fep_path_*) and the QueryText paths of DynamicList attributes.
+HOT_PROPERTY_PATH_IDS = {
+    'DataPath': 1,
+    'Visible': 2,
+    'Enabled': 3,
+    'QueryText': 4,
+    'Settings.QueryText': 5,
+}
+
+# Every type `form_property_flattener._value_type_for` emits; others are interned on insert.
+VALUE_TYPE_IDS = {'string': 1, 'number': 2, 'boolean': 3, 'longtext': 4}
+
 
 def group_eav_rows(rows) -> dict[int, list[dict[str, Any]]]:
     """Group EAV rows by entity_id."""
@@ -42,19 +60,30 @@ def get_eav_values(rows: list[dict[str, Any]], property_path: str) -> list[str]:
 
 
 def load_entity_eav(cursor, entity_kind: str, entity_ids: list[int]) -> dict[int, list[dict[str, Any]]]:
-    """Batch-load EAV rows for entity ids."""
+    """Batch-load EAV rows for entity ids (path, name and value type decoded from their ids)."""
     if not entity_ids:
         return {}
     placeholders = ','.join('?' * len(entity_ids))
     cursor.execute(f'''
-        SELECT entity_id, property_path, property_name, ordinal, value_text, value_type
-        FROM form_entity_properties
-        WHERE entity_kind = ? AND entity_id IN ({placeholders})
-        ORDER BY entity_id, property_path, ordinal
-    ''', [entity_kind, *entity_ids])
+        SELECT fep.entity_id, pp.property_path, pp.property_name, fep.ordinal, fep.value_text,
+               vt.value_type
+        FROM form_entity_properties fep
+        JOIN form_property_paths pp ON pp.id = fep.path_id
+        LEFT JOIN form_value_types vt ON vt.id = fep.value_type_id
+        WHERE fep.entity_kind = ? AND fep.entity_id IN ({placeholders})
+        ORDER BY fep.entity_id, pp.property_path, fep.ordinal
+    ''', [ENTITY_KIND_IDS[entity_kind], *entity_ids])
     return group_eav_rows(cursor.fetchall())
 
 
+def property_path_id(cursor, property_path: str) -> int | None:
+    """Id of property_path in form_property_paths; None if no entity has this property."""
+    row = cursor.execute(
+        'SELECT id FROM form_property_paths WHERE property_path = ?', (property_path,)
+    ).fetchone()
+    return row[0] if row is not None else None
+
+
 def count_field_siblings(rows: list[dict[str, Any]]) -> int:
     """Count DynamicList Settings.Field ordinals from EAV (max ordinal at Field.dataPath + 1)."""
     ordinals = [r.get('ordinal', 0) for r in rows if r['property_path'] in ('Settings.Field.dataPath', 'Settings.Field.field')]
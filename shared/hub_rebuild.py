@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from admin_tool.db_manager import DatabaseManager, format_build_error
+from shared.build_scheduler import BuildJob, estimate_build_weight, run_concurrent_builds
 from shared.db_build_state import (
     MARKER_SUFFIX,
     TMP_SUFFIX,
@@ -22,6 +23,8 @@ from shared.operations_log import log_operation_result
 from shared.project_manager import ProjectManager
 from shared.runtime_paths import get_paths
 from shared.source_path import get_effective_config_xml, source_exists
+from shared.xml_parser import WorkerPool
+from shared.xml_parser.parse_cache import default_parse_cache_dir
 
 PathLike = str | Path
 
@@ -64,9 +67,24 @@ def _resolve_rebuild_target(
     return db_path, config_xml, errors
 
 
+def _incremental_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """camelCase view of DatabaseManager.update_from_xml_atomic result for JSON output."""
+    out: Dict[str, Any] = {"mode": summary.get("mode")}
+    if summary.get("mode") == "full":
+        out["fallbackReason"] = summary.get("reason")
+    else:
+        for key in ("changed", "added", "deleted", "unchanged"):
+            out[f"{key}Objects"] = summary.get(key, 0)
+    return out
+
+
 def run_rebuild_index(
     db_id: str,
     explicit_root: Optional[PathLike] = None,
+    incremental: bool = False,
+    worker_pool: Optional[WorkerPool] = None,
+    compact: bool = False,
+    code_trigram: bool = False,
 ) -> Dict[str, Any]:
     paths = get_paths(explicit_root)
     pm = ProjectManager(str(paths.config), str(paths.data_dir))
@@ -98,7 +116,18 @@ def run_rebuild_index(
     started = time.perf_counter()
 
     try:
-        ok = DatabaseManager.build_from_xml_atomic(db_path, config_xml)
+        if incremental:
+            summary = DatabaseManager.update_from_xml_atomic(
+                db_path, config_xml, parse_cache_dir=default_parse_cache_dir(db_path),
+                worker_pool=worker_pool, code_trigram=code_trigram,
+            )
+            result["incremental"] = _incremental_summary(summary)
+            ok = True
+        else:
+            ok = DatabaseManager.build_from_xml_atomic(
+                db_path, config_xml, parse_cache_dir=default_parse_cache_dir(db_path),
+                worker_pool=worker_pool, compact=compact, code_trigram=code_trigram,
+            )
         if not ok:
             result["errors"].append("build_from_xml_atomic returned false")
             log_operation_result(paths.operations_log, result)
@@ -120,7 +149,7 @@ def run_rebuild_index(
     return result
 
 
-def run_rebuild_all(explicit_root: Optional[PathLike] = None) -> Dict[str, Any]:
+def run_rebuild_all(explicit_root: Optional[PathLike] = None, parallel: int = 1) -> Dict[str, Any]:
     paths = get_paths(explicit_root)
     pm = ProjectManager(str(paths.config), str(paths.data_dir))
 
@@ -128,7 +157,7 @@ def run_rebuild_all(explicit_root: Optional[PathLike] = None) -> Dict[str, Any]:
     started = time.perf_counter()
     results: List[Dict[str, Any]] = []
     warnings: List[str] = []
-    any_failed = False
+    runnable: List[tuple] = []
 
     for project in pm.get_all_projects():
         for db in project.get("databases", []):
@@ -138,23 +167,47 @@ def run_rebuild_all(explicit_root: Optional[PathLike] = None) -> Dict[str, Any]:
                 "name": db.get("name"),
                 "dbFile": db.get("db_file"),
             }
+            results.append(entry)
 
             if not source_exists(db):
                 entry["result"] = "skipped"
                 entry["success"] = True
                 warnings.append(f"Database '{db.get('name')}': sourcePath not found, skipped")
-                results.append(entry)
                 continue
-
-            sub = run_rebuild_index(db_id, explicit_root=explicit_root)
-            entry["success"] = sub.get("success", False)
-            entry["result"] = sub.get("result", "failed")
-            entry["durationMs"] = sub.get("durationMs", 0)
-            entry["userVersion"] = sub.get("userVersion")
-            if sub.get("errors"):
-                entry["errors"] = sub["errors"]
-                any_failed = True
-            results.append(entry)
+            runnable.append((entry, db))
+
+    def rebuild(item, worker_pool):
+        entry, db = item
+        sub = run_rebuild_index(db.get("id", ""), explicit_root=explicit_root, worker_pool=worker_pool)
+        entry["success"] = sub.get("success", False)
+        entry["result"] = sub.get("result", "failed")
+        entry["durationMs"] = sub.get("durationMs", 0)
+        entry["userVersion"] = sub.get("userVersion")
+        if sub.get("errors"):
+            entry["errors"] = sub["errors"]
+
+    # One worker pool for the whole run: process startup (an app re-import per worker under
+    # spawn) is paid once, not per database. Reset after a worker crash so it cannot break
+    # the databases that follow. With parallel > 1 several databases build at once, each on
+    # its share of the pool (shared/build_scheduler.py); results keep registry order.
+    with WorkerPool() as pool:
+        if parallel > 1 and len(runnable) > 1:
+            jobs = [
+                BuildJob(item=item, weight=estimate_build_weight(get_effective_config_xml(item[1])))
+                for item in runnable
+            ]
+            run_concurrent_builds(jobs, rebuild, pool, parallel)
+            for job in jobs:
+                if job.error is not None:
+                    job.item[0]["success"] = False
+                    job.item[0]["result"] = "failed"
+                    job.item[0]["errors"] = [format_build_error(job.error)]
+        else:
+            for item in runnable:
+                rebuild(item, pool)
+                if pool.broken:
+                    pool.reset()
+    any_failed = any(entry.get("errors") for entry in results)
 
     duration_ms = int((time.perf_counter() - started) * 1000)
     succeeded = sum(1 for r in results if r.get("result") == "success")
@@ -2,30 +2,103 @@
 
 from __future__ import annotations
 
+import json
 import os
 import sqlite3
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from shared.db_build_state import is_building, is_stale_building, read_building_info
+from shared.db_build_state import building_marker_path, is_building, is_stale_building, read_building_info
 from shared.indexer_version import INDEXER_VERSION
 
 PathLike = str | Path
 
+#: index_metadata key holding the statistics computed at build time (JSON; written by
+#: ``DatabaseManagerCore._write_statistics``).
+INDEX_STATISTICS_KEY = "statistics"
 
-def read_db_user_version(db_path: PathLike) -> Optional[int]:
-    """PRAGMA user_version; None if file missing."""
-    p = Path(db_path)
-    if not p.is_file():
+#: index_metadata key holding a fresh id written by every build and incremental update
+#: (``DatabaseManagerCore._write_build_generation``); keys the server's tool result cache.
+INDEX_GENERATION_KEY = "build_generation"
+
+
+# db path -> (file identity, status); see ``read_db_status``.
+_STATUS_CACHE: Dict[str, Tuple[Tuple, Dict[str, Any]]] = {}
+_STATUS_CACHE_LOCK = threading.Lock()
+
+
+def _file_identity(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
         return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _read_status_from_file(p: Path) -> Dict[str, Any]:
     uri = p.resolve().as_uri() + "?mode=ro"
     conn = sqlite3.connect(uri, uri=True)
     try:
         row = conn.execute("PRAGMA user_version").fetchone()
-        return int(row[0]) if row is not None else 0
+        user_version = int(row[0]) if row is not None else 0
+        try:
+            meta = dict(conn.execute(
+                "SELECT key, value FROM index_metadata "
+                "WHERE key IN ('extension_purpose', 'code_trigram', ?, ?)",
+                (INDEX_STATISTICS_KEY, INDEX_GENERATION_KEY),
+            ).fetchall())
+        except sqlite3.Error:
+            meta = {}
     finally:
         conn.close()
+    statistics = None
+    if meta.get(INDEX_STATISTICS_KEY):
+        try:
+            statistics = json.loads(meta[INDEX_STATISTICS_KEY])
+        except ValueError:
+            statistics = None
+    return {
+        "user_version": user_version,
+        "extension_purpose": meta.get("extension_purpose") or "",
+        "statistics": statistics,
+        "build_generation": meta.get(INDEX_GENERATION_KEY),
+        "code_trigram": meta.get("code_trigram") == "1",
+    }
+
+
+def read_db_status(db_path: PathLike) -> Optional[Dict[str, Any]]:
+    """What status readers need from a .db file — user_version, extension_purpose, the
+    build-time statistics, the build generation id and whether the trigram code index was
+    built; None if the file is missing.
+
+    Cached per path and keyed on the file identity (mtime, size, inode) plus the
+    ``.building`` marker state: the file is opened again only after it actually changes.
+    Builds replace the file atomically (new inode), so a finished rebuild is always seen.
+    Shared by the MCP server (every tool call filters active databases), ``run_status``
+    and ``active_databases``. Callers must not mutate the returned dict.
+    """
+    p = Path(db_path)
+    identity = _file_identity(p)
+    if identity is None:
+        return None
+    key = (identity, building_marker_path(p).exists())
+    cache_key = str(p)
+    with _STATUS_CACHE_LOCK:
+        cached = _STATUS_CACHE.get(cache_key)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    status = _read_status_from_file(p)
+    with _STATUS_CACHE_LOCK:
+        _STATUS_CACHE[cache_key] = (key, status)
+    return status
+
+
+def read_db_user_version(db_path: PathLike) -> Optional[int]:
+    """PRAGMA user_version; None if file missing."""
+    status = read_db_status(db_path)
+    return status["user_version"] if status is not None else None
 
 
 def is_index_outdated(db_path: PathLike) -> bool:
@@ -45,6 +118,28 @@ def read_db_last_updated_at(db_path: PathLike) -> Optional[str]:
     return dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+def read_index_statistics(db_path: PathLike) -> Optional[Dict[str, Any]]:
+    """Build-time statistics from index_metadata; None if the file is missing or the index
+    predates them. Read once per file version (``read_db_status``) — no COUNT(*) over the
+    data tables."""
+    status = read_db_status(db_path)
+    return status["statistics"] if status is not None else None
+
+
+def index_statistics_summary(db_path: PathLike) -> Optional[Dict[str, Any]]:
+    """Hub-facing subset of ``read_index_statistics`` (camelCase); None if there is none."""
+    stats = read_index_statistics(db_path)
+    if stats is None:
+        return None
+    return {
+        "totalObjects": stats.get("total_objects"),
+        "totalModules": stats.get("total_modules"),
+        "buildSeconds": stats.get("build_seconds"),
+        "stageSeconds": stats.get("stage_seconds") or {},
+        "tableBytes": stats.get("table_bytes") or {},
+    }
+
+
 def format_last_updated_local(iso_z: Optional[str]) -> str:
     """DD.MM.YYYY HH:MM in local TZ; empty string if None."""
     if not iso_z:
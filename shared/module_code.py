@@ -0,0 +1,70 @@
+"""Хранилище кода модулей: текст BSL сжат zlib и лежит в базе один раз на содержимое.
+
+`modules.code_id` ссылается на строку `module_code` (sha1 текста → сжатый текст). Одинаковые
+модули — формы, скопированные между объектами, заимствованные в расширение модули, типовые
+библиотечные модули — хранятся и индексируются в `code_search` один раз. Полнотекстовый
+индекс contentless (rowid = `module_code.id`): текст ему отдаёт сборка, сама база хранит
+только сжатый. Пишет admin_tool (`_insert_module`), читает сервер через `ModuleCodeCache`.
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+#: Уровень zlib при записи. Распаковка на сервере от уровня не зависит, а сжимается только
+#: уникальный код — повторы находит sha1 до сжатия.
+CODE_COMPRESSION_LEVEL = 6
+
+#: Сколько распакованного кода держит `ModuleCodeCache` сервера (в символах).
+MODULE_CODE_CACHE_CHARS = 32 << 20
+
+
+def code_digest(code):
+    """Ключ содержимого модуля: sha1 текста в UTF-8 (20 байт)."""
+    return hashlib.sha1(code.encode('utf-8')).digest()
+
+
+def compress_code(code):
+    return zlib.compress(code.encode('utf-8'), CODE_COMPRESSION_LEVEL)
+
+
+def decompress_code(blob):
+    return zlib.decompress(blob).decode('utf-8')
+
+
+class ModuleCodeCache:
+    """LRU распакованного кода модулей по sha1 содержимого.
+
+    Ключ — хэш содержимого, а не id строки: один и тот же текст в разных базах и до/после
+    пересборки — одна запись, и устаревшей она быть не может. Объём ограничен суммой длин
+    текстов; модуль больше всего кэша распаковывается, но не кэшируется.
+    """
+
+    def __init__(self, max_chars=MODULE_CODE_CACHE_CHARS):
+        self.max_chars = max_chars
+        self._items = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, digest, blob, remember=True):
+        """Текст модуля: из кэша или распаковкой `blob` (строка `module_code` с хэшем `digest`).
+
+        remember=False — распакованный текст в кэш не кладётся: так проход по всему коду
+        (LIKE-поиск `search_code`) не вытесняет горячие модули."""
+        with self._lock:
+            code = self._items.get(digest)
+            if code is not None:
+                self._items.move_to_end(digest)
+                return code
+        code = decompress_code(blob)
+        if not remember or len(code) > self.max_chars:
+            return code
+        with self._lock:
+            if digest not in self._items:
+                self._items[digest] = code
+                self._chars += len(code)
+                while self._chars > self.max_chars:
+                    _digest, evicted = self._items.popitem(last=False)
+                    self._chars -= len(evicted)
+        return code
@@ -89,7 +89,8 @@ CREATE TABLE IF NOT EXISTS tool_calls (
   success      INTEGER,
   error_code   TEXT,
   args_summary TEXT,
-  pid          INTEGER
+  pid          INTEGER,
+  cache_status TEXT
 );
 CREATE INDEX IF NOT EXISTS idx_tool_calls_task    ON tool_calls(task_id);
 CREATE INDEX IF NOT EXISTS idx_tool_calls_session ON tool_calls(session_id);
@@ -101,11 +102,15 @@ CREATE INDEX IF NOT EXISTS idx_tool_calls_ts      ON tool_calls(ts_utc);
 # has the column — sqlite3 raises "duplicate column name" either way.
 _MIGRATE_SESSION_ID = "ALTER TABLE tool_calls ADD COLUMN session_id TEXT"
 
+# Same pattern for the server-side result cache outcome (memory / disk / miss; NULL when the
+# call was not cacheable). Added after session_id, so it is migrated independently.
+_MIGRATE_CACHE_STATUS = "ALTER TABLE tool_calls ADD COLUMN cache_status TEXT"
+
 _INSERT = (
     "INSERT INTO tool_calls "
     "(ts_utc, tool, task_id, session_id, agent, model, elapsed_ms, result_bytes, "
-    "success, error_code, args_summary, pid) "
-    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    "success, error_code, args_summary, pid, cache_status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
 )
 
 
@@ -195,6 +200,7 @@ class ToolCallLogger:
         success: bool,
         error_code: str | None = None,
         result_bytes: int | None = None,
+        cache_status: str | None = None,
     ) -> None:
         elapsed_ms = int((time.monotonic() - started_mono) * 1000)
         args = args or {}
@@ -213,6 +219,7 @@ class ToolCallLogger:
             error_code,
             build_args_summary(args),
             os.getpid(),
+            cache_status,
         )
         self._write(record)
 
@@ -278,10 +285,11 @@ class ToolCallLogger:
                     # Harmless no-op on a fresh store (no table yet) or an
                     # already-migrated one (column already exists) — both raise
                     # OperationalError, swallowed the same way.
-                    try:
-                        conn.execute(_MIGRATE_SESSION_ID)
-                    except sqlite3.OperationalError:
-                        pass
+                    for migration in (_MIGRATE_SESSION_ID, _MIGRATE_CACHE_STATUS):
+                        try:
+                            conn.execute(migration)
+                        except sqlite3.OperationalError:
+                            pass
                     conn.executescript(_SCHEMA)
                     conn.execute(_INSERT, record)
                     conn.commit()
@@ -307,6 +315,7 @@ _READ_COLUMNS = (
     "error_code",
     "args_summary",
     "pid",
+    "cache_status",
 )
 
 # Newest-first default page size and hard cap for a single read.
@@ -329,6 +338,7 @@ def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
         "errorCode": row["error_code"],
         "argsSummary": row["args_summary"],
         "pid": row["pid"],
+        "cacheStatus": row["cache_status"],
     }
 
 
@@ -377,10 +387,6 @@ def read_tool_calls(
     where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
     capped_limit = max(1, min(int(limit), READ_MAX_LIMIT))
     safe_offset = max(0, int(offset))
-    sql = (
-        f"SELECT {', '.join(_READ_COLUMNS)} FROM tool_calls"
-        f"{where} ORDER BY id DESC LIMIT ? OFFSET ?"
-    )
     params.extend([capped_limit, safe_offset])
 
     try:
@@ -388,6 +394,16 @@ def read_tool_calls(
         try:
             conn.execute("PRAGMA busy_timeout=2000")
             conn.row_factory = sqlite3.Row
+            # A store not yet migrated by a newer writer lacks the later columns
+            # (cache_status): read them as NULL instead of failing the whole read.
+            present = {r["name"] for r in conn.execute("PRAGMA table_info(tool_calls)")}
+            columns = ", ".join(
+                col if col in present else f"NULL AS {col}" for col in _READ_COLUMNS
+            )
+            sql = (
+                f"SELECT {columns} FROM tool_calls"
+                f"{where} ORDER BY id DESC LIMIT ? OFFSET ?"
+            )
             cursor = conn.execute(sql, params)
             return [_row_to_dict(r) for r in cursor.fetchall()]
         finally:
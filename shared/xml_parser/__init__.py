@@ -1,4 +1,4 @@
-from .core import ConfigurationParserCore
+from .core import ConfigurationParserCore, WorkerPool
 from .types import TypeSlotsMixin
 from .flowchart import FlowchartMixin
 from .modules import ModulesMixin
@@ -6,6 +6,7 @@ from .forms import FormsMixin
 from .roles import RolesMixin
 from .dcs import TemplatesDcsMixin
 from .external_processor import ExternalProcessorMixin
+from .fingerprints import SourceFingerprintsMixin
 from .xml_helpers import XmlHelpersMixin, get_configuration_name, get_configuration_type
 
 
@@ -17,6 +18,7 @@ class ConfigurationParser(
     RolesMixin,
     TemplatesDcsMixin,
     ExternalProcessorMixin,
+    SourceFingerprintsMixin,
     XmlHelpersMixin,
     ConfigurationParserCore,
 ):
@@ -37,4 +39,4 @@ def test_parser(config_path):
             print(f"    Модулей: {len(obj['modules'])}")
 
 
-__all__ = ['ConfigurationParser', 'get_configuration_name', 'get_configuration_type', 'test_parser']
+__all__ = ['ConfigurationParser', 'WorkerPool', 'get_configuration_name', 'get_configuration_type', 'test_parser']
@@ -1,11 +1,23 @@
 import concurrent.futures
+import heapq
 import os
 import time
 import xml.etree.ElementTree as ET
 from collections import deque
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import contextmanager
 from pathlib import Path
 
+from .bsl import _parse_module_procedures
+from .inventory import (
+    ExportInventory,
+    activate as _activate_inventory,
+    path_exists,
+    path_is_dir,
+    xml_files,
+)
+from .parse_cache import activate as _activate_parse_cache, cached_file_call
+from .worker import _run_in_worker, _worker_parser
 from .xml_helpers import _winlong
 
 
@@ -63,6 +75,100 @@ PROPERTY_ONLY_MIGRATED_TYPES = frozenset({
 OBJECT_LEVEL_TYPE_TYPES = frozenset({'DefinedType', 'Constant'})
 
 
+def default_pool_workers():
+    """Число воркеров пула разбора: все CPU, кроме одного (он — у потока вставки)."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class WorkerPool:
+    """Пул процессов разбора, которым владеет вызывающая сторона, — один на серию сборок.
+
+    Парсер (`ConfigurationParser(worker_pool=...)`) пользуется им и не останавливает.
+    Массовые пересборки (`run_bulk_update`, `run_rebuild_all`) так платят старт воркеров
+    один раз на весь батч: при spawn (Windows, PyInstaller) каждый процесс заново
+    импортирует приложение, и у пула на каждую базу это секунды на базу.
+
+    `executor` — None, когда воркер один (параллелить нечего, разбор идёт в процессе сборки).
+    Используется как контекстный менеджер.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or default_pool_workers()
+        self.executor = None
+        if self.workers > 1:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self._broken = False
+        # Пул, которому принадлежит исполнитель: у вида (`share`) — исходный.
+        self._origin = self
+
+    @property
+    def broken(self):
+        """Исполнитель сломан упавшим воркером (`mark_broken`): любой submit дальше —
+        `BrokenProcessPool`, пока не будет `reset`."""
+        return self._origin._broken
+
+    def mark_broken(self):
+        """Парсер получил `BrokenProcessPool` от задачи этого исполнителя. Сбой уже
+        замененного (`reset`) исполнителя новый не помечает."""
+        if self._origin.executor is self.executor:
+            self._origin._broken = True
+
+    def share(self, workers):
+        """Вид на этот пул для одной из одновременных сборок (`shared/build_scheduler.py`): тот же
+        исполнитель, но `workers` — её доля, по ней парсер считает окно задач в полёте."""
+        view = WorkerPool.__new__(WorkerPool)
+        view.workers = max(1, min(workers, self.workers))
+        view.executor = self.executor
+        view._origin = self._origin
+        return view
+
+    def reset(self):
+        """Заменяет исполнитель новым — после сбоя: упавший воркер ломает весь
+        `ProcessPoolExecutor` (`broken`), и следующие базы батча падали бы тоже. Сборки,
+        которые держат старый исполнитель, доразбирают свои задачи у себя (`_pool_result`)."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self._broken = False
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+
+def _parse_object_worker(config_path, name, obj_type, folder_name, index_spreadsheet_templates):
+    """Весь `_parse_object` одного дочернего объекта в процессе-воркере (picklable, уровень
+    модуля — как `_parse_forms_worker`). Формы внутри воркера разбираются синхронно: у
+    парсера воркера своего пула нет.
+
+    Returns:
+        (obj_data | None, stage_seconds, skipped_forms, skipped_form_modules, skipped_dcs) —
+        накопители обнуляются на каждый вызов, родитель сливает их к себе в исходном порядке.
+    """
+    parser = _worker_parser(config_path)
+    parser.index_spreadsheet_templates = index_spreadsheet_templates
+    parser.stage_seconds = {}
+    parser.skipped_forms = []
+    parser.skipped_form_modules = []
+    parser.skipped_dcs = []
+    obj_data = parser._parse_object(name, obj_type, folder_name)
+    return (
+        obj_data,
+        parser.stage_seconds,
+        parser.skipped_forms,
+        parser.skipped_form_modules,
+        parser.skipped_dcs,
+    )
+
+
 class ConfigurationParserCore:
     """Configuration.xml top-level parsing, per-object dispatch, subsystems, properties/attributes."""
 
@@ -72,7 +178,14 @@ class ConfigurationParserCore:
     #: «все объекты конфигурации сразу».
     FORM_WINDOW_PER_WORKER = 2
 
-    def __init__(self, config_path, use_process_pool=True):
+    #: Горизонт `_schedule_by_cost` на воркера: из стольких задач впереди выбирается самая
+    #: дорогая для отправки. Памяти не стоит — в полёте по-прежнему не больше окна.
+    SCHEDULE_HORIZON_PER_WORKER = 16
+
+    def __init__(
+        self, config_path, use_process_pool=True, parse_objects_in_pool=True, parse_cache=None,
+        worker_pool=None,
+    ):
         """
         Args:
             config_path: Путь к файлу Configuration.xml
@@ -80,10 +193,27 @@ class ConfigurationParserCore:
                 во время parse(). По умолчанию включено; True/False — рубильник на случай
                 проблем с параллелизмом в конкретном окружении, тестам он даёт возможность
                 детерминированно сравнить последовательный путь с параллельным.
+            parse_objects_in_pool: При работающем пуле отдавать воркерам весь `_parse_object`
+                дочернего объекта (дескриптор, модули, формы, команды, СКД, flowchart), а не
+                только формы. False — прежний режим «в пул уходят только формы». Без пула
+                (use_process_pool=False или один CPU) ни на что не влияет.
+            parse_cache: `ParseCache` (parse_cache.py) — дисковый кэш результатов движка
+                формата (дескрипторы, формы, права ролей) по хешу содержимого файла. Действует
+                на время потока объектов, в том числе в воркерах пула. None — без кэша.
+            worker_pool: `WorkerPool` вызывающей стороны — разбирать в нём, а не поднимать
+                свой пул на время parse(). Парсер его не останавливает. None — свой пул
+                (если use_process_pool).
         """
         self.config_path = Path(config_path)
         self.root_dir = self.config_path.parent
         self._use_process_pool = use_process_pool
+        self._parse_objects_in_pool = parse_objects_in_pool
+        self.parse_cache = parse_cache
+        self.worker_pool = worker_pool
+        # Опись файлов выгрузки (`ExportInventory`, один обход os.scandir) — строится лениво
+        # (`_export_inventory`) перед первым обходом выгрузки и отвечает на «есть ли файл»
+        # всем миксинам и воркерам пула вместо stat-проб по каждому кандидату.
+        self.inventory = None
         # Пул воркеров для параллельного разбора форм (P-8 audit-2026-08) — создаётся в
         # parse() (объект ProcessPoolExecutor сам по себе не порождает процессы: они
         # появляются лениво только на первый submit(), а submit() вызывается лишь когда у
@@ -91,9 +221,20 @@ class ConfigurationParserCore:
         # «пул ещё не запущен» (вызовы _parse_object в обход parse(), как в юнит-тестах,
         # всегда получают синхронный путь без побочных процессов).
         self._form_pool = None
+        # Future задачи пула → (опись, fn, args): чтобы доделать её здесь, если пул сломается.
+        self._pool_tasks = {}
+        # Размер окна «в полёте» для пула (см. `_stream_configuration_objects`); ставится вместе
+        # с пулом.
+        self._pool_window = 2
+        # Насколько вперёд `_schedule_by_cost` ищет самую дорогую задачу; ставится вместе с пулом.
+        self._pool_horizon = 2
         # Накопленное время по категориям парсинга (заполняется во время parse()),
         # используется вызывающей стороной (db_manager) для разбивки в progress_callback.
         self.stage_seconds = {}
+        # То же, но накопленное внутри процессов-воркеров при разборе объектов в пуле
+        # (`parse_objects_in_pool`). Это суммарное процессорное время всех воркеров, а не
+        # стена: в stage_seconds оно не складывается, там — время ожидания ('objects').
+        self.worker_stage_seconds = {}
         # Формы, не разобранные из-за исключения (см. FormsMixin._parse_form) — заполняется
         # во время parse(), используется вызывающей стороной для отчёта в progress_callback
         # (P-2: ошибка раньше уходила только в stdout print и терялась в GUI-сборке).
@@ -110,6 +251,11 @@ class ConfigurationParserCore:
         # для внешних отчётов/обработок, где макет — это и есть полезная нагрузка объекта.
         # СКД (_parse_dcs_schemas) под этот флаг НЕ попадает — текст запроса ценен всегда.
         self.index_spreadsheet_templates = False
+        # Разбирать только эти объекты — множество ключей `(object_type, name)` (для подсистем
+        # имя квалифицированное, как в БД). None — все. Ставит инкрементальная пересборка
+        # (`DatabaseManager.update_database`): переразбираются только объекты с изменившимися
+        # файлами, см. SourceFingerprintsMixin.
+        self.only_objects = None
 
     @contextmanager
     def _accumulate(self, stage_name):
@@ -120,6 +266,13 @@ class ConfigurationParserCore:
         finally:
             self.stage_seconds[stage_name] = self.stage_seconds.get(stage_name, 0.0) + (time.perf_counter() - t0)
 
+    def _export_inventory(self):
+        """Опись файлов выгрузки (строится один раз на парсер; время — `stage_seconds['inventory']`)."""
+        if self.inventory is None:
+            with self._accumulate('inventory'):
+                self.inventory = ExportInventory(self.root_dir)
+        return self.inventory
+
     def parse(self):
         """Парсит корень выгрузки и возвращает структуру данных целиком (весь поток в списке).
 
@@ -158,6 +311,7 @@ class ConfigurationParserCore:
         генератора — сам объект процессов не порождает, они появляются лениво только на
         первый submit() (см. FormsMixin._submit_forms), так что конфигурации без форм
         (внешние отчёты/обработки почти всегда, мелкие тестовые фикстуры) ничего не платят.
+        С `worker_pool` своего пула нет — задачи идут в переданный, он переживает генератор.
 
         ВАЖНО (Windows): вызывающий код обязан быть за ``if __name__ == '__main__':`` —
         стандартное требование `multiprocessing` со spawn-стартом. Без этого дочерний
@@ -175,7 +329,11 @@ class ConfigurationParserCore:
 
         if config is not None:
             header = self._configuration_header(config, ns)
-            header['expected_object_count'] = self._count_expected_objects(config, ns)
+            previous_inventory = _activate_inventory(self._export_inventory())
+            try:
+                header['expected_object_count'] = self._count_expected_objects(config, ns)
+            finally:
+                _activate_inventory(previous_inventory)
             return header, self._stream_configuration_objects(config, ns)
 
         # Внешние отчёты/обработки — отдельные файлы-объекты, где макет часто и есть суть
@@ -228,55 +386,231 @@ class ConfigurationParserCore:
         if child_objects is not None:
             for obj_type in CHILD_OBJECT_TYPES:
                 total += sum(
-                    1 for element in child_objects.findall(f'md:{obj_type}', ns) if element.text
+                    1 for element in child_objects.findall(f'md:{obj_type}', ns)
+                    if element.text and self._wanted(obj_type, element.text)
                 )
 
         subsystems_root = self.root_dir / 'Subsystems'
-        if subsystems_root.is_dir():
-            total += sum(1 for p in subsystems_root.rglob('*.xml') if 'Ext' not in p.parts)
+        if path_is_dir(subsystems_root):
+            total += sum(
+                1 for p in xml_files(subsystems_root, recursive=True)
+                if 'Ext' not in p.parts and self._wanted('Subsystem', self._subsystem_qualified_name(p))
+            )
 
         roles_root = self.root_dir / 'Roles'
-        if roles_root.is_dir():
-            total += sum(1 for p in roles_root.glob('*.xml') if 'Ext' not in p.parts)
+        if path_is_dir(roles_root):
+            total += sum(
+                1 for p in xml_files(roles_root)
+                if 'Ext' not in p.parts and self._wanted('Role', p.stem)
+            )
 
         return total
 
+    def _wanted(self, obj_type, name):
+        """Входит ли объект в `only_objects` (None — разбираются все)."""
+        return self.only_objects is None or (obj_type, name) in self.only_objects
+
     def _stream_configuration_objects(self, config, ns):
         """Генератор объектов конфигурации: дочерние объекты, затем подсистемы, затем роли.
 
         Окно (`FORM_WINDOW_PER_WORKER` × число воркеров) — компромисс между P-8 и P-4:
-        объекты разбираются на несколько шагов вперёд, чтобы пул форм не простаивал, но не
+        объекты разбираются на несколько шагов вперёд, чтобы пул не простаивал, но не
         больше окна, иначе вернулись бы к «все разобранные формы держим в памяти». Отдаётся
         всегда самый старый объект окна — порядок выдачи тот же, что у прежнего списка.
+
+        С `parse_objects_in_pool` в окне лежат `Future` целых объектов (`_parse_object_worker`):
+        разбор дескриптора движком — самая долгая последовательная часть сборки — тоже уходит
+        в воркеры. Без него в пул уходят только формы (`_submit_forms`), а дескриптор
+        разбирается здесь же.
         """
-        workers = max(1, (os.cpu_count() or 2) - 1)
-        pool_cls = concurrent.futures.ProcessPoolExecutor if (self._use_process_pool and workers > 1) else None
-        self._form_pool = pool_cls(max_workers=workers) if pool_cls else None
+        owns_pool = self.worker_pool is None
+        if not owns_pool:
+            workers = self.worker_pool.workers
+            self._form_pool = self.worker_pool.executor
+        else:
+            workers = default_pool_workers()
+            pool_cls = concurrent.futures.ProcessPoolExecutor if (self._use_process_pool and workers > 1) else None
+            self._form_pool = pool_cls(max_workers=workers) if pool_cls else None
+        # `_pool_broke` обнуляет `_form_pool` посреди потока, а свой пул закрыть всё равно нужно.
+        own_executor = self._form_pool if owns_pool else None
+        previous_cache = _activate_parse_cache(self.parse_cache)
+        previous_inventory = _activate_inventory(self.inventory)
         window = max(2, workers * self.FORM_WINDOW_PER_WORKER)
+        # То же окно — и для ролей (`RolesMixin._iter_roles`), они идут тем же пулом.
+        self._pool_window = window
+        self._pool_horizon = workers * self.SCHEDULE_HORIZON_PER_WORKER
+        objects_in_pool = self._form_pool is not None and self._parse_objects_in_pool
 
         try:
-            pending = deque()
             child_objects = config.find('md:ChildObjects', ns)
+            wanted_objects = []
             if child_objects is not None:
                 for obj_type, folder_name in CHILD_OBJECT_TYPES.items():
                     for element in child_objects.findall(f'md:{obj_type}', ns):
                         obj_name = element.text
-                        if not obj_name:
-                            continue
-                        obj_data = self._parse_object(obj_name, obj_type, folder_name)
+                        if obj_name and self._wanted(obj_type, obj_name):
+                            wanted_objects.append((obj_name, obj_type, folder_name))
+
+            if objects_in_pool:
+                tasks = [
+                    (self._object_parse_cost(obj_name, obj_type, folder_name), (obj_name, obj_type, folder_name))
+                    for obj_name, obj_type, folder_name in wanted_objects
+                ]
+                for future in self._schedule_by_cost(tasks, self._submit_object):
+                    obj_data = self._resolve_pending_object(future)
+                    if obj_data:
+                        yield obj_data
+            else:
+                pending = deque()
+                for obj_name, obj_type, folder_name in wanted_objects:
+                    obj_data = self._parse_object(obj_name, obj_type, folder_name)
+                    if obj_data:
+                        pending.append(obj_data)
+                    while len(pending) > window:
+                        obj_data = self._resolve_pending_object(pending.popleft())
                         if obj_data:
-                            pending.append(obj_data)
-                        if len(pending) > window:
-                            yield self._resolve_object_forms(pending.popleft())
-            while pending:
-                yield self._resolve_object_forms(pending.popleft())
+                            yield obj_data
+                while pending:
+                    obj_data = self._resolve_pending_object(pending.popleft())
+                    if obj_data:
+                        yield obj_data
 
             yield from self._iter_subsystems()
             yield from self._iter_roles()
         finally:
-            if self._form_pool is not None:
-                self._form_pool.shutdown(wait=True)
-                self._form_pool = None
+            _activate_parse_cache(previous_cache)
+            _activate_inventory(previous_inventory)
+            if own_executor is not None:
+                own_executor.shutdown(wait=True, cancel_futures=True)
+            self._form_pool = None
+            self._pool_tasks.clear()
+
+    def _submit_to_pool(self, scope, fn, *args):
+        """`fn(*args)` в пул (`_run_in_worker`) с кэшем разбора и той частью описи, что
+        нужна задаче: `scope` — файлы и каталоги выгрузки, которые она читает."""
+        inventory = self.inventory.subset(scope) if self.inventory is not None else None
+        if self._form_pool is not None:
+            try:
+                future = self._form_pool.submit(_run_in_worker, self.parse_cache, inventory, fn, *args)
+            except BrokenProcessPool:
+                self._pool_broke()
+            else:
+                self._pool_tasks[future] = (inventory, fn, args)
+                return future
+        # Пул сломался: задача выполняется здесь же, потребитель получает готовый Future.
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(_run_in_worker(self.parse_cache, inventory, fn, *args))
+        except Exception as exc:  # noqa: BLE001 — как у задачи пула: ошибка — в Future
+            future.set_exception(exc)
+        return future
+
+    def _pool_result(self, future):
+        """Результат задачи `_submit_to_pool`. Если воркер упал (OOM, kill) и сломал общий
+        исполнитель, задача доделывается в процессе сборки, как и все следующие
+        (`_pool_broke`): чужой упавший воркер не роняет сборку."""
+        task = self._pool_tasks.pop(future, None)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            if task is None:
+                raise
+            self._pool_broke()
+            inventory, fn, args = task
+            return _run_in_worker(self.parse_cache, inventory, fn, *args)
+
+    def _pool_broke(self):
+        """Дальше без пула; владелец общего пула (`WorkerPool.mark_broken`) пересоздаст его."""
+        if self._form_pool is None:
+            return
+        if self.worker_pool is not None:
+            self.worker_pool.mark_broken()
+        self._form_pool = None
+
+    def _submit_object(self, task):
+        obj_name, obj_type, folder_name = task
+        return self._submit_to_pool(
+            (self.root_dir / folder_name / f'{obj_name}.xml', self.root_dir / folder_name / obj_name),
+            _parse_object_worker, str(self.config_path), obj_name, obj_type,
+            folder_name, self.index_spreadsheet_templates,
+        )
+
+    def _object_parse_cost(self, obj_name, obj_type, folder_name):
+        """Оценка стоимости разбора объекта для `_schedule_by_cost` — байты его `Form.xml`
+        (формы — больше половины времени разбора, а их размер разнится на порядки: у крупных
+        документов формы с тысячами элементов). Размеры — из описи выгрузки, без stat."""
+        inventory = self.inventory
+        if inventory is None:
+            return 0
+        object_dir = self.root_dir / folder_name / obj_name
+        if obj_type == 'CommonForm':
+            return inventory.file_size(object_dir / 'Ext' / 'Form.xml')
+        listing = inventory.listing(object_dir / 'Forms')
+        if not listing:
+            return 0
+        return sum(
+            inventory.file_size(object_dir / 'Forms' / form_name / 'Ext' / 'Form.xml')
+            for form_name in listing[1]
+        )
+
+    def _schedule_by_cost(self, tasks, submit):
+        """Отдаёт `Future` задач в исходном порядке, а в пул отправляет самые дорогие первыми.
+
+        `tasks` — список `(cost, task)` в порядке выдачи; `submit(task)` → `Future`. В полёте
+        (отправлено, но ещё не отдано потребителю) не больше `_pool_window` задач — потолок
+        памяти тот же, что у окна «по порядку». Следующей уходит голова очереди, если она
+        ещё не отправлена (иначе потребитель ждал бы её вечно), а если отправлена — самая
+        дорогая задача из горизонта `_pool_horizon` позиций вперёд. Так гигантская форма
+        стартует, пока воркеры ещё заняты соседями, а не оказывается последней в окне, когда
+        остальные воркеры уже простаивают. При равной стоимости (нет форм/прав) порядок
+        отправки совпадает с порядком выдачи.
+        """
+        in_flight = {}
+        candidates = []  # heap of (-cost, index) for tasks inside the horizon
+        frontier = 0
+        total = len(tasks)
+        for head in range(total):
+            while frontier < min(total, head + self._pool_horizon):
+                heapq.heappush(candidates, (-tasks[frontier][0], frontier))
+                frontier += 1
+            while len(in_flight) < self._pool_window:
+                if head not in in_flight:
+                    index = head
+                else:
+                    index = None
+                    while candidates:
+                        _cost, candidate = heapq.heappop(candidates)
+                        if candidate > head and candidate not in in_flight:
+                            index = candidate
+                            break
+                    if index is None:
+                        break
+                in_flight[index] = submit(tasks[index][1])
+            try:
+                yield in_flight.pop(head)
+            except GeneratorExit:
+                # Потребитель бросил поток (ошибка вставки, отмена): чужой пул живёт дальше,
+                # его очередь не должна дорабатывать задачи этой сборки.
+                for future in in_flight.values():
+                    future.cancel()
+                raise
+
+    def _resolve_pending_object(self, pending):
+        """Элемент окна `_stream_configuration_objects` → готовый dict объекта (или None, если
+        дескриптор не нашёлся). `Future` целого объекта дожидается и сливает накопители
+        воркера (ошибки форм/модулей форм/СКД, время по категориям) в свои — в том же порядке,
+        что дал бы последовательный разбор; dict с `Future` форм резолвит `_resolve_object_forms`.
+        """
+        if not isinstance(pending, concurrent.futures.Future):
+            return self._resolve_object_forms(pending)
+        with self._accumulate('objects'):
+            obj_data, stage_seconds, skipped_forms, skipped_form_modules, skipped_dcs = self._pool_result(pending)
+        for stage_name, seconds in stage_seconds.items():
+            self.worker_stage_seconds[stage_name] = self.worker_stage_seconds.get(stage_name, 0.0) + seconds
+        self.skipped_forms.extend(skipped_forms)
+        self.skipped_form_modules.extend(skipped_form_modules)
+        self.skipped_dcs.extend(skipped_dcs)
+        return obj_data
 
     def _subsystem_qualified_name(self, xml_path):
         """Квалифицированное имя подсистемы из пути под Subsystems/."""
@@ -308,12 +642,14 @@ class ConfigurationParserCore:
         отдельно, чтобы в `stage_seconds['subsystems']` не попало время потребителя.
         """
         subsystems_root = self.root_dir / 'Subsystems'
-        if not subsystems_root.is_dir():
+        if not path_is_dir(subsystems_root):
             return
 
-        for xml_file in sorted(subsystems_root.rglob('*.xml')):
+        for xml_file in sorted(xml_files(subsystems_root, recursive=True)):
             if 'Ext' in xml_file.parts:
                 continue
+            if not self._wanted('Subsystem', self._subsystem_qualified_name(xml_file)):
+                continue
             with self._accumulate('subsystems'):
                 record = self._parse_subsystem(xml_file)
             if record is not None:
@@ -332,7 +668,7 @@ class ConfigurationParserCore:
                 "(`pip install -e ../1c-metadata-schema`) и пересоберите portable."
             ) from exc
         try:
-            node = onec_metadata_schema.parse(xml_file)
+            node = cached_file_call('descriptor', xml_file, lambda: onec_metadata_schema.parse(xml_file))
         except (ET.ParseError, OSError):
             # OSError includes FileNotFoundError from Windows MAX_PATH (260 char)
             # limitations on very deeply nested Subsystems trees.
@@ -405,7 +741,7 @@ class ConfigurationParserCore:
         См. docs/library-migration.md.
         """
         xml_file = self.root_dir / folder_name / f"{name}.xml"
-        if not os.path.exists(_winlong(xml_file)):
+        if not path_exists(xml_file):
             return None
         try:
             import onec_metadata_schema
@@ -416,7 +752,7 @@ class ConfigurationParserCore:
                 "(`pip install -e ../1c-metadata-schema`) и пересоберите portable."
             ) from exc
 
-        node = onec_metadata_schema.parse(xml_file)
+        node = cached_file_call('descriptor', xml_file, lambda: onec_metadata_schema.parse(xml_file))
         descriptor = self._find_descriptor_node(node, obj_type)
         if descriptor is None:
             return None
@@ -532,9 +868,14 @@ class ConfigurationParserCore:
                 modules = self._parse_modules(name, folder_name)
                 if obj_type == 'CommonCommand':
                     cmd_path = self.root_dir / folder_name / name / 'Ext' / 'CommandModule.bsl'
-                    if os.path.exists(_winlong(cmd_path)):
+                    if path_exists(cmd_path):
                         with open(_winlong(cmd_path), 'r', encoding='utf-8-sig') as f:
-                            modules.append({'type': 'CommandModule', 'code': f.read()})
+                            code = f.read()
+                        modules.append({
+                            'type': 'CommandModule',
+                            'code': code,
+                            'procedures': _parse_module_procedures(code),
+                        })
             default_forms = {
                 'Element': properties.get('default_object_form') or properties.get('auxiliary_object_form'),
                 'List': properties.get('default_list_form') or properties.get('auxiliary_list_form'),
@@ -7,9 +7,9 @@ skipped and recorded in `self.skipped_dcs`, never fatal -- mirroring `skipped_fo
 (-> `dcs_schema` table + `get_dcs_schema`). See docs/dcs-schema-indexing.md.
 """
 
-import os
 import xml.etree.ElementTree as ET
 
+from .inventory import path_exists, path_is_dir, xml_files
 from .xml_helpers import _winlong
 
 _MD_NS = 'http://v8.1c.ru/8.3/MDClasses'
@@ -55,7 +55,7 @@ class TemplatesDcsMixin:
         absent. Descriptor lives at ``Templates/<Name>.xml`` (declares ``TemplateType``);
         the schema body at ``Templates/<Name>/Ext/Template.xml``."""
         templates_dir = self.root_dir / folder_name / name / 'Templates'
-        if not templates_dir.is_dir():
+        if not path_is_dir(templates_dir):
             return []
         reader = self._dcs_reader()
         if reader is None:
@@ -63,10 +63,10 @@ class TemplatesDcsMixin:
         read_dcs_schema, read_dcs_query_texts, dcs_shape_hints = reader
 
         schemas = []
-        for descriptor in sorted(templates_dir.glob('*.xml')):
+        for descriptor in sorted(xml_files(templates_dir)):
             template_name = descriptor.stem
             body = templates_dir / template_name / 'Ext' / 'Template.xml'
-            if not os.path.exists(_winlong(body)):
+            if not path_exists(body):
                 continue
             if not self._is_dcs_descriptor(descriptor):
                 continue
@@ -127,17 +127,17 @@ class TemplatesDcsMixin:
         if not self.index_spreadsheet_templates:
             return []
         templates_dir = self.root_dir / folder_name / name / 'Templates'
-        if not templates_dir.is_dir():
+        if not path_is_dir(templates_dir):
             return []
         read_spreadsheet_text = self._spreadsheet_reader()
         if read_spreadsheet_text is None:
             return []
 
         macets = []
-        for descriptor in sorted(templates_dir.glob('*.xml')):
+        for descriptor in sorted(xml_files(templates_dir)):
             template_name = descriptor.stem
             body = templates_dir / template_name / 'Ext' / 'Template.xml'
-            if not os.path.exists(_winlong(body)):
+            if not path_exists(body):
                 continue
             if not self._is_spreadsheet_descriptor(descriptor):
                 continue
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+from .inventory import activate as _activate_inventory, path_exists, path_is_dir, walk_files, xml_files
+from .xml_helpers import _winlong
+
+
+class SourceFingerprintsMixin:
+    """Per-object source fingerprints for incremental rebuilds (`rebuild-index --incremental`).
+
+    One fingerprint per indexed object — the same keys the DB uses: `(object_type, name)`
+    for child objects of Configuration.xml, `('Subsystem', qualified name)` and
+    `('Role', name)`. It covers every file the object is built from: the descriptor
+    `<Folder>/<Name>.xml` plus the whole `<Folder>/<Name>/` tree (modules, forms, commands,
+    templates, flowchart); for a subsystem only its descriptor (nested subsystems are
+    objects of their own); for a role the descriptor plus `Ext/Rights.xml`.
+    """
+
+    def object_source_fingerprints(self, previous=None):
+        """`{(object_type, name): (stat_signature, content_hash)}` for the whole export.
+
+        `content_hash` is sha1 over (relative path, bytes) of the object's files.
+        `stat_signature` is sha1 over (relative path, size, mtime_ns) — cheap, from
+        `os.stat` only. When `previous` (the same mapping as stored in the DB) has an
+        identical stat_signature for the object, its content_hash is reused without reading
+        the files: an unchanged nightly export costs a directory walk, not a full re-read.
+        """
+        previous = previous or {}
+        result = {}
+        # The file lists come from the export inventory the parse reuses afterwards.
+        previous_inventory = _activate_inventory(self._export_inventory())
+        try:
+            for key, paths in self._iter_object_source_files():
+                stat_signature = self._stat_signature(paths)
+                cached = previous.get(key)
+                if cached is not None and cached[0] == stat_signature:
+                    result[key] = (stat_signature, cached[1])
+                else:
+                    result[key] = (stat_signature, self._content_hash(paths))
+        finally:
+            _activate_inventory(previous_inventory)
+        return result
+
+    def matching_source_fingerprints(self, stored):
+        """`object_source_fingerprints()` if the export still matches `stored`, else None.
+
+        For resuming a build: only objects whose stat_signature differs are content-hashed,
+        and the walk stops at the first changed or added object — a touched but identical
+        file costs one read, a changed export does not pay for a full hashing pass.
+        """
+        result = {}
+        previous_inventory = _activate_inventory(self._export_inventory())
+        try:
+            for key, paths in self._iter_object_source_files():
+                cached = stored.get(key)
+                if cached is None:
+                    return None
+                stat_signature = self._stat_signature(paths)
+                if cached[0] != stat_signature and self._content_hash(paths) != cached[1]:
+                    return None
+                result[key] = (stat_signature, cached[1])
+        finally:
+            _activate_inventory(previous_inventory)
+        if len(result) != len(stored):
+            return None
+        return result
+
+    def _iter_object_source_files(self):
+        """(key, [files]) for every object the build would read, in build order."""
+        from .core import CHILD_OBJECT_TYPES  # deferred: core composes this mixin's host
+
+        ns = {'md': 'http://v8.1c.ru/8.3/MDClasses'}
+        root = ET.parse(_winlong(self.config_path)).getroot()
+        config = root.find('md:Configuration', ns)
+        if config is None:
+            # External reports/data processors: a single file-object, never rebuilt incrementally.
+            return
+        child_objects = config.find('md:ChildObjects', ns)
+        if child_objects is not None:
+            for obj_type, folder_name in CHILD_OBJECT_TYPES.items():
+                for element in child_objects.findall(f'md:{obj_type}', ns):
+                    name = element.text
+                    if not name:
+                        continue
+                    descriptor = self.root_dir / folder_name / f'{name}.xml'
+                    if not path_exists(descriptor):
+                        continue
+                    paths = [descriptor]
+                    paths.extend(self._walk_files(self.root_dir / folder_name / name))
+                    yield (obj_type, name), paths
+
+        subsystems_root = self.root_dir / 'Subsystems'
+        if path_is_dir(subsystems_root):
+            for xml_file in sorted(xml_files(subsystems_root, recursive=True)):
+                if 'Ext' in xml_file.parts:
+                    continue
+                yield ('Subsystem', self._subsystem_qualified_name(xml_file)), [xml_file]
+
+        roles_root = self.root_dir / 'Roles'
+        if path_is_dir(roles_root):
+            for xml_file in sorted(xml_files(roles_root)):
+                paths = [xml_file]
+                rights = roles_root / xml_file.stem / 'Ext' / 'Rights.xml'
+                if path_exists(rights):
+                    paths.append(rights)
+                yield ('Role', xml_file.stem), paths
+
+    @staticmethod
+    def _walk_files(directory):
+        """All files under `directory`, sorted (deterministic hash order)."""
+        return walk_files(directory)
+
+    def _relative(self, path):
+        """Path relative to the export root, '/'-separated — the hash must not depend on
+        where the export lives or on the OS."""
+        path = _winlong(path)
+        root = _winlong(self.root_dir)
+        if path.startswith(root):
+            path = path[len(root):]
+        return path.replace('\\', '/').lstrip('/')
+
+    def _stat_signature(self, paths):
+        digest = hashlib.sha1()
+        for path in paths:
+            st = os.stat(_winlong(path))
+            digest.update(f'{self._relative(path)}\0{st.st_size}\0{st.st_mtime_ns}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _content_hash(self, paths):
+        digest = hashlib.sha1()
+        for path in paths:
+            digest.update(self._relative(path).encode('utf-8') + b'\0')
+            with open(_winlong(path), 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
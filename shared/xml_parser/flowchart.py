@@ -1,6 +1,6 @@
-import os
 import xml.etree.ElementTree as ET
 
+from .inventory import path_exists
 from .xml_helpers import _winlong
 
 
@@ -11,7 +11,7 @@ class FlowchartMixin:
         """Точки маршрута и переходы бизнес-процесса из Ext/Flowchart.xml."""
         flowchart_path = self.root_dir / folder_name / name / 'Ext' / 'Flowchart.xml'
         empty = {'route_points': [], 'route_transitions': []}
-        if not os.path.exists(_winlong(flowchart_path)):
+        if not path_exists(flowchart_path):
             return empty
 
         sch_ns = 'http://v8.1c.ru/8.3/xcf/scheme'
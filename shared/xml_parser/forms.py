@@ -1,4 +1,3 @@
-import os
 import xml.etree.ElementTree as ET
 
 from shared.form_property_flattener import (
@@ -7,6 +6,9 @@ from shared.form_property_flattener import (
     flatten_item,
 )
 
+from .bsl import _parse_module_procedures
+from .inventory import path_exists, subdirs
+from .parse_cache import cached_call
 from .xml_helpers import _winlong
 
 # --- Standalone (no `self`) helpers -----------------------------------------------------
@@ -23,7 +25,7 @@ from .xml_helpers import _winlong
 def _read_form_uuid_standalone(form_dir, form_name):
     """UUID формы из соседнего файла метаданных ИмяФормы.xml (в самом Form.xml его нет)."""
     form_meta_xml = form_dir / f'{form_name}.xml'
-    if not os.path.exists(_winlong(form_meta_xml)):
+    if not path_exists(form_meta_xml):
         return ''
     try:
         meta_root = ET.parse(_winlong(form_meta_xml)).getroot()
@@ -38,7 +40,7 @@ def _read_form_uuid_standalone(form_dir, form_name):
 def _parse_form_module_standalone(form_dir):
     """Читает модуль формы. Returns (code_or_None, error_message_or_None)."""
     module_path = form_dir / 'Ext' / 'Form' / 'Module.bsl'
-    if not os.path.exists(_winlong(module_path)):
+    if not path_exists(module_path):
         return None, None
     try:
         with open(_winlong(module_path), 'r', encoding='utf-8-sig') as f:
@@ -57,7 +59,7 @@ def _parse_one_form(form_dir, uuid=None, form_name=None):
     outcome = {'form_data': None, 'form_error': None, 'module_error': None}
     try:
         form_xml = form_dir / 'Ext' / 'Form.xml'
-        if not os.path.exists(_winlong(form_xml)):
+        if not path_exists(form_xml):
             return outcome
         form_name = form_name or form_dir.name
         if uuid is None:
@@ -65,7 +67,8 @@ def _parse_one_form(form_dir, uuid=None, form_name=None):
 
         from onec_metadata_schema import read_form
         with open(_winlong(form_xml), 'rb') as f:
-            model = read_form(f.read())
+            form_bytes = f.read()
+        model = cached_call('form', form_bytes, lambda: read_form(form_bytes))
 
         attributes = []
         for a in model['attributes']:
@@ -111,6 +114,8 @@ def _parse_one_form(form_dir, uuid=None, form_name=None):
             'items': items,
             'conditional_appearance': model['conditional_appearance'],
             'module': module_code,
+            # Оглавление процедур модуля формы — здесь же, в воркере (см. ModulesMixin._parse_modules).
+            'module_procedures': _parse_module_procedures(module_code) if module_code else [],
         }
     except Exception as e:
         outcome['form_error'] = f"Ошибка парсинга формы {form_dir.name}: {e}"
@@ -142,13 +147,11 @@ def _parse_forms_worker(root_dir, folder_name, obj_name, default_forms):
     skipped_forms = []
     skipped_form_modules = []
     forms_dir = root_dir / folder_name / obj_name / 'Forms'
-    if not os.path.exists(_winlong(forms_dir)):
+    if not path_exists(forms_dir):
         return forms, skipped_forms, skipped_form_modules
 
     default_forms = default_forms or {}
-    for form_dir in forms_dir.iterdir():
-        if not form_dir.is_dir():
-            continue
+    for form_dir in subdirs(forms_dir):
         outcome = _parse_one_form(form_dir)
         if outcome['form_error']:
             print(outcome['form_error'])
@@ -200,11 +203,11 @@ class FormsMixin:
         пул (``self._form_pool``) — резолвится позже, одним проходом, в ``_resolve_pending_forms``.
         Без Forms/ или без пула — работает как обычно, синхронно."""
         forms_dir = self.root_dir / folder_name / obj_name / 'Forms'
-        if not os.path.exists(_winlong(forms_dir)):
+        if not path_exists(forms_dir):
             return []
         if self._form_pool is not None:
-            return self._form_pool.submit(
-                _parse_forms_worker, self.root_dir, folder_name, obj_name, default_forms
+            return self._submit_to_pool(
+                (forms_dir,), _parse_forms_worker, self.root_dir, folder_name, obj_name, default_forms
             )
         with self._accumulate('forms'):
             return self._parse_forms(obj_name, folder_name, default_forms)
@@ -212,10 +215,12 @@ class FormsMixin:
     def _submit_common_form(self, name, folder_name, uuid):
         """Как ``_parse_common_form``, но через пул (см. ``_submit_forms``)."""
         form_dir = self.root_dir / folder_name / name
-        if not os.path.exists(_winlong(form_dir / 'Ext' / 'Form.xml')):
+        if not path_exists(form_dir / 'Ext' / 'Form.xml'):
             return []
         if self._form_pool is not None:
-            return self._form_pool.submit(_parse_common_form_worker, self.root_dir, folder_name, name, uuid)
+            return self._submit_to_pool(
+                (form_dir,), _parse_common_form_worker, self.root_dir, folder_name, name, uuid
+            )
         with self._accumulate('forms'):
             return self._parse_common_form(name, folder_name, uuid)
 
@@ -231,7 +236,7 @@ class FormsMixin:
         forms = obj.get('forms')
         if isinstance(forms, concurrent.futures.Future):
             with self._accumulate('forms'):
-                forms_list, skipped_forms, skipped_form_modules = forms.result()
+                forms_list, skipped_forms, skipped_form_modules = self._pool_result(forms)
             obj['forms'] = forms_list
             self.skipped_forms.extend(skipped_forms)
             self.skipped_form_modules.extend(skipped_form_modules)
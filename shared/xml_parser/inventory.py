@@ -0,0 +1,284 @@
+import bisect
+import os
+import threading
+from pathlib import Path
+
+from .xml_helpers import _winlong
+
+# Files whose size the inventory records — the parse-cost estimate of the pool scheduler
+# (`ConfigurationParserCore._schedule_by_cost`): forms and role rights dominate parse time.
+# `DirEntry.stat()` is free on Windows (FindNextFile returns it) and one stat per such file
+# elsewhere — a few thousand, not one per probe.
+_SIZED_FILE_NAMES = frozenset(os.path.normcase(name) for name in ('Form.xml', 'Rights.xml'))
+
+# The inventory of the current thread (`activate`): set by the parser while it walks the export
+# and, per task, by `worker._run_in_worker` in pool workers. Per thread, not per process:
+# concurrent builds (`build_scheduler.run_concurrent_builds`) run on threads of one process, each
+# with its own export. Unset — helpers below go to the filesystem.
+_ACTIVE = threading.local()
+
+
+def _rel_key(rel):
+    """Lookup key of a '/'-joined relative path (`os.path.normcase` turns '/' into '\\' on Windows)."""
+    return os.path.normcase(rel).replace(os.sep, '/')
+
+
+class ExportInventory:
+    """Every file and directory of an export, from one `os.scandir` walk.
+
+    The parser used to probe the filesystem per candidate file: five `.bsl` names per object,
+    `CommandModule.bsl` per command, the form descriptor per form, `rglob` over `Subsystems/`
+    twice — each probe a stat syscall, slow on network shares and through `\\\\?\\` paths on
+    Windows. `scandir` gets the names of a whole directory (and whether each is a directory)
+    in one call, so the walk costs one syscall batch per directory and every later question
+    ("does `Ext/ObjectModule.bsl` exist", "which forms does X have") is a dict lookup.
+
+    Names are kept in `os.scandir` order (the order `Path.iterdir` used to give) and keyed by
+    `os.path.normcase`, so lookups are case-insensitive exactly where the filesystem is.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        # Captured once: `os.path.abspath` of a relative path asks the OS for the cwd every time.
+        self._cwd = os.getcwd()
+        self._root = self._normalize(str(root_dir))
+        # normcase(relative dir, '/'-joined; '' for the root) -> ({key: name} files, {key: name} dirs)
+        self._dirs = {}
+        # normcase relative path -> size, only for `_SIZED_FILE_NAMES`
+        self._sizes = {}
+        # Set only on a `subset`: relative keys of the trees it holds (None — the whole export)
+        # and {key: (is_file, is_dir)} of paths answered without their parent's listing.
+        self._covered = None
+        self._pinned = {}
+        # Sorted keys of `_dirs`, built by the first `subset` call.
+        self._sorted_keys = None
+        self.scandir_calls = 0
+        self._scan()
+
+    def __getstate__(self):
+        return {
+            'root_dir': self.root_dir, '_cwd': self._cwd, '_root': self._root,
+            '_dirs': self._dirs, '_sizes': self._sizes, 'scandir_calls': 0,
+            '_covered': self._covered, '_pinned': self._pinned, '_sorted_keys': None,
+        }
+
+    def subset(self, paths):
+        """Inventory of just `paths` — each one's existence, and for directories their whole
+        tree. Small enough to ship with every pool task (a worker of a long-lived pool serves
+        builds of several exports, so it cannot get the inventory once from the pool
+        initializer); anything outside answers None and goes to the filesystem."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._dirs)
+        sub = ExportInventory.__new__(ExportInventory)
+        sub.__setstate__({
+            'root_dir': self.root_dir, '_cwd': self._cwd, '_root': self._root,
+            '_dirs': {}, '_sizes': {}, 'scandir_calls': 0,
+            '_covered': [], '_pinned': {}, '_sorted_keys': None,
+        })
+        for path in paths:
+            key = self._key(path)
+            if key is None:
+                continue
+            found = self._lookup(path)
+            sub._pinned[key] = found
+            if not found[1]:
+                continue
+            sub._covered.append(key)
+            sub._dirs[key] = self._dirs[key]
+            # Keys with the prefix 'key/' are contiguous in sorted order; '0' follows '/'.
+            start = bisect.bisect_left(self._sorted_keys, key + '/')
+            end = bisect.bisect_left(self._sorted_keys, key + '0')
+            for nested in self._sorted_keys[start:end]:
+                sub._dirs[nested] = self._dirs[nested]
+        return sub
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def _covers(self, key):
+        if self._covered is None:
+            return True
+        return any(not root or key == root or key.startswith(root + '/') for root in self._covered)
+
+    def _normalize(self, path):
+        if not os.path.isabs(path):
+            path = os.path.join(self._cwd, path)
+        return os.path.normcase(os.path.normpath(path))
+
+    def _scan(self):
+        pending = ['']
+        while pending:
+            rel = pending.pop()
+            directory = self.root_dir / rel if rel else self.root_dir
+            files = {}
+            dirs = {}
+            self.scandir_calls += 1
+            try:
+                with os.scandir(_winlong(directory)) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            continue
+                        key = os.path.normcase(entry.name)
+                        if is_dir:
+                            dirs[key] = entry.name
+                        else:
+                            files[key] = entry.name
+                            if key in _SIZED_FILE_NAMES:
+                                try:
+                                    size = entry.stat().st_size
+                                except OSError:
+                                    size = 0
+                                self._sizes[_rel_key(f'{rel}/{entry.name}' if rel else entry.name)] = size
+            except OSError:
+                pass
+            self._dirs[_rel_key(rel)] = (files, dirs)
+            for name in dirs.values():
+                pending.append(f'{rel}/{name}' if rel else name)
+
+    def _key(self, path):
+        """normcase relative path with '/' separators, or None when `path` is outside the export."""
+        path = self._normalize(str(path))
+        if path == self._root:
+            return ''
+        prefix = self._root.rstrip(os.sep) + os.sep
+        if not path.startswith(prefix):
+            return None
+        return path[len(prefix):].replace(os.sep, '/')
+
+    def _lookup(self, path):
+        """(is_file, is_dir) for `path`, or None when it is outside the export."""
+        key = self._key(path)
+        if key is None:
+            return None
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            return pinned
+        if not self._covers(key):
+            return None
+        if key in self._dirs:
+            return False, True
+        parent, _, name = key.rpartition('/')
+        listing = self._dirs.get(parent)
+        if listing is None:
+            return False, False
+        return name in listing[0], name in listing[1]
+
+    def exists(self, path):
+        found = self._lookup(path)
+        return None if found is None else (found[0] or found[1])
+
+    def is_dir(self, path):
+        found = self._lookup(path)
+        return None if found is None else found[1]
+
+    def file_size(self, path):
+        """Size of a `_SIZED_FILE_NAMES` file; 0 when the file is missing or its size is not recorded."""
+        key = self._key(path)
+        if key is None:
+            return 0
+        return self._sizes.get(key, 0)
+
+    def listing(self, path):
+        """(file names, dir names) of a directory in scan order; None outside the export,
+        two empty lists for a missing directory."""
+        key = self._key(path)
+        if key is None or not self._covers(key):
+            return None
+        files, dirs = self._dirs.get(key, ({}, {}))
+        return list(files.values()), list(dirs.values())
+
+
+def activate(inventory):
+    """Makes `inventory` (ExportInventory or None) the inventory of the current thread; returns
+    the previous one."""
+    previous = active()
+    _ACTIVE.inventory = inventory
+    return previous
+
+
+def active():
+    """The inventory of the current thread, or None."""
+    return getattr(_ACTIVE, 'inventory', None)
+
+
+def path_exists(path):
+    """`os.path.exists` answered from the active inventory when it covers `path`."""
+    inventory = active()
+    if inventory is not None:
+        found = inventory.exists(path)
+        if found is not None:
+            return found
+    return os.path.exists(_winlong(path))
+
+
+def path_is_dir(path):
+    """`os.path.isdir` answered from the active inventory when it covers `path`."""
+    inventory = active()
+    if inventory is not None:
+        found = inventory.is_dir(path)
+        if found is not None:
+            return found
+    return os.path.isdir(_winlong(path))
+
+
+def subdirs(path):
+    """Subdirectories of `path` as Paths, in `Path.iterdir` order; [] if it is not a directory."""
+    path = Path(path)
+    inventory = active()
+    if inventory is not None:
+        found = inventory.listing(path)
+        if found is not None:
+            return [path / name for name in found[1]]
+    if not os.path.isdir(_winlong(path)):
+        return []
+    return [p for p in path.iterdir() if p.is_dir()]
+
+
+def xml_files(path, recursive=False):
+    """`*.xml` files of `path` (with `recursive`, of its whole tree) as Paths, unsorted —
+    the same set `Path.glob('*.xml')`/`Path.rglob('*.xml')` gives."""
+    path = Path(path)
+    inventory = active()
+    if inventory is None or inventory.listing(path) is None:
+        if not os.path.isdir(_winlong(path)):
+            return []
+        found = path.rglob('*.xml') if recursive else path.glob('*.xml')
+        return [p for p in found if not p.is_dir()]
+
+    suffix = os.path.normcase('.xml')
+    result = []
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        files, dirs = inventory.listing(directory)
+        result.extend(directory / name for name in files if os.path.normcase(name).endswith(suffix))
+        if recursive:
+            pending.extend(directory / name for name in dirs)
+    return result
+
+
+def walk_files(path):
+    """All files under `path`, as sorted path strings (`os.walk` over the inventory)."""
+    path = Path(path)
+    inventory = active()
+    if inventory is None or inventory.listing(path) is None:
+        found = []
+        if not os.path.isdir(_winlong(path)):
+            return found
+        for dirpath, _dirnames, filenames in os.walk(_winlong(path)):
+            for filename in filenames:
+                found.append(os.path.join(dirpath, filename))
+        found.sort()
+        return found
+
+    found = []
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        files, dirs = inventory.listing(directory)
+        found.extend(os.path.join(_winlong(directory), name) for name in files)
+        pending.extend(directory / name for name in dirs)
+    found.sort()
+    return found
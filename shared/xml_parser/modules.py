@@ -1,5 +1,5 @@
-import os
-
+from .bsl import _parse_module_procedures
+from .inventory import path_exists, path_is_dir
 from .xml_helpers import _winlong
 
 
@@ -29,9 +29,11 @@ class ModulesMixin:
             eco = eco.strip() if isinstance(eco, str) and eco.strip() else None
             module_path = self.root_dir / folder_name / obj_name / 'Commands' / cmd_name / 'Ext' / 'CommandModule.bsl'
             module_code = None
-            if os.path.exists(_winlong(module_path)):
+            module_procedures = None
+            if path_exists(module_path):
                 with open(_winlong(module_path), 'r', encoding='utf-8-sig') as f:
                     module_code = f.read()
+                module_procedures = _parse_module_procedures(module_code)
             result.append({
                 'name': cmd_name,
                 'synonym': synonym,
@@ -39,15 +41,18 @@ class ModulesMixin:
                 'object_belonging': ob,
                 'extended_configuration_object': eco,
                 'module_code': module_code,
+                'module_procedures': module_procedures,
             })
         return result
 
     def _parse_modules(self, obj_name, folder_name):
-        """Извлекает код модулей объекта"""
+        """Извлекает код модулей объекта вместе с оглавлением процедур (`procedures` —
+        строки module_procedures): regex-разбор BSL идёт тут, в воркере пула, а не на
+        потоке записи SQLite."""
         modules = []
         obj_dir = self.root_dir / folder_name / obj_name / 'Ext'
 
-        if not os.path.exists(_winlong(obj_dir)):
+        if not path_is_dir(obj_dir):
             return modules
 
         # Типы модулей. RecordSetModule — у регистров (сведений/накопления/бухгалтерии/расчёта):
@@ -64,12 +69,13 @@ class ModulesMixin:
 
         for file_name, module_type in module_files.items():
             module_path = obj_dir / file_name
-            if os.path.exists(_winlong(module_path)):
+            if path_exists(module_path):
                 with open(_winlong(module_path), 'r', encoding='utf-8-sig') as f:
                     code = f.read()
                 modules.append({
                     'type': module_type,
-                    'code': code
+                    'code': code,
+                    'procedures': _parse_module_procedures(code),
                 })
 
         return modules
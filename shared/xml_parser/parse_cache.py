@@ -0,0 +1,243 @@
+import hashlib
+import io
+import os
+import pickle
+import threading
+import time
+import zlib
+from importlib import metadata
+from pathlib import Path
+
+#: Bump when the shape of cached values changes. Values are raw results of the format engine
+#: (`onec_metadata_schema.parse`/`read_form`/`read_rights`), not C-MCP's reshaped dicts, so
+#: neither INDEXER_VERSION bumps nor changes to the adapters invalidate the cache.
+CACHE_FORMAT = 1
+
+#: Directory name, created next to `databases/` (see `default_parse_cache_dir`).
+PARSE_CACHE_DIRNAME = 'parse_cache'
+
+#: Size bound of the cache directory; least recently used entries go first (`ParseCache.trim`).
+DEFAULT_MAX_BYTES = 1 << 30
+
+_ENTRY_SUFFIX = '.pkl'
+_TMP_SUFFIX = '.tmp'
+#: Leftover temp files of killed writers older than this are removed by `trim`.
+_STALE_TMP_SECONDS = 3600
+
+#: The only globals an entry may reference besides classes of the format engine: entries live
+#: in a shared directory, and a planted pickle must not be able to call anything else.
+_SAFE_GLOBALS = {
+    'builtins': frozenset({
+        'bool', 'bytearray', 'bytes', 'complex', 'dict', 'float', 'frozenset', 'int', 'list',
+        'set', 'str', 'tuple',
+    }),
+    'collections': frozenset({'OrderedDict'}),
+    'datetime': frozenset({'date', 'datetime', 'time', 'timedelta', 'timezone'}),
+    'decimal': frozenset({'Decimal'}),
+}
+_ENGINE_PACKAGE = 'onec_metadata_schema'
+
+# The cache of the current thread (`activate`): set by the parser for the lifetime of its object
+# stream and, per task, by `worker._run_in_worker` in pool workers. Per thread, like the active
+# inventory: concurrent builds share a process. Unset — every call parses.
+_ACTIVE = threading.local()
+
+
+def default_parse_cache_dir(db_path):
+    """`<module root>/parse_cache` for a DB under `<module root>/databases/` — one cache for
+    all projects, so identical base configurations share their entries."""
+    return Path(db_path).resolve().parent.parent / PARSE_CACHE_DIRNAME
+
+
+def activate(cache):
+    """Makes `cache` (ParseCache or None) the cache of the current thread; returns the previous one."""
+    previous = active()
+    _ACTIVE.cache = cache
+    return previous
+
+
+def active():
+    """The cache of the current thread, or None."""
+    return getattr(_ACTIVE, 'cache', None)
+
+
+def cached_call(kind, data, compute):
+    """`compute()` through the active cache, keyed by the source bytes `data`."""
+    cache = active()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(kind, data, compute)
+
+
+def cached_file_call(kind, path, compute):
+    """Same as `cached_call` for engine calls that take a path: the file is read (to key the
+    entry) only when a cache is active."""
+    cache = active()
+    if cache is None:
+        return compute()
+    from .xml_helpers import _winlong
+    with open(_winlong(path), 'rb') as f:
+        data = f.read()
+    return cache.get_or_compute(kind, data, compute)
+
+
+def _engine_fingerprint():
+    """Version of the format engine for cache keys: the distribution version plus size/mtime of
+    its sources — an editable install keeps the version while its code changes."""
+    import onec_metadata_schema
+
+    try:
+        version = metadata.version('1c-metadata-schema')
+    except metadata.PackageNotFoundError:
+        version = getattr(onec_metadata_schema, '__version__', '')
+    digest = hashlib.sha1(version.encode('utf-8'))
+    package_dir = os.path.dirname(os.path.abspath(onec_metadata_schema.__file__))
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            rel = os.path.relpath(path, package_dir).replace('\\', '/')
+            digest.update(f'{rel}\0{st.st_size}\0{st.st_mtime_ns}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _in_engine_package(module):
+    return module == _ENGINE_PACKAGE or module.startswith(_ENGINE_PACKAGE + '.')
+
+
+class _EngineUnpickler(pickle.Unpickler):
+    """Loads only plain data and the format engine's own classes; anything else — a function,
+    a class of another package reached through an engine module — raises UnpicklingError."""
+
+    def find_class(self, module, name):
+        if name in _SAFE_GLOBALS.get(module, ()):
+            return super().find_class(module, name)
+        if _in_engine_package(module):
+            value = super().find_class(module, name)
+            if isinstance(value, type) and _in_engine_package(value.__module__):
+                return value
+        raise pickle.UnpicklingError(f'global {module}.{name} is not allowed in a parse cache entry')
+
+
+def _loads(blob):
+    return _EngineUnpickler(io.BytesIO(zlib.decompress(blob))).load()
+
+
+class ParseCache:
+    """On-disk LRU of format-engine results keyed by sha1 of the source file bytes.
+
+    One file per entry (`<dir>/<key[:2]>/<key>.pkl`, zlib-compressed pickle), written to a
+    temp file and `os.replace`d into place — pool workers and concurrent builds share the
+    directory without locks. Entries are read back by `_EngineUnpickler`, which refuses
+    every global but plain data types and engine classes. A hit touches the entry's mtime;
+    `trim` evicts by mtime. Any I/O or decoding problem, a refused entry included, is a miss,
+    never a build failure.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._engine = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Workers compute their own engine fingerprint and counters.
+        return {'directory': self.directory, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'], state['max_bytes'])
+
+    def _entry_path(self, kind, data):
+        if self._engine is None:
+            self._engine = _engine_fingerprint()
+        digest = hashlib.sha1(f'{CACHE_FORMAT}\0{self._engine}\0{kind}\0'.encode('utf-8'))
+        digest.update(data)
+        key = digest.hexdigest()
+        return self.directory / key[:2] / (key + _ENTRY_SUFFIX)
+
+    def get_or_compute(self, kind, data, compute):
+        path = self._entry_path(kind, data)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            blob = None
+        if blob is not None:
+            try:
+                value = _loads(blob)
+            except Exception:  # noqa: BLE001 — a truncated/foreign/refused entry is a miss, not an error
+                self._remove(path)
+            else:
+                self.hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return value
+
+        self.misses += 1
+        value = compute()
+        self._store(path, value)
+        return value
+
+    def _store(self, path, value):
+        try:
+            blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        # pid and thread: concurrent builds of one process store the same shared-base entries.
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}{_TMP_SUFFIX}')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            self._remove(tmp)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def trim(self):
+        """Evicts least recently used entries until the directory fits `max_bytes`.
+
+        Returns:
+            dict: entries, bytes (after eviction), evicted.
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        if self.directory.is_dir():
+            for dirpath, _dirnames, filenames in os.walk(self.directory):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if filename.endswith(_TMP_SUFFIX):
+                        if now - st.st_mtime > _STALE_TMP_SECONDS:
+                            self._remove(path)
+                        continue
+                    if filename.endswith(_ENTRY_SUFFIX):
+                        entries.append((st.st_mtime_ns, st.st_size, path))
+                        total += st.st_size
+
+        evicted = 0
+        if total > self.max_bytes:
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                evicted += 1
+        return {'entries': len(entries) - evicted, 'bytes': total, 'evicted': evicted}
@@ -1,7 +1,10 @@
-import os
+import time
 import xml.etree.ElementTree as ET
 
+from .inventory import path_exists, path_is_dir, xml_files
+from .parse_cache import cached_call
 from .role_qname import classify_target_qname
+from .worker import _worker_parser
 from .xml_helpers import _winlong
 
 MD_NS = 'http://v8.1c.ru/8.3/MDClasses'
@@ -61,17 +64,26 @@ def parse_rights_xml(rights_path):
     via ImportError, but by the time roles are parsed the object pass has already required the
     library, so it is guaranteed present.
     """
-    if not os.path.exists(_winlong(rights_path)):
+    if not path_exists(rights_path):
         return None
     from onec_metadata_schema import read_rights
     try:
         with open(_winlong(rights_path), 'rb') as f:
             xml = f.read()
-        return _reshape_rights_from_library(read_rights(xml))
+        return _reshape_rights_from_library(cached_call('rights', xml, lambda: read_rights(xml)))
     except (ET.ParseError, OSError):
         return None
 
 
+def _parse_role_worker(config_path, xml_file, roles_root):
+    """`RolesMixin._parse_role_file` в процессе-воркере (picklable, уровень модуля — как
+    `_parse_object_worker`). Возвращает `(entry | None, секунды)`; секунды родитель
+    добавляет в `worker_stage_seconds['roles']`."""
+    t0 = time.perf_counter()
+    entry = _worker_parser(config_path)._parse_role_file(xml_file, roles_root)
+    return entry, time.perf_counter() - t0
+
+
 class RolesMixin:
     """Parse Roles/*.xml and Roles/<Name>/Ext/Rights.xml."""
 
@@ -83,19 +95,58 @@ class RolesMixin:
         """Роли по одной (`parser-streaming-pipeline`): у крупной конфигурации это ~3000 ролей
         и сотни тысяч грантов — держать их все в памяти незачем, потребитель вставляет и
         отпускает каждую. Время копится по одной роли, чтобы в `stage_seconds['roles']` не
-        попало время потребителя (генератор исполняется между его итерациями)."""
+        попало время потребителя (генератор исполняется между его итерациями).
+
+        При работающем пуле (`self._form_pool`) роли разбираются воркерами
+        (`_parse_role_worker`) с тем же окном `_pool_window` и тем же планировщиком
+        `_schedule_by_cost` (стоимость — размер `Rights.xml`), что и дочерние объекты;
+        отдаются в порядке имён файлов, как и без пула. `stage_seconds['roles']` тогда — ожидание
+        результата, время самих воркеров — `worker_stage_seconds['roles']`.
+        """
         roles_root = self.root_dir / 'Roles'
-        if not roles_root.is_dir():
+        if not path_is_dir(roles_root):
+            return
+
+        role_files = [
+            p for p in sorted(xml_files(roles_root))
+            if 'Ext' not in p.parts and self._wanted('Role', p.stem)
+        ]
+        if self._form_pool is None:
+            for xml_file in role_files:
+                with self._accumulate('roles'):
+                    entry = self._parse_role_file(xml_file, roles_root)
+                if entry is not None:
+                    yield entry
             return
 
-        for xml_file in sorted(roles_root.glob('*.xml')):
-            if 'Ext' in xml_file.parts:
-                continue
-            with self._accumulate('roles'):
-                entry = self._parse_role_file(xml_file, roles_root)
+        inventory = self.inventory
+        tasks = [
+            (
+                inventory.file_size(roles_root / xml_file.stem / 'Ext' / 'Rights.xml') if inventory else 0,
+                xml_file,
+            )
+            for xml_file in role_files
+        ]
+
+        def submit(xml_file):
+            return self._submit_to_pool(
+                (xml_file, roles_root / xml_file.stem),
+                _parse_role_worker, str(self.config_path), xml_file, roles_root,
+            )
+
+        for future in self._schedule_by_cost(tasks, submit):
+            entry = self._resolve_pending_role(future)
             if entry is not None:
                 yield entry
 
+    def _resolve_pending_role(self, future):
+        """Дожидается роли из пула (см. `_iter_roles`): ожидание — в `stage_seconds['roles']`,
+        время воркера — в `worker_stage_seconds['roles']`."""
+        with self._accumulate('roles'):
+            entry, seconds = self._pool_result(future)
+        self.worker_stage_seconds['roles'] = self.worker_stage_seconds.get('roles', 0.0) + seconds
+        return entry
+
     def _parse_role_file(self, xml_file, roles_root):
         """Одна роль: дескриптор `Roles/<Имя>.xml` + права `Roles/<Имя>/Ext/Rights.xml`.
         None — файл не читается или это не Role (skip-on-error, как формы/СКД)."""
@@ -0,0 +1,39 @@
+"""Состояние процесса-воркера пула разбора: общее для `core` и `roles`, без импорта друг друга."""
+import threading
+
+from .inventory import activate as _activate_inventory
+from .parse_cache import activate as _activate_parse_cache
+
+
+# Парсер процесса-воркера для `_parse_object_worker`/`_parse_role_worker`: один экземпляр
+# на config_path на поток, чтобы ленивые кэши читателей (`_dcs_reader_cache`,
+# `_spreadsheet_reader_cache`) не собирались заново на каждый объект. В воркере поток один;
+# по потокам — ради сборок, доделывающих задачи сломанного пула у себя (`_pool_result`):
+# одновременные сборки одной выгрузки не должны делить изменяемый парсер.
+_WORKER_PARSERS = threading.local()
+
+
+def _worker_parser(config_path):
+    """Парсер без пула для процесса-воркера (см. `_WORKER_PARSERS`)."""
+    parsers = getattr(_WORKER_PARSERS, 'parsers', None)
+    if parsers is None:
+        parsers = _WORKER_PARSERS.parsers = {}
+    parser = parsers.get(config_path)
+    if parser is None:
+        from . import ConfigurationParser  # deferred: ConfigurationParser собирается из модулей, импортирующих этот
+        parser = ConfigurationParser(config_path, use_process_pool=False)
+        parsers[config_path] = parser
+    return parser
+
+
+def _run_in_worker(parse_cache, inventory, fn, *args):
+    """Задача пула: `fn(*args)` с кэшем разбора и описью выгрузки своей сборки. Оба едут с
+    каждой задачей, а не через initializer: долгоживущий пул (`WorkerPool`) обслуживает
+    сборки разных баз подряд. Опись — только поддеревья задачи (`ExportInventory.subset`)."""
+    previous_cache = _activate_parse_cache(parse_cache)
+    previous_inventory = _activate_inventory(inventory)
+    try:
+        return fn(*args)
+    finally:
+        _activate_parse_cache(previous_cache)
+        _activate_inventory(previous_inventory)
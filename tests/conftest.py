@@ -5,7 +5,11 @@ from pathlib import Path
 
 import pytest
 
+from admin_tool.db_manager.insert_forms import _insert_entity_properties
+from admin_tool.db_manager.roles import RoleInsertionMixin
+from shared.form_eav import ENTITY_KIND_IDS, HOT_PROPERTY_PATH_IDS, VALUE_TYPE_IDS
 from shared.indexer_version import INDEXER_VERSION
+from shared.xml_parser.role_qname import classify_target_qname
 from server.tools import ConfigurationTools
 
 
@@ -28,6 +32,102 @@ METADATA_OBJECTS_DDL = '''
     );
 '''
 
+# form_entity_properties with its lookup tables (v25) and the ids the schema fixes.
+FORM_EAV_DDL = '''
+    CREATE TABLE form_entity_kinds (id INTEGER PRIMARY KEY, entity_kind TEXT NOT NULL UNIQUE);
+    CREATE TABLE form_property_paths (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        property_path TEXT NOT NULL UNIQUE,
+        property_name TEXT NOT NULL
+    );
+    CREATE TABLE form_value_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        value_type TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE form_entity_properties (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity_kind INTEGER NOT NULL,
+        entity_id INTEGER NOT NULL,
+        path_id INTEGER NOT NULL,
+        ordinal INTEGER NOT NULL DEFAULT 0,
+        value_text TEXT,
+        value_type_id INTEGER,
+        UNIQUE(entity_kind, entity_id, path_id, ordinal)
+    );
+''' + ''.join(
+    f"INSERT INTO form_entity_kinds VALUES ({kind_id}, '{kind}');\n"
+    for kind, kind_id in ENTITY_KIND_IDS.items()
+) + ''.join(
+    f"INSERT INTO form_property_paths VALUES ({path_id}, '{path}', '{path.rsplit('.', 1)[-1]}');\n"
+    for path, path_id in HOT_PROPERTY_PATH_IDS.items()
+) + ''.join(
+    f"INSERT INTO form_value_types VALUES ({type_id}, '{value_type}');\n"
+    for value_type, type_id in VALUE_TYPE_IDS.items()
+)
+
+
+def insert_eav(conn, entity_kind, entity_id, property_path, value_text, ordinal=0, value_type='string'):
+    """One form_entity_properties row, interned the way the indexer does it."""
+    _insert_entity_properties(conn.cursor(), entity_kind, entity_id, [{
+        'property_path': property_path,
+        'property_name': property_path.rsplit('.', 1)[-1],
+        'ordinal': ordinal,
+        'value_text': value_text,
+        'value_type': value_type,
+    }])
+
+
+# role_grants/role_access_restrictions with their lookup tables (v26).
+ROLE_GRANTS_DDL = '''
+    CREATE TABLE role_qnames (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        qname TEXT NOT NULL UNIQUE,
+        target_kind TEXT NOT NULL
+    );
+    CREATE TABLE role_rights (id INTEGER PRIMARY KEY AUTOINCREMENT, right_name TEXT NOT NULL UNIQUE);
+    CREATE TABLE role_sources (id INTEGER PRIMARY KEY AUTOINCREMENT, source_db_name TEXT NOT NULL UNIQUE);
+    CREATE TABLE role_restriction_texts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        hash BLOB NOT NULL UNIQUE,
+        restriction_text TEXT NOT NULL
+    );
+    CREATE TABLE role_grants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        role_object_id INTEGER NOT NULL,
+        target_id INTEGER NOT NULL,
+        parent_id INTEGER NOT NULL,
+        right_id INTEGER NOT NULL,
+        granted INTEGER,
+        source_id INTEGER
+    );
+    CREATE TABLE role_access_restrictions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        grant_id INTEGER NOT NULL,
+        field_scope TEXT,
+        text_id INTEGER NOT NULL,
+        source_id INTEGER
+    );
+'''
+
+
+def insert_role_grant(conn, role_object_id, target_qname, right_name, granted=True,
+                      source_db_name=None, restrictions=()):
+    """One role_grants row (plus RLS `restrictions` texts), interned the way the indexer does it."""
+    target_kind, parent_object_qname = classify_target_qname(target_qname)
+    RoleInsertionMixin()._insert_role_data(conn.cursor(), role_object_id, {
+        'role_grants': [{
+            'target_qname': target_qname,
+            'target_kind': target_kind,
+            'parent_object_qname': parent_object_qname,
+            'right_name': right_name,
+            'granted': granted,
+        }],
+        'role_access_restrictions': [
+            {'target_qname': target_qname, 'right_name': right_name, 'restriction_text': text}
+            for text in restrictions
+        ],
+    }, source_db_name)
+
 
 def create_test_db(path: Path, ddl_and_data: str) -> None:
     """Create a mini SQLite DB with INDEXER_VERSION and the given schema/data SQL."""
@@ -25,8 +25,9 @@ from server.tool_schemas import (
 )
 from shared.indexer_version import INDEXER_VERSION
 from shared.metadata_type_resolver import REF_SUFFIX_TO_OBJECT_TYPE
+from shared.module_code import code_digest, compress_code
 from shared.xml_parser.core import CHILD_OBJECT_TYPES
-from tests.conftest import build_configuration_tools
+from tests.conftest import FORM_EAV_DDL, build_configuration_tools
 
 
 # --- T-8: неоднозначность точного имени ----------------------------------------------------
@@ -207,9 +208,12 @@ _TOOLS_DDL = '''
         synonym TEXT, comment TEXT, object_belonging TEXT, extended_configuration_object TEXT,
         object_kind TEXT NOT NULL DEFAULT 'ConfigObject'
     );
+    CREATE TABLE module_code (
+        id INTEGER PRIMARY KEY, hash BLOB NOT NULL UNIQUE, code BLOB NOT NULL
+    );
     CREATE TABLE modules (
         id INTEGER PRIMARY KEY, object_id INTEGER, form_id INTEGER, command_id INTEGER,
-        module_type TEXT, code TEXT
+        module_type TEXT, code_id INTEGER
     );
     CREATE TABLE module_procedures (
         id INTEGER PRIMARY KEY, module_id INTEGER, name TEXT, proc_type TEXT,
@@ -230,12 +234,7 @@ _TOOLS_DDL = '''
     CREATE TABLE form_items (
         id INTEGER PRIMARY KEY, form_id INTEGER, parent_id INTEGER, name TEXT, item_type TEXT
     );
-    CREATE TABLE form_entity_properties (
-        id INTEGER PRIMARY KEY, entity_kind TEXT NOT NULL, entity_id INTEGER NOT NULL,
-        property_path TEXT NOT NULL, property_name TEXT NOT NULL, ordinal INTEGER NOT NULL DEFAULT 0,
-        value_text TEXT, value_type TEXT
-    );
-    CREATE VIRTUAL TABLE code_search USING fts5(code, content='modules', content_rowid='id');
+    CREATE VIRTUAL TABLE code_search USING fts5(code, content='');
 '''
 
 # Одно и то же слово в двух модулях разного типа — чтобы проверить, что фильтр сужает
@@ -245,18 +244,19 @@ _CODE_MANAGER = 'Функция Провести()\n\tВозврат Истин
 
 
 def _setup_tools_db(conn, n_forms=5):
-    conn.executescript(_TOOLS_DDL)
+    conn.executescript(_TOOLS_DDL + FORM_EAV_DDL)
     conn.execute("INSERT INTO metadata_objects (id, object_type, name) VALUES (1, 'Document', 'Реализация')")
-    conn.execute("INSERT INTO modules (id, object_id, module_type, code) VALUES (1, 1, 'ObjectModule', ?)",
-                 (_CODE_OBJECT,))
-    conn.execute("INSERT INTO modules (id, object_id, module_type, code) VALUES (2, 1, 'ManagerModule', ?)",
-                 (_CODE_MANAGER,))
+    for code_id, code in ((1, _CODE_OBJECT), (2, _CODE_MANAGER)):
+        conn.execute("INSERT INTO module_code (id, hash, code) VALUES (?, ?, ?)",
+                     (code_id, code_digest(code), compress_code(code)))
+        conn.execute("INSERT INTO code_search (rowid, code) VALUES (?, ?)", (code_id, code))
+    conn.execute("INSERT INTO modules (id, object_id, module_type, code_id) VALUES (1, 1, 'ObjectModule', 1)")
+    conn.execute("INSERT INTO modules (id, object_id, module_type, code_id) VALUES (2, 1, 'ManagerModule', 2)")
     for form_id in range(1, n_forms + 1):
         conn.execute("INSERT INTO forms (id, object_id, form_name) VALUES (?, 1, ?)",
                      (form_id, f'Форма{form_id}'))
         conn.execute("INSERT INTO form_items (form_id, name, item_type) VALUES (?, 'Поле', 'InputField')",
                      (form_id,))
-    conn.execute("INSERT INTO code_search(code_search) VALUES ('rebuild')")
 
 
 @pytest.fixture
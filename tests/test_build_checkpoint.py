@@ -0,0 +1,157 @@
+import json
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+from admin_tool.db_manager import DatabaseManager, checkpoint as checkpoint_module
+from admin_tool.db_manager.insert_objects import ObjectInsertionMixin, _InsertState
+from shared.db_build_state import building_marker_path, is_building, tmp_db_path
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+def _objects(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            (row[0], row[1]): (row[2], row[3])
+            for row in conn.execute('SELECT object_type, name, id, comment FROM metadata_objects')
+        }
+    finally:
+        conn.close()
+
+
+class TestBuildCheckpoint(unittest.TestCase):
+    """Full build killed mid-insert: the next build of the same export continues from the
+    last checkpoint in foo.db.tmp instead of starting over."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.export = self.tmp / 'export'
+        roles_dir = self.export / 'Roles'
+        roles_dir.mkdir(parents=True)
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, roles_dir / descriptor.name)
+        shutil.copy(FIXTURE, self.export / 'Configuration.xml')
+        self.config_xml = self.export / 'Configuration.xml'
+        self.db_path = self.tmp / 'test.db'
+
+        reference = self.tmp / 'reference.db'
+        DatabaseManager.build_from_xml_atomic(reference, self.config_xml)
+        self.reference = _objects(reference)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _interrupted_build(self, die_after):
+        """Leaves what a killed build leaves: foo.db.tmp with `die_after` objects checkpointed
+        (the next one inserted but not committed) and the marker of a dead process."""
+        original_insert = ObjectInsertionMixin._insert_object
+        inserted = []
+
+        def insert_then_die(manager, cursor, obj, state):
+            if len(inserted) == die_after + 1:
+                raise SystemExit('killed')
+            inserted.append(obj['name'])
+            return original_insert(manager, cursor, obj, state)
+
+        manager = DatabaseManager(tmp_db_path(self.db_path))
+        manager.connect(journal_mode='DELETE')
+        with mock.patch.object(checkpoint_module, 'CHECKPOINT_INTERVAL_SECONDS', 0), \
+                mock.patch.object(ObjectInsertionMixin, '_insert_object', insert_then_die), \
+                mock.patch.object(checkpoint_module.BuildCheckpoints, 'after_object',
+                                  self._checkpoint_all_but_last(die_after)):
+            with self.assertRaises(SystemExit):
+                manager.create_database(self.config_xml)
+        manager.conn.close()
+        building_marker_path(self.db_path).write_text('{"pid": 999999999}', encoding='utf-8')
+
+    @staticmethod
+    def _checkpoint_all_but_last(limit):
+        original = checkpoint_module.BuildCheckpoints.after_object
+
+        def after_object(checkpoints, rows, state, obj):
+            if checkpoints.objects_done < limit:
+                original(checkpoints, rows, state, obj)
+            else:
+                checkpoints.objects_done += 1
+        return after_object
+
+    def test_resume_inserts_only_the_remaining_objects(self):
+        self._interrupted_build(die_after=2)
+        point = DatabaseManager.load_build_checkpoint(self.db_path, self.config_xml)
+        self.assertIsNotNone(point)
+        self.assertEqual(point['objects_done'], 2)
+        self.assertEqual(len(point['state'].type_name_to_id), 2)
+
+        messages = []
+
+        def progress(current, total, message, **_kwargs):
+            messages.append(message)
+
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml, progress_callback=progress)
+
+        self.assertTrue(any(m.startswith('Продолжение прерванной сборки') for m in messages))
+        self.assertEqual(_objects(self.db_path), self.reference)
+        self.assertFalse(tmp_db_path(self.db_path).exists())
+        self.assertFalse(is_building(self.db_path))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+        self.assertNotIn('build_checkpoint', tables)
+
+    def test_changed_export_starts_over(self):
+        self._interrupted_build(die_after=2)
+        role = next(iter(sorted((self.export / 'Roles').glob('*.xml'))))
+        text = role.read_text(encoding='utf-8-sig')
+        role.write_text(text.replace('<Comment/>', '<Comment>изменено</Comment>'), encoding='utf-8')
+
+        self.assertIsNone(DatabaseManager.load_build_checkpoint(self.db_path, self.config_xml))
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml)
+        self.assertIn('изменено', {comment for _id, comment in _objects(self.db_path).values()})
+
+    def test_state_is_stored_as_data_only(self):
+        self._interrupted_build(die_after=2)
+        conn = sqlite3.connect(tmp_db_path(self.db_path))
+        try:
+            blob = conn.execute('SELECT insert_state FROM build_checkpoint WHERE id = 1').fetchone()[0]
+        finally:
+            conn.close()
+        payload = json.loads(zlib.decompress(blob).decode('utf-8'))
+        self.assertEqual(len(payload['type_name_to_id']), 2)
+
+        state = _InsertState('base')
+        state.pending_fo_usage = [('ФО.Склады', 1, 2, 'Field', 'Склад', None)]
+        state.type_name_to_id = {('Catalog', 'Товары'): 7}
+        state.preassigned_ids = {('Catalog', 'Склады'): 8}
+        state.fo_resolver = {'ФО.Склады': 3}
+        state.relation_objects = [{'type': 'Subsystem', 'name': 'Продажи', 'content_refs': ['Catalog.Товары']}]
+        copy = checkpoint_module._load_state(checkpoint_module._dump_state(state))
+        self.assertEqual(vars(copy), vars(state))
+
+    def test_pickled_state_is_not_loaded(self):
+        self._interrupted_build(die_after=2)
+        conn = sqlite3.connect(tmp_db_path(self.db_path))
+        try:
+            conn.execute('UPDATE build_checkpoint SET insert_state = ? WHERE id = 1',
+                         (zlib.compress(pickle.dumps(_InsertState('base'))),))
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertIsNone(DatabaseManager.load_build_checkpoint(self.db_path, self.config_xml))
+
+    def test_no_checkpoint_without_dead_build_marker(self):
+        self._interrupted_build(die_after=2)
+        building_marker_path(self.db_path).unlink()
+        self.assertIsNone(DatabaseManager.load_build_checkpoint(self.db_path, self.config_xml))
+
+
+if __name__ == '__main__':
+    unittest.main()
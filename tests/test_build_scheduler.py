@@ -0,0 +1,139 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from shared import build_scheduler
+from shared.build_scheduler import BuildJob, plan_worker_shares, run_concurrent_builds
+
+
+class _Pool:
+    """Stand-in for WorkerPool: records the shares handed to builds."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.broken = False
+        self.resets = 0
+
+    def share(self, workers):
+        return ('share', workers)
+
+    def reset(self):
+        self.resets += 1
+        self.broken = False
+
+
+class TestWorkerShares(unittest.TestCase):
+    def test_large_base_gets_most_workers(self):
+        self.assertEqual(plan_worker_shares([9_000_000, 200_000, 150_000, 100_000], 8), [8, 1, 1, 1])
+        self.assertEqual(plan_worker_shares([1, 1], 8), [4, 4])
+        self.assertEqual(plan_worker_shares([0, 0, 0], 7), [2, 2, 2])
+
+
+class TestAvailableMemory(unittest.TestCase):
+    def test_meminfo_available_includes_page_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            meminfo = Path(tmp) / 'meminfo'
+            meminfo.write_text(
+                'MemTotal:       16384000 kB\nMemFree:          204800 kB\nMemAvailable:    8192000 kB\n',
+                encoding='ascii',
+            )
+            with mock.patch.object(build_scheduler, 'PROC_MEMINFO', str(meminfo)), \
+                    mock.patch.object(build_scheduler.os, 'name', 'posix'):
+                self.assertEqual(build_scheduler.available_memory_mb(), 8000)
+
+    def test_sysconf_is_the_fallback(self):
+        sysconf = {'SC_AVPHYS_PAGES': 1024, 'SC_PAGE_SIZE': 4096}.get
+        with mock.patch.object(build_scheduler, 'PROC_MEMINFO', '/nonexistent/meminfo'), \
+                mock.patch.object(build_scheduler.os, 'name', 'posix'), \
+                mock.patch.object(build_scheduler.os, 'sysconf', side_effect=sysconf):
+            self.assertEqual(build_scheduler.available_memory_mb(), 4)
+
+
+class TestConcurrentBuilds(unittest.TestCase):
+    """`run_concurrent_builds`: heavy first, at most max_jobs at once within the memory budget,
+    failures isolated, stop between starts."""
+
+    def _run(self, weights, failing=(), max_jobs=3, memory_budget_mb=10_000, should_stop=None):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+        started, finished = [], []
+
+        def build(name, worker_pool):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+            if name in failing:
+                raise RuntimeError(f'сбой {name}')
+            return worker_pool
+
+        jobs = [BuildJob(item=name, weight=weight) for name, weight in weights.items()]
+        stopped = run_concurrent_builds(
+            jobs, build, _Pool(8), max_jobs, memory_budget_mb=memory_budget_mb,
+            should_stop=should_stop,
+            on_start=lambda job: started.append(job.item),
+            on_finish=lambda job: finished.append((job.item, job.error is None)),
+        )
+        return jobs, started, finished, state['peak'], stopped
+
+    def test_heaviest_starts_first_and_failures_are_isolated(self):
+        jobs, started, finished, peak, stopped = self._run(
+            {'ext1': 100_000, 'base': 8_000_000, 'ext2': 120_000}, failing={'ext1'},
+        )
+        self.assertEqual(started[0], 'base')
+        self.assertEqual(sorted(finished), [('base', True), ('ext1', False), ('ext2', True)])
+        self.assertLessEqual(peak, 3)
+        self.assertFalse(stopped)
+        by_name = {job.item: job for job in jobs}
+        self.assertEqual(by_name['base'].result, ('share', by_name['base'].workers))
+        self.assertIn('сбой ext1', str(by_name['ext1'].error))
+
+    def test_memory_budget_limits_concurrency(self):
+        # Each ~150 MB estimate: a 200 MB budget admits one build at a time.
+        _jobs, _started, finished, peak, _stopped = self._run(
+            {'a': 1000, 'b': 1000, 'c': 1000}, memory_budget_mb=200,
+        )
+        self.assertEqual(peak, 1)
+        self.assertEqual(len(finished), 3)
+
+    def test_stop_request_prevents_new_starts(self):
+        calls = {'n': 0}
+
+        def should_stop():
+            calls['n'] += 1
+            return calls['n'] > 1
+
+        _jobs, started, finished, _peak, stopped = self._run(
+            {'a': 3, 'b': 2, 'c': 1}, max_jobs=1, should_stop=should_stop,
+        )
+        self.assertEqual(started, ['a'])
+        self.assertEqual(finished, [('a', True)])
+        self.assertTrue(stopped)
+
+    def test_broken_pool_is_reset_before_next_start(self):
+        """A crashed worker does not fail the builds that used the pool (they finish
+        in-process); the pool is replaced before the next build starts."""
+        pool = _Pool(8)
+        resets_at_start = []
+
+        def build(name, worker_pool):
+            if name == 'base':
+                pool.broken = True  # the parser saw BrokenProcessPool and fell back
+            return name
+
+        jobs = [BuildJob(item=name, weight=weight) for name, weight in {'base': 3, 'ext': 1}.items()]
+        run_concurrent_builds(
+            jobs, build, pool, max_jobs=1,
+            on_start=lambda job: resets_at_start.append((job.item, pool.resets)),
+        )
+        self.assertEqual(resets_at_start, [('base', 0), ('ext', 1)])
+        self.assertTrue(all(job.error is None for job in jobs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -129,6 +129,7 @@ class BulkRunTest(unittest.TestCase):
     def setUp(self):
         self._orig_build = bulk_update.DatabaseManager.build_from_xml_atomic
         self.built = []
+        self.pools = []
 
     def tearDown(self):
         bulk_update.DatabaseManager.build_from_xml_atomic = self._orig_build
@@ -141,9 +142,10 @@ class BulkRunTest(unittest.TestCase):
         )
 
     def _stub_build(self, failing=()):
-        def build(db_path, config_xml, progress_callback=None):
+        def build(db_path, config_xml, progress_callback=None, parse_cache_dir=None, worker_pool=None):
             name = Path(db_path).stem
             self.built.append(name)
+            self.pools.append(worker_pool)
             if progress_callback:
                 progress_callback(0, 100, f'{name}: стадия', False)
             if name in failing:
@@ -206,6 +208,45 @@ class BulkRunTest(unittest.TestCase):
         self.assertEqual(starts, [(1, 2, 'A'), (2, 2, 'C')])
         self.assertEqual(progress, [('A', 'A: стадия'), ('C', 'C: стадия')])
 
+    def test_one_worker_pool_for_the_whole_run(self):
+        self._stub_build(failing={'A'})
+        targets = [self._target('A'), self._target('B'), self._target('C')]
+
+        run_bulk_update(targets)
+
+        self.assertIsNotNone(self.pools[0])
+        self.assertTrue(all(pool is self.pools[0] for pool in self.pools))
+        self.assertIsNone(self.pools[0].executor)  # shut down with the run
+
+    def test_parallel_run_keeps_bulk_contract(self):
+        self._stub_build(failing={'B'})
+        starts, progress, finished = [], [], []
+        targets = [self._target('A'), self._target('B'), self._target('C', skip_reason='пропуск'), self._target('D')]
+
+        result = run_bulk_update(
+            targets,
+            on_db_start=lambda i, total, t: starts.append((i, total)),
+            on_progress=lambda t, cur, total, msg, repl: progress.append((t.db_name, msg)),
+            on_db_finish=lambda t, ok, error_text: finished.append((t.db_name, ok)),
+            max_parallel=3,
+        )
+
+        self.assertEqual(sorted(self.built), ['A', 'B', 'D'])
+        self.assertEqual((result.succeeded, result.failed), (2, 1))
+        self.assertIn('сбой B', result.failures[0][1])
+        self.assertEqual(sorted(starts), [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(sorted(progress), [('A', 'A: стадия'), ('B', 'B: стадия'), ('D', 'D: стадия')])
+        self.assertEqual(sorted(finished), [('A', True), ('B', False), ('D', True)])
+
+    def test_parallel_stop_request(self):
+        self._stub_build()
+        targets = [self._target('A'), self._target('B'), self._target('C')]
+
+        result = run_bulk_update(targets, should_stop=lambda: True, max_parallel=2)
+
+        self.assertEqual(self.built, [])
+        self.assertTrue(result.stopped_early)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+"""Optional trigram code index (`code_trigram`): built in the code_search pass, flagged in
+index_metadata, and used by search_code for substring queries with punctuation."""
+import json
+import sqlite3
+
+import pytest
+
+from admin_tool.db_manager import DatabaseManager
+from admin_tool.db_manager.bsl import _insert_module
+from admin_tool.db_manager.row_writer import RowWriter
+from shared.index_status import read_db_status
+from shared.indexer_version import INDEXER_VERSION
+from tests.conftest import build_configuration_tools
+
+CALL = 'ОбщегоНазначения.СообщитьПользователю(Текст);'
+MODULES = {
+    'Продажи': 'Процедура Провести()\n    ' + CALL + '\nКонецПроцедуры',
+    'Закупки': 'Процедура Провести()\n    Сообщить(Текст);\nКонецПроцедуры',
+}
+
+
+def _build(db_path, code_trigram):
+    manager = DatabaseManager(str(db_path))
+    manager.code_trigram = code_trigram
+    manager.connect()
+    manager._create_schema()
+    cursor = manager.conn.cursor()
+    rows = RowWriter(cursor, defer_code_search=True, code_trigram=code_trigram)
+    for object_id, (name, code) in enumerate(MODULES.items(), start=1):
+        cursor.execute(
+            "INSERT INTO metadata_objects (id, object_type, name) VALUES (?, 'CommonModule', ?)",
+            (object_id, name),
+        )
+        _insert_module(rows, object_id, None, None, 'Module', code)
+    rows.flush()
+    manager._build_code_search()
+    manager.conn.execute(f'PRAGMA user_version = {INDEXER_VERSION}')
+    manager.conn.commit()
+    manager.close()
+
+
+def _object_names(tools, query):
+    result = tools.search_code(query, project_filter='TestProject')
+    if result.get('_empty'):
+        return set()
+    payload = result['TestProject']['Main (base)']
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    return {m['object_name'] for m in payload['matches']}
+
+
+def test_trigram_index_is_built_and_flagged(tmp_path):
+    db_path = tmp_path / 'trigram.db'
+    _build(db_path, code_trigram=True)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        hits = [r[0] for r in conn.execute(
+            'SELECT rowid FROM code_search_trigram WHERE code_search_trigram MATCH ?',
+            ('"общегоназначения.сообщитьпользователю("',),
+        )]
+        segments = conn.execute('SELECT COUNT(*) FROM code_search_trigram_data').fetchone()[0]
+    finally:
+        conn.close()
+    assert len(hits) == 1  # регистр кириллицы не важен
+    assert segments > 0
+    assert read_db_status(str(db_path))['code_trigram'] is True
+
+
+def test_default_build_has_no_trigram_index(tmp_path):
+    db_path = tmp_path / 'plain.db'
+    _build(db_path, code_trigram=False)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    assert 'code_search_trigram' not in tables
+    assert read_db_status(str(db_path))['code_trigram'] is False
+
+
+@pytest.mark.parametrize('code_trigram', [True, False])
+def test_search_code_substring_with_and_without_trigram(tmp_path, code_trigram):
+    db_path = tmp_path / 'search.db'
+    _build(db_path, code_trigram=code_trigram)
+    tools = build_configuration_tools(tmp_path, db_path)
+    tools._require_project_exists = lambda pf, dbs: None
+
+    statements = []
+    tools._get_connection(str(db_path)).set_trace_callback(statements.append)
+    assert _object_names(tools, 'Назначения.СообщитьПользователю(') == {'Продажи'}
+    assert _object_names(tools, 'Сообщить(') == {'Закупки'}
+    assert _object_names(tools, 'НетТакого(') == set()
+    tools.close_all()
+
+    used_trigram = any('code_search_trigram MATCH' in sql for sql in statements)
+    assert used_trigram is code_trigram
+
+
+def test_incremental_cleanup_deletes_trigram_rows(tmp_path):
+    db_path = tmp_path / 'update.db'
+    _build(db_path, code_trigram=True)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('DELETE FROM modules WHERE object_id = 1')
+        DatabaseManager._drop_unused_module_code(conn.cursor(), code_trigram=True)
+        hits = conn.execute(
+            'SELECT COUNT(*) FROM code_search_trigram WHERE code_search_trigram MATCH ?',
+            ('"СообщитьПользователю"',),
+        ).fetchone()[0]
+        remaining = conn.execute(
+            'SELECT COUNT(*) FROM code_search_trigram WHERE code_search_trigram MATCH ?',
+            ('"Сообщить(Текст)"',),
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert hits == 0
+    assert remaining == 1
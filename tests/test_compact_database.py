@@ -0,0 +1,77 @@
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from admin_tool.db_manager import DatabaseManager
+from admin_tool.db_manager.core import COMPACT_PAGE_SIZE
+from shared.index_status import INDEX_STATISTICS_KEY
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+class TestCompactBuild(unittest.TestCase):
+    """build_from_xml_atomic(compact=True): the tmp database is VACUUMed with the chosen page
+    size before the atomic replace, and the stage is recorded in index_metadata and the log."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        # Role descriptors without Rights.xml: the build stays independent of the format library.
+        roles_dir = root / 'export' / 'Roles'
+        roles_dir.mkdir(parents=True)
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, roles_dir / descriptor.name)
+        self.config_xml = root / 'export' / 'Configuration.xml'
+        shutil.copy(FIXTURE, self.config_xml)
+        self.db_path = root / 'compact.db'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compact_build_records_the_stage(self):
+        messages = []
+        with mock.patch.object(DatabaseManager, '_table_bytes', side_effect=DatabaseManager._table_bytes) as dbstat:
+            DatabaseManager.build_from_xml_atomic(
+                self.db_path, self.config_xml, compact=True,
+                progress_callback=lambda current, total, message, **_: messages.append(message),
+            )
+        self.assertEqual(dbstat.call_count, 1)  # only after VACUUM, not also before it
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute('PRAGMA page_size').fetchone()[0], COMPACT_PAGE_SIZE)
+            self.assertEqual(conn.execute('PRAGMA freelist_count').fetchone()[0], 0)
+            self.assertEqual(conn.execute('PRAGMA integrity_check').fetchone()[0], 'ok')
+            meta = dict(conn.execute("SELECT key, value FROM index_metadata WHERE key LIKE 'compact_%'"))
+            self.assertTrue(conn.execute('SELECT COUNT(*) FROM sqlite_stat1').fetchone()[0])
+            stats = json.loads(conn.execute(
+                'SELECT value FROM index_metadata WHERE key = ?', (INDEX_STATISTICS_KEY,),
+            ).fetchone()[0])
+            table_bytes = DatabaseManager._table_bytes(conn.cursor())
+        finally:
+            conn.close()
+        # table_bytes is re-measured after VACUUM: whole pages of the new size, as in the file.
+        if table_bytes:
+            self.assertEqual(stats['table_bytes']['metadata_objects'], table_bytes['metadata_objects'])
+            self.assertTrue(all(size % COMPACT_PAGE_SIZE == 0 for size in stats['table_bytes'].values()))
+        self.assertEqual(meta['compact_page_size'], str(COMPACT_PAGE_SIZE))
+        self.assertGreater(int(meta['compact_size_before']), 0)
+        self.assertGreater(int(meta['compact_size_after']), 0)
+        self.assertIn('compact_seconds', meta)
+        self.assertTrue(any(m.startswith('Сжатие базы (VACUUM') for m in messages))
+
+    def test_default_build_is_not_compacted(self):
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            keys = [r[0] for r in conn.execute("SELECT key FROM index_metadata WHERE key LIKE 'compact_%'")]
+        finally:
+            conn.close()
+        self.assertEqual(keys, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,18 @@
+import sqlite3
+
+import pytest
+
 from shared.db_build_state import (
     building_marker_path,
     clear_building,
     is_building,
+    is_interrupted_build,
     is_stale_building,
     mark_building,
     reconcile_building_markers,
     tmp_db_path,
 )
+from shared.indexer_version import INDEXER_VERSION
 
 
 def test_building_marker_lifecycle(tmp_path):
@@ -48,3 +54,38 @@ def test_reconcile_keeps_tmp_for_alive_build(tmp_path):
     reconcile_building_markers(tmp_path)
     assert tmp.exists()
     clear_building(db_path)
+
+
+def _write_checkpoint_tmp(tmp, indexer_version):
+    conn = sqlite3.connect(tmp)
+    conn.execute('CREATE TABLE build_checkpoint (id INTEGER PRIMARY KEY, indexer_version INTEGER)')
+    conn.execute('INSERT INTO build_checkpoint VALUES (1, ?)', (indexer_version,))
+    conn.commit()
+    conn.close()
+
+
+def test_reconcile_keeps_tmp_of_interrupted_build(tmp_path):
+    db_path = tmp_path / 'foo.db'
+    tmp = tmp_db_path(db_path)
+    _write_checkpoint_tmp(tmp, INDEXER_VERSION)
+    building_marker_path(db_path).write_text('{"pid": 999999999}', encoding='utf-8')
+    assert is_interrupted_build(db_path)
+    reconcile_building_markers(tmp_path)
+    assert tmp.exists()
+    assert is_building(db_path)
+
+
+@pytest.mark.parametrize('checkpoint_version', [None, INDEXER_VERSION - 1])
+def test_reconcile_removes_tmp_that_cannot_be_resumed(tmp_path, checkpoint_version):
+    """A dead build's tmp without a current checkpoint (an interrupted incremental update, an
+    older indexer) is deleted together with its marker."""
+    db_path = tmp_path / 'foo.db'
+    tmp = tmp_db_path(db_path)
+    if checkpoint_version is None:
+        sqlite3.connect(tmp).execute('CREATE TABLE metadata_objects (id INTEGER)').connection.close()
+    else:
+        _write_checkpoint_tmp(tmp, checkpoint_version)
+    building_marker_path(db_path).write_text('{"pid": 999999999}', encoding='utf-8')
+    reconcile_building_markers(tmp_path)
+    assert not tmp.exists()
+    assert not is_building(db_path)
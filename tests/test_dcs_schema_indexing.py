@@ -17,6 +17,7 @@ if str(ROOT) not in sys.path:
 
 pytest.importorskip('onec_metadata_schema')
 
+from shared.module_code import decompress_code
 from shared.xml_parser import ConfigurationParser
 from admin_tool.db_manager.insert_objects import ObjectInsertionMixin
 from tests.conftest import build_configuration_tools, create_test_db, METADATA_OBJECTS_DDL
@@ -109,12 +110,15 @@ def test_broken_schema_is_skipped_not_fatal(tmp_path):
 # --- insertion: query text -> code_search FTS --------------------------------------------
 
 _INSERT_SCHEMA = '''
+    CREATE TABLE module_code (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, hash BLOB NOT NULL UNIQUE, code BLOB NOT NULL
+    );
     CREATE TABLE modules (
         id INTEGER PRIMARY KEY AUTOINCREMENT, object_id INTEGER, form_id INTEGER,
-        command_id INTEGER, module_type TEXT NOT NULL, code TEXT NOT NULL
+        command_id INTEGER, module_type TEXT NOT NULL, code_id INTEGER NOT NULL
     );
     CREATE VIRTUAL TABLE code_search USING fts5(
-        code, content='modules', content_rowid='id'
+        code, content=''
     );
     CREATE TABLE dcs_schema (
         id INTEGER PRIMARY KEY AUTOINCREMENT, object_id INTEGER NOT NULL,
@@ -151,14 +155,15 @@ def test_query_text_becomes_searchable_dcs_query_row():
     ObjectInsertionMixin()._insert_dcs_schemas(cursor, 42, _OBJ)
 
     rows = cursor.execute(
-        "SELECT m.object_id, m.module_type, m.code FROM code_search cs "
-        "JOIN modules m ON m.id = cs.rowid WHERE code_search MATCH 'Номенклатура'"
+        "SELECT m.object_id, m.module_type, mc.code FROM code_search cs "
+        "JOIN module_code mc ON mc.id = cs.rowid JOIN modules m ON m.code_id = mc.id "
+        "WHERE code_search MATCH 'Номенклатура'"
     ).fetchall()
     assert len(rows) == 1  # only the schema with a <query> yields an FTS row
-    object_id, module_type, code = rows[0]
+    object_id, module_type, blob = rows[0]
     assert object_id == 42
     assert module_type == 'DcsQuery'
-    assert 'Справочник.Номенклатура' in code
+    assert 'Справочник.Номенклатура' in decompress_code(blob)
     conn.close()
 
 
@@ -0,0 +1,136 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from shared.xml_parser import ConfigurationParser
+from shared.xml_parser import inventory
+from shared.xml_parser.inventory import ExportInventory
+
+
+class TestExportInventory(unittest.TestCase):
+    """One scandir walk answers the parser's existence probes: same answers as the filesystem,
+    no stat calls while it is active."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        ext = self.root / 'Catalogs' / 'Товары' / 'Ext'
+        ext.mkdir(parents=True)
+        (ext / 'ObjectModule.bsl').write_text('Процедура А()\nКонецПроцедуры\n', encoding='utf-8')
+        (ext / 'ManagerModule.bsl').write_text('', encoding='utf-8')
+        for form in ('ФормаЭлемента', 'ФормаСписка'):
+            (self.root / 'Catalogs' / 'Товары' / 'Forms' / form / 'Ext').mkdir(parents=True)
+            (self.root / 'Catalogs' / 'Товары' / 'Forms' / f'{form}.xml').write_text('<x/>')
+        nested = self.root / 'Subsystems' / 'Продажи' / 'Subsystems'
+        nested.mkdir(parents=True)
+        (self.root / 'Subsystems' / 'Продажи.xml').write_text('<x/>')
+        (nested / 'Скидки.xml').write_text('<x/>')
+        (self.root / 'Configuration.xml').write_text('<x/>')
+        self.inventory = ExportInventory(self.root)
+
+    def tearDown(self):
+        inventory.activate(None)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_answers_match_filesystem(self):
+        probes = [
+            self.root / 'Catalogs' / 'Товары' / 'Ext' / 'ObjectModule.bsl',
+            self.root / 'Catalogs' / 'Товары' / 'Ext' / 'RecordSetModule.bsl',
+            self.root / 'Catalogs' / 'Товары' / 'Forms',
+            self.root / 'Catalogs' / 'Нет' / 'Ext',
+            self.root,
+        ]
+        for path in probes:
+            self.assertEqual(self.inventory.exists(path), path.exists(), path)
+            self.assertEqual(self.inventory.is_dir(path), path.is_dir(), path)
+        self.assertIsNone(self.inventory.exists(self.root.parent))
+
+    def test_listings_match_pathlib(self):
+        inventory.activate(self.inventory)
+        forms_dir = self.root / 'Catalogs' / 'Товары' / 'Forms'
+        self.assertEqual(inventory.subdirs(forms_dir), [p for p in forms_dir.iterdir() if p.is_dir()])
+        subsystems = self.root / 'Subsystems'
+        self.assertEqual(
+            sorted(inventory.xml_files(subsystems, recursive=True)),
+            sorted(subsystems.rglob('*.xml')),
+        )
+        self.assertEqual(sorted(inventory.xml_files(forms_dir)), sorted(forms_dir.glob('*.xml')))
+
+    def test_module_probes_do_not_stat(self):
+        parser = ConfigurationParser(str(self.root / 'Configuration.xml'), use_process_pool=False)
+        expected = parser._parse_modules('Товары', 'Catalogs')
+        inventory.activate(self.inventory)
+        with mock.patch('os.stat', side_effect=AssertionError('stat while inventory is active')):
+            self.assertTrue(inventory.path_exists(self.root / 'Catalogs' / 'Товары' / 'Ext' / 'ObjectModule.bsl'))
+            self.assertFalse(inventory.path_is_dir(self.root / 'Catalogs' / 'Нет'))
+        self.assertEqual(parser._parse_modules('Товары', 'Catalogs'), expected)
+        self.assertEqual([m['type'] for m in expected], ['ManagerModule', 'ObjectModule'])
+
+    def test_survives_pickling_for_pool_workers(self):
+        copy = pickle.loads(pickle.dumps(self.inventory))
+        self.assertTrue(copy.exists(self.root / 'Subsystems' / 'Продажи' / 'Subsystems' / 'Скидки.xml'))
+        self.assertEqual(self.inventory.scandir_calls, sum(1 for _ in os.walk(self.root)))
+
+    def test_subset_for_pool_tasks(self):
+        catalog = self.root / 'Catalogs' / 'Товары'
+        sub = pickle.loads(pickle.dumps(self.inventory.subset([self.root / 'Catalogs' / 'Товары.xml', catalog])))
+        self.assertFalse(sub.exists(self.root / 'Catalogs' / 'Товары.xml'))
+        self.assertTrue(sub.is_dir(catalog))
+        self.assertTrue(sub.exists(catalog / 'Ext' / 'ObjectModule.bsl'))
+        self.assertFalse(sub.exists(catalog / 'Ext' / 'RecordSetModule.bsl'))
+        self.assertEqual(sub.listing(catalog / 'Forms'), self.inventory.listing(catalog / 'Forms'))
+        # Outside the subset: unknown, the helpers go to the filesystem.
+        self.assertIsNone(sub.exists(self.root / 'Subsystems' / 'Продажи.xml'))
+        self.assertIsNone(sub.listing(self.root / 'Subsystems'))
+        self.assertNotIn('subsystems', ''.join(sub._dirs).lower())
+
+    def test_concurrent_builds_keep_their_own_inventory(self):
+        """Builds on threads of one process: each thread answers from its own inventory, even
+        when activations and restores interleave, and nothing stays active afterwards."""
+        other_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, other_root, True)
+        (other_root / 'Configuration.xml').write_text('<x/>')
+        other = ExportInventory(other_root)
+        # Gone from disk: only the inventory taken before still knows the file.
+        (self.root / 'Configuration.xml').unlink()
+        (other_root / 'Configuration.xml').unlink()
+
+        activated, a_restored = threading.Barrier(2, timeout=5), threading.Event()
+        seen = {}
+
+        def build(name, own, own_root, other_root_):
+            previous = inventory.activate(own)
+            activated.wait()
+            if name == 'b':
+                a_restored.wait(timeout=5)
+            seen[name] = (
+                inventory.active() is own,
+                inventory.path_exists(own_root / 'Configuration.xml'),
+                inventory.path_exists(other_root_ / 'Configuration.xml'),
+            )
+            inventory.activate(previous)
+            if name == 'a':
+                a_restored.set()
+            seen[name + '_after'] = inventory.active()
+
+        threads = [
+            threading.Thread(target=build, args=('a', self.inventory, self.root, other_root)),
+            threading.Thread(target=build, args=('b', other, other_root, self.root)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen['a'], (True, True, False))
+        self.assertEqual(seen['b'], (True, True, False))
+        self.assertIsNone(seen['a_after'])
+        self.assertIsNone(seen['b_after'])
+        self.assertIsNone(inventory.active())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Хвост сборки (`_finalize_configuration`): связи и флаги процедур — через справочники в
+памяти и set-based SQL, с разбивкой времени по подстадиям."""
+import sqlite3
+
+import pytest
+
+from admin_tool.db_manager import DatabaseManager
+from admin_tool.db_manager.insert_objects import _InsertState
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'finalize.db'))
+    manager.connect()
+    manager._create_schema()
+    conn = manager.conn
+    conn.executescript('''
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (1, 'CommonModule', 'Регламент');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (2, 'ScheduledJob', 'Очистка');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (3, 'ScheduledJob', 'Обмен');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (4, 'ScheduledJob', 'Чужое');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (5, 'Catalog', 'Номенклатура');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (6, 'Subsystem', 'Продажи');
+        INSERT INTO metadata_objects (id, object_type, name) VALUES (7, 'FunctionalOption', 'Скидки');
+        INSERT INTO modules (id, object_id, module_type, code_id) VALUES (1, 1, 'Module', 1);
+        INSERT INTO module_procedures (id, module_id, name, proc_type, start_line)
+        VALUES (1, 1, 'Очистить', 'Procedure', 1);
+        INSERT INTO module_procedures (id, module_id, name, proc_type, start_line)
+        VALUES (2, 1, 'Обменяться', 'Procedure', 5);
+        INSERT INTO module_procedures (id, module_id, name, proc_type, start_line)
+        VALUES (3, 1, 'НеЗадание', 'Procedure', 9);
+        INSERT INTO scheduled_jobs (object_id, method_name) VALUES (2, 'CommonModule.Регламент.Очистить');
+        INSERT INTO scheduled_jobs (object_id, method_name) VALUES (3, ' CommonModule.Регламент.Обменяться ');
+        INSERT INTO scheduled_jobs (object_id, method_name) VALUES (4, 'Регламент.НеЗадание');
+    ''')
+    yield manager
+    manager.close()
+
+
+def test_scheduled_job_procedures_marked_in_one_update(manager):
+    statements = []
+    manager.conn.set_trace_callback(statements.append)
+    manager._link_scheduled_job_procedures(manager.conn.cursor())
+    manager.conn.set_trace_callback(None)
+
+    flags = dict(manager.conn.execute('SELECT name, used_in_scheduled_job FROM module_procedures'))
+    assert flags == {'Очистить': 1, 'Обменяться': 1, 'НеЗадание': 0}
+    assert sum('UPDATE module_procedures' in sql for sql in statements) == 1
+
+
+def test_finalize_links_relations_and_reports_substages(manager):
+    state = _InsertState('Тест')
+    state.type_name_to_id = {
+        ('CommonModule', 'Регламент'): 1, ('Catalog', 'Номенклатура'): 5,
+        ('Subsystem', 'Продажи'): 6, ('FunctionalOption', 'Скидки'): 7,
+    }
+    state.fo_resolver = {'FunctionalOption.Скидки': 7}
+    state.pending_fo_usage = [
+        ('FunctionalOption.Скидки', 5, None, 'FormItem', 'Поле1', None),
+        ('FunctionalOption.Нет', 5, None, 'FormItem', 'Поле2', None),
+    ]
+    state.relation_objects = [
+        {'type': 'Subsystem', 'name': 'Продажи', 'content_refs': ['Catalog.Номенклатура', 'Catalog.Нет']},
+        {'type': 'FunctionalOption', 'name': 'Скидки',
+         'properties': {'content_refs': ['Catalog.Номенклатура']}},
+    ]
+    messages = []
+    manager._finalize_configuration(
+        manager.conn.cursor(), state, {'name': 'Тест'},
+        progress_callback=lambda current, total, message, **_: messages.append(message),
+    )
+
+    conn = manager.conn
+    conn.row_factory = sqlite3.Row
+    assert [tuple(r) for r in conn.execute(
+        'SELECT functional_option_id, owner_object_id, element_name FROM fo_form_usage'
+    )] == [(7, 5, 'Поле1')]
+    assert [tuple(r) for r in conn.execute(
+        'SELECT src_object_id, dst_object_id, relation_kind, source_detail FROM metadata_relations'
+    )] == [(6, 5, 'subsystem_member', 'Content')]
+    assert [tuple(r) for r in conn.execute(
+        'SELECT functional_option_id, metadata_object_id, content_ref_type FROM fo_content_ref'
+    )] == [(7, 5, 'Object')]
+    assert conn.execute(
+        "SELECT used_in_scheduled_job FROM module_procedures WHERE name = 'Очистить'"
+    ).fetchone()[0] == 1
+
+    summary = messages[-1]
+    assert summary.startswith('Связи — ')
+    for label in ('типы', 'ФО на формах', 'подсистемы', 'подписки', 'состав ФО', 'процедуры', 'типы форм'):
+        assert label in summary
@@ -3,7 +3,12 @@ from pathlib import Path
 
 import pytest
 
-from tests.conftest import METADATA_OBJECTS_DDL, build_configuration_tools
+from tests.conftest import (
+    METADATA_OBJECTS_DDL,
+    ROLE_GRANTS_DDL,
+    build_configuration_tools,
+    insert_role_grant,
+)
 from shared.indexer_version import INDEXER_VERSION
 
 
@@ -70,16 +75,6 @@ def _create_test_db(path: Path) -> None:
             source_name TEXT,
             source_detail TEXT
         );
-        CREATE TABLE role_grants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_object_id INTEGER NOT NULL,
-            target_qname TEXT NOT NULL,
-            target_kind TEXT NOT NULL,
-            parent_object_qname TEXT NOT NULL,
-            right_name TEXT NOT NULL,
-            granted INTEGER,
-            source_db_name TEXT
-        );
         INSERT INTO metadata_objects (id, name, object_type, object_kind)
         VALUES (1, 'Контрагенты', 'Catalog', 'ConfigObject');
         INSERT INTO metadata_objects (id, name, object_type, object_kind)
@@ -110,7 +105,7 @@ def _create_test_db(path: Path) -> None:
         VALUES (1, 2, 'Ссылка');
         INSERT INTO metadata_type_slots (source_table, source_row_id, src_object_id, object_id, ordinal)
         VALUES ('form_attribute_columns', 1, 3, 1, 0);
-    ''')
+    ''' + ROLE_GRANTS_DDL)
     conn.commit()
     conn.close()
 
@@ -222,13 +217,7 @@ def test_find_referencing_relation_kinds_filter(tools_with_db):
         INSERT INTO metadata_objects (id, name, object_type, object_kind)
         VALUES (5, 'РольТест', 'Role', 'ConfigObject')
     ''')
-    conn.execute('''
-        INSERT INTO role_grants (
-            role_object_id, target_qname, target_kind, parent_object_qname,
-            right_name, granted, source_db_name
-        )
-        VALUES (5, 'Catalog.Контрагенты', 'object', 'Catalog.Контрагенты', 'Read', 1, 'Main')
-    ''')
+    insert_role_grant(conn, 5, 'Catalog.Контрагенты', 'Read', source_db_name='Main')
     conn.execute('''
         INSERT INTO metadata_objects (id, name, object_type, object_kind)
         VALUES (6, 'ПодсистемаТест', 'Subsystem', 'ConfigObject')
@@ -11,7 +11,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from shared.indexer_version import INDEXER_VERSION
-from tests.conftest import build_configuration_tools
+from tests.conftest import FORM_EAV_DDL, build_configuration_tools, insert_eav
 
 
 _SCHEMA = '''
@@ -31,13 +31,6 @@ _SCHEMA = '''
     CREATE TABLE form_item_events (
         id INTEGER PRIMARY KEY, item_id INTEGER, event_name TEXT, handler TEXT
     );
-    CREATE TABLE form_entity_properties (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        entity_kind TEXT NOT NULL, entity_id INTEGER NOT NULL,
-        property_path TEXT NOT NULL, property_name TEXT NOT NULL,
-        ordinal INTEGER NOT NULL DEFAULT 0, value_text TEXT, value_type TEXT,
-        UNIQUE(entity_kind, entity_id, property_path, ordinal)
-    );
 '''
 
 _EAV = [
@@ -50,18 +43,14 @@ _EAV = [
 
 
 def _setup(conn):
-    conn.executescript(_SCHEMA)
+    conn.executescript(_SCHEMA + FORM_EAV_DDL)
     conn.execute(
         "INSERT INTO metadata_objects (id, object_type, name) VALUES (1, 'Document', 'ТестДок')"
     )
     conn.execute("INSERT INTO forms (id, object_id, form_name) VALUES (1, 1, 'Форма')")
     conn.execute("INSERT INTO form_items (id, form_id, parent_id, name, item_type) VALUES (1, 1, NULL, 'Список', 'Table')")
-    for path, name, value, vt in _EAV:
-        conn.execute(
-            "INSERT INTO form_entity_properties (entity_kind, entity_id, property_path, property_name, ordinal, value_text, value_type) "
-            "VALUES ('item', 1, ?, ?, 0, ?, ?)",
-            (path, name, value, vt),
-        )
+    for path, _name, value, vt in _EAV:
+        insert_eav(conn, 'item', 1, path, value, value_type=vt)
 
 
 @pytest.fixture
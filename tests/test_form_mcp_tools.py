@@ -8,7 +8,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from tests.conftest import build_configuration_tools
+from tests.conftest import FORM_EAV_DDL, build_configuration_tools, insert_eav
 
 
 def _setup_v12_form_db(conn: sqlite3.Connection) -> None:
@@ -32,13 +32,6 @@ def _setup_v12_form_db(conn: sqlite3.Connection) -> None:
         CREATE TABLE form_items (
             id INTEGER PRIMARY KEY, form_id INTEGER, parent_id INTEGER, name TEXT, item_type TEXT
         );
-        CREATE TABLE form_entity_properties (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            entity_kind TEXT NOT NULL, entity_id INTEGER NOT NULL,
-            property_path TEXT NOT NULL, property_name TEXT NOT NULL,
-            ordinal INTEGER NOT NULL DEFAULT 0, value_text TEXT, value_type TEXT,
-            UNIQUE(entity_kind, entity_id, property_path, ordinal)
-        );
         CREATE TABLE form_commands (
             id INTEGER PRIMARY KEY, form_id INTEGER, name TEXT, title TEXT,
             action TEXT, shortcut TEXT, representation TEXT
@@ -54,16 +47,13 @@ def _setup_v12_form_db(conn: sqlite3.Connection) -> None:
             src_object_id INTEGER, object_id INTEGER, ordinal INTEGER
         );
     ''')
+    conn.executescript(FORM_EAV_DDL)
     conn.execute("INSERT INTO metadata_objects VALUES (1,NULL,'Document','ТестДок',NULL,NULL,NULL,NULL,'ConfigObject',0,NULL,NULL,NULL,NULL)")
     conn.execute("INSERT INTO metadata_objects VALUES (2,NULL,'TypeDescriptor','DynamicList',NULL,NULL,NULL,NULL,'TypeDescriptor',1,'DynamicList',NULL,NULL,NULL)")
     conn.execute('INSERT INTO forms VALUES (1, 1, "ФормаСписка", "List", "", NULL)')
     conn.execute('INSERT INTO form_attributes VALUES (1, 1, "Список", "", 1)')
     query = 'ВЫБРАТЬ Ссылка ИЗ Документ.ТестДок ГДЕ Истина'
-    conn.execute(
-        "INSERT INTO form_entity_properties (entity_kind, entity_id, property_path, property_name, ordinal, value_text, value_type) "
-        "VALUES ('attribute', 1, 'Settings.QueryText', 'QueryText', 0, ?, 'longtext')",
-        (query,),
-    )
+    insert_eav(conn, 'attribute', 1, 'Settings.QueryText', query, value_type='longtext')
     conn.execute(
         "INSERT INTO metadata_type_slots (source_table, source_row_id, src_object_id, object_id, ordinal) "
         "VALUES ('form_attributes', 1, 1, 2, 0)"
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
 import subprocess
 import sys
@@ -167,7 +168,7 @@ def test_rebuild_index_busy(portable_with_source):
     db_path = root / "databases" / "main.db"
     marker = root / "databases" / "main.db.building"
     marker.write_text(
-        json.dumps({"pid": 999999, "started_at": "2026-01-01T00:00:00Z"}),
+        json.dumps({"pid": os.getpid(), "started_at": "2026-01-01T00:00:00Z"}),
         encoding="utf-8",
     )
     (root / "databases" / "main.db.tmp").write_bytes(b"")
@@ -199,6 +200,30 @@ def test_rebuild_all_mixed(mock_build, portable_with_source, tmp_path):
     assert result["summary"]["skipped"] == 1
 
 
+@patch("shared.hub_rebuild.DatabaseManager.build_from_xml_atomic", return_value=True)
+def test_rebuild_all_parallel_keeps_registry_order(mock_build, portable_with_source):
+    root, config_xml = portable_with_source
+    projects = _minimal_projects(str(config_xml), db_id=INFOBASE_ID)
+    projects["projects"][0]["databases"].append(
+        {
+            "id": "db-ext",
+            "name": "Extension",
+            "type": "extension",
+            "db_file": "ext.db",
+            "source_xml": str(config_xml),
+        }
+    )
+    (root / "projects.json").write_text(json.dumps(projects), encoding="utf-8")
+
+    result = run_rebuild_all(root, parallel=2)
+    assert result["success"] is True
+    assert result["summary"]["succeeded"] == 2
+    assert [r["targetId"] for r in result["results"]] == [INFOBASE_ID, "db-ext"]
+    assert mock_build.call_count == 2
+    pools = {id(call.kwargs["worker_pool"].executor) for call in mock_build.call_args_list}
+    assert len(pools) == 1
+
+
 def test_reconcile_markers_removes_stale(portable_with_source):
     root, _ = portable_with_source
     marker = root / "databases" / "main.db.building"
@@ -0,0 +1,158 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from admin_tool.db_manager import DatabaseManager
+from shared.indexer_version import INDEXER_VERSION
+from shared.xml_parser import ConfigurationParser
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+def _objects(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            (row[0], row[1]): (row[2], row[3])
+            for row in conn.execute('SELECT object_type, name, id, comment FROM metadata_objects')
+        }
+    finally:
+        conn.close()
+
+
+class TestIncrementalRebuild(unittest.TestCase):
+    """`rebuild-index --incremental`: only objects whose files changed are re-parsed, they
+    keep their ids, removed objects disappear. Role descriptors without Rights.xml keep the
+    fixture independent of the format library."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.export = self.tmp / 'export'
+        roles_dir = self.export / 'Roles'
+        roles_dir.mkdir(parents=True)
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, roles_dir / descriptor.name)
+        shutil.copy(FIXTURE, self.export / 'Configuration.xml')
+        self.config_xml = self.export / 'Configuration.xml'
+        self.db_path = self.tmp / 'test.db'
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _edit_comment(self, role_name, comment):
+        path = self.export / 'Roles' / f'{role_name}.xml'
+        text = path.read_text(encoding='utf-8-sig')
+        path.write_text(text.replace('<Comment/>', f'<Comment>{comment}</Comment>'), encoding='utf-8')
+
+    def test_full_build_records_fingerprints(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            keys = {(r[0], r[1]) for r in conn.execute('SELECT object_type, name FROM object_sources')}
+        finally:
+            conn.close()
+        self.assertEqual(keys, {key for key in _objects(self.db_path) if key[0] == 'Role'})
+
+    def test_unchanged_export_is_a_no_op(self):
+        before = _objects(self.db_path)
+        summary = DatabaseManager.update_from_xml_atomic(self.db_path, self.config_xml)
+        self.assertEqual(summary['mode'], 'incremental')
+        self.assertEqual(
+            (summary['changed'], summary['added'], summary['deleted'], summary['unchanged']),
+            (0, 0, 0, len(before)),
+        )
+        self.assertEqual(_objects(self.db_path), before)
+
+    def test_changed_added_and_deleted_objects(self):
+        before = _objects(self.db_path)
+        self._edit_comment('ЧтениеЭЛН', 'изменено')
+        (self.export / 'Roles' / 'ЧтениеДанныхБухгалтерии.xml').unlink()
+        new_role = self.export / 'Roles' / 'НоваяРоль.xml'
+        new_role.write_text(
+            (self.export / 'Roles' / 'ФТ_Бюджетирование.xml').read_text(encoding='utf-8-sig')
+            .replace('<Name>ФТ_Бюджетирование</Name>', '<Name>НоваяРоль</Name>'),
+            encoding='utf-8',
+        )
+
+        summary = DatabaseManager.update_from_xml_atomic(self.db_path, self.config_xml)
+
+        self.assertEqual(
+            (summary['mode'], summary['changed'], summary['added'], summary['deleted']),
+            ('incremental', 1, 1, 1),
+        )
+        after = _objects(self.db_path)
+        self.assertEqual(after[('Role', 'ЧтениеЭЛН')], (before[('Role', 'ЧтениеЭЛН')][0], 'изменено'))
+        self.assertNotIn(('Role', 'ЧтениеДанныхБухгалтерии'), after)
+        self.assertIn(('Role', 'НоваяРоль'), after)
+        self.assertEqual(after[('Role', 'ФТ_Бюджетирование')], before[('Role', 'ФТ_Бюджетирование')])
+        self.assertEqual(DatabaseManager.read_db_version(self.db_path), INDEXER_VERSION)
+
+        # Same rows as a full build of the edited export (ids aside).
+        full_db = self.tmp / 'full.db'
+        DatabaseManager.build_from_xml_atomic(full_db, self.config_xml)
+        self.assertEqual(
+            {key: value[1] for key, value in after.items()},
+            {key: value[1] for key, value in _objects(full_db).items()},
+        )
+
+    def test_falls_back_to_full_build_without_fingerprints(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM object_sources')
+        conn.commit()
+        conn.close()
+        summary = DatabaseManager.update_from_xml_atomic(self.db_path, self.config_xml)
+        self.assertEqual(summary['mode'], 'full')
+        self.assertTrue(summary['reason'])
+        self.assertEqual(len(_objects(self.db_path)), 5)
+
+
+class TestSourceFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        (self.tmp / 'Roles').mkdir()
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, self.tmp / 'Roles' / descriptor.name)
+        shutil.copy(FIXTURE, self.tmp / 'Configuration.xml')
+        self.parser = ConfigurationParser(str(self.tmp / 'Configuration.xml'), use_process_pool=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_stat_match_reuses_stored_hash(self):
+        first = self.parser.object_source_fingerprints()
+        key = ('Role', 'ЧтениеЭЛН')
+        stale = {key: (first[key][0], 'stored-hash')}
+        second = self.parser.object_source_fingerprints(previous=stale)
+        self.assertEqual(second[key][1], 'stored-hash')
+
+    def test_matching_fingerprints_hash_only_touched_objects(self):
+        stored = self.parser.object_source_fingerprints()
+        role = sorted((self.tmp / 'Roles').glob('*.xml'))[0]
+        os.utime(role, ns=(0, 0))
+        with mock.patch.object(self.parser, '_content_hash', wraps=self.parser._content_hash) as content_hash:
+            current = self.parser.matching_source_fingerprints(stored)
+        self.assertEqual(content_hash.call_count, 1)
+        self.assertEqual({k: v[1] for k, v in current.items()}, {k: v[1] for k, v in stored.items()})
+        self.assertIsNone(self.parser.matching_source_fingerprints(dict(list(stored.items())[1:])))
+
+        role.write_text(role.read_text(encoding='utf-8-sig') + ' ', encoding='utf-8')
+        self.assertIsNone(self.parser.matching_source_fingerprints(stored))
+
+    def test_hash_ignores_export_location(self):
+        first = self.parser.object_source_fingerprints()
+        moved = self.tmp / 'moved'
+        shutil.copytree(self.tmp / 'Roles', moved / 'Roles')
+        shutil.copy(self.tmp / 'Configuration.xml', moved / 'Configuration.xml')
+        other = ConfigurationParser(str(moved / 'Configuration.xml'), use_process_pool=False)
+        self.assertEqual(
+            {k: v[1] for k, v in first.items()},
+            {k: v[1] for k, v in other.object_source_fingerprints().items()},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
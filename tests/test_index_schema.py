@@ -6,6 +6,7 @@
 """
 import sqlite3
 import sys
+import zlib
 from pathlib import Path
 
 import pytest
@@ -15,7 +16,13 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from admin_tool.db_manager import DatabaseManager
+from admin_tool.db_manager.bsl import _insert_module
+from admin_tool.db_manager.insert_forms import _insert_entity_properties
+from admin_tool.db_manager.row_writer import RowWriter
+from shared.form_eav import ENTITY_KIND_IDS, HOT_PROPERTY_PATH_IDS, VALUE_TYPE_IDS, load_entity_eav
 from shared.indexer_version import INDEXER_VERSION
+from shared.module_code import ModuleCodeCache, code_digest, compress_code, decompress_code
+from server.role_db import fetch_role_layer
 
 NS = ('xmlns="http://v8.1c.ru/8.3/MDClasses" '
       'xmlns:v8="http://v8.1c.ru/8.1/data/core" '
@@ -86,6 +93,116 @@ def test_type_slots_lookup_uses_composite_index(schema_conn):
     assert 'ix_mts_object_source' in plan, plan
 
 
+# --- EAV форм: справочники путей и типов (v25) ---------------------------------------------
+
+def test_hot_property_path_query_uses_its_partial_index(schema_conn):
+    """search_form_properties привязывает id пути параметром — частичный индекс горячего
+    пути подхватывается и так, по значению параметра."""
+    plan = _plan(
+        schema_conn,
+        'SELECT COUNT(*) FROM form_entity_properties WHERE entity_kind = ? AND path_id = ?',
+        (ENTITY_KIND_IDS['item'], HOT_PROPERTY_PATH_IDS['DataPath']),
+    )
+    assert 'ix_fep_path_datapath' in plan, plan
+
+
+def test_query_text_probe_uses_longtext_index(schema_conn):
+    plan = _plan(schema_conn, f'''
+        SELECT id FROM form_entity_properties
+        WHERE value_type_id = {VALUE_TYPE_IDS['longtext']}
+          AND path_id IN (SELECT id FROM form_property_paths WHERE property_name = 'QueryText')
+    ''')
+    assert 'ix_fep_longtext' in plan, plan
+
+
+def test_eav_paths_are_interned_and_decoded(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'eav.db'))
+    manager.connect()
+    manager._create_schema()
+    try:
+        rows = RowWriter(manager.conn.cursor())
+        for entity_id in (1, 2):
+            _insert_entity_properties(rows, 'item', entity_id, [
+                {'property_path': 'DataPath', 'property_name': 'DataPath', 'value_text': f'Поле{entity_id}',
+                 'value_type': 'string'},
+                {'property_path': 'ToolTip.item.content', 'property_name': 'content', 'ordinal': 0,
+                 'value_text': 'Подсказка', 'value_type': 'string'},
+            ])
+        rows.flush()
+        conn = manager.conn
+        paths = dict(conn.execute('SELECT property_path, id FROM form_property_paths').fetchall())
+        assert paths['DataPath'] == HOT_PROPERTY_PATH_IDS['DataPath']
+        assert paths['ToolTip.item.content'] > max(HOT_PROPERTY_PATH_IDS.values())
+        assert conn.execute('SELECT COUNT(DISTINCT path_id) FROM form_entity_properties').fetchone()[0] == 2
+
+        eav = load_entity_eav(conn.cursor(), 'item', [2])
+        assert [(r['property_path'], r['property_name'], r['value_text'], r['value_type']) for r in eav[2]] == [
+            ('DataPath', 'DataPath', 'Поле2', 'string'),
+            ('ToolTip.item.content', 'content', 'Подсказка', 'string'),
+        ]
+    finally:
+        manager.close()
+
+
+def _role_payload(target_qname, right_name, restriction_text):
+    return {
+        'role_settings': None,
+        'role_grants': [
+            {'target_qname': target_qname, 'target_kind': 'attribute', 'parent_object_qname': 'Catalog.Банки',
+             'right_name': right_name, 'granted': True},
+            {'target_qname': 'Catalog.Банки', 'target_kind': 'object', 'parent_object_qname': 'Catalog.Банки',
+             'right_name': 'View', 'granted': False},
+        ],
+        'role_access_restrictions': [
+            {'target_qname': target_qname, 'right_name': right_name, 'field_scope': None,
+             'restriction_text': restriction_text},
+        ],
+        'role_restriction_templates': [],
+    }
+
+
+def test_role_grants_are_interned_and_decoded(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'roles.db'))
+    manager.connect()
+    manager._create_schema()
+    try:
+        rls = 'ГДЕ Организация = &Организация'
+        rows = RowWriter(manager.conn.cursor())
+        for role_id in (1, 2):
+            manager._insert_role_data(rows, role_id, _role_payload('Catalog.Банки.Attribute.Код', 'Read', rls), 'Main')
+        rows.flush()
+        conn = manager.conn
+        assert conn.execute('SELECT COUNT(*) FROM role_restriction_texts').fetchone()[0] == 1
+        assert conn.execute('SELECT COUNT(*) FROM role_qnames').fetchone()[0] == 2
+        assert conn.execute('SELECT COUNT(*) FROM role_sources').fetchone()[0] == 1
+
+        layer = fetch_role_layer(conn.cursor(), 2)
+        assert layer['grants'] == [
+            {'target_qname': 'Catalog.Банки', 'target_kind': 'object', 'parent_object_qname': 'Catalog.Банки',
+             'right_name': 'View', 'granted': False, 'source_db_name': 'Main'},
+            {'target_qname': 'Catalog.Банки.Attribute.Код', 'target_kind': 'attribute',
+             'parent_object_qname': 'Catalog.Банки', 'right_name': 'Read', 'granted': True, 'source_db_name': 'Main'},
+        ]
+        assert layer['access_restrictions'] == [
+            {'target_qname': 'Catalog.Банки.Attribute.Код', 'right_name': 'Read', 'field_scope': None,
+             'restriction_text': rls, 'source_db_name': 'Main'},
+        ]
+
+        conn.execute('DELETE FROM role_access_restrictions')
+        manager._drop_unused_role_texts(conn.cursor())
+        assert conn.execute('SELECT COUNT(*) FROM role_restriction_texts').fetchone()[0] == 0
+    finally:
+        manager.close()
+
+
+def test_roles_for_object_query_uses_parent_index(schema_conn):
+    plan = _plan(schema_conn, '''
+        SELECT rg.role_object_id FROM role_grants rg
+        WHERE rg.parent_id = ? AND rg.granted = 1
+    ''', (1,))
+    assert 'ix_role_grants_parent' in plan, plan
+
+
 # --- A-6/A-7: форма FTS5 -------------------------------------------------------------------
 
 def test_code_search_indexes_only_code(schema_conn):
@@ -98,11 +215,7 @@ def _seed_module(conn, module_id, module_type, code):
         'INSERT INTO metadata_objects (id, object_type, name) VALUES (?, ?, ?)',
         (module_id, 'CommonModule', f'Модуль{module_id}'),
     )
-    conn.execute(
-        'INSERT INTO modules (id, object_id, module_type, code) VALUES (?, ?, ?, ?)',
-        (module_id, module_id, module_type, code),
-    )
-    conn.execute('INSERT INTO code_search (rowid, code) VALUES (?, ?)', (module_id, code))
+    return _insert_module(conn.cursor(), module_id, None, None, module_type, code)
 
 
 @pytest.fixture
@@ -133,19 +246,97 @@ def test_code_word_is_matchable(fts_conn):
     assert [h['rowid'] for h in hits] == [2]
 
 
-def test_rebuild_and_snippet_work(fts_conn):
-    """Контракт external content: колонки FTS обязаны существовать в modules.
-
-    Прежняя схема объявляла object_name, которой в modules нет, — rebuild и snippet()
-    падали с `no such column: T.object_name` (из-за чего рекомендация A-5 аудита
-    2026-07 была неисполнима)."""
-    fts_conn.execute("INSERT INTO code_search(code_search) VALUES ('rebuild')")
+def test_fts_is_contentless_over_module_code(fts_conn):
+    """Код лежит в module_code сжатым, FTS5 его прочитать не может: индекс contentless,
+    rowid = module_code.id, текст ему отдаёт вставка. integrity-check сверяет структуру."""
     fts_conn.execute("INSERT INTO code_search(code_search) VALUES ('integrity-check')")
     row = fts_conn.execute(
-        "SELECT snippet(code_search, 0, '[', ']', '…', 8) AS s "
-        "FROM code_search WHERE code_search MATCH 'ПриОткрытии'"
+        "SELECT m.module_type, mc.code FROM code_search cs "
+        "JOIN module_code mc ON mc.id = cs.rowid JOIN modules m ON m.code_id = mc.id "
+        "WHERE code_search MATCH 'ПриОткрытии'"
     ).fetchone()
-    assert '[ПриОткрытии]' in row['s']
+    assert row['module_type'] == 'FormModule'
+    assert decompress_code(row['code']) == 'Процедура ПриОткрытии()\nКонецПроцедуры'
+
+
+# --- код модулей: один сжатый текст на содержимое ----------------------------------------
+
+def test_duplicate_code_is_stored_and_indexed_once(fts_conn):
+    code = 'Процедура ПриОткрытии()\nКонецПроцедуры'
+    module_id = _seed_module(fts_conn, 3, 'FormModule', code)
+    code_ids = [r[0] for r in fts_conn.execute('SELECT code_id FROM modules ORDER BY id')]
+    assert code_ids == [1, 2, 1]
+    assert fts_conn.execute('SELECT COUNT(*) FROM module_code').fetchone()[0] == 2
+    hits = fts_conn.execute(
+        "SELECT m.id FROM code_search cs JOIN modules m ON m.code_id = cs.rowid "
+        "WHERE code_search MATCH 'ПриОткрытии' ORDER BY m.id"
+    ).fetchall()
+    assert [h[0] for h in hits] == [1, module_id]
+
+
+def test_unused_module_code_is_dropped_with_its_fts_row(fts_conn):
+    """Инкрементальная пересборка удаляет модули объекта, а код — только когда на него
+    больше никто не ссылается (`_drop_unused_module_code`)."""
+    _seed_module(fts_conn, 3, 'FormModule', 'Процедура ПриОткрытии()\nКонецПроцедуры')
+    fts_conn.execute('DELETE FROM modules WHERE object_id IN (1, 2)')
+    DatabaseManager._drop_unused_module_code(fts_conn.cursor())
+    fts_conn.execute("INSERT INTO code_search(code_search) VALUES ('integrity-check')")
+    assert [r[0] for r in fts_conn.execute('SELECT id FROM module_code')] == [1]
+    assert fts_conn.execute(
+        "SELECT rowid FROM code_search WHERE code_search MATCH 'ОбработкаПроведения'"
+    ).fetchall() == []
+    assert [r[0] for r in fts_conn.execute(
+        "SELECT rowid FROM code_search WHERE code_search MATCH 'ПриОткрытии'"
+    )] == [1]
+
+
+def test_module_code_cache_evicts_least_recently_used():
+    texts = {code_digest(t): t for t in ('а' * 40, 'б' * 40, 'в' * 40)}
+    blobs = {d: compress_code(t) for d, t in texts.items()}
+    first, second, third = texts
+    cache = ModuleCodeCache(max_chars=100)
+    assert cache.get(first, blobs[first]) == texts[first]
+    cache.get(second, blobs[second])
+    cache.get(first, b'')  # попадание: распаковки нет, запись становится свежей
+    cache.get(third, blobs[third])
+    assert cache.get(first, b'') == texts[first]
+    with pytest.raises(zlib.error):
+        cache.get(second, b'')  # вытеснена
+
+
+def test_substring_search_decompresses_each_code_once(tmp_path, monkeypatch):
+    """search_code со спецсимволами без триграммного индекса проходит module_code, а не modules:
+    текст, общий для двух модулей, распаковывается один раз на весь вызов."""
+    import shared.module_code as module_code
+    from tests.conftest import build_configuration_tools
+
+    db_path = tmp_path / 'like.db'
+    manager = DatabaseManager(str(db_path))
+    manager.connect()
+    manager._create_schema()
+    shared_code = 'Процедура Открыть()\n    Общий.Вызвать(1);\nКонецПроцедуры'
+    for object_id, code in ((1, shared_code), (2, shared_code), (3, 'Процедура Прочее()\nКонецПроцедуры')):
+        manager.conn.execute(
+            "INSERT INTO metadata_objects (id, object_type, name) VALUES (?, 'Catalog', ?)",
+            (object_id, f'Справочник{object_id}'),
+        )
+        _insert_module(manager.conn.cursor(), object_id, None, None, 'ObjectModule', code)
+    manager.conn.execute(f'PRAGMA user_version = {INDEXER_VERSION}')
+    manager.conn.commit()
+    manager.close()
+
+    decompressed = []
+    real_decompress = module_code.decompress_code
+    monkeypatch.setattr(module_code, 'decompress_code',
+                        lambda blob: decompressed.append(blob) or real_decompress(blob))
+    tools = build_configuration_tools(tmp_path, db_path)
+    tools._require_project_exists = lambda pf, dbs: None
+    result = tools.search_code('Общий.Вызвать(', project_filter='TestProject')
+    tools.close_all()
+
+    matches = result['TestProject']['Main (base)']['matches']
+    assert sorted(m['object_name'] for m in matches) == ['Справочник1', 'Справочник2']
+    assert len(decompressed) == len(set(decompressed)) == 2
 
 
 # --- A-8: ANALYZE в конце сборки -----------------------------------------------------------
@@ -199,3 +390,89 @@ def test_build_leaves_planner_statistics(built_db):
 
 def test_build_stamps_current_indexer_version(built_db):
     assert DatabaseManager.read_db_version(built_db) == INDEXER_VERSION
+
+
+# --- Индексы чтения строятся после загрузки ------------------------------------------------
+
+ROLES_FIXTURE = ROOT / 'tests' / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+def _index_names(conn):
+    return {
+        r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex%'"
+        )
+    }
+
+
+def test_bulk_schema_defers_read_indexes(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'bulk.db'))
+    manager.connect()
+    try:
+        manager._create_schema(read_indexes=False)
+        deferred = _index_names(manager.conn)
+        # Ограничение, на которое опирается вставка дескрипторов типов, — сразу.
+        assert 'uq_metadata_objects_type_descriptor' in deferred
+        for name in ('ix_fep_entity', 'uq_fep_entity_path', 'ix_mts_object_source',
+                     'ix_role_grants_role', 'idx_form_items_form'):
+            assert name not in deferred
+    finally:
+        manager.close()
+
+
+def test_full_build_has_every_schema_index(tmp_path, schema_conn):
+    export = tmp_path / 'export'
+    (export / 'Roles').mkdir(parents=True)
+    for descriptor in ROLES_FIXTURE.parent.glob('Roles/*.xml'):
+        (export / 'Roles' / descriptor.name).write_bytes(descriptor.read_bytes())
+    (export / 'Configuration.xml').write_bytes(ROLES_FIXTURE.read_bytes())
+
+    db_path = tmp_path / 'built.db'
+    messages = []
+    DatabaseManager.build_from_xml_atomic(
+        db_path, export / 'Configuration.xml',
+        progress_callback=lambda current, total, message, **_: messages.append(message),
+    )
+    conn = sqlite3.connect(db_path)
+    try:
+        assert _index_names(conn) == _index_names(schema_conn)
+    finally:
+        conn.close()
+    assert any(m.startswith('Индексы чтения') for m in messages)
+
+
+# --- code_search строится одной фазой после загрузки ---------------------------------------
+
+def _common_module(name, code):
+    return {'type': 'CommonModule', 'name': name, 'uuid': name, 'properties': {},
+            'modules': [{'type': 'Module', 'code': code}]}
+
+
+def test_bulk_code_search_matches_row_by_row_index(tmp_path):
+    objects = [
+        _common_module('Первый', 'Процедура ПриОткрытии()\nКонецПроцедуры'),
+        _common_module('Второй', 'Процедура ОбработкаПроведения()\nКонецПроцедуры'),
+        _common_module('Третий', 'Процедура ПриОткрытии(Отказ)\nКонецПроцедуры'),
+    ]
+    hits = {}
+    for bulk in (False, True):
+        manager = DatabaseManager(str(tmp_path / f'fts_{bulk}.db'))
+        manager.connect()
+        manager._create_schema(read_indexes=not bulk)
+        messages = []
+        manager._insert_configuration(
+            {'name': 'cfg', 'objects': [dict(o, modules=list(o['modules'])) for o in objects]},
+            progress_callback=lambda current, total, message, **_: messages.append(message),
+            bulk_code_search=bulk,
+        )
+        conn = manager.conn
+        conn.execute("INSERT INTO code_search(code_search) VALUES ('integrity-check')")
+        hits[bulk] = [r[0] for r in conn.execute(
+            "SELECT rowid FROM code_search WHERE code_search MATCH 'ПриОткрытии' ORDER BY rowid"
+        )]
+        assert any(m.startswith('Полнотекстовый индекс') for m in messages) == bulk
+        if bulk:
+            # optimize: один сегмент на весь индекс
+            assert conn.execute('SELECT COUNT(DISTINCT segid) FROM code_search_idx').fetchone()[0] == 1
+        manager.close()
+    assert hits[True] == hits[False] == [1, 3]
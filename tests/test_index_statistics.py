@@ -0,0 +1,90 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from admin_tool.db_manager import DatabaseManager
+from shared.index_status import (
+    INDEX_STATISTICS_KEY,
+    index_statistics_summary,
+    read_db_status,
+    read_index_statistics,
+)
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+class TestBuildTimeStatistics(unittest.TestCase):
+    """Statistics are computed once at the end of the build and stored in index_metadata;
+    get_statistics and the hub/server readers return them without scanning the tables."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        # Role descriptors without Rights.xml: the build stays independent of the format library.
+        roles_dir = root / 'export' / 'Roles'
+        roles_dir.mkdir(parents=True)
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, roles_dir / descriptor.name)
+        self.config_xml = root / 'export' / 'Configuration.xml'
+        shutil.copy(FIXTURE, self.config_xml)
+        self.db_path = root / 'stats.db'
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_statistics_are_stored_at_build_time(self):
+        stats = read_index_statistics(self.db_path)
+        self.assertIsNotNone(stats)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(
+                stats['total_objects'], conn.execute('SELECT COUNT(*) FROM metadata_objects').fetchone()[0],
+            )
+            self.assertEqual(stats['total_modules'], conn.execute('SELECT COUNT(*) FROM modules').fetchone()[0])
+        finally:
+            conn.close()
+        self.assertEqual(stats['by_type'].get('Role'), len(list(FIXTURE.parent.glob('Roles/*.xml'))))
+        self.assertGreaterEqual(stats['build_seconds'], 0)
+        for stage in ('objects', 'relations', 'read_indexes', 'analyze', 'statistics'):
+            self.assertIn(stage, stats['stage_seconds'])
+        self.assertGreater(stats['table_bytes']['metadata_objects'], 0)
+
+    def test_get_statistics_reads_the_stored_row(self):
+        db = DatabaseManager(self.db_path)
+        db.connect()
+        try:
+            statements = []
+            db.conn.set_trace_callback(statements.append)
+            stats = db.get_statistics()
+            db.conn.set_trace_callback(None)
+            self.assertFalse([sql for sql in statements if 'COUNT(' in sql])
+            self.assertEqual(stats, read_index_statistics(self.db_path))
+            # Older indexes without the stored row fall back to counting.
+            db.conn.execute('DELETE FROM index_metadata WHERE key = ?', (INDEX_STATISTICS_KEY,))
+            counted = db.get_statistics()
+        finally:
+            db.close()
+        self.assertEqual(counted['total_objects'], stats['total_objects'])
+        self.assertEqual(counted['by_type'], stats['by_type'])
+        self.assertNotIn('table_bytes', counted)
+
+    def test_each_build_writes_a_new_generation(self):
+        first = read_db_status(self.db_path)['build_generation']
+        DatabaseManager.build_from_xml_atomic(self.db_path, self.config_xml)
+        second = read_db_status(self.db_path)['build_generation']
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertNotEqual(first, second)
+
+    def test_hub_summary(self):
+        summary = index_statistics_summary(self.db_path)
+        self.assertEqual(summary['totalObjects'], read_index_statistics(self.db_path)['total_objects'])
+        self.assertIn('objects', summary['stageSeconds'])
+        self.assertIsNone(index_statistics_summary(Path(self.tmp.name) / 'missing.db'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,3 +50,48 @@ def test_format_last_updated_local_converts_tz():
     formatted = format_last_updated_local(iso)
     assert len(formatted) == 16  # DD.MM.YYYY HH:MM
     assert formatted[2] == "." and formatted[5] == "."
+
+
+def _make_db(path, user_version):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {user_version}")
+    conn.execute("CREATE TABLE IF NOT EXISTS index_metadata (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR REPLACE INTO index_metadata VALUES ('extension_purpose', 'Customization')")
+    conn.commit()
+    conn.close()
+
+
+def test_read_db_status_reopens_only_changed_files(tmp_path, monkeypatch):
+    from shared import index_status
+    from shared.db_build_state import clear_building, mark_building
+
+    reads = []
+    original = index_status._read_status_from_file
+    monkeypatch.setattr(
+        index_status, "_read_status_from_file", lambda p: reads.append(p) or original(p)
+    )
+    db_path = tmp_path / "main.db"
+    _make_db(db_path, 1)
+
+    assert index_status.read_db_status(db_path)["extension_purpose"] == "Customization"
+    assert index_status.read_db_user_version(db_path) == 1
+    assert index_status.is_index_outdated(db_path)
+    assert len(reads) == 1
+
+    # Atomic replace (new inode) — the status is read again.
+    tmp_db = tmp_path / "main.db.tmp"
+    _make_db(tmp_db, INDEXER_VERSION)
+    os.replace(tmp_db, db_path)
+    assert index_status.read_db_user_version(db_path) == INDEXER_VERSION
+    assert len(reads) == 2
+
+    # The .building marker is part of the key.
+    mark_building(db_path)
+    index_status.read_db_status(db_path)
+    clear_building(db_path)
+    index_status.read_db_status(db_path)
+    assert len(reads) == 4
+
+    db_path.unlink()
+    assert index_status.read_db_status(db_path) is None
+    assert index_status.read_db_user_version(db_path) is None
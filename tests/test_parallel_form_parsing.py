@@ -136,6 +136,24 @@ class TestParallelFormParsing(unittest.TestCase):
         self.assertEqual(len(pool_parser.skipped_form_modules), 1)
         self.assertIn('ФормаСПлохимМодулем', pool_parser.skipped_form_modules[0]['path'])
 
+    def test_object_pool_matches_form_only_pool(self):
+        """parse_objects_in_pool: the whole _parse_object runs in a worker — same objects, same
+        skipped-lists as the forms-only pool; worker timings land in worker_stage_seconds."""
+        forms_parser = ConfigurationParser(
+            str(self.config_xml), use_process_pool=True, parse_objects_in_pool=False,
+        )
+        forms_data = forms_parser.parse()
+
+        objects_parser = ConfigurationParser(str(self.config_xml), use_process_pool=True)
+        objects_data = objects_parser.parse()
+
+        self.assertEqual(forms_data, objects_data)
+        self.assertEqual(forms_parser.skipped_forms, objects_parser.skipped_forms)
+        self.assertEqual(forms_parser.skipped_form_modules, objects_parser.skipped_form_modules)
+        self.assertEqual(forms_parser.worker_stage_seconds, {})
+        if objects_parser.stage_seconds.get('objects') is not None:  # pool ran (more than one CPU)
+            self.assertIn('forms', objects_parser.worker_stage_seconds)
+
     def test_pool_is_torn_down_even_on_error(self):
         """If parse() raises, the pool must still be shut down (no leaked worker processes)."""
         broken_config = self.tmp / 'BadConfiguration.xml'
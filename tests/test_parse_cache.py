@@ -0,0 +1,172 @@
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import types
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+from shared.xml_parser import parse_cache
+from shared.xml_parser.parse_cache import ParseCache, activate, cached_call
+
+
+class _Planted:
+    """What a planted entry would do on load: call an arbitrary function."""
+
+    def __reduce__(self):
+        return os.getcwd, ()
+
+
+class _CallEngine:
+    def __reduce__(self):
+        return sys.modules['onec_metadata_schema.model'].helper, ()
+
+
+class TestParseCache(unittest.TestCase):
+    """Disk LRU of format-engine results. The engine fingerprint is pinned so the tests do not
+    need the format library."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        patcher = mock.patch.object(parse_cache, '_engine_fingerprint', return_value='engine-1')
+        self.engine = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        activate(None)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_hit_skips_compute(self):
+        cache = ParseCache(self.tmp)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'items': [1, 2, 3]}
+
+        self.assertEqual(cache.get_or_compute('form', b'<Form/>', compute), {'items': [1, 2, 3]})
+        second = ParseCache(self.tmp)  # a fresh process/build sees the same entry
+        self.assertEqual(second.get_or_compute('form', b'<Form/>', compute), {'items': [1, 2, 3]})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_key_covers_bytes_kind_and_engine(self):
+        cache = ParseCache(self.tmp)
+        cache.get_or_compute('form', b'a', lambda: 'form-a')
+        self.assertEqual(cache.get_or_compute('form', b'b', lambda: 'form-b'), 'form-b')
+        self.assertEqual(cache.get_or_compute('rights', b'a', lambda: 'rights-a'), 'rights-a')
+        self.engine.return_value = 'engine-2'
+        fresh = ParseCache(self.tmp)
+        self.assertEqual(fresh.get_or_compute('form', b'a', lambda: 'form-a v2'), 'form-a v2')
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ParseCache(self.tmp)
+        cache.get_or_compute('form', b'x', lambda: 'value')
+        entry = next(self.tmp.rglob('*.pkl'))
+        entry.write_bytes(b'not zlib')
+        self.assertEqual(ParseCache(self.tmp).get_or_compute('form', b'x', lambda: 'recomputed'), 'recomputed')
+
+    def test_entry_with_foreign_globals_is_a_miss(self):
+        cache = ParseCache(self.tmp)
+        cache.get_or_compute('form', b'x', lambda: 'value')
+        entry = next(self.tmp.rglob('*.pkl'))
+        entry.write_bytes(zlib.compress(pickle.dumps(_Planted())))
+        with mock.patch.object(os, 'getcwd') as planted_call:
+            value = ParseCache(self.tmp).get_or_compute('form', b'x', lambda: 'recomputed')
+        self.assertEqual(value, 'recomputed')
+        planted_call.assert_not_called()
+
+    def test_engine_classes_round_trip(self):
+        engine = types.ModuleType('onec_metadata_schema.model')
+        engine.Node = type('Node', (), {'__module__': 'onec_metadata_schema.model'})
+        engine.helper = lambda: 'called'
+        engine.helper.__module__, engine.helper.__qualname__ = 'onec_metadata_schema.model', 'helper'
+        node = engine.Node()
+        node.children = [{'name': 'Товары', 'tags': {1, 2}}]
+        package = types.ModuleType('onec_metadata_schema')
+        package.model = engine
+        modules = {'onec_metadata_schema': package, 'onec_metadata_schema.model': engine}
+        with mock.patch.dict(sys.modules, modules):
+            ParseCache(self.tmp).get_or_compute('descriptor', b'x', lambda: node)
+            value = ParseCache(self.tmp).get_or_compute('descriptor', b'x', lambda: 'recomputed')
+            self.assertIsInstance(value, engine.Node)
+            self.assertEqual(value.children, node.children)
+            # Only classes: a function of the engine package is refused too.
+            with self.assertRaises(pickle.UnpicklingError):
+                parse_cache._EngineUnpickler(io.BytesIO(pickle.dumps(_CallEngine()))).load()
+
+    def test_threads_write_through_their_own_temp_files(self):
+        cache = ParseCache(self.tmp)
+        temp_files = []
+        original_open = open
+
+        def recording_open(file, mode='r', *args, **kwargs):
+            if 'w' in mode:
+                temp_files.append(Path(file).name)
+            return original_open(file, mode, *args, **kwargs)
+
+        both_running = threading.Barrier(2)  # live threads never share an ident
+
+        def store():
+            both_running.wait()
+            cache._store(cache._entry_path('descriptor', b'shared base'), {'name': 'Товары'})
+
+        with mock.patch('builtins.open', recording_open):
+            threads = [threading.Thread(target=store) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(set(temp_files)), 2)
+        self.assertEqual(ParseCache(self.tmp).get_or_compute('descriptor', b'shared base', lambda: None),
+                         {'name': 'Товары'})
+
+    def test_trim_evicts_least_recently_used(self):
+        cache = ParseCache(self.tmp)
+        for i in range(4):
+            cache.get_or_compute('form', bytes([i]), lambda i=i: 'v' * 1000 + str(i))
+        entries = sorted(self.tmp.rglob('*.pkl'))
+        for age, path in enumerate(entries):
+            os.utime(path, (1_000_000 + age, 1_000_000 + age))
+        newest = entries[-1]
+        cache.max_bytes = newest.stat().st_size
+        stats = cache.trim()
+        self.assertEqual(stats['evicted'], 3)
+        self.assertEqual(list(self.tmp.rglob('*.pkl')), [newest])
+
+    def test_cached_call_without_active_cache_just_computes(self):
+        activate(None)
+        self.assertEqual(cached_call('form', b'x', lambda: 42), 42)
+        self.assertEqual(list(self.tmp.rglob('*')), [])
+
+        activate(ParseCache(self.tmp))
+        cached_call('form', b'x', lambda: 42)
+        self.assertEqual(len(list(self.tmp.rglob('*.pkl'))), 1)
+
+    def test_active_cache_is_per_thread(self):
+        """Concurrent builds share a process: a build on another thread neither sees nor
+        replaces this thread's cache."""
+        mine = ParseCache(self.tmp)
+        activate(mine)
+        seen = []
+
+        def other_build():
+            seen.append(parse_cache.active())
+            previous = activate(ParseCache(self.tmp / 'other'))
+            activate(previous)
+            seen.append(parse_cache.active())
+
+        thread = threading.Thread(target=other_build)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [None, None])
+        self.assertIs(parse_cache.active(), mine)
+
+
+if __name__ == '__main__':
+    unittest.main()
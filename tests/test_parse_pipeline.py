@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+
+from admin_tool.db_manager.pipeline import ParsePipeline
+
+
+class TestParsePipeline(unittest.TestCase):
+    """Parse → insert pipeline: order, back-pressure, errors and shutdown."""
+
+    def test_yields_objects_in_order(self):
+        pipeline = ParsePipeline(iter(range(100)), depth=4)
+        try:
+            self.assertEqual(list(pipeline), list(range(100)))
+        finally:
+            pipeline.close()
+
+    def test_parser_runs_at_most_depth_ahead(self):
+        produced = []
+
+        def source():
+            for i in range(50):
+                produced.append(i)
+                yield i
+
+        pipeline = ParsePipeline(source(), depth=3)
+        try:
+            items = iter(pipeline)
+            self.assertEqual(next(items), 0)
+            time.sleep(0.3)  # give the parser time to run ahead
+            # depth in the queue + one object parsed and waiting to be put
+            self.assertLessEqual(len(produced), 1 + 3 + 1)
+            self.assertEqual(list(items), list(range(1, 50)))
+        finally:
+            pipeline.close()
+
+    def test_parse_error_reaches_the_writer(self):
+        def source():
+            yield 1
+            raise ValueError('bad descriptor')
+
+        pipeline = ParsePipeline(source())
+        try:
+            items = iter(pipeline)
+            self.assertEqual(next(items), 1)
+            with self.assertRaisesRegex(ValueError, 'bad descriptor'):
+                next(items)
+        finally:
+            pipeline.close()
+
+    def test_close_stops_the_parser_and_closes_the_source(self):
+        closed = threading.Event()
+
+        def source():
+            try:
+                i = 0
+                while True:
+                    yield i
+                    i += 1
+            finally:
+                closed.set()
+
+        pipeline = ParsePipeline(source(), depth=2)
+        self.assertEqual(next(iter(pipeline)), 0)
+        pipeline.close()
+        self.assertTrue(closed.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from admin_tool.db_manager import DatabaseManager
+from shared.xml_parser import ConfigurationParser, WorkerPool
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
+
+
+class TestScheduleByCost(unittest.TestCase):
+    """`_schedule_by_cost`: results in task order, the most expensive task within the horizon
+    goes to the pool first, never more than the window in flight."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        (self.tmp / 'Configuration.xml').write_text('<x/>', encoding='utf-8')
+        self.parser = ConfigurationParser(str(self.tmp / 'Configuration.xml'), use_process_pool=False)
+        self.parser._pool_window = 2
+        self.parser._pool_horizon = 8
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _run(self, costs):
+        submitted = []
+        in_flight_peak = []
+
+        def submit(task):
+            submitted.append(task)
+            return task
+
+        delivered = []
+        for result in self.parser._schedule_by_cost([(cost, i) for i, cost in enumerate(costs)], submit):
+            in_flight_peak.append(len(submitted) - len(delivered))
+            delivered.append(result)
+        return submitted, delivered, max(in_flight_peak)
+
+    def test_output_order_is_kept(self):
+        costs = [1, 5, 1, 100, 1, 1, 7, 1, 1, 1]
+        submitted, delivered, peak = self._run(costs)
+        self.assertEqual(delivered, list(range(len(costs))))
+        self.assertEqual(sorted(submitted), list(range(len(costs))))
+        self.assertLessEqual(peak, self.parser._pool_window)
+
+    def test_straggler_starts_early(self):
+        costs = [1] * 6 + [1000] + [1] * 3
+        submitted, _delivered, _peak = self._run(costs)
+        # The head goes first, the giant right after — not when the window reaches it.
+        self.assertEqual(submitted[:2], [0, 6])
+
+    def test_equal_costs_submit_in_order(self):
+        submitted, _delivered, _peak = self._run([0] * 12)
+        self.assertEqual(submitted, list(range(12)))
+
+
+class TestObjectParseCost(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        for form, size in (('ФормаЭлемента', 300), ('ФормаСписка', 50)):
+            ext = self.tmp / 'Documents' / 'Заказ' / 'Forms' / form / 'Ext'
+            ext.mkdir(parents=True)
+            (ext / 'Form.xml').write_bytes(b'x' * size)
+        (self.tmp / 'CommonForms' / 'Общая' / 'Ext').mkdir(parents=True)
+        (self.tmp / 'CommonForms' / 'Общая' / 'Ext' / 'Form.xml').write_bytes(b'x' * 70)
+        (self.tmp / 'Configuration.xml').write_text('<x/>', encoding='utf-8')
+        self.parser = ConfigurationParser(str(self.tmp / 'Configuration.xml'), use_process_pool=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_cost_is_form_bytes_from_inventory(self):
+        self.assertEqual(self.parser._object_parse_cost('Заказ', 'Document', 'Documents'), 0)
+        self.parser._export_inventory()
+        self.assertEqual(self.parser._object_parse_cost('Заказ', 'Document', 'Documents'), 350)
+        self.assertEqual(self.parser._object_parse_cost('Общая', 'CommonForm', 'CommonForms'), 70)
+        self.assertEqual(self.parser._object_parse_cost('Нет', 'Catalog', 'Catalogs'), 0)
+
+
+class TestSharedWorkerPool(unittest.TestCase):
+    """A caller-owned `WorkerPool` serves several builds in a row and outlives them."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.exports = []
+        for name in ('base', 'other'):
+            export = self.tmp / name
+            (export / 'Roles').mkdir(parents=True)
+            for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+                shutil.copy(descriptor, export / 'Roles' / descriptor.name)
+            shutil.copy(FIXTURE, export / 'Configuration.xml')
+            self.exports.append(export / 'Configuration.xml')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    @staticmethod
+    def _roles(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            return sorted(row[0] for row in conn.execute("SELECT name FROM metadata_objects WHERE object_type = 'Role'"))
+        finally:
+            conn.close()
+
+    def test_builds_share_the_pool(self):
+        expected_db = self.tmp / 'expected.db'
+        DatabaseManager.build_from_xml_atomic(expected_db, self.exports[0])
+        with WorkerPool(workers=2) as pool:
+            executor = pool.executor
+            for i, config_xml in enumerate(self.exports):
+                db_path = self.tmp / f'{i}.db'
+                DatabaseManager.build_from_xml_atomic(db_path, config_xml, worker_pool=pool)
+                self.assertIs(pool.executor, executor)
+                self.assertEqual(self._roles(db_path), self._roles(expected_db))
+            # Still usable after the builds: the parser did not shut it down.
+            self.assertEqual(executor.submit(sum, (1, 2)).result(), 3)
+        self.assertIsNone(pool.executor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Кэш результатов инструментов (server/result_cache.py): ключ по поколению сборки баз,
+LRU в памяти с бюджетом в байтах, дисковый уровень с атомарной записью."""
+import asyncio
+import sqlite3
+
+from server.dispatch import handle_active_databases
+from server.result_cache import (
+    CACHE_HIT_DISK,
+    CACHE_HIT_MEMORY,
+    CACHE_MISS,
+    RESULT_CACHE_DISK_ENV,
+    ToolResultCache,
+    result_cache_disk_dir,
+    result_cache_key,
+)
+from shared.index_status import INDEX_GENERATION_KEY
+from tests.conftest import METADATA_OBJECTS_DDL, build_configuration_tools, create_test_db
+
+GENERATION = (('TestProject', 'Main', 'base', '/db/main.db', 'g1', 26, False),)
+
+
+def test_key_ignores_correlation_fields_and_tracks_generation():
+    args = {'object_name': 'Контрагенты', 'project_filter': 'ТГ'}
+    key = result_cache_key('get_object_structure', args, GENERATION)
+    assert key == result_cache_key(
+        'get_object_structure',
+        {'project_filter': 'ТГ', 'object_name': 'Контрагенты', 'task_id': 'T-1', 'sections': None},
+        GENERATION,
+    )
+    rebuilt = (GENERATION[0][:4] + ('g2',) + GENERATION[0][5:],)
+    assert key != result_cache_key('get_object_structure', args, rebuilt)
+    assert key != result_cache_key('find_object', args, GENERATION)
+
+
+def test_memory_tier_is_lru_within_byte_budget():
+    cache = ToolResultCache(max_bytes=10)
+    cache.put('a', ['12345'])
+    cache.put('b', ['12345'])
+    assert cache.get('a') == (['12345'], CACHE_HIT_MEMORY)
+    cache.put('c', ['12345'])  # evicts b — a was used more recently
+    assert cache.get('b') == (None, CACHE_MISS)
+    assert cache.get('a')[1] == CACHE_HIT_MEMORY
+    cache.put('huge', ['x' * 11])
+    assert cache.get('huge') == (None, CACHE_MISS)
+    counters = cache.counters()
+    assert (counters['hits_memory'], counters['misses']) == (2, 2)
+    assert counters['bytes'] <= 10
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    disk = tmp_path / 'result-cache'
+    ToolResultCache(disk_dir=disk).put('k', ['ответ'])
+    assert [p.name for p in disk.iterdir()] == ['k.json']
+
+    restarted = ToolResultCache(disk_dir=disk)
+    assert restarted.get('k') == (['ответ'], CACHE_HIT_DISK)
+    assert restarted.get('k') == (['ответ'], CACHE_HIT_MEMORY)
+
+
+def test_disk_tier_prunes_oldest(tmp_path):
+    cache = ToolResultCache(disk_dir=tmp_path, max_disk_bytes=70)  # ~33 bytes per file
+    for key in ('a', 'b', 'c'):
+        cache.put(key, ['x' * 20])
+    cache.prune_disk()
+    assert sorted(p.name for p in tmp_path.glob('*.json')) == ['b.json', 'c.json']
+
+
+def test_disk_tier_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv(RESULT_CACHE_DISK_ENV, raising=False)
+    assert result_cache_disk_dir(tmp_path) is None
+    monkeypatch.setenv(RESULT_CACHE_DISK_ENV, '1')
+    assert result_cache_disk_dir(tmp_path) == tmp_path / 'result-cache'
+
+
+def test_active_databases_reports_cache_counters(tmp_path):
+    db_path = tmp_path / 'test.db'
+    create_test_db(db_path, METADATA_OBJECTS_DDL)
+    tools = build_configuration_tools(tmp_path, db_path)
+    try:
+        assert 'result_cache' not in tools.list_active_databases()
+        tools.result_cache = ToolResultCache()
+        tools.result_cache.put('k', ['ответ'])
+        tools.result_cache.get('k')
+        tools.result_cache.get('other')
+        assert tools.list_active_databases()['result_cache']['hits_memory'] == 1
+        text = asyncio.run(handle_active_databases(tools, {}))[0].text
+        assert 'Кэш ответов: попаданий 1 (память) + 0 (диск), промахов 1, записей 1' in text
+    finally:
+        tools.close_all()
+
+
+def test_generation_token_requires_a_build_generation(tmp_path):
+    db_path = tmp_path / 'test.db'
+    create_test_db(db_path, METADATA_OBJECTS_DDL + '''
+        CREATE TABLE index_metadata (key TEXT PRIMARY KEY, value TEXT);
+    ''')
+    tools = build_configuration_tools(tmp_path, db_path)
+    tools.pm.get_active_databases = lambda: [{
+        'project_name': 'TestProject', 'db_name': 'Main', 'db_type': 'base', 'db_path': str(db_path),
+    }]
+    try:
+        assert tools.build_generation_token() is None
+        conn = sqlite3.connect(db_path)
+        conn.execute('INSERT INTO index_metadata VALUES (?, ?)', (INDEX_GENERATION_KEY, 'g1'))
+        conn.commit()
+        conn.close()
+        token = tools.build_generation_token()
+        assert token[0][:5] == ('TestProject', 'Main', 'base', str(db_path), 'g1')
+    finally:
+        tools.close_all()
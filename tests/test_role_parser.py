@@ -1,11 +1,15 @@
+import concurrent.futures
+import shutil
 import sqlite3
 import tempfile
 import unittest
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from unittest import mock
 
 from admin_tool.db_manager import DatabaseManager
 from shared.indexer_version import INDEXER_VERSION
-from shared.xml_parser import ConfigurationParser
+from shared.xml_parser import ConfigurationParser, WorkerPool
 from shared.xml_parser.role_qname import classify_target_qname
 
 FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
@@ -115,5 +119,77 @@ class TestRoleIndexFixture(unittest.TestCase):
             conn.close()
 
 
+class TestRolePoolParsing(unittest.TestCase):
+    """Roles go through the process pool (_parse_role_worker) with the same window as child
+    objects: same entries, same order, broken descriptors still skipped. Roles without
+    Rights.xml keep the fixture independent of the format library."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        roles_dir = self.tmp / 'Roles'
+        roles_dir.mkdir()
+        for descriptor in sorted(FIXTURE.parent.glob('Roles/*.xml')):
+            shutil.copy(descriptor, roles_dir / descriptor.name)
+        (roles_dir / 'СломаннаяРоль.xml').write_text('<not valid xml', encoding='utf-8')
+        shutil.copy(FIXTURE, self.tmp / 'Configuration.xml')
+        self.config_xml = self.tmp / 'Configuration.xml'
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_pool_matches_sequential(self):
+        seq_parser = ConfigurationParser(str(self.config_xml), use_process_pool=False)
+        seq_roles = _roles(seq_parser.parse())
+
+        with mock.patch('shared.xml_parser.core.os.cpu_count', return_value=3):
+            pool_parser = ConfigurationParser(str(self.config_xml), use_process_pool=True)
+            pool_roles = _roles(pool_parser.parse())
+
+        self.assertEqual(seq_roles, pool_roles)
+        self.assertEqual(len(pool_roles), len(list(FIXTURE.parent.glob('Roles/*.xml'))))
+        self.assertIn('roles', pool_parser.stage_seconds)
+        self.assertIn('roles', pool_parser.worker_stage_seconds)
+        self.assertEqual(seq_parser.worker_stage_seconds, {})
+        self.assertIsNone(pool_parser._form_pool)
+
+    def test_broken_pool_finishes_in_process(self):
+        """A worker killed mid-build breaks the shared executor: the build finishes its tasks
+        in-process instead of failing, and flags the pool for a reset."""
+        seq_roles = _roles(ConfigurationParser(str(self.config_xml), use_process_pool=False).parse())
+
+        with WorkerPool(workers=1) as pool:
+            pool.workers = 3
+            pool.executor = _BrokenExecutor()
+            view = pool.share(2)
+            parser = ConfigurationParser(str(self.config_xml), worker_pool=view)
+            self.assertEqual(_roles(parser.parse()), seq_roles)
+            self.assertTrue(pool.broken)
+            self.assertGreater(pool.executor.submits, 0)
+
+            pool.executor = _BrokenExecutor()
+            pool._broken = False  # what reset() leaves behind
+            view.mark_broken()  # a late report about the replaced executor
+            self.assertFalse(pool.broken)
+            pool.executor = None
+
+
+class _BrokenExecutor:
+    """Executor whose worker died: the first task fails, later submits are refused."""
+
+    def __init__(self):
+        self.submits = 0
+
+    def submit(self, *args, **kwargs):
+        self.submits += 1
+        if self.submits > 1:
+            raise BrokenProcessPool('refused')
+        future = concurrent.futures.Future()
+        future.set_exception(BrokenProcessPool('worker died'))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
 if __name__ == '__main__':
     unittest.main()
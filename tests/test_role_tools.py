@@ -7,6 +7,7 @@ from pathlib import Path
 
 from admin_tool.db_manager import DatabaseManager
 from server.tools import ConfigurationTools
+from tests.conftest import insert_role_grant
 
 FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'roles' / 'Configuration.xml'
 
@@ -135,13 +136,7 @@ class TestFindRolesForObjectMerge(unittest.TestCase):
                 INSERT INTO metadata_objects (id, name, object_type, object_kind)
                 VALUES (100, 'ФТ_ТолькоВРасширении', 'Role', 'ConfigObject')
             ''')
-            conn.execute('''
-                INSERT INTO role_grants (
-                    role_object_id, target_qname, target_kind, parent_object_qname,
-                    right_name, granted, source_db_name
-                )
-                VALUES (100, 'Catalog.БанковскиеСчета', 'object', 'Catalog.БанковскиеСчета', 'Read', 1, 'RolesFixture')
-            ''')
+            insert_role_grant(conn, 100, 'Catalog.БанковскиеСчета', 'Read', source_db_name='RolesFixture')
             conn.commit()
             conn.close()
 
@@ -0,0 +1,62 @@
+import sqlite3
+import unittest
+
+from admin_tool.db_manager.row_writer import RowWriter
+
+_SCHEMA = '''
+    CREATE TABLE parents (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+    CREATE TABLE children (id INTEGER PRIMARY KEY AUTOINCREMENT, parent_id INTEGER, name TEXT);
+'''
+_PARENT = 'INSERT INTO parents (id, name) VALUES (?, ?)'
+_CHILD = 'INSERT INTO children (parent_id, name) VALUES (?, ?)'
+
+
+class TestRowWriter(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.executescript(_SCHEMA)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _rows(self, table):
+        return self.conn.execute(f'SELECT * FROM {table} ORDER BY id').fetchall()
+
+    def test_ids_match_what_autoincrement_would_assign(self):
+        self.conn.execute("INSERT INTO parents (name) VALUES ('old')")
+        self.conn.execute("DELETE FROM parents")  # sqlite_sequence keeps 1: the next id is 2
+        rows = RowWriter(self.conn.cursor())
+        first = rows.insert_id('parents', _PARENT, ('a',))
+        second = rows.insert_id('parents', _PARENT, ('b',))
+        rows.insert(_CHILD, (second, 'b1'))
+        self.assertEqual((first, second), (2, 3))
+        self.assertEqual(self._rows('parents'), [])  # nothing written before flush
+
+        rows.flush()
+        self.assertEqual(self._rows('parents'), [(2, 'a'), (3, 'b')])
+        self.assertEqual(self._rows('children'), [(1, 3, 'b1')])
+
+    def test_preassigned_id_does_not_advance_the_counter(self):
+        rows = RowWriter(self.conn.cursor())
+        self.assertEqual(rows.insert_id('parents', _PARENT, ('kept',), row_id=40), 40)
+        self.assertEqual(rows.insert_id('parents', _PARENT, ('new',)), 1)
+        rows.flush()
+        self.assertEqual(self._rows('parents'), [(1, 'new'), (40, 'kept')])
+
+    def test_flushes_when_batch_weight_is_reached(self):
+        rows = RowWriter(self.conn.cursor(), flush_weight=3)
+        rows.insert_many(_CHILD, [(1, 'x'), (1, 'y')])
+        self.assertEqual(self._rows('children'), [])
+        rows.insert(_CHILD, (1, 'z'))
+        self.assertEqual(len(self._rows('children')), 3)
+
+    def test_plain_cursor_writes_immediately(self):
+        cursor = self.conn.cursor()
+        rows = RowWriter.of(cursor)
+        self.assertIs(RowWriter.of(rows), rows)
+        rows.insert_id('parents', _PARENT, ('a',))
+        self.assertEqual(self._rows('parents'), [(1, 'a')])
+
+
+if __name__ == '__main__':
+    unittest.main()
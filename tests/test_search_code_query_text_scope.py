@@ -9,7 +9,8 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from tests.conftest import build_configuration_tools
+from shared.module_code import code_digest, compress_code
+from tests.conftest import FORM_EAV_DDL, build_configuration_tools, insert_eav
 
 _SCHEMA = '''
     CREATE TABLE metadata_objects (
@@ -18,9 +19,12 @@ _SCHEMA = '''
         object_kind TEXT NOT NULL DEFAULT 'ConfigObject', is_primitive INTEGER NOT NULL DEFAULT 0,
         base_type TEXT, qualifier_1 TEXT, qualifier_2 TEXT, qualifier_3 TEXT
     );
+    CREATE TABLE module_code (
+        id INTEGER PRIMARY KEY, hash BLOB NOT NULL UNIQUE, code BLOB NOT NULL
+    );
     CREATE TABLE modules (
         id INTEGER PRIMARY KEY, object_id INTEGER, form_id INTEGER, command_id INTEGER,
-        module_type TEXT, code TEXT
+        module_type TEXT, code_id INTEGER
     );
     CREATE TABLE module_procedures (
         id INTEGER PRIMARY KEY, module_id INTEGER, name TEXT, proc_type TEXT,
@@ -35,32 +39,30 @@ _SCHEMA = '''
     CREATE TABLE form_attributes (
         id INTEGER PRIMARY KEY, form_id INTEGER, name TEXT, title TEXT, is_main INTEGER DEFAULT 0
     );
-    CREATE TABLE form_entity_properties (
-        id INTEGER PRIMARY KEY, entity_kind TEXT NOT NULL, entity_id INTEGER NOT NULL,
-        property_path TEXT NOT NULL, property_name TEXT NOT NULL, ordinal INTEGER NOT NULL DEFAULT 0,
-        value_text TEXT, value_type TEXT
-    );
-    CREATE VIRTUAL TABLE code_search USING fts5(code, content='modules', content_rowid='id');
+    CREATE VIRTUAL TABLE code_search USING fts5(code, content='');
 '''
 
 
 def _setup(conn):
-    conn.executescript(_SCHEMA)
+    conn.executescript(_SCHEMA + FORM_EAV_DDL)
     conn.execute(
         "INSERT INTO metadata_objects (id, object_type, name, object_kind) "
         "VALUES (1, 'Catalog', 'Товары', 'ConfigObject')"
     )
+    code = 'Процедура Тест() КонецПроцедуры'
     conn.execute(
-        "INSERT INTO modules (id, object_id, module_type, code) "
-        "VALUES (1, 1, 'ObjectModule', 'Процедура Тест() КонецПроцедуры')"
+        "INSERT INTO module_code (id, hash, code) VALUES (1, ?, ?)",
+        (code_digest(code), compress_code(code)),
     )
-    conn.execute("INSERT INTO forms (id, object_id, form_name) VALUES (1, 1, 'ФормаСписка')")
-    conn.execute("INSERT INTO form_attributes (id, form_id, name) VALUES (1, 1, 'Список')")
+    conn.execute("INSERT INTO code_search (rowid, code) VALUES (1, ?)", (code,))
     conn.execute(
-        "INSERT INTO form_entity_properties (entity_kind, entity_id, property_path, property_name, value_text) "
-        "VALUES ('attribute', 1, 'Settings.QueryText', 'QueryText', 'ВЫБРАТЬ Тест ИЗ Справочник.Товары')"
+        "INSERT INTO modules (id, object_id, module_type, code_id) "
+        "VALUES (1, 1, 'ObjectModule', 1)"
     )
-    conn.execute("INSERT INTO code_search(code_search) VALUES ('rebuild')")
+    conn.execute("INSERT INTO forms (id, object_id, form_name) VALUES (1, 1, 'ФормаСписка')")
+    conn.execute("INSERT INTO form_attributes (id, form_id, name) VALUES (1, 1, 'Список')")
+    insert_eav(conn, 'attribute', 1, 'Settings.QueryText', 'ВЫБРАТЬ Тест ИЗ Справочник.Товары',
+               value_type='longtext')
 
 
 @pytest.fixture
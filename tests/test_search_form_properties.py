@@ -11,7 +11,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from shared.indexer_version import INDEXER_VERSION
-from tests.conftest import build_configuration_tools
+from tests.conftest import FORM_EAV_DDL, build_configuration_tools, insert_eav
 
 
 _SCHEMA = '''
@@ -27,13 +27,6 @@ _SCHEMA = '''
     CREATE TABLE form_items (
         id INTEGER PRIMARY KEY, form_id INTEGER, parent_id INTEGER, name TEXT, item_type TEXT
     );
-    CREATE TABLE form_entity_properties (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        entity_kind TEXT NOT NULL, entity_id INTEGER NOT NULL,
-        property_path TEXT NOT NULL, property_name TEXT NOT NULL,
-        ordinal INTEGER NOT NULL DEFAULT 0, value_text TEXT, value_type TEXT,
-        UNIQUE(entity_kind, entity_id, property_path, ordinal)
-    );
 '''
 
 # (item_id, name, type, [(path, value)])
@@ -47,7 +40,7 @@ _ITEMS = [
 
 
 def _setup(conn):
-    conn.executescript(_SCHEMA)
+    conn.executescript(_SCHEMA + FORM_EAV_DDL)
     conn.execute("INSERT INTO metadata_objects (id, object_type, name) VALUES (1, 'Document', 'ТестДок')")
     conn.execute("INSERT INTO forms (id, object_id, form_name) VALUES (1, 1, 'Форма')")
     for item_id, name, itype, props in _ITEMS:
@@ -56,11 +49,7 @@ def _setup(conn):
             (item_id, name, itype),
         )
         for path, value in props:
-            conn.execute(
-                "INSERT INTO form_entity_properties (entity_kind, entity_id, property_path, property_name, ordinal, value_text, value_type) "
-                "VALUES ('item', ?, ?, ?, 0, ?, 'string')",
-                (item_id, path, path.rsplit('.', 1)[-1], value),
-            )
+            insert_eav(conn, 'item', item_id, path, value)
 
 
 @pytest.fixture
@@ -285,6 +285,42 @@ def test_migrates_pre_v1_0_8_store_missing_session_id_column(tmp_path: Path) ->
 
     row = _read_rows(db_path)[0]
     assert row["session_id"] == "01J8UPG"
+    assert row["cache_status"] is None
+
+
+def test_logger_records_cache_status(tmp_path: Path) -> None:
+    db_path = tmp_path / "logs" / "tool-calls.db"
+    logger = ToolCallLogger(db_path)
+    for status in ("miss", "memory"):
+        logger.log(
+            tool="get_object_structure",
+            started_at="2026-07-16T07:00:00Z",
+            started_mono=0.0,
+            args={"object_name": "Контрагенты"},
+            success=True,
+            cache_status=status,
+        )
+    assert [r["cacheStatus"] for r in read_tool_calls(db_path)] == ["memory", "miss"]
+
+
+def test_read_store_without_cache_status_column(tmp_path: Path) -> None:
+    # Written by a server that predates the result cache and not migrated yet.
+    db_path = tmp_path / "logs" / "tool-calls.db"
+    db_path.parent.mkdir(parents=True)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute(
+            "CREATE TABLE tool_calls (id INTEGER PRIMARY KEY, ts_utc TEXT, tool TEXT, task_id TEXT, "
+            "session_id TEXT, agent TEXT, model TEXT, elapsed_ms INTEGER, result_bytes INTEGER, "
+            "success INTEGER, error_code TEXT, args_summary TEXT, pid INTEGER)"
+        )
+        conn.execute("INSERT INTO tool_calls (ts_utc, tool, success) VALUES ('2026-07-16T07:00:00Z', 'search_code', 1)")
+        conn.commit()
+    finally:
+        conn.close()
+    rows = read_tool_calls(db_path)
+    assert [r["tool"] for r in rows] == ["search_code"]
+    assert rows[0]["cacheStatus"] is None
 
 
 def test_logger_task_id_none_when_never_seen(tmp_path: Path) -> None:
@@ -358,6 +394,7 @@ def test_read_returns_newest_first_camelcase(tmp_path: Path) -> None:
     assert set(top) == {
         "id", "tsUtc", "tool", "taskId", "sessionId", "agent", "model",
         "elapsedMs", "resultBytes", "success", "errorCode", "argsSummary", "pid",
+        "cacheStatus",
     }
 
 
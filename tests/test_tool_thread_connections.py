@@ -0,0 +1,172 @@
+"""Tool calls run in the server's thread pool: a thread holds a read-only connection from the
+database's shared pool for the length of a call, and close_all closes the connections of every
+thread. Within one call the base configuration and its extensions are queried concurrently on
+the same tool pool (`_fan_out`)."""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from server.tools.base import CONNECTION_CACHE_KIB, CONNECTION_POOL_SIZE, TOOL_WORKERS
+from tests.conftest import METADATA_OBJECTS_DDL, build_configuration_tools, create_test_db
+
+
+def _create_db(db_path, object_name='Контрагенты'):
+    create_test_db(db_path, METADATA_OBJECTS_DDL + f'''
+        CREATE TABLE forms (id INTEGER PRIMARY KEY, object_id INTEGER, form_name TEXT);
+        CREATE TABLE modules (
+            id INTEGER PRIMARY KEY, object_id INTEGER, form_id INTEGER, command_id INTEGER, module_type TEXT
+        );
+        CREATE TABLE scheduled_jobs (object_id INTEGER PRIMARY KEY, method_name TEXT);
+        INSERT INTO metadata_objects (name, object_type, object_kind)
+        VALUES ('{object_name}', 'Catalog', 'ConfigObject');
+    ''')
+
+
+@pytest.fixture
+def tools_with_db(tmp_path):
+    db_path = tmp_path / 'test.db'
+    _create_db(db_path)
+    tools = build_configuration_tools(tmp_path, db_path)
+    yield tools, str(db_path)
+    tools.close_all()
+
+
+def test_each_thread_gets_its_own_connection(tools_with_db):
+    tools, db_path = tools_with_db
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(tools._get_connection, db_path).result()
+    main = tools._get_connection(db_path)
+    assert main is not first
+    assert main is tools._get_connection(db_path)
+
+
+def test_released_connections_are_shared_by_threads(tools_with_db):
+    tools, db_path = tools_with_db
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        def call():
+            conn = tools._get_connection(db_path)
+            tools.release_connections()
+            return conn
+
+        first = pool.submit(call).result()
+    # Another thread gets the same pooled connection back, not a new one.
+    assert tools._get_connection(db_path) is first
+    cache_kib = -first.execute('PRAGMA cache_size').fetchone()[0]
+    assert cache_kib == max(2048, CONNECTION_CACHE_KIB // CONNECTION_POOL_SIZE)
+
+
+def test_pool_keeps_a_bounded_number_of_idle_connections(tools_with_db):
+    tools, db_path = tools_with_db
+    barrier = threading.Barrier(CONNECTION_POOL_SIZE + 2, timeout=5)
+
+    def call():
+        tools._get_connection(db_path)
+        barrier.wait()  # all threads hold a connection at once
+        tools.release_connections()
+
+    with ThreadPoolExecutor(max_workers=CONNECTION_POOL_SIZE + 2) as pool:
+        list(pool.map(lambda _: call(), range(CONNECTION_POOL_SIZE + 2)))
+    assert tools._pool(db_path).idle_count() == CONNECTION_POOL_SIZE
+
+
+def test_replaced_database_closes_idle_connections(tools_with_db):
+    tools, db_path = tools_with_db
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        def call():
+            conn = tools._get_connection(db_path)
+            tools.release_connections()
+            return conn
+
+        idle = pool.submit(call).result()
+    stat = os.stat(db_path)
+    os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    fresh = tools._get_connection(db_path)
+    assert fresh is not idle
+    with pytest.raises(sqlite3.ProgrammingError):
+        idle.execute('SELECT 1')
+
+
+def test_parallel_calls_and_close_all(tools_with_db):
+    tools, db_path = tools_with_db
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(
+            lambda _: tools.find_object('Контрагенты', project_filter='TestProject'), range(16),
+        ))
+        thread_connections = list(pool.map(lambda _: tools._get_connection(db_path), range(4)))
+    for result in results:
+        assert [item['name'] for item in result['TestProject']['Main (base)']] == ['Контрагенты']
+
+    tools.close_all()
+    for conn in thread_connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+    # A closed thread's cache is empty: the next call reconnects.
+    assert tools._get_connection(db_path).execute('SELECT COUNT(*) FROM metadata_objects').fetchone()[0] == 1
+
+
+def test_fan_out_runs_databases_concurrently_in_order(tools_with_db):
+    tools, _db_path = tools_with_db
+    barrier = threading.Barrier(3, timeout=5)
+
+    def per_db(db_info):
+        # Every database waits for the others: passes only if all three run at once.
+        barrier.wait()
+        time.sleep(0.01 * (3 - db_info['n']))
+        return db_info['n']
+
+    databases = [{'n': n} for n in range(3)]
+    assert tools._fan_out(databases, per_db) == [0, 1, 2]
+    assert tools._fan_out([], per_db) == []
+
+
+def test_fan_out_completes_when_the_tool_pool_is_busy(tools_with_db):
+    tools, _db_path = tools_with_db
+
+    def per_db(db_info):
+        if db_info['n'] < 2:
+            # Nested fan-out from a task that itself runs on the tool pool.
+            return sum(tools._fan_out([{'n': 10}, {'n': 20}], per_db))
+        return db_info['n']
+
+    # More fanning-out calls than pool threads: every worker waits on its own databases.
+    calls = [
+        tools.executor.submit(tools._fan_out, [{'n': n} for n in range(4)], per_db)
+        for _ in range(TOOL_WORKERS * 2)
+    ]
+    for call in calls:
+        assert call.result(timeout=10) == [30, 30, 2, 3]
+
+
+def test_fan_out_raises_the_first_failure(tools_with_db):
+    tools, _db_path = tools_with_db
+
+    def per_db(db_info):
+        if db_info['n']:
+            raise ValueError(db_info['n'])
+        return 0
+
+    with pytest.raises(ValueError, match='1'):
+        tools._fan_out([{'n': n} for n in range(3)], per_db)
+
+
+def test_find_object_merges_extensions_in_database_order(tmp_path):
+    databases = []
+    for db_name, db_type in (('Main', 'base'), ('ExtA', 'extension'), ('ExtB', 'extension')):
+        db_path = tmp_path / f'{db_name}.db'
+        _create_db(db_path, f'Контрагенты{db_name}')
+        databases.append({
+            'project_name': 'TestProject', 'db_name': db_name, 'db_type': db_type, 'db_path': str(db_path),
+        })
+    tools = build_configuration_tools(tmp_path, tmp_path / 'Main.db')
+    tools._get_active_databases = lambda project_filter=None, include_outdated=False: databases
+    try:
+        result = tools.find_object('Контрагенты', project_filter='TestProject')
+    finally:
+        tools.close_all()
+    assert list(result['TestProject']) == ['Main (base)', 'ExtA (extension)', 'ExtB (extension)']
+    assert result['TestProject']['ExtB (extension)'][0]['name'] == 'КонтрагентыExtB'
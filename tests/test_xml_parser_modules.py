@@ -9,6 +9,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from shared.xml_parser import ConfigurationParser
+from shared.xml_parser.bsl import _parse_module_procedures
 
 
 class TestParseModules(unittest.TestCase):
@@ -83,6 +84,14 @@ class TestParseModules(unittest.TestCase):
         modules = self.parser._parse_modules('Номенклатура', 'Catalogs')
         self.assertEqual([m['type'] for m in modules], ['ObjectModule'])
 
+    def test_procedure_outline_is_computed_with_the_code(self):
+        """Оглавление процедур считается в парсере (воркере), вставка его только пишет."""
+        code = 'Процедура ПередЗаписью(Отказ) Экспорт\nКонецПроцедуры\n'
+        self._write_module('Catalogs', 'Номенклатура', 'ObjectModule.bsl', code)
+        modules = self.parser._parse_modules('Номенклатура', 'Catalogs')
+        self.assertEqual(modules[0]['procedures'], _parse_module_procedures(code))
+        self.assertEqual([p['name'] for p in modules[0]['procedures']], ['ПередЗаписью'])
+
 
 if __name__ == '__main__':
     unittest.main()